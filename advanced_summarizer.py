@@ -13,6 +13,8 @@ from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
 import requests
 
+from backend.app.services.term_matrix import WORD_ANALYZER, term_matrix_engine
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -279,8 +281,8 @@ class AdvancedSummarizer:
     
     def _extract_key_themes(self, texts: List[str]) -> List[str]:
         """Extract key themes from texts."""
-        # Combine all texts
-        all_text = " ".join(texts).lower()
+        # Vocabulary of all texts, from the shared term-document matrix
+        matrix = term_matrix_engine.build(texts, WORD_ANALYZER)
         
         # Key theme patterns
         theme_patterns = {
@@ -294,7 +296,7 @@ class AdvancedSummarizer:
         
         themes = []
         for theme, keywords in theme_patterns.items():
-            if any(keyword in all_text for keyword in keywords):
+            if any(matrix.terms_containing(keyword) for keyword in keywords):
                 themes.append(theme)
         
         return themes[:5]  # Top 5 themes
@@ -79,11 +79,92 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "data/uploads")
     ALLOWED_EXTENSIONS: List[str] = [".csv", ".xlsx", ".xls", ".txt", ".json"]
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 * 1024)))  # 50MB default
-    
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 1MB spool chunks
+    ENCODING_SAMPLE_SIZE: int = int(os.getenv("ENCODING_SAMPLE_SIZE", str(64 * 1024)))
+    INGESTION_CHUNK_ROWS: int = int(os.getenv("INGESTION_CHUNK_ROWS", "5000"))
+    BULK_WRITE_BATCH_SIZE: int = int(os.getenv("BULK_WRITE_BATCH_SIZE", "1000"))
+    DIRECTORY_INGESTION_WORKERS: int = int(os.getenv("DIRECTORY_INGESTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    DIRECTORY_RUN_HISTORY: int = int(os.getenv("DIRECTORY_RUN_HISTORY", "100"))
+
+    # Campaign (template comment) clustering
+    CAMPAIGN_SIMILARITY_THRESHOLD: float = float(os.getenv("CAMPAIGN_SIMILARITY_THRESHOLD", "0.85"))
+
+    # Batch job queue
+    BATCH_CHUNK_SIZE: int = int(os.getenv("BATCH_CHUNK_SIZE", "50"))
+    BATCH_LEASE_SECONDS: int = int(os.getenv("BATCH_LEASE_SECONDS", "120"))
+    BATCH_HEARTBEAT_SECONDS: float = float(os.getenv("BATCH_HEARTBEAT_SECONDS", "30"))
+    BATCH_POLL_INTERVAL_SECONDS: float = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "2"))
+    BATCH_MAX_ATTEMPTS: int = int(os.getenv("BATCH_MAX_ATTEMPTS", "3"))
+    # Per-job result files; must be shared storage when workers run on other hosts
+    BATCH_RESULTS_DIR: str = os.getenv("BATCH_RESULTS_DIR", "data/batch_results")
+    # Result files are deleted this long after they were written (0 = keep forever)
+    BATCH_RESULT_RETENTION_HOURS: float = float(os.getenv("BATCH_RESULT_RETENTION_HOURS", "168"))
+    # How often the progress stream re-reads a followed job (once per job, shared by all viewers)
+    BATCH_STREAM_POLL_SECONDS: float = float(os.getenv("BATCH_STREAM_POLL_SECONDS", "1"))
+    # Chunked job input: parts on disk, job size ceiling and abandoned-upload timeout.
+    # The API writes the parts and workers read them, so the input directory must be
+    # shared storage when workers run on other hosts
+    BATCH_INPUT_DIR: str = os.getenv("BATCH_INPUT_DIR", "data/batch_input")
+    BATCH_MAX_JOB_COMMENTS: int = int(os.getenv("BATCH_MAX_JOB_COMMENTS", "500000"))
+    BATCH_MAX_PART_COMMENTS: int = int(os.getenv("BATCH_MAX_PART_COMMENTS", "50000"))
+    BATCH_UPLOAD_IDLE_SECONDS: int = int(os.getenv("BATCH_UPLOAD_IDLE_SECONDS", "3600"))
+    # Chunks of one job analyzed concurrently, on a pool of spawned processes in
+    # dedicated workers (0 = in-process)
+    BATCH_PARALLEL_CHUNKS: int = int(os.getenv("BATCH_PARALLEL_CHUNKS", str(min(4, os.cpu_count() or 1))))
+    BATCH_CHUNK_PROCESSES: int = int(os.getenv("BATCH_CHUNK_PROCESSES", str(min(4, os.cpu_count() or 1))))
+    # Jobs run in dedicated workers (python -m backend.app.workers.batch_worker);
+    # set above 0 to also run workers inside the API process, e.g. for local development
+    BATCH_EMBEDDED_WORKERS: int = int(os.getenv("BATCH_EMBEDDED_WORKERS", "0"))
+    # Embedded workers run chunks in the API process unless a pool is configured here
+    BATCH_EMBEDDED_CHUNK_PROCESSES: int = int(os.getenv("BATCH_EMBEDDED_CHUNK_PROCESSES", "0"))
+
+    # Scored stakeholder tables kept for follow-up comparison/insight/word cloud requests
+    STAKEHOLDER_TABLE_CACHE_SIZE: int = int(os.getenv("STAKEHOLDER_TABLE_CACHE_SIZE", "32"))
+
+    # Rendered word cloud images (memory LRU in front of an on-disk tier)
+    WORDCLOUD_CACHE_DIR: str = os.getenv("WORDCLOUD_CACHE_DIR", "data/wordcloud_cache")
+    WORDCLOUD_CACHE_MAX_BYTES: int = int(os.getenv("WORDCLOUD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    WORDCLOUD_CACHE_DISK_MAX_BYTES: int = int(os.getenv("WORDCLOUD_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+    # Consultations whose term statistics (stored in MongoDB) are cached in memory for word clouds
+    TERM_STATISTICS_MAX_CONSULTATIONS: int = int(os.getenv("TERM_STATISTICS_MAX_CONSULTATIONS", "64"))
+    # Terms per stored statistics delta, and deltas folded into the per-term documents at a time
+    TERM_STATISTICS_DELTA_TERMS: int = int(os.getenv("TERM_STATISTICS_DELTA_TERMS", "5000"))
+    TERM_STATISTICS_COMPACT_VERSIONS: int = int(os.getenv("TERM_STATISTICS_COMPACT_VERSIONS", "32"))
+    # Comment sets whose term-document matrices are kept (per tokenization rules)
+    TERM_MATRIX_CACHE_SIZE: int = int(os.getenv("TERM_MATRIX_CACHE_SIZE", "32"))
+
+    # Report exports: rows fetched per database batch
+    REPORT_FETCH_BATCH_SIZE: int = int(os.getenv("REPORT_FETCH_BATCH_SIZE", "1000"))
+    # Rendered report artifacts (one per consultation, format and data version) and how long
+    # a download waits for a rendering before answering 202 with the job status
+    REPORT_CACHE_DIR: str = os.getenv("REPORT_CACHE_DIR", "data/report_cache")
+    REPORT_WAIT_SECONDS: float = float(os.getenv("REPORT_WAIT_SECONDS", "10"))
+    # Superseded report versions stay on disk this long, so downloads streaming them can finish
+    REPORT_SUPERSEDED_GRACE_SECONDS: float = float(os.getenv("REPORT_SUPERSEDED_GRACE_SECONDS", "600"))
+    # Empty and failed report renderings remembered per process, so status polls can see the outcome
+    REPORT_FINISHED_JOBS: int = int(os.getenv("REPORT_FINISHED_JOBS", "256"))
+
+    # Provision keyword tables and vector indexes kept per distinct legislation structure
+    PROVISION_INDEX_CACHE_SIZE: int = int(os.getenv("PROVISION_INDEX_CACHE_SIZE", "16"))
+    # Legislation sessions (bill structure + incremental comment mappings) held in memory
+    LEGISLATION_SESSION_MAX: int = int(os.getenv("LEGISLATION_SESSION_MAX", "32"))
+    LEGISLATION_SESSION_TTL_SECONDS: int = int(os.getenv("LEGISLATION_SESSION_TTL_SECONDS", "86400"))
+    LEGISLATION_SESSION_MAX_COMMENTS: int = int(os.getenv("LEGISLATION_SESSION_MAX_COMMENTS", "100000"))
+    # Provision analyses (sentiment + summarization) run concurrently on this many inference workers
+    LEGISLATIVE_ANALYSIS_WORKERS: int = int(os.getenv("LEGISLATIVE_ANALYSIS_WORKERS", "4"))
+
+    # spaCy settings
+    SPACY_DOC_CACHE_SIZE: int = int(os.getenv("SPACY_DOC_CACHE_SIZE", "2048"))
+    SPACY_PIPE_BATCH_SIZE: int = int(os.getenv("SPACY_PIPE_BATCH_SIZE", "64"))
+
     # First superuser
     FIRST_SUPERUSER_EMAIL: EmailStr = os.getenv("FIRST_SUPERUSER_EMAIL", "admin@econsultation.gov")
     FIRST_SUPERUSER_PASSWORD: str = os.getenv("FIRST_SUPERUSER_PASSWORD", "admin123")
     
+    # Validated users cached by get_current_user (bounded LRU, short TTL; 0 disables)
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+    AUTH_USER_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+
     # JWT settings
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-jwt-secret-key")
     JWT_ALGORITHM: str = "HS256"
@@ -95,6 +95,36 @@ async def init_db():
         await db.users.create_index("email", unique=True)
         await db.users.create_index("username", unique=True)
 
+        # Near-duplicate signature index used during ingestion
+        from backend.app.services.duplicate_index_service import DuplicateSignatureIndex
+        from backend.app.utils.text_utils import DuplicationDetector
+        await DuplicateSignatureIndex(db, DuplicationDetector()).ensure_indexes()
+
+        # Campaign clusters assigned at ingestion
+        await db.comments.create_index("campaign_cluster_id")
+        await db.campaign_clusters.create_index([("consultation_id", 1), ("member_count", -1)])
+        # Upsert key of ingested comments; replaces the older key without
+        # consultation_id, which let same-named files of different
+        # consultations overwrite each other
+        try:
+            await db.comments.drop_index("content_hash_1_source_file_1_source_row_1")
+        except Exception:
+            pass
+        await db.comments.create_index(
+            [("consultation_id", 1), ("content_hash", 1), ("source_file", 1), ("source_row", 1)],
+            unique=True,
+            partialFilterExpression={"content_hash": {"$exists": True}}
+        )
+        await db.ingestion_manifest.create_index([("path", 1), ("consultation_id", 1)], unique=True)
+
+        # Durable batch job queue
+        from backend.app.services.batch_job_queue import BatchJobQueue
+        await BatchJobQueue(db).ensure_indexes()
+
+        # Per-consultation term statistics for word clouds
+        from backend.app.services.term_statistics import term_statistics_store
+        await term_statistics_store.ensure_indexes(db)
+
         logger.info("Database initialization completed (indexes ensured)")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
@@ -9,6 +9,7 @@ from jose import jwt, JWTError
 from backend.app.core.database import MongoDB
 from backend.app.models.mongo_models import UserInDB
 from backend.app.core.config import settings
+from backend.app.core.user_cache import user_cache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -54,7 +55,11 @@ async def get_user_by_email(email: str) -> Optional[UserInDB]:
 from fastapi import Header, HTTPException, status
 
 async def get_current_user(authorization: str = Header(...)) -> UserInDB:
-    """Get current user from JWT token in Authorization header for MongoDB implementation."""
+    """
+    Get current user from JWT token in Authorization header for MongoDB implementation.
+    Users validated within the last AUTH_USER_CACHE_TTL_SECONDS come from the
+    user cache: the same token skips decoding, a new token skips the database.
+    """
     scheme, _, token = authorization.partition(" ")
     if scheme.lower() != "bearer" or not token:
         raise HTTPException(
@@ -62,6 +67,9 @@ async def get_current_user(authorization: str = Header(...)) -> UserInDB:
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    user = user_cache.get_by_token(token)
+    if user is not None:
+        return user
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
@@ -71,13 +79,17 @@ async def get_current_user(authorization: str = Header(...)) -> UserInDB:
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        user = await get_user_by_email(email)
+        user = user_cache.get(email)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            user_cache.record_miss()
+            user = await get_user_by_email(email)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authentication credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        user_cache.put(email, token, user, payload.get("exp"))
         return user
     except JWTError:
         raise HTTPException(
@@ -96,5 +108,8 @@ async def get_optional_current_user(authorization: Optional[str] = Header(None))
     if authorization:
         scheme, _, token = authorization.partition(" ")
         if scheme.lower() == "bearer" and token:
-            return await get_current_user(token)
+            try:
+                return await get_current_user(authorization)
+            except HTTPException:
+                return None
     return None
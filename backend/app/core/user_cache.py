@@ -0,0 +1,144 @@
+"""
+Authenticated-user cache.
+get_current_user would otherwise decode the JWT and read the user from
+MongoDB on every authenticated request, including each job status poll.
+Validated users are kept here for a short TTL, keyed by token subject
+(email) together with the token they were validated with, so a repeat
+request with the same token costs one dictionary lookup. Admin changes to
+a user invalidate its entry.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from backend.app.core.config import settings
+
+
+class _CachedUser:
+    __slots__ = ("user", "token", "expires_at")
+
+    def __init__(self, user: Any, token: str, expires_at: float):
+        self.user = user
+        self.token = token
+        self.expires_at = expires_at
+
+
+class AuthenticatedUserCache:
+    """Bounded LRU of validated users with a short TTL and hit/miss counters."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries if max_entries is not None else settings.AUTH_USER_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AUTH_USER_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, _CachedUser]" = OrderedDict()
+        # token -> subject, so a known token is resolved without decoding it
+        self._subjects: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_by_token(self, token: str) -> Optional[Any]:
+        """User validated with exactly this token, if still fresh."""
+        with self._lock:
+            subject = self._subjects.get(token)
+            entry = self._entries.get(subject) if subject is not None else None
+            if entry is None or entry.token != token:
+                return None
+            return self._fresh(subject, entry)
+
+    def get(self, subject: str) -> Optional[Any]:
+        """User of a token subject (validated with any token), if still fresh."""
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            return self._fresh(subject, entry)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, subject: str, token: str, user: Any, token_expires_at: Optional[float] = None):
+        """
+        Remember a user validated with token.
+
+        Args:
+            subject: Token subject (email)
+            token: The validated token
+            user: User record
+            token_expires_at: Token exp claim (epoch seconds); the entry never outlives it
+        """
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + (token_expires_at - time.time()))
+        with self._lock:
+            self._drop(subject)
+            self._entries[subject] = _CachedUser(user, token, expires_at)
+            self._subjects[token] = subject
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._subjects.pop(evicted.token, None)
+                self.evictions += 1
+
+    def invalidate(self, subject: Optional[str] = None, user_id: Optional[Any] = None) -> int:
+        """
+        Drop cached users by subject and/or user ID (after a role or status change).
+
+        Returns:
+            int: Entries removed
+        """
+        with self._lock:
+            subjects = set()
+            if subject is not None and subject in self._entries:
+                subjects.add(subject)
+            if user_id is not None:
+                subjects.update(
+                    cached_subject for cached_subject, entry in self._entries.items()
+                    if str(getattr(entry.user, "id", None)) == str(user_id)
+                )
+            for cached_subject in subjects:
+                self._drop(cached_subject)
+            self.invalidations += len(subjects)
+            return len(subjects)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._subjects.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+    def _fresh(self, subject: str, entry: _CachedUser) -> Optional[Any]:
+        if entry.expires_at <= time.monotonic():
+            self._drop(subject)
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return entry.user
+
+    def _drop(self, subject: str):
+        entry = self._entries.pop(subject, None)
+        if entry is not None:
+            self._subjects.pop(entry.token, None)
+
+
+# Shared cache for the process
+user_cache = AuthenticatedUserCache()
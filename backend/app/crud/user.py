@@ -11,6 +11,7 @@ from pymongo.errors import DuplicateKeyError
 from backend.app.core.database import MongoDB
 from backend.app.models.mongo_models import UserInDB, UserCreate, UserUpdate, UserRole
 from backend.app.core.security import get_password_hash
+from backend.app.core.user_cache import user_cache
 
 class CRUDUser:
     """CRUD operations for users."""
@@ -88,6 +89,7 @@ class CRUDUser:
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        user_cache.invalidate(user_id=user_id)
         
         if result.modified_count == 0:
             return None
@@ -99,6 +101,7 @@ class CRUDUser:
         """Delete a user."""
         db = MongoDB.get_db()
         result = await db.users.delete_one({"_id": ObjectId(user_id)})
+        user_cache.invalidate(user_id=user_id)
         return result.deleted_count > 0
 
     @staticmethod
@@ -3,6 +3,7 @@ Main FastAPI application module.
 """
 
 import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, status
@@ -39,6 +40,8 @@ static_dir.mkdir(exist_ok=True)
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown events."""
     logger.info("Starting up...")
+    worker_stop = asyncio.Event()
+    worker_task = None
     db_disabled = os.getenv("DISABLE_DB", "").lower() in ("1", "true", "yes")
     if db_disabled:
         logger.info("Database initialization disabled via DISABLE_DB env var")
@@ -46,6 +49,17 @@ async def lifespan(app: FastAPI):
         try:
             await init_db()
             logger.info("Database connection established")
+
+            # Opt-in in-process batch workers; by default jobs wait for dedicated worker processes
+            if settings.BATCH_EMBEDDED_WORKERS > 0:
+                from backend.app.workers.batch_worker import BatchWorker
+                worker = BatchWorker(
+                    MongoDB.get_db(),
+                    concurrency=settings.BATCH_EMBEDDED_WORKERS,
+                    chunk_processes=settings.BATCH_EMBEDDED_CHUNK_PROCESSES
+                )
+                worker_task = asyncio.create_task(worker.run(worker_stop))
+                logger.info(f"Embedded batch worker started ({settings.BATCH_EMBEDDED_WORKERS} slot(s))")
         except Exception as e:
             # Log but do not crash app in development/local runs
             logger.error(f"Failed to connect to database: {e}")
@@ -53,6 +67,14 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Shutting down...")
+    if worker_task is not None:
+        # Running jobs keep their checkpoints and are resumed once their lease expires
+        worker_stop.set()
+        worker_task.cancel()
+        try:
+            await worker_task
+        except (asyncio.CancelledError, Exception):
+            pass
     try:
         await MongoDB.close_db()
         logger.info("Database connection closed")
@@ -287,8 +309,9 @@ async def summarize_text(payload: SummarizeRequest):
 @app.post("/api/v1/wordcloud", response_model=WordCloudResponse, tags=["visualization"])
 async def wordcloud(payload: WordCloudRequest):
     import base64
-    tokens = await visualization_service.prepare_tokens(payload.texts, min_len=payload.min_word_length)
-    freqs = visualization_service.compute_frequencies(tokens, max_words=payload.max_words)
+    freqs = visualization_service.text_frequencies(
+        payload.texts, max_words=payload.max_words, min_len=payload.min_word_length
+    )
     img_bytes = visualization_service.generate_wordcloud_image(freqs, width=payload.width, height=payload.height)
     return WordCloudResponse(
         image_base64=base64.b64encode(img_bytes).decode("utf-8"),
@@ -27,6 +27,7 @@ from backend.app.core.security import (
 # Remove duplicate secondary auth router section that pulls non-existent schemas
 # (kept for legacy but not used in tests)
 from backend.app.models.user import UserRole
+from backend.app.core.user_cache import user_cache
 
 # Provide a minimal SQLAlchemy User model for tests (since tests expect ORM)
 Base = declarative_base()
@@ -416,6 +417,7 @@ async def activate_user(
     
     user.is_active = True
     db.commit()
+    user_cache.invalidate(subject=user.email, user_id=user.id)
     
     return {"message": f"User {user.email} activated successfully"}
 
@@ -445,6 +447,7 @@ async def deactivate_user(
     
     user.is_active = False
     db.commit()
+    user_cache.invalidate(subject=user.email, user_id=user.id)
     
     return {"message": f"User {user.email} deactivated successfully"}
 
@@ -475,6 +478,7 @@ async def update_user_role(
     
     user.role = new_role
     db.commit()
+    user_cache.invalidate(subject=user.email, user_id=user.id)
     
     return {"message": f"User {user.email} role updated to {new_role.value}"}
 
@@ -1,38 +1,33 @@
 """
 Batch processing router for handling high-volume comment analysis.
 Prevents comments from being overlooked by implementing efficient processing queues.
+
+Jobs are stored in a durable MongoDB queue and executed by batch workers
+(backend.app.workers.batch_worker), not by the API process.
 """
 
 import asyncio
 import uuid
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import json
-from enum import Enum
 
+from backend.app.core.config import settings
+from backend.app.core.database import get_db
 from backend.app.core.security import get_current_user
 from backend.app.models.user import User
-from backend.app.services.sentiment_service import SentimentAnalyzer
-from backend.app.services.summarization_service import SummarizationService
-from backend.app.services.visualization_service import VisualizationService
+from backend.app.services.batch_job_processor import BatchStatus, BatchJobType
+from backend.app.services.batch_input_store import BatchInputStore, parse_comment_chunk
+from backend.app.services.batch_job_queue import BatchJobQueue, CHUNKED_INPUT
+from backend.app.services.batch_progress import progress_broker
+from backend.app.services.batch_result_store import BatchResultStore
 
 router = APIRouter()
-
-class BatchStatus(str, Enum):
-    QUEUED = "queued"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELLED = "cancelled"
-
-class BatchJobType(str, Enum):
-    SENTIMENT_ANALYSIS = "sentiment_analysis"
-    SUMMARIZATION = "summarization"
-    COMPREHENSIVE_ANALYSIS = "comprehensive_analysis"
-    POLICY_ANALYSIS = "policy_analysis"
+result_store = BatchResultStore()
+input_store = BatchInputStore()
 
 class BatchJobRequest(BaseModel):
     job_type: BatchJobType
@@ -41,6 +36,13 @@ class BatchJobRequest(BaseModel):
     priority: Optional[int] = 5  # 1 (highest) to 10 (lowest)
     notification_email: Optional[str] = None
 
+class BatchUploadRequest(BaseModel):
+    """A batch job whose comments are uploaded afterwards in chunks."""
+    job_type: BatchJobType
+    parameters: Optional[Dict[str, Any]] = {}
+    priority: Optional[int] = 5  # 1 (highest) to 10 (lowest)
+    notification_email: Optional[str] = None
+
 class BatchJobStatus(BaseModel):
     job_id: str
     job_type: BatchJobType
@@ -64,28 +66,23 @@ class BatchResult(BaseModel):
     summary_statistics: Dict[str, Any]
     failed_comments: List[Dict[str, Any]]
     recommendations: List[str]
-
-# In-memory storage for batch jobs (in production, use Redis or database)
-batch_jobs: Dict[str, Dict] = {}
-job_queue = asyncio.Queue()
-processing_jobs: Dict[str, asyncio.Task] = {}
-
-# Initialize services
-sentiment_analyzer = SentimentAnalyzer()
-summarization_service = SummarizationService()
-visualization_service = VisualizationService()
+    # Pagination over results (failed_comments are paged with the same window)
+    offset: int = 0
+    limit: int = 0
+    total_results: int = 0
+    total_failed: int = 0
 
 @router.post("/submit-batch", response_model=Dict[str, str])
 async def submit_batch_job(
     request: BatchJobRequest,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
 ):
     """
     Submit a batch job for processing high-volume comments.
     
     This endpoint prevents comments from being overlooked by:
-    - Queueing all comments for systematic processing
+    - Queueing all comments for systematic processing (lower priority value runs first)
     - Providing progress tracking
     - Ensuring no comment is skipped
     - Handling failures gracefully with retry mechanisms
@@ -99,14 +96,13 @@ async def submit_batch_job(
     if len(request.comments) > 10000:  # Limit for single batch
         raise HTTPException(
             status_code=400, 
-            detail="Batch size too large. Maximum 10,000 comments per batch."
+            detail="Batch size too large. Maximum 10,000 comments per batch; use chunked upload (POST /jobs) for larger jobs."
         )
     
     # Create job record
     job_data = {
         "job_id": job_id,
-        "job_type": request.job_type,
-        "status": BatchStatus.QUEUED,
+        "job_type": request.job_type.value,
         "total_comments": len(request.comments),
         "processed_comments": 0,
         "progress_percentage": 0.0,
@@ -116,15 +112,11 @@ async def submit_batch_job(
         "comments": request.comments,
         "parameters": request.parameters,
         "notification_email": request.notification_email,
-        "results": [],
-        "failed_comments": [],
         "error_message": None
     }
     
-    batch_jobs[job_id] = job_data
-    
-    # Add to processing queue
-    background_tasks.add_task(process_batch_job, job_id)
+    # Persist to the durable queue; a batch worker picks it up by priority
+    await BatchJobQueue(db).enqueue(job_data)
     
     return {
         "job_id": job_id,
@@ -132,24 +124,165 @@ async def submit_batch_job(
         "estimated_time": f"{len(request.comments) * 2} seconds"  # Rough estimate
     }
 
+async def _get_owned_job(queue: BatchJobQueue, job_id: str, current_user: User) -> Dict[str, Any]:
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    
+    # Check if user owns this job or is admin
+    if job["user_id"] != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return job
+
+@router.post("/jobs", response_model=Dict[str, Any])
+async def create_upload_job(
+    request: BatchUploadRequest,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Create a batch job for chunked upload of large comment sets.
+    
+    Append comments with POST /jobs/{job_id}/chunks (NDJSON, optionally gzip)
+    and finish with POST /jobs/{job_id}/seal. Workers start on the first
+    chunk instead of waiting for the whole upload.
+    """
+    job_id = str(uuid.uuid4())
+    
+    job_data = {
+        "job_id": job_id,
+        "job_type": request.job_type.value,
+        "total_comments": 0,
+        "processed_comments": 0,
+        "progress_percentage": 0.0,
+        "created_at": datetime.utcnow(),
+        "user_id": current_user.id,
+        "priority": request.priority,
+        "parameters": request.parameters,
+        "notification_email": request.notification_email,
+        "error_message": None,
+        "input_mode": CHUNKED_INPUT,
+        "input_parts": 0,
+        "sealed": False,
+        "last_append_at": None
+    }
+    await BatchJobQueue(db).enqueue(job_data)
+    
+    return {
+        "job_id": job_id,
+        "upload_url": f"/api/v1/batch/jobs/{job_id}/chunks",
+        "seal_url": f"/api/v1/batch/jobs/{job_id}/seal",
+        "max_comments": settings.BATCH_MAX_JOB_COMMENTS,
+        "max_chunk_comments": settings.BATCH_MAX_PART_COMMENTS
+    }
+
+@router.post("/jobs/{job_id}/chunks", response_model=Dict[str, Any])
+async def append_job_chunk(
+    job_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Append a chunk of comments to an unsealed job.
+    
+    The body is NDJSON: one JSON string, or object with a "comment" field,
+    per line. Send Content-Encoding: gzip (or a gzip body) to compress it.
+    """
+    queue = BatchJobQueue(db)
+    job = await _get_owned_job(queue, job_id, current_user)
+    if job.get("input_mode") != CHUNKED_INPUT:
+        raise HTTPException(status_code=400, detail="Job was not created for chunked upload")
+    
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(status_code=413, detail="Chunk too large")
+    
+    compressed = True if request.headers.get("content-encoding", "").lower() == "gzip" else None
+    try:
+        # Decompressing and parsing a large chunk is CPU-bound; keep it off the event loop
+        comments = await asyncio.to_thread(parse_comment_chunk, bytes(body), compressed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid chunk: {e}")
+    
+    if not comments:
+        raise HTTPException(status_code=400, detail="No comments provided")
+    if len(comments) > settings.BATCH_MAX_PART_COMMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk too large. Maximum {settings.BATCH_MAX_PART_COMMENTS:,} comments per chunk."
+        )
+    
+    reservation = await queue.reserve_part(job_id, len(comments), settings.BATCH_MAX_JOB_COMMENTS)
+    if reservation is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is sealed, finished, or would exceed {settings.BATCH_MAX_JOB_COMMENTS:,} comments"
+        )
+    seq, start = reservation
+    
+    # Store the part before registering it, so workers never see a partial file
+    try:
+        await asyncio.to_thread(input_store.write_part, job_id, seq, comments)
+    except Exception as e:
+        await queue.release_part(job_id, seq, start, len(comments))
+        raise HTTPException(status_code=500, detail=f"Failed to store chunk: {e}")
+    await queue.add_part(job_id, seq, start, len(comments))
+    
+    return {
+        "job_id": job_id,
+        "chunk": seq,
+        "first_comment_index": start,
+        "comments": len(comments),
+        "total_comments": start + len(comments)
+    }
+
+@router.post("/jobs/{job_id}/seal", response_model=Dict[str, Any])
+async def seal_upload_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Mark a chunked job's upload complete; results become available once all chunks are processed."""
+    queue = BatchJobQueue(db)
+    job = await _get_owned_job(queue, job_id, current_user)
+    if job.get("input_mode") != CHUNKED_INPUT:
+        raise HTTPException(status_code=400, detail="Job was not created for chunked upload")
+    if job["total_comments"] == 0:
+        raise HTTPException(status_code=400, detail="No comments uploaded")
+    
+    if not await queue.seal(job_id):
+        raise HTTPException(status_code=409, detail="Job is already sealed or finished")
+    
+    return {
+        "job_id": job_id,
+        "total_comments": job["total_comments"],
+        "message": "Upload sealed. Processing continues with the remaining chunks."
+    }
+
 @router.get("/status/{job_id}", response_model=BatchJobStatus)
 async def get_batch_status(
     job_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
 ):
     """Get the status of a batch processing job."""
-    if job_id not in batch_jobs:
+    job = await BatchJobQueue(db).get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Batch job not found")
     
-    job = batch_jobs[job_id]
-    
     # Check if user owns this job or is admin
     if job["user_id"] != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Calculate estimated completion
-    estimated_completion = None
-    if job["status"] == BatchStatus.PROCESSING and job["processed_comments"] > 0:
+    # Calculate estimated completion; workers store one based on their own chunk throughput
+    estimated_completion = job.get("estimated_completion")
+    if job["status"] != BatchStatus.PROCESSING:
+        estimated_completion = None
+    elif estimated_completion is None and job["processed_comments"] > 0 and job.get("started_at"):
         avg_time_per_comment = (datetime.utcnow() - job["started_at"]).total_seconds() / job["processed_comments"]
         remaining_comments = job["total_comments"] - job["processed_comments"]
         estimated_seconds = remaining_comments * avg_time_per_comment
@@ -170,17 +303,11 @@ async def get_batch_status(
         results_available=job["status"] == BatchStatus.COMPLETED
     )
 
-@router.get("/results/{job_id}", response_model=BatchResult)
-async def get_batch_results(
-    job_id: str,
-    current_user: User = Depends(get_current_user)
-):
-    """Get the results of a completed batch processing job."""
-    if job_id not in batch_jobs:
+async def _get_completed_job(queue: BatchJobQueue, job_id: str, current_user: User) -> Dict[str, Any]:
+    job = await queue.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Batch job not found")
     
-    job = batch_jobs[job_id]
-    
     # Check if user owns this job or is admin
     if job["user_id"] != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
@@ -188,12 +315,59 @@ async def get_batch_results(
     if job["status"] != BatchStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Job not completed yet")
     
-    # Calculate summary statistics
-    results = job["results"]
-    summary_stats = calculate_summary_statistics(results, job["job_type"])
+    if not job.get("result_summary") or not await asyncio.to_thread(result_store.exists, job_id):
+        raise HTTPException(status_code=410, detail="Batch job results are no longer available")
+    
+    return job
+
+@router.get("/stream/{job_id}")
+async def stream_batch_progress(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Server-sent events for a batch job: progress (with partial summary
+    statistics) until a final completed, failed or cancelled event.
+    Authentication happens once per connection instead of once per poll.
+    """
+    queue = BatchJobQueue(db)
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    
+    # Check if user owns this job or is admin
+    if job["user_id"] != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    async def event_stream():
+        async for event in progress_broker.subscribe(queue, job_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/results/{job_id}", response_model=BatchResult)
+async def get_batch_results(
+    job_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=1000, ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Get a page of the results of a completed batch processing job."""
+    job = await _get_completed_job(BatchJobQueue(db), job_id, current_user)
     
-    # Generate recommendations
-    recommendations = generate_batch_recommendations(results, job["job_type"])
+    # Summary statistics and recommendations were aggregated when the results were written
+    result_summary = job["result_summary"]
+    results = await asyncio.to_thread(result_store.read_page, job_id, offset, limit)
+    failed_comments = await asyncio.to_thread(result_store.read_page, job_id, offset, limit, failed=True)
     
     processing_time = (job["completed_at"] - job["started_at"]).total_seconds()
     
@@ -203,9 +377,29 @@ async def get_batch_results(
         total_comments=job["total_comments"],
         processing_time_seconds=processing_time,
         results=results,
-        summary_statistics=summary_stats,
-        failed_comments=job["failed_comments"],
-        recommendations=recommendations
+        summary_statistics=result_summary["summary_statistics"],
+        failed_comments=failed_comments,
+        recommendations=result_summary["recommendations"],
+        offset=offset,
+        limit=limit,
+        total_results=result_summary["result_count"],
+        total_failed=result_summary["failed_count"]
+    )
+
+@router.get("/results/{job_id}/stream")
+async def stream_batch_results(
+    job_id: str,
+    failed: bool = False,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Stream all results (or failed comments) of a completed job as NDJSON."""
+    await _get_completed_job(BatchJobQueue(db), job_id, current_user)
+    
+    return StreamingResponse(
+        result_store.iter_lines(job_id, failed=failed),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={job_id}.{'failed' if failed else 'results'}.jsonl"}
     )
 
 @router.get("/list-jobs")
@@ -213,24 +407,22 @@ async def list_batch_jobs(
     status: Optional[BatchStatus] = None,
     job_type: Optional[BatchJobType] = None,
     limit: int = Query(default=50, le=100),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
 ):
     """List batch jobs for the current user."""
-    user_jobs = []
+    # Filter by user (admin can see all)
+    jobs = await BatchJobQueue(db).list(
+        user_id=None if current_user.role == "admin" else current_user.id,
+        status=status.value if status else None,
+        job_type=job_type.value if job_type else None,
+        limit=limit
+    )
     
-    for job_id, job in batch_jobs.items():
-        # Filter by user (admin can see all)
-        if job["user_id"] != current_user.id and current_user.role != "admin":
-            continue
-        
-        # Apply filters
-        if status and job["status"] != status:
-            continue
-        if job_type and job["job_type"] != job_type:
-            continue
-        
+    user_jobs = []
+    for job in jobs:
         user_jobs.append({
-            "job_id": job_id,
+            "job_id": job["job_id"],
             "job_type": job["job_type"],
             "status": job["status"],
             "total_comments": job["total_comments"],
@@ -240,315 +432,27 @@ async def list_batch_jobs(
             "completed_at": job.get("completed_at")
         })
     
-    # Sort by creation time (newest first)
-    user_jobs.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    return user_jobs[:limit]
+    return user_jobs
 
 @router.delete("/cancel/{job_id}")
 async def cancel_batch_job(
     job_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
 ):
     """Cancel a batch processing job."""
-    if job_id not in batch_jobs:
+    queue = BatchJobQueue(db)
+    job = await queue.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Batch job not found")
     
-    job = batch_jobs[job_id]
-    
     # Check if user owns this job or is admin
     if job["user_id"] != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if job["status"] in [BatchStatus.COMPLETED, BatchStatus.FAILED, BatchStatus.CANCELLED]:
+    # The worker running the job stops at its next heartbeat or checkpoint
+    if not await queue.cancel(job_id):
         raise HTTPException(status_code=400, detail="Cannot cancel completed/failed/cancelled job")
-    
-    # Cancel the job
-    job["status"] = BatchStatus.CANCELLED
-    
-    # Cancel processing task if running
-    if job_id in processing_jobs:
-        processing_jobs[job_id].cancel()
-        del processing_jobs[job_id]
+    await asyncio.to_thread(input_store.delete, job_id)
     
     return {"message": "Batch job cancelled successfully"}
-
-async def process_batch_job(job_id: str):
-    """Background task to process batch job."""
-    try:
-        job = batch_jobs[job_id]
-        job["status"] = BatchStatus.PROCESSING
-        job["started_at"] = datetime.utcnow()
-        
-        comments = job["comments"]
-        job_type = job["job_type"]
-        parameters = job["parameters"]
-        
-        results = []
-        failed_comments = []
-        
-        # Process comments in batches to prevent memory issues
-        batch_size = 50  # Process 50 comments at a time
-        
-        for i in range(0, len(comments), batch_size):
-            batch_comments = comments[i:i + batch_size]
-            
-            # Process batch
-            batch_results = await process_comment_batch(
-                batch_comments, job_type, parameters, i
-            )
-            
-            # Separate successful and failed results
-            for result in batch_results:
-                if result.get("error"):
-                    failed_comments.append(result)
-                else:
-                    results.append(result)
-            
-            # Update progress
-            job["processed_comments"] = min(i + batch_size, len(comments))
-            job["progress_percentage"] = (job["processed_comments"] / len(comments)) * 100
-            
-            # Check if job was cancelled
-            if job["status"] == BatchStatus.CANCELLED:
-                return
-        
-        # Job completed successfully
-        job["status"] = BatchStatus.COMPLETED
-        job["completed_at"] = datetime.utcnow()
-        job["results"] = results
-        job["failed_comments"] = failed_comments
-        
-        # Send notification if email provided
-        if job.get("notification_email"):
-            await send_completion_notification(job)
-        
-    except Exception as e:
-        # Job failed
-        job["status"] = BatchStatus.FAILED
-        job["error_message"] = str(e)
-        job["completed_at"] = datetime.utcnow()
-        
-        print(f"Batch job {job_id} failed: {e}")
-
-async def process_comment_batch(
-    comments: List[str], 
-    job_type: BatchJobType, 
-    parameters: Dict[str, Any],
-    batch_start_index: int
-) -> List[Dict[str, Any]]:
-    """Process a batch of comments based on job type."""
-    results = []
-    
-    for i, comment in enumerate(comments):
-        try:
-            comment_index = batch_start_index + i
-            
-            if job_type == BatchJobType.SENTIMENT_ANALYSIS:
-                # Basic sentiment analysis
-                sentiment_results = await sentiment_analyzer.analyze_sentiment(comment)
-                result = {
-                    "comment_index": comment_index,
-                    "comment": comment,
-                    "sentiment_results": [r.__dict__ for r in sentiment_results],
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-            elif job_type == BatchJobType.POLICY_ANALYSIS:
-                # Policy-specific analysis
-                policy_result = await sentiment_analyzer.analyze_policy_sentiment(comment)
-                stakeholder_type = sentiment_analyzer._detect_stakeholder_type(comment)
-                result = {
-                    "comment_index": comment_index,
-                    "comment": comment,
-                    "policy_sentiment": policy_result.__dict__,
-                    "stakeholder_type": stakeholder_type,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-            elif job_type == BatchJobType.COMPREHENSIVE_ANALYSIS:
-                # Full comprehensive analysis
-                comprehensive_result = await sentiment_analyzer.comprehensive_analysis(comment)
-                result = {
-                    "comment_index": comment_index,
-                    "comment": comment,
-                    "comprehensive_analysis": {
-                        "sentiment_results": [r.__dict__ for r in comprehensive_result.sentiment_results],
-                        "emotion_result": comprehensive_result.emotion_result.__dict__,
-                        "aspect_sentiments": [a.__dict__ for a in comprehensive_result.aspect_sentiments],
-                        "key_phrases": comprehensive_result.key_phrases,
-                        "law_sections_mentioned": comprehensive_result.law_sections_mentioned,
-                        "overall_sentiment": comprehensive_result.overall_sentiment.value,
-                        "overall_confidence": comprehensive_result.overall_confidence,
-                        "processing_time_ms": comprehensive_result.processing_time_ms
-                    },
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-            elif job_type == BatchJobType.SUMMARIZATION:
-                # Summarization with policy enhancement
-                summary_result = await summarization_service.policy_summarization(comment)
-                result = {
-                    "comment_index": comment_index,
-                    "comment": comment,
-                    "summary_result": summary_result.__dict__,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            
-            results.append(result)
-            
-        except Exception as e:
-            # Record failed comment
-            results.append({
-                "comment_index": comment_index,
-                "comment": comment,
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
-            })
-    
-    return results
-
-def calculate_summary_statistics(results: List[Dict], job_type: BatchJobType) -> Dict[str, Any]:
-    """Calculate summary statistics for batch results."""
-    total_results = len(results)
-    
-    if job_type == BatchJobType.SENTIMENT_ANALYSIS or job_type == BatchJobType.POLICY_ANALYSIS:
-        # Sentiment distribution
-        sentiments = []
-        confidences = []
-        
-        for result in results:
-            if job_type == BatchJobType.POLICY_ANALYSIS:
-                sentiment = result.get("policy_sentiment", {}).get("sentiment_label")
-                confidence = result.get("policy_sentiment", {}).get("confidence_score", 0)
-            else:
-                sentiment_results = result.get("sentiment_results", [])
-                if sentiment_results:
-                    sentiment = sentiment_results[0].get("sentiment_label")
-                    confidence = sentiment_results[0].get("confidence_score", 0)
-                else:
-                    continue
-                    
-            sentiments.append(sentiment)
-            confidences.append(confidence)
-        
-        sentiment_counts = {}
-        for sentiment in sentiments:
-            sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        
-        return {
-            "total_comments": total_results,
-            "sentiment_distribution": sentiment_counts,
-            "average_confidence": sum(confidences) / len(confidences) if confidences else 0,
-            "high_confidence_comments": len([c for c in confidences if c > 0.8]),
-            "low_confidence_comments": len([c for c in confidences if c < 0.5])
-        }
-    
-    elif job_type == BatchJobType.COMPREHENSIVE_ANALYSIS:
-        # More detailed statistics
-        sentiments = []
-        emotions = []
-        aspects_count = 0
-        
-        for result in results:
-            analysis = result.get("comprehensive_analysis", {})
-            overall_sentiment = analysis.get("overall_sentiment")
-            emotion = analysis.get("emotion_result", {}).get("emotion_label")
-            aspects = analysis.get("aspect_sentiments", [])
-            
-            if overall_sentiment:
-                sentiments.append(overall_sentiment)
-            if emotion:
-                emotions.append(emotion)
-            aspects_count += len(aspects)
-        
-        sentiment_counts = {}
-        for sentiment in sentiments:
-            sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        
-        emotion_counts = {}
-        for emotion in emotions:
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        return {
-            "total_comments": total_results,
-            "sentiment_distribution": sentiment_counts,
-            "emotion_distribution": emotion_counts,
-            "total_aspects_identified": aspects_count,
-            "average_aspects_per_comment": aspects_count / total_results if total_results > 0 else 0
-        }
-    
-    else:  # Summarization
-        total_chars = sum(len(r.get("summary_result", {}).get("summary_text", "")) for r in results)
-        return {
-            "total_comments": total_results,
-            "total_summary_characters": total_chars,
-            "average_summary_length": total_chars / total_results if total_results > 0 else 0
-        }
-
-def generate_batch_recommendations(results: List[Dict], job_type: BatchJobType) -> List[str]:
-    """Generate actionable recommendations based on batch analysis results."""
-    recommendations = []
-    
-    if not results:
-        return ["No results available for recommendations."]
-    
-    # Calculate basic metrics
-    total_comments = len(results)
-    
-    if job_type in [BatchJobType.SENTIMENT_ANALYSIS, BatchJobType.POLICY_ANALYSIS]:
-        # Sentiment-based recommendations
-        positive_count = 0
-        negative_count = 0
-        neutral_count = 0
-        low_confidence_count = 0
-        
-        for result in results:
-            if job_type == BatchJobType.POLICY_ANALYSIS:
-                sentiment_data = result.get("policy_sentiment", {})
-            else:
-                sentiment_results = result.get("sentiment_results", [])
-                sentiment_data = sentiment_results[0] if sentiment_results else {}
-            
-            sentiment = sentiment_data.get("sentiment_label", "").lower()
-            confidence = sentiment_data.get("confidence_score", 0)
-            
-            if sentiment == "positive":
-                positive_count += 1
-            elif sentiment == "negative":
-                negative_count += 1
-            else:
-                neutral_count += 1
-            
-            if confidence < 0.6:
-                low_confidence_count += 1
-        
-        # Generate recommendations
-        if negative_count > positive_count:
-            recommendations.append(f"High negative sentiment detected ({negative_count}/{total_comments} comments). Consider addressing stakeholder concerns.")
-        
-        if positive_count > total_comments * 0.7:
-            recommendations.append(f"Strong positive support ({positive_count}/{total_comments} comments). This policy appears well-received.")
-        
-        if low_confidence_count > total_comments * 0.3:
-            recommendations.append(f"Many comments have ambiguous sentiment ({low_confidence_count}/{total_comments}). Manual review recommended for unclear feedback.")
-        
-        if neutral_count > total_comments * 0.5:
-            recommendations.append("High neutral sentiment suggests stakeholders need more information or clarification.")
-    
-    # Add volume-based recommendations
-    if total_comments > 1000:
-        recommendations.append("High volume of feedback received. Consider categorizing by stakeholder type for targeted responses.")
-    
-    if total_comments < 50:
-        recommendations.append("Limited feedback volume. Consider extending consultation period or broader outreach.")
-    
-    recommendations.append("Review failed comments for processing issues and ensure comprehensive coverage.")
-    recommendations.append("Use stakeholder categorization to identify different perspectives on the policy.")
-    
-    return recommendations
-
-async def send_completion_notification(job: Dict):
-    """Send email notification when batch job completes (placeholder)."""
-    # In production, implement actual email sending
-    print(f"Notification: Batch job {job['job_id']} completed. Email would be sent to {job['notification_email']}")
\ No newline at end of file
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from backend.app.core.database import get_db, check_db_connection, get_db_info
 from backend.app.core.config import settings
+from backend.app.core.user_cache import user_cache
 
 
 router = APIRouter()
@@ -86,4 +87,18 @@ async def database_health():
         "database_healthy": db_healthy,
         "database_info": db_info,
         "timestamp": datetime.utcnow().isoformat(),
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/health/auth-cache")
+async def auth_cache_health():
+    """
+    Authenticated-user cache statistics (hit ratio of get_current_user lookups).
+    
+    Returns:
+        dict: Cache size, hits, misses, evictions, invalidations and hit ratio
+    """
+    return {
+        **user_cache.stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
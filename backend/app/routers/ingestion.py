@@ -7,7 +7,7 @@ from typing import Optional, Dict, Any
 
 from backend.app.core.database import get_db
 from backend.app.core.mongo_auth import get_current_user
-from backend.app.services.ingestion_service import IngestionService
+from backend.app.services.ingestion_service import IngestionService, directory_runs
 from backend.app.models.mongo_models import UserInDB as User
 
 router = APIRouter()
@@ -86,12 +86,18 @@ async def get_ingestion_stats(
 async def bulk_process_directory(
     directory_path: str = Form(..., description="Path to directory containing files"),
     consultation_id: Optional[str] = Form(None, description="Consultation process ID"),
+    max_workers: Optional[int] = Form(None, description="Files processed concurrently"),
+    force: bool = Form(False, description="Re-ingest files even if unchanged since the last run"),
+    run_id: Optional[str] = Form(None, description="ID for polling progress at /bulk-directory/{run_id}/progress"),
     current_user: User = Depends(get_current_user),
     db = Depends(get_db)
 ):
     """
     Bulk process all supported files in a directory.
 
+    Files are processed concurrently and streamed from disk. Files unchanged
+    since the last successful run (same hash and modification time) are skipped.
+
     **Note**: This endpoint is for server-side directory processing.
     The directory must be accessible to the server.
     """
@@ -101,12 +107,18 @@ async def bulk_process_directory(
         result = await ingestion_service.bulk_process_directory(
             directory_path=directory_path,
             user_id=current_user.id,
-            consultation_id=consultation_id
+            consultation_id=consultation_id,
+            max_workers=max_workers,
+            force=force,
+            run_id=run_id
         )
 
         return {
             "success": True,
-            "message": f"Bulk processing completed. {result['processed_files']}/{result['total_files']} files processed.",
+            "message": (
+                f"Bulk processing completed. {result['processed_files']}/{result['total_files']} files processed, "
+                f"{result['skipped_files']} unchanged files skipped."
+            ),
             "statistics": result
         }
 
@@ -119,6 +131,33 @@ async def bulk_process_directory(
         )
 
 
+@router.get("/bulk-directory/{run_id}/progress", response_model=Dict[str, Any])
+async def get_bulk_directory_progress(
+    run_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get per-file status of a directory ingestion run.
+    """
+    progress = directory_runs.get(run_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Directory run not found"
+        )
+
+    file_statuses = [entry['status'] for entry in progress['files'].values()]
+    return {
+        "success": True,
+        "run_id": run_id,
+        "status": progress['status'],
+        "started_at": progress['started_at'],
+        "completed_at": progress['completed_at'],
+        "summary": {status_name: file_statuses.count(status_name) for status_name in set(file_statuses)},
+        "files": progress['files']
+    }
+
+
 @router.get("/supported-formats")
 async def get_supported_formats():
     """
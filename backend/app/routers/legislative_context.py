@@ -4,7 +4,7 @@ and providing context-aware analysis for draft legislation feedback.
 """
 
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -14,8 +14,10 @@ from backend.app.services.legislative_context_service import (
     LegislativeContextService, 
     LegislativeProvision, 
     ProvisionType,
-    LegislativeContextResult
+    LegislativeContextResult,
+    ProvisionMapping
 )
+from backend.app.services.legislation_session_service import LegislationSession, LegislationSessionStore
 
 router = APIRouter()
 
@@ -27,14 +29,25 @@ class LegislationStructureRequest(BaseModel):
     parent_provision: Optional[str] = None
 
 class LegislativeAnalysisRequest(BaseModel):
-    comments: List[str]
+    comments: List[str] = []
     legislation_structure: Optional[List[LegislationStructureRequest]] = None
     legislation_title: Optional[str] = None
     legislation_type: Optional[str] = None  # "bill", "amendment", "regulation", etc.
+    session_id: Optional[str] = None  # Analyze a legislation session (comments are added to it)
 
 class ProvisionMappingRequest(BaseModel):
     comments: List[str]
     target_provisions: Optional[List[str]] = None  # Specific provisions to focus on
+    session_id: Optional[str] = None  # Map against a session's structure and store the mappings
+
+class LegislationSessionRequest(BaseModel):
+    legislation_structure: List[LegislationStructureRequest]
+    legislation_title: Optional[str] = None
+    legislation_type: Optional[str] = None
+    comments: Optional[List[str]] = None
+
+class SessionCommentsRequest(BaseModel):
+    comments: List[str]
 
 class ProvisionAnalysisResponse(BaseModel):
     provision_id: str
@@ -49,6 +62,152 @@ class ProvisionAnalysisResponse(BaseModel):
 
 # Initialize service
 legislative_service = LegislativeContextService()
+legislation_sessions = LegislationSessionStore(legislative_service)
+
+def _to_provisions(items: List[LegislationStructureRequest]) -> List[LegislativeProvision]:
+    return [
+        LegislativeProvision(
+            provision_id=item.provision_id,
+            provision_type=item.provision_type,
+            title=item.title,
+            content=item.content,
+            parent_provision=item.parent_provision
+        )
+        for item in items
+    ]
+
+def _format_mapping(mapping: ProvisionMapping) -> Dict[str, Any]:
+    return {
+        "comment_text": mapping.comment_text,
+        "provision_id": mapping.provision_id,
+        "provision_type": mapping.provision_type.value,
+        "provision_title": mapping.provision_title,
+        "mapping_confidence": mapping.mapping_confidence,
+        "mapping_method": mapping.mapping_method,
+        "context_snippet": mapping.context_snippet
+    }
+
+def _get_owned_session(session_id: str, current_user: User) -> LegislationSession:
+    session = legislation_sessions.get(session_id)
+    if session is None:
+        # Sessions are held in memory by the API process that created them
+        raise HTTPException(
+            status_code=404,
+            detail="Legislation session not found (sessions expire, and exist only on the API process that created them)"
+        )
+    
+    # Check if user owns this session or is admin
+    if session.user_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return session
+
+async def _add_session_comments(session: LegislationSession, comments: List[str]):
+    """Add comments to a session, rejecting additions beyond its comment limit."""
+    try:
+        return await session.add_comments(comments)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@router.post("/legislation-sessions")
+async def create_legislation_session(
+    request: LegislationSessionRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a legislation structure once and get a session ID.
+    
+    Keyword and vector indexes of the provisions are built immediately.
+    Comments added to the session are mapped incrementally, and the
+    analysis, provision, cross-provision and coverage endpoints accept the
+    session_id to query the stored mappings instead of re-mapping.
+    
+    Sessions are held in memory by the API process that creates them: they
+    are not shared between workers or kept across restarts, so with several
+    workers a request routed to another process gets 404. Sessions expire
+    after LEGISLATION_SESSION_TTL_SECONDS idle and hold at most
+    LEGISLATION_SESSION_MAX_COMMENTS comments (413 beyond that).
+    """
+    if not request.legislation_structure:
+        raise HTTPException(status_code=400, detail="No legislation structure provided")
+    
+    session = await legislation_sessions.create(
+        current_user.id,
+        _to_provisions(request.legislation_structure),
+        request.legislation_title,
+        request.legislation_type
+    )
+    if request.comments:
+        await _add_session_comments(session, request.comments)
+    
+    return {"legislation_session": session.summary()}
+
+@router.post("/legislation-sessions/{session_id}/comments")
+async def add_session_comments(
+    session_id: str,
+    request: SessionCommentsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Map new comments against the session's legislation and store the mappings.
+    
+    Returns 413 if the session would exceed LEGISLATION_SESSION_MAX_COMMENTS,
+    and 404 if the session is unknown to this API process (see
+    POST /legislation-sessions).
+    """
+    if not request.comments:
+        raise HTTPException(status_code=400, detail="No comments provided")
+    
+    session = _get_owned_session(session_id, current_user)
+    comment_mappings = await _add_session_comments(session, request.comments)
+    
+    return {
+        "legislation_session": session.summary(),
+        "added_comments": len(request.comments),
+        "newly_mapped_comments": sum(1 for mappings in comment_mappings if mappings),
+        "provision_mappings": [_format_mapping(mapping) for mappings in comment_mappings for mapping in mappings],
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/legislation-sessions/{session_id}")
+async def get_legislation_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Session metadata and mapping totals."""
+    session = _get_owned_session(session_id, current_user)
+    return {"legislation_session": session.summary()}
+
+@router.get("/legislation-sessions/{session_id}/mappings")
+async def get_session_mappings(
+    session_id: str,
+    provision_id: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """Page through the session's stored comment-to-provision mappings."""
+    session = _get_owned_session(session_id, current_user)
+    mappings = session.mappings(provision_id)
+    
+    return {
+        "session_id": session_id,
+        "provision_id": provision_id,
+        "offset": offset,
+        "limit": limit,
+        "total_mappings": len(mappings),
+        "provision_mappings": [_format_mapping(mapping) for mapping in mappings[offset:offset + limit]]
+    }
+
+@router.delete("/legislation-sessions/{session_id}")
+async def delete_legislation_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Discard a legislation session and its mappings."""
+    _get_owned_session(session_id, current_user)
+    legislation_sessions.delete(session_id)
+    return {"message": "Legislation session deleted", "session_id": session_id}
 
 @router.post("/analyze-legislative-context")
 async def analyze_legislative_context(
@@ -62,28 +221,33 @@ async def analyze_legislative_context(
     This addresses the MCA eConsultation requirement for systematic analysis
     to ensure no observations are overlooked.
     """
-    if not request.comments:
-        raise HTTPException(status_code=400, detail="No comments provided")
-    
-    # Convert request structure to service objects
-    legislation_structure = None
-    if request.legislation_structure:
-        legislation_structure = [
-            LegislativeProvision(
-                provision_id=item.provision_id,
-                provision_type=item.provision_type,
-                title=item.title,
-                content=item.content,
-                parent_provision=item.parent_provision
-            )
-            for item in request.legislation_structure
-        ]
-    
-    # Perform analysis
-    result = await legislative_service.analyze_legislative_context(
-        request.comments, 
-        legislation_structure
-    )
+    legislation_title = request.legislation_title
+    legislation_type = request.legislation_type
+    
+    if request.session_id:
+        # Analyze the session's stored mappings, adding any new comments first
+        session = _get_owned_session(request.session_id, current_user)
+        if request.comments:
+            await _add_session_comments(session, request.comments)
+        if not session.comments:
+            raise HTTPException(status_code=400, detail="No comments provided")
+        result = await session.analyze()
+        legislation_title = legislation_title or session.title
+        legislation_type = legislation_type or session.legislation_type
+    else:
+        if not request.comments:
+            raise HTTPException(status_code=400, detail="No comments provided")
+        
+        # Convert request structure to service objects
+        legislation_structure = None
+        if request.legislation_structure:
+            legislation_structure = _to_provisions(request.legislation_structure)
+        
+        # Perform analysis
+        result = await legislative_service.analyze_legislative_context(
+            request.comments, 
+            legislation_structure
+        )
     
     # Format response
     provision_responses = []
@@ -102,8 +266,9 @@ async def analyze_legislative_context(
     
     return {
         "legislative_analysis": {
-            "legislation_title": request.legislation_title or "Draft Legislation",
-            "legislation_type": request.legislation_type or "bill",
+            "legislation_title": legislation_title or "Draft Legislation",
+            "legislation_type": legislation_type or "bill",
+            "session_id": request.session_id,
             "analysis_summary": {
                 "total_comments": result.total_comments,
                 "mapped_comments": result.mapped_comments,
@@ -114,6 +279,7 @@ async def analyze_legislative_context(
             "cross_provision_themes": result.cross_provision_themes,
             "legislative_recommendations": result.legislative_recommendations,
             "implementation_considerations": result.implementation_considerations,
+            "stage_timings": {stage: round(seconds, 4) for stage, seconds in result.stage_timings.items()},
             "timestamp": datetime.utcnow().isoformat()
         }
     }
@@ -133,20 +299,16 @@ async def map_comments_to_provisions(
         raise HTTPException(status_code=400, detail="No comments provided")
     
     # Perform provision mapping
-    mappings = await legislative_service.map_comments_to_provisions(request.comments)
+    if request.session_id:
+        # Map against the session's structure and keep the mappings
+        session = _get_owned_session(request.session_id, current_user)
+        comment_mappings = await _add_session_comments(session, request.comments)
+        mappings = [mapping for per_comment in comment_mappings for mapping in per_comment]
+    else:
+        mappings = await legislative_service.map_comments_to_provisions(request.comments)
     
     # Format mappings for response
-    formatted_mappings = []
-    for mapping in mappings:
-        formatted_mappings.append({
-            "comment_text": mapping.comment_text,
-            "provision_id": mapping.provision_id,
-            "provision_type": mapping.provision_type.value,
-            "provision_title": mapping.provision_title,
-            "mapping_confidence": mapping.mapping_confidence,
-            "mapping_method": mapping.mapping_method,
-            "context_snippet": mapping.context_snippet
-        })
+    formatted_mappings = [_format_mapping(mapping) for mapping in mappings]
     
     # Generate mapping statistics
     mapping_stats = {
@@ -166,8 +328,9 @@ async def map_comments_to_provisions(
 @router.post("/provision-specific-analysis/{provision_id}")
 async def analyze_specific_provision(
     provision_id: str,
-    comments: List[str],
+    comments: Optional[List[str]] = Body(None),
     provision_title: Optional[str] = None,
+    session_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -175,24 +338,31 @@ async def analyze_specific_provision(
     
     Provides focused analysis for individual provisions to help
     understand stakeholder feedback on specific parts of legislation.
+    With a session_id the comments already mapped to the provision are used.
     """
-    if not comments:
-        raise HTTPException(status_code=400, detail="No comments provided")
-    
-    # Create a mock provision for analysis
-    from backend.app.services.legislative_context_service import LegislativeProvision, ProvisionType
-    
-    provision = LegislativeProvision(
-        provision_id=provision_id,
-        provision_type=ProvisionType.SECTION,  # Default type
-        title=provision_title or f"Provision {provision_id}",
-        content=""
-    )
-    
-    # Analyze the provision
-    analysis = await legislative_service._analyze_provision_comments(
-        provision_id, comments, [provision]
-    )
+    if session_id:
+        if comments:
+            raise HTTPException(status_code=400, detail="Add comments to the legislation session instead of sending them here")
+        session = _get_owned_session(session_id, current_user)
+        analysis = await session.provision_analysis(provision_id)
+        if analysis is None:
+            raise HTTPException(status_code=404, detail="No comments mapped to this provision")
+    else:
+        if not comments:
+            raise HTTPException(status_code=400, detail="No comments provided")
+        
+        # Create a mock provision for analysis
+        provision = LegislativeProvision(
+            provision_id=provision_id,
+            provision_type=ProvisionType.SECTION,  # Default type
+            title=provision_title or f"Provision {provision_id}",
+            content=""
+        )
+        
+        # Analyze the provision
+        analysis = await legislative_service._analyze_provision_comments(
+            provision_id, comments, [provision]
+        )
     
     return {
         "provision_analysis": {
@@ -213,26 +383,31 @@ async def analyze_specific_provision(
 
 @router.post("/cross-provision-analysis")
 async def analyze_cross_provision_themes(
-    comments_by_provision: Dict[str, List[str]],
+    comments_by_provision: Optional[Dict[str, List[str]]] = Body(None),
+    session_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
     Analyze themes and concerns that span across multiple provisions.
     
     Helps identify systemic issues or broad stakeholder concerns
-    that affect multiple parts of the legislation.
+    that affect multiple parts of the legislation. With a session_id the
+    session's stored mappings (and cached provision analyses) are used.
     """
-    if not comments_by_provision:
-        raise HTTPException(status_code=400, detail="No provision-comment mapping provided")
-    
-    # Analyze each provision
-    provision_analyses = []
-    for provision_id, comments in comments_by_provision.items():
-        if comments:
-            analysis = await legislative_service._analyze_provision_comments(
-                provision_id, comments, None
-            )
-            provision_analyses.append(analysis)
+    if session_id:
+        session = _get_owned_session(session_id, current_user)
+        if not session.provision_comments:
+            raise HTTPException(status_code=400, detail="No comments mapped in this legislation session")
+        # Stale provisions are analyzed together, sharing one sentiment pass
+        provision_analyses = await session.provision_analyses()
+        total_comments = session.mapping_count
+    else:
+        if not comments_by_provision:
+            raise HTTPException(status_code=400, detail="No provision-comment mapping provided")
+        
+        # Analyze the provisions concurrently after one shared sentiment pass
+        provision_analyses = await legislative_service.analyze_provision_groups(comments_by_provision)
+        total_comments = sum(len(comments) for comments in comments_by_provision.values())
     
     # Find cross-provision themes
     cross_themes = legislative_service._find_cross_provision_themes(provision_analyses)
@@ -241,7 +416,6 @@ async def analyze_cross_provision_themes(
     recommendations = legislative_service._generate_legislative_recommendations(provision_analyses)
     
     # Calculate cross-provision statistics
-    total_comments = sum(len(comments) for comments in comments_by_provision.values())
     provisions_with_concerns = len([a for a in provision_analyses if a.key_concerns])
     avg_concerns_per_provision = sum(len(a.key_concerns) for a in provision_analyses) / len(provision_analyses) if provision_analyses else 0
     
@@ -263,8 +437,9 @@ async def analyze_cross_provision_themes(
 
 @router.get("/provision-coverage-report")
 async def generate_provision_coverage_report(
-    total_provisions: int,
-    analyzed_provisions: int,
+    total_provisions: Optional[int] = None,
+    analyzed_provisions: Optional[int] = None,
+    session_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -272,7 +447,18 @@ async def generate_provision_coverage_report(
     and which may need additional consultation.
     
     Helps ensure comprehensive review as required by MCA eConsultation objectives.
+    With a session_id coverage is computed from the session's mapping table;
+    otherwise total_provisions and analyzed_provisions must be given.
     """
+    mapping_coverage: Dict[str, Any] = {}
+    if session_id:
+        session = _get_owned_session(session_id, current_user)
+        mapping_coverage = session.coverage()
+        total_provisions = mapping_coverage["total_provisions"]
+        analyzed_provisions = mapping_coverage["provisions_with_feedback"]
+    elif total_provisions is None or analyzed_provisions is None:
+        raise HTTPException(status_code=400, detail="Provide a session_id or total_provisions and analyzed_provisions")
+    
     coverage_percentage = (analyzed_provisions / total_provisions * 100) if total_provisions > 0 else 0
     uncovered_provisions = total_provisions - analyzed_provisions
     
@@ -300,6 +486,13 @@ async def generate_provision_coverage_report(
             "provisions_without_feedback": uncovered_provisions,
             "coverage_percentage": round(coverage_percentage, 2),
             "coverage_assessment": coverage_assessment,
+            "session_id": session_id,
+            "uncovered_provision_ids": mapping_coverage.get("uncovered_provision_ids"),
+            "comments_per_provision": mapping_coverage.get("comments_per_provision"),
+            "comment_coverage": {
+                key: mapping_coverage[key]
+                for key in ("total_comments", "mapped_comments", "unmapped_comments", "references_outside_structure")
+            } if mapping_coverage else None,
             "recommendations": recommendations,
             "next_steps": [
                 "Review provisions without feedback for potential consultation gaps",
@@ -1,31 +1,39 @@
 """
 Report generation endpoints (Excel exports) for officials.
+Reports render in the background once per consultation data version and are
+served from disk afterwards.
 """
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+import asyncio
+from itertools import islice
+from functools import partial
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-import io
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 import pandas as pd
 
+from backend.app.core.config import settings
 from backend.app.core.database import get_db
 from backend.app.core.security import require_staff_or_admin
 from backend.app.models.user import User
 from backend.app.models.comment import Comment
 from backend.app.models.analysis import AnalysisResult, SentimentLabel
 from backend.app.services.visualization_service import VisualizationService
+from backend.app.services.report_export import write_excel_report
+from backend.app.services.report_cache import REPORT_FORMATS, report_artifact_store
 
 router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
 
 viz = VisualizationService()
 
 
-def _fetch_analysis_rows(db: Session, consultation_id: str):
-    q = (
+def _analysis_query(db: Session, consultation_id: str):
+    return (
         db.query(
             Comment.id,
             Comment.original_text,
@@ -38,12 +46,178 @@ def _fetch_analysis_rows(db: Session, consultation_id: str):
         .join(AnalysisResult, AnalysisResult.comment_id == Comment.id)
         .filter(Comment.consultation_id == consultation_id)
     )
-    rows = q.all()
-    return rows
 
 
-@router.get("/excel")
+def _fetch_analysis_rows(db: Session, consultation_id: str):
+    return _analysis_query(db, consultation_id).all()
+
+
+def _data_version(db: Session, consultation_id: str) -> Optional[str]:
+    """
+    Version of a consultation's analyzed data: row count plus the latest
+    comment and analysis timestamps (None when nothing is analyzed).
+    """
+    row_count, latest_comment, latest_analysis = (
+        db.query(func.count(Comment.id), func.max(Comment.created_at), func.max(AnalysisResult.created_at))
+        .join(AnalysisResult, AnalysisResult.comment_id == Comment.id)
+        .filter(Comment.consultation_id == consultation_id)
+        .one()
+    )
+    if not row_count:
+        return None
+    timestamps = [value.isoformat() if value else "" for value in (latest_comment, latest_analysis)]
+    return ":".join([str(row_count)] + timestamps)
+
+
+def _iter_analysis_batches(db: Session, consultation_id: str,
+                           batch_size: int = settings.REPORT_FETCH_BATCH_SIZE) -> Iterator[List[Sequence[Any]]]:
+    """Analyzed rows of a consultation, read from the cursor batch_size at a time."""
+    rows = iter(_analysis_query(db, consultation_id).yield_per(batch_size))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+def _render_excel(db: Session, consultation_id: str, output: BinaryIO) -> int:
+    """
+    Excel report with:
+    - Summary sheet: sentiment distribution
+    - Comments sheet: comments and analysis
+    - Keywords sheet: top keywords
+    """
+    return write_excel_report(_iter_analysis_batches(db, consultation_id), output, viz.token_analyzer())
+
+
+def _render_pdf(db: Session, consultation_id: str, output: BinaryIO) -> int:
+    """PDF report with sentiment distribution, top keywords, and sample comments."""
+    rows = _fetch_analysis_rows(db, consultation_id)
+    if not rows:
+        return 0
+
+    # Prepare data
+    df = pd.DataFrame(rows, columns=[
+        "comment_id", "text", "law_section", "submitted_at", "sentiment", "confidence", "summary"
+    ])
+
+    # Sentiment counts
+    sentiment_counts = df["sentiment"].value_counts()
+    pos = int(sentiment_counts.get(SentimentLabel.POSITIVE, 0))
+    neg = int(sentiment_counts.get(SentimentLabel.NEGATIVE, 0))
+    neu = int(sentiment_counts.get(SentimentLabel.NEUTRAL, 0))
+
+    # Keywords from summaries/texts
+    texts = df["summary"].fillna("").tolist()
+    if not any(texts):
+        texts = df["text"].fillna("").tolist()
+    freq = viz.text_frequencies(texts, max_words=50)
+    keywords_table_data = [["Keyword", "Count"]] + [[k, v] for k, v in freq.items()]
+
+    # Build PDF
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    story.append(Paragraph(f"Consultation Report: {consultation_id}", styles["Title"]))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph("Sentiment Distribution", styles["Heading2"]))
+    sent_table = Table([
+        ["Positive", "Negative", "Neutral", "Total"],
+        [str(pos), str(neg), str(neu), str(pos + neg + neu)],
+    ])
+    sent_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ]))
+    story.append(sent_table)
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Top Keywords", styles["Heading2"]))
+    kw_table = Table(keywords_table_data)
+    kw_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    story.append(kw_table)
+    story.append(Spacer(1, 12))
+
+    # Sample comments table (first 10)
+    story.append(Paragraph("Sample Comments", styles["Heading2"]))
+    sample_df = df.head(10)[["comment_id", "law_section", "sentiment", "confidence", "summary"]]
+    table_data = [["ID", "Section", "Sentiment", "Confidence", "Summary"]] + sample_df.values.tolist()
+    sample_table = Table(table_data, repeatRows=1)
+    sample_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    story.append(sample_table)
+
+    doc.build(story)
+    return len(rows)
+
+
+RENDERERS: Dict[str, Callable[[Session, str, BinaryIO], int]] = {"excel": _render_excel, "pdf": _render_pdf}
+
+
+def _render_in_own_session(renderer: Callable[[Session, str, BinaryIO], int], bind: Any,
+                           consultation_id: str, output: BinaryIO) -> int:
+    """
+    Run a renderer on a session of its own. Renderings outlive the request
+    (and its session, which is not thread-safe), so they never share it.
+    """
+    with Session(bind=bind) as session:
+        return renderer(session, consultation_id, output)
+
+
+async def _current_data_version(db: Session, consultation_id: str) -> str:
+    data_version = await asyncio.to_thread(_data_version, db, consultation_id)
+    if data_version is None:
+        raise HTTPException(status_code=404, detail="No analyzed data found for this consultation")
+    return data_version
+
+
+def _job_status(http_request: Request, job, report_format: str) -> dict:
+    status = job.to_dict()
+    status["status_url"] = str(http_request.url_for("get_report_status").include_query_params(
+        consultation_id=job.consultation_id, report_format=report_format
+    ))
+    status["download_url"] = str(http_request.url_for(f"export_{report_format}").include_query_params(
+        consultation_id=job.consultation_id
+    ))
+    return status
+
+
+async def _report_response(http_request: Request, report_format: str, consultation_id: str, db: Session):
+    """
+    Serve the report of the current data version from disk, rendering it in
+    the background first if needed. Waits up to REPORT_WAIT_SECONDS for a
+    rendering, then answers 202 with the job status to poll.
+    """
+    data_version = await _current_data_version(db, consultation_id)
+    render = partial(_render_in_own_session, RENDERERS[report_format], db.get_bind(), consultation_id)
+    job = report_artifact_store.ensure(report_format, consultation_id, data_version, render)
+
+    if not job.done and job.task is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(job.task), timeout=settings.REPORT_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    if job.status == "ready":
+        extension, media_type = REPORT_FORMATS[report_format]
+        return FileResponse(job.path, media_type=media_type, filename=f"consultation_{consultation_id}_report{extension}")
+    if job.status == "empty":
+        raise HTTPException(status_code=404, detail="No analyzed data found for this consultation")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Failed to render report: {job.error}")
+    return JSONResponse(status_code=202, content=_job_status(http_request, job, report_format))
+
+
+@router.get("/excel", name="export_excel")
 async def export_excel(
+    http_request: Request,
     consultation_id: str = Query(..., description="Consultation/draft ID"),
     current_user: User = Depends(require_staff_or_admin),
     db: Session = Depends(get_db),
@@ -55,57 +229,16 @@ async def export_excel(
     - Keywords sheet: top keywords
     """
     try:
-        rows = _fetch_analysis_rows(db, consultation_id)
-        if not rows:
-            raise HTTPException(status_code=404, detail="No analyzed data found for this consultation")
-
-        # Build DataFrame of comments
-        df = pd.DataFrame(rows, columns=[
-            "comment_id", "text", "law_section", "submitted_at", "sentiment", "confidence", "summary"
-        ])
-
-        # Sentiment distribution
-        sentiment_counts = df["sentiment"].value_counts().reindex(
-            [SentimentLabel.POSITIVE, SentimentLabel.NEGATIVE, SentimentLabel.NEUTRAL], fill_value=0
-        )
-        dist_df = pd.DataFrame({
-            "sentiment": ["positive", "negative", "neutral"],
-            "count": [int(sentiment_counts.get(lbl, 0)) for lbl in [
-                SentimentLabel.POSITIVE, SentimentLabel.NEGATIVE, SentimentLabel.NEUTRAL
-            ]]
-        })
-
-        # Top keywords
-        texts = df["summary"].fillna("").tolist()
-        # fallback to original text if summary empty
-        if not any(texts):
-            texts = df["text"].fillna("").tolist()
-        tokens = await viz.prepare_tokens(texts)
-        freq = viz.compute_frequencies(tokens, max_words=200)
-        kw_df = pd.DataFrame([{"keyword": k, "count": v} for k, v in freq.items()])
-
-        # Write to Excel
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            dist_df.to_excel(writer, sheet_name="Summary", index=False)
-            df.to_excel(writer, sheet_name="Comments", index=False)
-            kw_df.to_excel(writer, sheet_name="Keywords", index=False)
-        output.seek(0)
-
-        filename = f"consultation_{consultation_id}_report.xlsx"
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+        return await _report_response(http_request, "excel", consultation_id, db)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export report: {str(e)}")
 
 
-@router.get("/pdf")
+@router.get("/pdf", name="export_pdf")
 async def export_pdf(
+    http_request: Request,
     consultation_id: str = Query(..., description="Consultation/draft ID"),
     current_user: User = Depends(require_staff_or_admin),
     db: Session = Depends(get_db),
@@ -114,79 +247,33 @@ async def export_pdf(
     Export a PDF report with sentiment distribution, top keywords, and sample comments.
     """
     try:
-        rows = _fetch_analysis_rows(db, consultation_id)
-        if not rows:
-            raise HTTPException(status_code=404, detail="No analyzed data found for this consultation")
-
-        # Prepare data
-        df = pd.DataFrame(rows, columns=[
-            "comment_id", "text", "law_section", "submitted_at", "sentiment", "confidence", "summary"
-        ])
-
-        # Sentiment counts
-        sentiment_counts = df["sentiment"].value_counts()
-        pos = int(sentiment_counts.get(SentimentLabel.POSITIVE, 0))
-        neg = int(sentiment_counts.get(SentimentLabel.NEGATIVE, 0))
-        neu = int(sentiment_counts.get(SentimentLabel.NEUTRAL, 0))
-
-        # Keywords from summaries/texts
-        texts = df["summary"].fillna("").tolist()
-        if not any(texts):
-            texts = df["text"].fillna("").tolist()
-        tokens = await viz.prepare_tokens(texts)
-        freq = viz.compute_frequencies(tokens, max_words=50)
-        keywords_table_data = [["Keyword", "Count"]] + [[k, v] for k, v in freq.items()]
-
-        # Build PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-
-        story.append(Paragraph(f"Consultation Report: {consultation_id}", styles["Title"]))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph("Sentiment Distribution", styles["Heading2"]))
-        sent_table = Table([
-            ["Positive", "Negative", "Neutral", "Total"],
-            [str(pos), str(neg), str(neu), str(pos + neg + neu)],
-        ])
-        sent_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ]))
-        story.append(sent_table)
-        story.append(Spacer(1, 12))
-
-        story.append(Paragraph("Top Keywords", styles["Heading2"]))
-        kw_table = Table(keywords_table_data)
-        kw_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        story.append(kw_table)
-        story.append(Spacer(1, 12))
-
-        # Sample comments table (first 10)
-        story.append(Paragraph("Sample Comments", styles["Heading2"]))
-        sample_df = df.head(10)[["comment_id", "law_section", "sentiment", "confidence", "summary"]]
-        table_data = [["ID", "Section", "Sentiment", "Confidence", "Summary"]] + sample_df.values.tolist()
-        sample_table = Table(table_data, repeatRows=1)
-        sample_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        story.append(sample_table)
-
-        doc.build(story)
-        buffer.seek(0)
-        filename = f"consultation_{consultation_id}_report.pdf"
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+        return await _report_response(http_request, "pdf", consultation_id, db)
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
+
+
+@router.get("/status", name="get_report_status")
+async def get_report_status(
+    http_request: Request,
+    consultation_id: str = Query(..., description="Consultation/draft ID"),
+    report_format: str = Query("excel", pattern="^(excel|pdf)$"),
+    current_user: User = Depends(require_staff_or_admin),
+    db: Session = Depends(get_db),
+):
+    """
+    Rendering status of a consultation report for its current data:
+    not_started, pending, running, ready (download is served from disk),
+    empty or failed.
+    """
+    data_version = await _current_data_version(db, consultation_id)
+    job = report_artifact_store.status(report_format, consultation_id, data_version)
+    if job is None:
+        return {
+            "report_format": report_format,
+            "consultation_id": consultation_id,
+            "data_version": data_version,
+            "status": "not_started"
+        }
+    return _job_status(http_request, job, report_format)
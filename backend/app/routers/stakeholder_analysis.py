@@ -7,12 +7,17 @@ from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
 
+import numpy as np
+
+from backend.app.core.database import get_db
 from backend.app.routers.auth import get_current_user
 from backend.app.models.user import User
 from backend.app.services.sentiment_service import SentimentAnalyzer
+from backend.app.services.stakeholder_service import ProfileVectors, StakeholderAnalysisService, StakeholderTable
 from backend.app.services.summarization_service import SummarizationService
+from backend.app.services.term_statistics import term_statistics_store
 from backend.app.services.visualization_service import VisualizationService
 
 router = APIRouter()
@@ -57,6 +62,7 @@ class StakeholderInsight(BaseModel):
 sentiment_analyzer = SentimentAnalyzer()
 summarization_service = SummarizationService()
 visualization_service = VisualizationService()
+stakeholder_service = StakeholderAnalysisService(sentiment_analyzer)
 
 @router.post("/analyze-stakeholders", response_model=Dict[str, Any])
 async def analyze_stakeholders(
@@ -71,23 +77,19 @@ async def analyze_stakeholders(
     - Sentiment analysis by stakeholder group
     - Comparative analysis across stakeholder types
     - Policy implications and recommendations
+    
+    The returned table_id can be passed to the comparison, insights and
+    word cloud endpoints to reuse the scored comments.
     """
     if not request.comments:
         raise HTTPException(status_code=400, detail="No comments provided")
     
-    # Step 1: Categorize comments by stakeholder type
-    stakeholder_comments = await categorize_comments_by_stakeholder(
-        request.comments, 
-        request.auto_detect_stakeholders,
-        request.predefined_stakeholders
-    )
+    # Step 1: Score every comment once and categorize by stakeholder type
+    groups = request.predefined_stakeholders if request.predefined_stakeholders and not request.auto_detect_stakeholders else None
+    table = await stakeholder_service.analyze([comment.text for comment in request.comments], groups)
     
-    # Step 2: Analyze each stakeholder group
-    stakeholder_profiles = {}
-    for stakeholder_type, comments in stakeholder_comments.items():
-        if comments:  # Only analyze if there are comments
-            profile = await analyze_stakeholder_group(stakeholder_type, comments)
-            stakeholder_profiles[stakeholder_type] = profile
+    # Step 2: Stakeholder group profiles from the scored table
+    stakeholder_profiles = build_stakeholder_profiles(table)
     
     # Step 3: Generate comparative analysis
     comparison = generate_stakeholder_comparison(stakeholder_profiles)
@@ -101,58 +103,84 @@ async def analyze_stakeholders(
             "comparison": comparison.__dict__,
             "insights": insights.__dict__,
             "timestamp": datetime.utcnow().isoformat(),
-            "total_comments_analyzed": len(request.comments)
+            "total_comments_analyzed": len(request.comments),
+            "table_id": table.table_id
         }
     }
 
 @router.post("/stakeholder-comparison", response_model=StakeholderComparison)
 async def compare_stakeholders(
-    stakeholder_data: Dict[str, List[str]],  # stakeholder_type -> comments
+    stakeholder_data: Optional[Dict[str, List[str]]] = None,  # stakeholder_type -> comments
+    table_id: Optional[str] = Query(default=None, description="Reuse a table from /analyze-stakeholders"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Compare sentiment and perspectives across different stakeholder types.
     """
-    if not stakeholder_data:
+    if table_id:
+        table = get_stakeholder_table(table_id)
+    elif stakeholder_data:
+        table = await table_from_grouped_comments(stakeholder_data)
+    else:
         raise HTTPException(status_code=400, detail="No stakeholder data provided")
     
-    # Analyze each stakeholder group
-    stakeholder_profiles = {}
-    for stakeholder_type, comments in stakeholder_data.items():
-        if comments:
-            comment_objects = [StakeholderComment(text=comment) for comment in comments]
-            profile = await analyze_stakeholder_group(stakeholder_type, comment_objects)
-            stakeholder_profiles[stakeholder_type] = profile
-    
     # Generate comparison
-    return generate_stakeholder_comparison(stakeholder_profiles)
+    return generate_stakeholder_comparison(build_stakeholder_profiles(table))
+
+@router.get("/stakeholder-insights/{table_id}", response_model=StakeholderInsight)
+async def get_stakeholder_insights(
+    table_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Insights for a previously analyzed set of comments."""
+    return generate_stakeholder_insights(build_stakeholder_profiles(get_stakeholder_table(table_id)))
 
 @router.get("/stakeholder-wordcloud/{stakeholder_type}")
 async def generate_stakeholder_wordcloud(
     stakeholder_type: str,
-    comments: List[str],
-    current_user: User = Depends(get_current_user)
+    comments: Optional[List[str]] = None,
+    table_id: Optional[str] = Query(default=None, description="Reuse a table from /analyze-stakeholders"),
+    consultation_id: Optional[str] = Query(default=None, description="Read a consultation's recorded term statistics"),
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
 ):
     """Generate word cloud specific to a stakeholder type."""
-    if not comments:
+    from fastapi.responses import Response
+    
+    if consultation_id:
+        statistics = await term_statistics_store.get(db, consultation_id)
+        if statistics is None:
+            raise HTTPException(status_code=404, detail=f"No term statistics recorded for consultation '{consultation_id}'")
+        if not statistics.top_terms(1, stakeholder_type=stakeholder_type):
+            raise HTTPException(status_code=404, detail=f"No comments for stakeholder type '{stakeholder_type}'")
+        wordcloud_bytes, word_data = await visualization_service.generate_stakeholder_wordcloud(
+            {stakeholder_type: []}, {}, statistics=statistics
+        )
+        return Response(content=wordcloud_bytes, media_type="image/png")
+    
+    if table_id:
+        rows = get_stakeholder_table(table_id).group_rows(stakeholder_type)
+    elif comments:
+        table = await stakeholder_service.analyze(comments, {stakeholder_type: list(range(len(comments)))})
+        rows = table.group_rows(stakeholder_type)
+    else:
         raise HTTPException(status_code=400, detail="No comments provided")
     
-    # Analyze comments for sentiment
-    analysis_results = []
-    for comment in comments:
-        result = await sentiment_analyzer.analyze_policy_sentiment(comment)
-        analysis_results.append({
-            "sentiment_score": result.positive_score - result.negative_score,
-            "stakeholder_type": stakeholder_type
-        })
+    if rows.empty:
+        raise HTTPException(status_code=404, detail=f"No comments for stakeholder type '{stakeholder_type}'")
+    
+    # Sentiment comes from the scored table instead of re-analyzing each comment
+    analysis_results = [
+        {"sentiment_score": score, "stakeholder_type": stakeholder_type}
+        for score in (rows["positive_score"] - rows["negative_score"]).tolist()
+    ]
     
     # Generate stakeholder-specific word cloud
     wordcloud_bytes, word_data = await visualization_service.generate_stakeholder_wordcloud(
-        {stakeholder_type: comments},
+        {stakeholder_type: rows["text"].tolist()},
         {stakeholder_type: analysis_results}
     )
     
-    from fastapi.responses import Response
     return Response(content=wordcloud_bytes, media_type="image/png")
 
 @router.post("/stakeholder-summary")
@@ -190,103 +218,45 @@ async def generate_stakeholder_summary(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-async def categorize_comments_by_stakeholder(
-    comments: List[StakeholderComment],
-    auto_detect: bool,
-    predefined: Optional[Dict[str, List[int]]]
-) -> Dict[str, List[StakeholderComment]]:
-    """Categorize comments by stakeholder type."""
-    stakeholder_comments = defaultdict(list)
-    
-    if predefined and not auto_detect:
-        # Use predefined categorization
-        for stakeholder_type, indices in predefined.items():
-            for idx in indices:
-                if 0 <= idx < len(comments):
-                    stakeholder_comments[stakeholder_type].append(comments[idx])
-    else:
-        # Auto-detect stakeholder types
-        for comment in comments:
-            stakeholder_type = sentiment_analyzer._detect_stakeholder_type(comment.text)
-            stakeholder_comments[stakeholder_type].append(comment)
-    
-    return dict(stakeholder_comments)
+def get_stakeholder_table(table_id: str) -> StakeholderTable:
+    """Cached stakeholder table, or 404 once it has been evicted."""
+    table = stakeholder_service.get(table_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Stakeholder table not found or expired; re-run the analysis")
+    return table
 
-async def analyze_stakeholder_group(
-    stakeholder_type: str, 
-    comments: List[StakeholderComment]
-) -> StakeholderProfile:
-    """Analyze a group of comments from a specific stakeholder type."""
-    
-    # Analyze sentiment for all comments
-    sentiment_results = []
-    all_text = []
-    
-    for comment in comments:
-        text = comment.text
-        all_text.append(text)
-        
-        # Get policy-specific sentiment
-        policy_result = await sentiment_analyzer.analyze_policy_sentiment(text)
-        sentiment_results.append(policy_result)
-    
-    # Calculate sentiment distribution
-    sentiment_counts = Counter()
-    confidences = []
-    sentiments = []
-    
-    for result in sentiment_results:
-        sentiment_label = result.sentiment_label.value
-        sentiment_counts[sentiment_label] += 1
-        confidences.append(result.confidence_score)
-        sentiments.append(sentiment_label)
-    
-    # Determine dominant sentiment and policy stance
-    dominant_sentiment = sentiment_counts.most_common(1)[0][0] if sentiment_counts else "neutral"
-    
-    # Determine policy stance
-    positive_ratio = sentiment_counts.get("positive", 0) / len(comments)
-    negative_ratio = sentiment_counts.get("negative", 0) / len(comments)
-    
-    if positive_ratio > 0.6:
-        policy_stance = "support"
-    elif negative_ratio > 0.6:
-        policy_stance = "oppose"
-    else:
-        policy_stance = "neutral"
-    
-    # Extract key concerns and phrases
-    combined_text = " ".join(all_text)
-    key_concerns = extract_stakeholder_concerns(combined_text, stakeholder_type)
-    key_phrases = extract_key_phrases(all_text)
-    
-    # Select representative comments
-    representative_comments = select_representative_comments(comments, sentiment_results)
-    
-    return StakeholderProfile(
-        stakeholder_type=stakeholder_type,
-        comment_count=len(comments),
-        sentiment_distribution=dict(sentiment_counts),
-        dominant_sentiment=dominant_sentiment,
-        average_confidence=sum(confidences) / len(confidences) if confidences else 0,
-        key_concerns=key_concerns,
-        key_phrases=key_phrases,
-        representative_comments=representative_comments,
-        policy_stance=policy_stance
-    )
+async def table_from_grouped_comments(stakeholder_data: Dict[str, List[str]]) -> StakeholderTable:
+    """Score comments supplied as stakeholder_type -> comments."""
+    texts = []
+    groups = {}
+    for stakeholder_type, comments in stakeholder_data.items():
+        if comments:
+            groups[stakeholder_type] = list(range(len(texts), len(texts) + len(comments)))
+            texts.extend(comments)
+    return await stakeholder_service.analyze(texts, groups)
+
+def build_stakeholder_profiles(table: StakeholderTable) -> Dict[str, StakeholderProfile]:
+    """Stakeholder profiles from a scored table."""
+    return {
+        stakeholder_type: StakeholderProfile(**profile)
+        for stakeholder_type, profile in table.profiles().items()
+    }
 
 def generate_stakeholder_comparison(profiles: Dict[str, StakeholderProfile]) -> StakeholderComparison:
     """Generate comparative analysis across stakeholder types."""
     
+    # Encode the profiles once; every comparison below is a matrix operation
+    vectors = ProfileVectors(profiles)
+    
     # Find consensus and conflict areas
-    consensus_areas = find_consensus_areas(profiles)
-    conflict_areas = find_conflict_areas(profiles)
+    consensus_areas = find_consensus_areas(profiles, vectors)
+    conflict_areas = find_conflict_areas(profiles, vectors)
     
     # Calculate stakeholder alignment (similarity matrix)
-    alignment = calculate_stakeholder_alignment(profiles)
+    alignment = calculate_stakeholder_alignment(profiles, vectors)
     
     # Generate recommendations
-    recommendations = generate_comparison_recommendations(profiles)
+    recommendations = generate_comparison_recommendations(profiles, vectors, consensus_areas, conflict_areas)
     
     return StakeholderComparison(
         stakeholder_profiles=profiles,
@@ -341,159 +311,59 @@ def generate_stakeholder_insights(profiles: Dict[str, StakeholderProfile]) -> St
         policy_implications=implications
     )
 
-def extract_stakeholder_concerns(text: str, stakeholder_type: str) -> List[str]:
-    """Extract key concerns specific to stakeholder type."""
-    concern_keywords = {
-        'business': ['cost', 'compliance', 'burden', 'impact', 'implementation', 'timeline'],
-        'individual': ['rights', 'privacy', 'access', 'fairness', 'transparency'],
-        'ngo': ['social', 'environment', 'community', 'protection', 'welfare'],
-        'academic': ['research', 'evidence', 'methodology', 'data', 'analysis'],
-        'legal': ['constitution', 'jurisdiction', 'precedent', 'enforcement', 'liability'],
-        'government': ['coordination', 'resources', 'authority', 'implementation', 'oversight']
-    }
-    
-    text_lower = text.lower()
-    keywords = concern_keywords.get(stakeholder_type, [])
-    found_concerns = []
-    
-    for keyword in keywords:
-        if keyword in text_lower:
-            found_concerns.append(keyword)
-    
-    return found_concerns[:5]  # Return top 5 concerns
-
-def extract_key_phrases(texts: List[str]) -> List[str]:
-    """Extract key phrases from a collection of texts."""
-    # Simple keyword extraction based on frequency
-    word_freq = Counter()
-    
-    for text in texts:
-        words = text.lower().split()
-        # Filter out common words
-        filtered_words = [w for w in words if len(w) > 3 and w.isalpha()]
-        word_freq.update(filtered_words)
-    
-    # Return top frequent words as key phrases
-    return [word for word, freq in word_freq.most_common(10)]
-
-def select_representative_comments(
-    comments: List[StakeholderComment], 
-    sentiment_results: List[Any]
-) -> List[str]:
-    """Select representative comments for each sentiment."""
-    representatives = []
-    
-    # Group by sentiment
-    sentiment_groups = defaultdict(list)
-    for comment, result in zip(comments, sentiment_results):
-        sentiment = result.sentiment_label.value
-        sentiment_groups[sentiment].append(comment.text)
-    
-    # Select one representative from each sentiment group
-    for sentiment, group_comments in sentiment_groups.items():
-        if group_comments:
-            # Select the comment with moderate length (not too short or long)
-            selected = min(group_comments, key=lambda x: abs(len(x.split()) - 20))
-            representatives.append(selected)
-    
-    return representatives[:3]  # Max 3 representatives
-
-def find_consensus_areas(profiles: Dict[str, StakeholderProfile]) -> List[str]:
+def find_consensus_areas(profiles: Dict[str, StakeholderProfile],
+                         vectors: Optional[ProfileVectors] = None) -> List[str]:
     """Find areas where stakeholders agree."""
+    vectors = vectors or ProfileVectors(profiles)
     consensus = []
     
     # Check if majority of stakeholders have same dominant sentiment
-    sentiments = [profile.dominant_sentiment for profile in profiles.values()]
-    sentiment_counts = Counter(sentiments)
-    
-    if len(sentiment_counts) > 0:
-        most_common_sentiment, count = sentiment_counts.most_common(1)[0]
-        if count >= len(profiles) * 0.7:  # 70% agreement
+    sentiment_counts = vectors.dominant_sentiment_counts()
+    if sentiment_counts:
+        most_common_sentiment = max(sentiment_counts, key=sentiment_counts.get)
+        if sentiment_counts[most_common_sentiment] >= len(profiles) * 0.7:  # 70% agreement
             consensus.append(f"Majority stakeholder sentiment: {most_common_sentiment}")
     
     # Find common concerns across stakeholders
-    all_concerns = []
-    for profile in profiles.values():
-        all_concerns.extend(profile.key_concerns)
-    
-    concern_counts = Counter(all_concerns)
-    common_concerns = [concern for concern, count in concern_counts.items() 
-                      if count >= len(profiles) * 0.5]
+    shared = vectors.concern_counts() >= len(profiles) * 0.5
+    common_concerns = [vectors.vocabulary[index] for index in np.flatnonzero(shared)]
     
     if common_concerns:
         consensus.append(f"Common concerns: {', '.join(common_concerns[:3])}")
     
     return consensus
 
-def find_conflict_areas(profiles: Dict[str, StakeholderProfile]) -> List[str]:
+def find_conflict_areas(profiles: Dict[str, StakeholderProfile],
+                        vectors: Optional[ProfileVectors] = None) -> List[str]:
     """Find areas where stakeholders disagree."""
+    vectors = vectors or ProfileVectors(profiles)
     conflicts = []
     
     # Check for opposing policy stances
-    stances = [profile.policy_stance for profile in profiles.values()]
-    stance_counts = Counter(stances)
-    
+    stance_counts = vectors.stance_counts()
     if "support" in stance_counts and "oppose" in stance_counts:
         conflicts.append("Divided stakeholder opinion on policy support")
     
     # Check for sentiment polarization
-    sentiments = [profile.dominant_sentiment for profile in profiles.values()]
+    sentiments = vectors.dominant_sentiment_counts()
     if "positive" in sentiments and "negative" in sentiments:
         conflicts.append("Polarized sentiment across stakeholder groups")
     
-    # Find stakeholder-specific concerns (not shared)
-    stakeholder_specific_concerns = {}
-    for stakeholder_type, profile in profiles.items():
-        unique_concerns = []
-        for concern in profile.key_concerns:
-            # Check if this concern appears in other stakeholder groups
-            appears_elsewhere = any(
-                concern in other_profile.key_concerns 
-                for other_type, other_profile in profiles.items() 
-                if other_type != stakeholder_type
-            )
-            if not appears_elsewhere:
-                unique_concerns.append(concern)
-        
-        if unique_concerns:
-            stakeholder_specific_concerns[stakeholder_type] = unique_concerns
-    
-    if stakeholder_specific_concerns:
+    # Find stakeholder-specific concerns (raised by exactly one group)
+    if vectors.groups_with_unique_concerns().any():
         conflicts.append("Stakeholder-specific concerns with limited cross-support")
     
     return conflicts
 
-def calculate_stakeholder_alignment(profiles: Dict[str, StakeholderProfile]) -> Dict[str, Dict[str, float]]:
+def calculate_stakeholder_alignment(profiles: Dict[str, StakeholderProfile],
+                                    vectors: Optional[ProfileVectors] = None) -> Dict[str, Dict[str, float]]:
     """Calculate similarity between stakeholder groups."""
-    alignment = {}
-    stakeholder_types = list(profiles.keys())
-    
-    for i, type1 in enumerate(stakeholder_types):
-        alignment[type1] = {}
-        for j, type2 in enumerate(stakeholder_types):
-            if i == j:
-                alignment[type1][type2] = 1.0
-            else:
-                # Calculate similarity based on sentiment and concerns
-                profile1 = profiles[type1]
-                profile2 = profiles[type2]
-                
-                # Sentiment similarity
-                sentiment_similarity = 1.0 if profile1.dominant_sentiment == profile2.dominant_sentiment else 0.0
-                
-                # Concern overlap
-                concerns1 = set(profile1.key_concerns)
-                concerns2 = set(profile2.key_concerns)
-                concern_similarity = len(concerns1.intersection(concerns2)) / len(concerns1.union(concerns2)) if concerns1.union(concerns2) else 0
-                
-                # Policy stance similarity
-                stance_similarity = 1.0 if profile1.policy_stance == profile2.policy_stance else 0.0
-                
-                # Weighted average
-                overall_similarity = (sentiment_similarity * 0.4 + concern_similarity * 0.4 + stance_similarity * 0.2)
-                alignment[type1][type2] = round(overall_similarity, 2)
-    
-    return alignment
+    vectors = vectors or ProfileVectors(profiles)
+    matrix = vectors.alignment().round(2).tolist()
+    return {
+        type1: dict(zip(vectors.types, row))
+        for type1, row in zip(vectors.types, matrix)
+    }
 
 def calculate_diversity_score(profiles: Dict[str, StakeholderProfile]) -> float:
     """Calculate how diverse stakeholder perspectives are."""
@@ -567,8 +437,12 @@ def generate_policy_implications(profiles: Dict[str, StakeholderProfile]) -> Lis
     
     return implications
 
-def generate_comparison_recommendations(profiles: Dict[str, StakeholderProfile]) -> List[str]:
+def generate_comparison_recommendations(profiles: Dict[str, StakeholderProfile],
+                                        vectors: Optional[ProfileVectors] = None,
+                                        consensus_items: Optional[List[str]] = None,
+                                        conflicts: Optional[List[str]] = None) -> List[str]:
     """Generate recommendations based on stakeholder comparison."""
+    vectors = vectors or ProfileVectors(profiles)
     recommendations = []
     
     # Engagement recommendations
@@ -581,16 +455,18 @@ def generate_comparison_recommendations(profiles: Dict[str, StakeholderProfile])
         recommendations.append(f"Engage directly with opposing stakeholders: {', '.join(opposing_stakeholders)}")
     
     # Build on consensus
-    consensus_items = find_consensus_areas(profiles)
+    if consensus_items is None:
+        consensus_items = find_consensus_areas(profiles, vectors)
     if consensus_items:
         recommendations.append("Leverage consensus areas to build broader support")
     
     # Address conflicts
-    conflicts = find_conflict_areas(profiles)
+    if conflicts is None:
+        conflicts = find_conflict_areas(profiles, vectors)
     if conflicts:
         recommendations.append("Facilitate dialogue to address conflicting perspectives")
     
     recommendations.append("Consider stakeholder-specific communication strategies")
     recommendations.append("Monitor ongoing stakeholder sentiment through implementation")
     
-    return recommendations
\ No newline at end of file
+    return recommendations
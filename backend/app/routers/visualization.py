@@ -2,11 +2,18 @@
 Visualization API endpoints for word clouds, charts, and other visual analytics.
 """
 
+import hashlib
+import json
+from dataclasses import asdict
 from typing import List, Dict, Any, Optional, Tuple
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 
+from backend.app.core.database import get_db
+from backend.app.services.term_statistics import TermStatistics, term_statistics_store
 from backend.app.services.visualization_service import VisualizationService
+from backend.app.services.wordcloud_cache import etag_matches, image_etag, wordcloud_image_cache
 from backend.app.core.mongo_auth import get_current_user, get_optional_current_user
 from backend.app.models.user import User
 
@@ -20,8 +27,14 @@ visualization_service = VisualizationService()
 # Request/Response Models
 class WordCloudRequest(BaseModel):
     """Request model for word cloud generation."""
-    texts: List[str] = Field(..., description="List of texts to analyze")
-    analysis_results: List[Dict[str, Any]] = Field(..., description="Analysis results for sentiment tagging")
+    texts: List[str] = Field(default_factory=list, description="List of texts to analyze")
+    analysis_results: List[Dict[str, Any]] = Field(default_factory=list, description="Analysis results for sentiment tagging")
+    consultation_id: Optional[str] = Field(
+        default=None,
+        description="Read the consultation's recorded term statistics instead of texts"
+    )
+    sentiment_label: Optional[str] = Field(default=None, description="Only words of comments with this sentiment")
+    stakeholder_type: Optional[str] = Field(default=None, description="Only words of comments from this stakeholder type")
     max_words: int = Field(
         default=100,
         ge=10,
@@ -42,6 +55,17 @@ class WordCloudRequest(BaseModel):
     )
 
 
+class TermStatisticsRequest(BaseModel):
+    """Analyzed comments to add to a consultation's term statistics."""
+    comment_ids: List[str] = Field(
+        ..., description="Stable ID per comment; comments already recorded for the consultation are skipped"
+    )
+    texts: List[str] = Field(..., description="Comment texts")
+    analysis_results: List[Dict[str, Any]] = Field(
+        ..., description="Analysis result per text (sentiment_score, confidence_score, sentiment label, stakeholder_type)"
+    )
+
+
 class WordCloudResponse(BaseModel):
     """Response model for word cloud generation."""
     image_data: str = Field(..., description="Base64 encoded PNG image data")
@@ -49,10 +73,44 @@ class WordCloudResponse(BaseModel):
     metadata: Dict[str, Any] = Field(..., description="Metadata about the word cloud")
 
 
+async def _stored_statistics(request: WordCloudRequest, db) -> Optional[TermStatistics]:
+    """Recorded statistics for a consultation request, or None for a texts request."""
+    if not request.consultation_id:
+        return None
+    if request.texts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either texts or consultation_id, not both"
+        )
+    statistics = await term_statistics_store.get(db, request.consultation_id)
+    if statistics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No term statistics recorded for consultation '{request.consultation_id}'"
+        )
+    return statistics
+
+
+def _image_url(http_request: Request, key: str) -> str:
+    return str(http_request.url_for("get_word_cloud_image", key=key))
+
+
+def _cached_json_response(http_request: Request, payload: WordCloudResponse) -> Response:
+    """JSON response with an ETag over the payload; 304 when the client already has it."""
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":"))
+    etag = f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/wordcloud/sentiment", response_model=WordCloudResponse)
 async def create_sentiment_word_cloud(
     request: WordCloudRequest,
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db = Depends(get_db)
 ):
     """
     Create a sentiment-tagged word cloud with contextual examples.
@@ -61,8 +119,10 @@ async def create_sentiment_word_cloud(
     contextual examples for hover-based exploration.
     """
     try:
+        statistics = await _stored_statistics(request, db)
+
         # Validate input
-        if not request.texts:
+        if statistics is None and not request.texts:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No texts provided for word cloud generation"
@@ -86,7 +146,10 @@ async def create_sentiment_word_cloud(
             analysis_results=request.analysis_results,
             width=request.width,
             height=request.height,
-            max_words=request.max_words
+            max_words=request.max_words,
+            statistics=statistics,
+            sentiment_label=request.sentiment_label,
+            stakeholder_type=request.stakeholder_type
         )
 
         if not image_bytes:
@@ -99,16 +162,20 @@ async def create_sentiment_word_cloud(
         import base64
         image_data = base64.b64encode(image_bytes).decode('utf-8')
 
-        return WordCloudResponse(
+        image_key = visualization_service.sentiment_wordcloud_key(word_data, request.width, request.height)
+
+        return _cached_json_response(http_request, WordCloudResponse(
             image_data=image_data,
-            word_data=word_data,
+            word_data={word: asdict(data) for word, data in word_data.items()},
             metadata={
-                "total_texts": len(request.texts),
+                "total_texts": statistics.comment_count if statistics is not None else len(request.texts),
                 "max_words": request.max_words,
                 "image_size": f"{request.width}x{request.height}",
-                "sentiment_tagged": True
+                "sentiment_tagged": True,
+                "image_key": image_key,
+                "image_url": _image_url(http_request, image_key)
             }
-        )
+        ))
 
     except HTTPException:
         raise
@@ -122,7 +189,9 @@ async def create_sentiment_word_cloud(
 @router.post("/wordcloud/basic", response_model=WordCloudResponse)
 async def create_basic_word_cloud(
     request: WordCloudRequest,
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db = Depends(get_db)
 ):
     """
     Create a basic word cloud without sentiment tagging.
@@ -130,16 +199,23 @@ async def create_basic_word_cloud(
     Generates a standard word cloud based on word frequencies.
     """
     try:
+        statistics = await _stored_statistics(request, db)
+
         # Validate input
-        if not request.texts:
+        if statistics is None and not request.texts:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No texts provided for word cloud generation"
             )
 
-        # Prepare tokens and compute frequencies
-        tokens = await visualization_service.prepare_tokens(request.texts)
-        frequencies = visualization_service.compute_frequencies(tokens, request.max_words)
+        if statistics is not None:
+            # Top-N straight from the recorded running totals
+            frequencies = dict(statistics.top_terms(
+                request.max_words, request.sentiment_label, request.stakeholder_type
+            ))
+        else:
+            # Top-N from the shared term-document matrix of the texts
+            frequencies = visualization_service.text_frequencies(request.texts, request.max_words)
 
         if not frequencies:
             raise HTTPException(
@@ -162,16 +238,20 @@ async def create_basic_word_cloud(
         import base64
         image_data = base64.b64encode(image_bytes).decode('utf-8')
 
-        return WordCloudResponse(
+        image_key = visualization_service.wordcloud_image_key(frequencies, request.width, request.height)
+
+        return _cached_json_response(http_request, WordCloudResponse(
             image_data=image_data,
             word_data={},  # No detailed word data for basic word cloud
             metadata={
-                "total_texts": len(request.texts),
+                "total_texts": statistics.comment_count if statistics is not None else len(request.texts),
                 "max_words": request.max_words,
                 "image_size": f"{request.width}x{request.height}",
-                "sentiment_tagged": False
+                "sentiment_tagged": False,
+                "image_key": image_key,
+                "image_url": _image_url(http_request, image_key)
             }
-        )
+        ))
 
     except HTTPException:
         raise
@@ -182,6 +262,93 @@ async def create_basic_word_cloud(
         )
 
 
+@router.post("/term-statistics/{consultation_id}")
+async def record_term_statistics(
+    consultation_id: str,
+    request: TermStatisticsRequest,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """
+    Record analyzed comments in a consultation's term statistics.
+
+    Word cloud requests with this consultation_id then read top words from
+    the running totals instead of re-tokenizing the comments. Comments whose
+    ID was already recorded are skipped, so retried requests do not count
+    them twice. Batch jobs submitted with a consultation_id parameter record
+    their results automatically.
+    """
+    if len(request.analysis_results) != len(request.texts) or len(request.comment_ids) != len(request.texts):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Number of comment IDs and analysis results must match number of texts"
+        )
+
+    recorded, total = await visualization_service.record_analyzed_comments(
+        db, consultation_id, request.comment_ids, request.texts, request.analysis_results
+    )
+    return {
+        "consultation_id": consultation_id,
+        "recorded_comments": recorded,
+        "skipped_comments": len(request.texts) - recorded,
+        "total_comments": total
+    }
+
+
+@router.delete("/term-statistics/{consultation_id}")
+async def delete_term_statistics(
+    consultation_id: str,
+    current_user: User = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Drop a consultation's recorded term statistics."""
+    if not await term_statistics_store.delete(db, consultation_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No term statistics recorded for consultation '{consultation_id}'"
+        )
+    return {"consultation_id": consultation_id, "deleted": True}
+
+
+@router.get("/wordcloud/image/{key}", name="get_word_cloud_image")
+async def get_word_cloud_image(
+    key: str,
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
+    """
+    Serve a rendered word cloud as PNG bytes.
+
+    Keys come from the image_key metadata of the word cloud endpoints. Images
+    are immutable per key, so clients revalidate with If-None-Match and get
+    304 Not Modified without the image being read again.
+    """
+    if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid word cloud image key"
+        )
+
+    etag = image_etag(key)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400, immutable"}
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image_bytes = wordcloud_image_cache.get(key)
+    if image_bytes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word cloud image not found or expired"
+        )
+    return Response(content=image_bytes, media_type="image/png", headers=headers)
+
+
+@router.get("/wordcloud/cache/stats")
+async def word_cloud_cache_stats(current_user: User = Depends(get_current_user)):
+    """Word cloud image cache statistics."""
+    return wordcloud_image_cache.stats()
+
+
 @router.get("/health")
 async def visualization_health_check():
     """Check the health of visualization service."""
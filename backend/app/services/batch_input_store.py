@@ -0,0 +1,117 @@
+"""
+On-disk input storage for batch jobs uploaded in chunks.
+Each appended chunk is parsed once, normalized to NDJSON (one JSON string per
+line) and stored as a numbered part file, so neither the API nor the workers
+hold a whole job's comments in memory.
+"""
+
+import json
+import os
+import shutil
+import zlib
+from typing import List, Optional
+
+from backend.app.core.config import settings
+
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _gunzip(data: bytes, max_size: int) -> bytes:
+    """
+    Decompress gzip data (one or more members) without inflating more than
+    max_size bytes, so a small compressed body cannot expand without bound.
+
+    Raises:
+        ValueError: If the data is not gzip or decompresses beyond max_size
+    """
+    output = bytearray()
+    while data:
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        try:
+            while data:
+                output += decompressor.decompress(data, max_size + 1 - len(output))
+                if len(output) > max_size:
+                    raise ValueError(f"Decompressed chunk exceeds {max_size:,} bytes")
+                data = decompressor.unconsumed_tail
+            if not decompressor.eof:
+                raise ValueError("Invalid gzip data: truncated stream")
+        except zlib.error as e:
+            raise ValueError(f"Invalid gzip data: {e}")
+        # Concatenated gzip members follow as unused data
+        data = decompressor.unused_data
+    return bytes(output)
+
+
+def parse_comment_chunk(data: bytes, compressed: Optional[bool] = None,
+                        max_size: Optional[int] = None) -> List[str]:
+    """
+    Parse an uploaded chunk of comments.
+
+    Each non-blank line is a JSON string, or a JSON object with a "comment"
+    or "text" field. gzip input is detected from its magic bytes unless
+    compressed is given. Decompression stops at max_size bytes (default
+    MAX_UPLOAD_SIZE).
+
+    Args:
+        data: Raw chunk body
+        compressed: Whether the body is gzip-compressed
+        max_size: Maximum decompressed size in bytes
+
+    Returns:
+        list: Comment texts in upload order
+
+    Raises:
+        ValueError: If the chunk is not valid NDJSON of comments, or
+            decompresses beyond max_size
+    """
+    if compressed is None:
+        compressed = data[:2] == GZIP_MAGIC
+    if compressed:
+        data = _gunzip(data, max_size or settings.MAX_UPLOAD_SIZE)
+
+    comments = []
+    for line_number, line in enumerate(data.decode("utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})")
+
+        if isinstance(value, dict):
+            value = value.get("comment", value.get("text"))
+        if not isinstance(value, str):
+            raise ValueError(f"Line {line_number}: expected a string or an object with a 'comment' field")
+        comments.append(value)
+    return comments
+
+
+class BatchInputStore:
+    """Per-job directories of NDJSON input parts under BATCH_INPUT_DIR."""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or settings.BATCH_INPUT_DIR
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def part_path(self, job_id: str, seq: int) -> str:
+        return os.path.join(self.base_dir, job_id, f"part-{seq:06d}.ndjson")
+
+    def write_part(self, job_id: str, seq: int, comments: List[str]):
+        """Store one part; it only becomes visible once completely written."""
+        path = self.part_path(job_id, seq)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for comment in comments:
+                f.write(json.dumps(comment, ensure_ascii=False))
+                f.write("\n")
+        os.replace(path + ".tmp", path)
+
+    def read_part(self, job_id: str, seq: int) -> List[str]:
+        """Comments of one part, in upload order."""
+        with open(self.part_path(job_id, seq), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def delete(self, job_id: str):
+        """Remove all stored input of a job."""
+        shutil.rmtree(os.path.join(self.base_dir, job_id), ignore_errors=True)
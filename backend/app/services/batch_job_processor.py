@@ -0,0 +1,682 @@
+"""
+Batch job execution.
+Runs queued batch jobs in chunks, checkpointing each chunk so a job taken over
+by another worker resumes where the previous one stopped. Several chunks are
+in flight at once (on a process pool for dedicated workers), so a large job
+uses more than one core.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.core.config import settings
+from backend.app.services.batch_input_store import BatchInputStore
+from backend.app.services.batch_job_queue import BatchJobQueue, CHUNKED_INPUT, PROCESSING
+from backend.app.services.batch_result_store import BatchResultStore, BatchResultWriter, BatchSummaryAccumulator
+from backend.app.services.campaign_clustering import CampaignCluster, CampaignClusterer, campaign_summary
+
+
+class BatchStatus(str, Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class BatchJobType(str, Enum):
+    SENTIMENT_ANALYSIS = "sentiment_analysis"
+    SUMMARIZATION = "summarization"
+    COMPREHENSIVE_ANALYSIS = "comprehensive_analysis"
+    POLICY_ANALYSIS = "policy_analysis"
+
+
+# Initialize services
+campaign_clusterer = CampaignClusterer()
+result_store = BatchResultStore()
+input_store = BatchInputStore()
+
+# Analysis models are loaded on first use, so importing this module (in the
+# API process or in a spawned chunk process) does not load them
+_sentiment_analyzer = None
+_summarization_service = None
+_visualization_service = None
+_services_lock = threading.Lock()
+
+# Chunk process pool, shared by all jobs of this worker process. Children are
+# spawned (not forked) so they do not inherit the parent's event loop or
+# database client; each loads its own copy of the analysis services.
+_chunk_pool: Optional[ProcessPoolExecutor] = None
+_chunk_manager = None
+
+
+class ChunkCancelled(Exception):
+    """Raised inside a chunk when its job was cancelled or lost its lease."""
+
+
+def get_sentiment_analyzer():
+    """Return the process-wide SentimentAnalyzer, loading it on first use."""
+    global _sentiment_analyzer
+    with _services_lock:
+        if _sentiment_analyzer is None:
+            from backend.app.services.sentiment_service import SentimentAnalyzer
+            _sentiment_analyzer = SentimentAnalyzer()
+        return _sentiment_analyzer
+
+
+def get_summarization_service():
+    """Return the process-wide SummarizationService, loading it on first use."""
+    global _summarization_service
+    with _services_lock:
+        if _summarization_service is None:
+            from backend.app.services.summarization_service import SummarizationService
+            _summarization_service = SummarizationService()
+        return _summarization_service
+
+
+def get_visualization_service():
+    """Return the process-wide VisualizationService, loading it on first use."""
+    global _visualization_service
+    with _services_lock:
+        if _visualization_service is None:
+            from backend.app.services.visualization_service import VisualizationService
+            _visualization_service = VisualizationService()
+        return _visualization_service
+
+
+def term_statistics_result(result: Dict[str, Any], job_type: BatchJobType) -> Optional[Dict[str, Any]]:
+    """
+    Term statistics input (sentiment label and score, confidence, stakeholder
+    type) of one written result, or None if the result carries no sentiment.
+    """
+    if result.get("error"):
+        return None
+    if job_type == BatchJobType.POLICY_ANALYSIS:
+        sentiment = result.get("policy_sentiment") or {}
+        label = sentiment.get("sentiment_label")
+        confidence = sentiment.get("confidence_score", 0.5)
+    elif job_type == BatchJobType.SENTIMENT_ANALYSIS:
+        sentiment_results = result.get("sentiment_results") or [{}]
+        sentiment = sentiment_results[0]
+        label = sentiment.get("sentiment_label")
+        confidence = sentiment.get("confidence_score", 0.5)
+    elif job_type == BatchJobType.COMPREHENSIVE_ANALYSIS:
+        analysis = result.get("comprehensive_analysis") or {}
+        sentiment = (analysis.get("sentiment_results") or [{}])[0]
+        label = analysis.get("overall_sentiment")
+        confidence = analysis.get("overall_confidence", 0.5)
+    else:
+        return None
+    if not label:
+        return None
+    return {
+        "sentiment_label": label,
+        "sentiment_score": sentiment.get("positive_score", 0.0) - sentiment.get("negative_score", 0.0),
+        "confidence_score": confidence,
+        "stakeholder_type": result.get("stakeholder_type"),
+        "campaign_cluster_id": result.get("campaign_cluster_id")
+    }
+
+
+def get_chunk_pool(processes: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared chunk process pool, or None when chunks run in-process.
+
+    Args:
+        processes: Pool size (default BATCH_CHUNK_PROCESSES); 0 runs chunks in-process.
+            The first call that starts the pool decides its size.
+    """
+    global _chunk_pool, _chunk_manager
+    processes = settings.BATCH_CHUNK_PROCESSES if processes is None else processes
+    if processes <= 0:
+        return None
+    if _chunk_pool is None:
+        context = multiprocessing.get_context("spawn")
+        _chunk_pool = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        _chunk_manager = context.Manager()
+    return _chunk_pool
+
+
+def shutdown_chunk_pool():
+    """Stop the chunk process pool and its cancellation manager."""
+    global _chunk_pool, _chunk_manager
+    if _chunk_pool is not None:
+        _chunk_pool.shutdown(wait=False, cancel_futures=True)
+        _chunk_pool = None
+    if _chunk_manager is not None:
+        _chunk_manager.shutdown()
+        _chunk_manager = None
+
+
+def _run_chunk(comments: List[str], job_type: str, parameters: Dict[str, Any],
+               batch_start_index: int, cancel_event) -> Optional[List[Dict[str, Any]]]:
+    """
+    Chunk entry point inside a pool process, or a worker thread when there is
+    no pool; returns None if the job was cancelled.
+    """
+    try:
+        results = process_comment_batch(
+            comments, BatchJobType(job_type), parameters, batch_start_index, cancel_event
+        )
+    except ChunkCancelled:
+        return None
+    return jsonable_encoder(results)
+
+
+def _restore_clusters(layout: List[Dict[str, Any]], comments: List[str]) -> List[CampaignCluster]:
+    """Rebuild clusters from their stored layout."""
+    return [
+        CampaignCluster(
+            cluster_id=cluster["cluster_id"],
+            representative_index=cluster["representative_index"],
+            representative_text=comments[cluster["representative_index"]],
+            member_indexes=cluster["member_indexes"]
+        )
+        for cluster in layout
+    ]
+
+
+def _cluster_layout(clusters: List[CampaignCluster]) -> List[Dict[str, Any]]:
+    """Storable cluster layout (without texts) that checkpoints refer to."""
+    return [
+        {
+            "cluster_id": cluster.cluster_id,
+            "representative_index": cluster.representative_index,
+            "member_indexes": cluster.member_indexes
+        }
+        for cluster in clusters
+    ]
+
+
+class _JobProgress:
+    """Progress of one job run: processed comments, throughput and partial aggregates."""
+
+    def __init__(self, job_type: str, total: int):
+        self.total = total
+        self.processed = 0
+        self.processed_this_run = 0
+        self.run_started = time.monotonic()
+        self.partial = BatchSummaryAccumulator(job_type)
+
+    def advance(self, comments: int):
+        self.processed += comments
+        self.processed_this_run += comments
+
+    def percentage(self) -> float:
+        return (self.processed / self.total) * 100 if self.total else 0.0
+
+    def estimated_completion(self) -> datetime:
+        seconds_per_comment = (time.monotonic() - self.run_started) / self.processed_this_run
+        return datetime.utcnow() + timedelta(seconds=(self.total - self.processed) * seconds_per_comment)
+
+
+class BatchJobProcessor:
+    """Executes a claimed job while holding its lease."""
+
+    def __init__(self, queue: BatchJobQueue, worker_id: str,
+                 chunk_size: Optional[int] = None,
+                 heartbeat_seconds: Optional[float] = None,
+                 parallel_chunks: Optional[int] = None,
+                 chunk_processes: Optional[int] = None):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+        self.heartbeat_seconds = heartbeat_seconds or settings.BATCH_HEARTBEAT_SECONDS
+        self.parallel_chunks = max(1, parallel_chunks or settings.BATCH_PARALLEL_CHUNKS)
+        # Size of the chunk process pool; 0 runs chunks as tasks on the event loop
+        self.chunk_processes = settings.BATCH_CHUNK_PROCESSES if chunk_processes is None else chunk_processes
+
+    async def run(self, job: Dict[str, Any]):
+        """
+        Process a claimed job, renewing its lease in the background.
+
+        Args:
+            job: Job document returned by BatchJobQueue.claim
+        """
+        job_id = job["_id"]
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, lease_lost))
+
+        try:
+            await self._process(job, lease_lost)
+        except Exception as e:
+            await self.queue.fail(job_id, self.worker_id, str(e))
+            print(f"Batch job {job_id} failed: {e}")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str, lease_lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if not await self.queue.heartbeat(job_id, self.worker_id):
+                # Cancelled, or the lease expired and another worker took over
+                lease_lost.set()
+                return
+
+    async def _process(self, job: Dict[str, Any], lease_lost: asyncio.Event):
+        job_id = job["_id"]
+        job_type = BatchJobType(job["job_type"])
+        progress = _JobProgress(job_type.value, job["total_comments"])
+
+        if job.get("input_mode") == CHUNKED_INPUT:
+            result_summary = await self._process_chunked(job, job_type, progress, lease_lost)
+        else:
+            result_summary = await self._process_inline(job, job_type, progress, lease_lost)
+        if result_summary is None:
+            # Cancelled or lease lost; checkpoints stay for whoever resumes the job
+            return
+
+        if await self.queue.complete(job_id, self.worker_id, result_summary):
+            await asyncio.to_thread(input_store.delete, job_id)
+            # Send notification if email provided
+            if job.get("notification_email"):
+                await send_completion_notification(job)
+
+    async def _process_inline(self, job: Dict[str, Any], job_type: BatchJobType,
+                              progress: "_JobProgress", lease_lost: asyncio.Event) -> Optional[Dict[str, Any]]:
+        """Process a job submitted with all its comments in the job record."""
+        job_id = job["_id"]
+        comments = job["comments"]
+
+        # Campaign copies are analyzed once through their cluster representative.
+        # The cluster layout is stored with the job so resumed runs line up with
+        # the checkpointed chunks.
+        campaign_statistics = job.get("campaign_statistics")
+        if job.get("clusters"):
+            clusters = _restore_clusters(job["clusters"], comments)
+        else:
+            clusters = campaign_clusterer.cluster(comments)
+            campaign_statistics = campaign_summary(clusters)
+            await self.queue.mark_started(job_id, self.worker_id, _cluster_layout(clusters), campaign_statistics)
+
+        representative_results = await self._analyze_segment(job, job_type, clusters, 0, progress, lease_lost)
+        if representative_results is None:
+            return None
+
+        # Result files are written from a worker thread, off the event loop
+        writer = await asyncio.to_thread(result_store.open_writer, job_id, job_type.value)
+        try:
+            await asyncio.to_thread(self._write_segment, writer, comments, clusters, representative_results, 0)
+            await self._record_term_statistics(job, job_type, comments, clusters, representative_results, 0)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+        result_summary = await asyncio.to_thread(writer.close)
+        if campaign_statistics:
+            result_summary["summary_statistics"]["campaigns"] = campaign_statistics
+        return result_summary
+
+    async def _process_chunked(self, job: Dict[str, Any], job_type: BatchJobType,
+                               progress: "_JobProgress", lease_lost: asyncio.Event) -> Optional[Dict[str, Any]]:
+        """
+        Process a job uploaded in parts, starting before the upload is sealed.
+
+        Each part is clustered and analyzed as soon as it is stored; once the
+        job is sealed and every part is analyzed, results are fanned out part
+        by part in comment order.
+        """
+        job_id = job["_id"]
+        if not job.get("started_at"):
+            await self.queue.mark_started(job_id, self.worker_id)
+
+        analyzed = set()
+        while True:
+            state = await self.queue.get(job_id)
+            if state is None or state["status"] != PROCESSING:
+                return None
+            progress.total = state["total_comments"]
+
+            parts = await self.queue.list_parts(job_id)
+            for part in parts:
+                if part["seq"] in analyzed:
+                    continue
+                if not part["count"]:
+                    # Released reservation: the part was never stored
+                    analyzed.add(part["seq"])
+                    continue
+                comments = await asyncio.to_thread(input_store.read_part, job_id, part["seq"])
+                if part.get("clusters") is not None:
+                    clusters = _restore_clusters(part["clusters"], comments)
+                else:
+                    clusters = campaign_clusterer.cluster(comments)
+                    await self.queue.save_part_clusters(
+                        job_id, part["seq"], _cluster_layout(clusters), campaign_summary(clusters)
+                    )
+                if await self._analyze_segment(job, job_type, clusters, part["start"], progress, lease_lost) is None:
+                    return None
+                analyzed.add(part["seq"])
+
+            stored = sum(part["count"] for part in parts)
+            if state.get("sealed") and stored == state["total_comments"] and len(analyzed) == len(parts):
+                break
+
+            last_append_at = state.get("last_append_at") or state["created_at"]
+            if (datetime.utcnow() - last_append_at).total_seconds() > settings.BATCH_UPLOAD_IDLE_SECONDS:
+                raise RuntimeError("Upload abandoned: no chunk received and job not sealed")
+
+            # Wait for more parts (or give up the job if the lease is lost)
+            try:
+                await asyncio.wait_for(lease_lost.wait(), timeout=settings.BATCH_POLL_INTERVAL_SECONDS)
+                return None
+            except asyncio.TimeoutError:
+                pass
+
+        writer = await asyncio.to_thread(result_store.open_writer, job_id, job_type.value)
+        all_clusters: List[CampaignCluster] = []
+        try:
+            # Reload the parts for their stored cluster layouts
+            for part in await self.queue.list_parts(job_id):
+                if not part["count"]:
+                    continue
+                comments = await asyncio.to_thread(input_store.read_part, job_id, part["seq"])
+                clusters = _restore_clusters(part["clusters"], comments)
+                checkpoints = await self.queue.load_checkpoints(
+                    job_id, part["start"], part["start"] + self._chunk_count(clusters)
+                )
+                representative_results = [
+                    result for chunk_index in sorted(checkpoints) for result in checkpoints[chunk_index]
+                ]
+                await asyncio.to_thread(
+                    self._write_segment, writer, comments, clusters, representative_results, part["start"]
+                )
+                await self._record_term_statistics(
+                    job, job_type, comments, clusters, representative_results, part["start"]
+                )
+                all_clusters.extend(clusters)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+        result_summary = await asyncio.to_thread(writer.close)
+        result_summary["summary_statistics"]["campaigns"] = campaign_summary(all_clusters)
+        return result_summary
+
+    def _chunk_count(self, clusters: List[CampaignCluster]) -> int:
+        return (len(clusters) + self.chunk_size - 1) // self.chunk_size
+
+    async def _analyze_segment(self, job: Dict[str, Any], job_type: BatchJobType,
+                               clusters: List[CampaignCluster], chunk_base: int,
+                               progress: "_JobProgress",
+                               lease_lost: asyncio.Event) -> Optional[List[Dict[str, Any]]]:
+        """
+        Analyze the representatives of one segment (the whole inline job, or one part).
+
+        Chunk i of the segment is checkpointed as chunk_base + i; chunk_base is
+        the index of the segment's first comment, so keys never collide across parts.
+
+        Returns:
+            list: One result per cluster, or None if the job was cancelled or its lease lost
+        """
+        job_id = job["_id"]
+        representatives = [cluster.representative_text for cluster in clusters]
+        chunk_starts = list(range(0, len(representatives), self.chunk_size))
+        checkpoints = await self.queue.load_checkpoints(job_id, chunk_base, chunk_base + len(chunk_starts))
+        checkpoints = {chunk_index - chunk_base: results for chunk_index, results in checkpoints.items()}
+
+        # Comments covered by each chunk (its representatives' cluster members)
+        chunk_members = [
+            sum(cluster.member_count for cluster in clusters[start:start + self.chunk_size])
+            for start in chunk_starts
+        ]
+        member_counts = [cluster.member_count for cluster in clusters]
+
+        # Running aggregates for progress subscribers, weighted by cluster size
+        for chunk_index, chunk_results in checkpoints.items():
+            progress.processed += chunk_members[chunk_index]
+            self._accumulate(progress.partial, chunk_results, member_counts, chunk_starts[chunk_index])
+
+        pending = [
+            (chunk_index, start) for chunk_index, start in enumerate(chunk_starts)
+            if chunk_index not in checkpoints
+        ]
+        completed = await self._run_chunks(
+            job_id, job_type, job.get("parameters") or {}, representatives, pending,
+            chunk_members, member_counts, chunk_base, progress, lease_lost
+        )
+        if completed is None:
+            return None
+        checkpoints.update(completed)
+
+        return [result for chunk_index in sorted(checkpoints) for result in checkpoints[chunk_index]]
+
+    @staticmethod
+    def _write_segment(writer: BatchResultWriter, comments: List[str], clusters: List[CampaignCluster],
+                       representative_results: List[Dict[str, Any]], offset: int):
+        """
+        Fan representative results back out to every cluster member, written
+        in comment order straight to the job's result files.
+        """
+        cluster_of = [0] * len(comments)
+        for position, cluster in enumerate(clusters):
+            for comment_index in cluster.member_indexes:
+                cluster_of[comment_index] = position
+
+        for comment_index, position in enumerate(cluster_of):
+            cluster = clusters[position]
+            result = dict(representative_results[position])
+            result["comment_index"] = offset + comment_index
+            result["comment"] = comments[comment_index]
+            result["campaign_cluster_id"] = cluster.cluster_id
+            result["campaign_size"] = cluster.member_count
+            writer.write(result, failed=bool(result.get("error")))
+
+    async def _record_term_statistics(self, job: Dict[str, Any], job_type: BatchJobType, comments: List[str],
+                                      clusters: List[CampaignCluster],
+                                      representative_results: List[Dict[str, Any]], offset: int):
+        """
+        Add a segment's sentiment results to the term statistics of the job's
+        consultation (the consultation_id job parameter), if it has one.
+
+        Comments are keyed by job and comment index, so a resumed run that
+        writes the segment again does not count it twice.
+        """
+        consultation_id = (job.get("parameters") or {}).get("consultation_id")
+        if not consultation_id or job_type == BatchJobType.SUMMARIZATION:
+            return
+
+        keys, texts, analysis_results = [], [], []
+        for position, cluster in enumerate(clusters):
+            analysis_result = term_statistics_result(
+                {**representative_results[position], "campaign_cluster_id": cluster.cluster_id}, job_type
+            )
+            if analysis_result is None:
+                continue
+            for comment_index in cluster.member_indexes:
+                keys.append(f"{job['_id']}:{offset + comment_index}")
+                texts.append(comments[comment_index])
+                analysis_results.append(analysis_result)
+
+        if keys:
+            await get_visualization_service().record_analyzed_comments(
+                self.queue.db, consultation_id, keys, texts, analysis_results
+            )
+
+    async def _run_chunks(self, job_id: str, job_type: BatchJobType, parameters: Dict[str, Any],
+                          representatives: List[str], pending: List[tuple], chunk_members: List[int],
+                          member_counts: List[int], chunk_base: int, progress: "_JobProgress",
+                          lease_lost: asyncio.Event) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+        """
+        Keep up to parallel_chunks chunks in flight and checkpoint each as it completes.
+
+        Returns:
+            dict: chunk index -> results, or None if the job was cancelled or its lease lost
+        """
+        loop = asyncio.get_running_loop()
+        pool = get_chunk_pool(self.chunk_processes)
+        cancel_event = _chunk_manager.Event() if pool is not None else threading.Event()
+        lost_waiter = asyncio.ensure_future(lease_lost.wait())
+        in_flight: Dict[asyncio.Future, int] = {}
+        remaining = iter(pending)
+        completed: Dict[int, List[Dict[str, Any]]] = {}
+        chunk_start = dict(pending)
+
+        def dispatch() -> bool:
+            for chunk_index, start in remaining:
+                batch = representatives[start:start + self.chunk_size]
+                # Without a pool, chunks run on the loop's default thread pool so
+                # inference never blocks the event loop
+                future = loop.run_in_executor(
+                    pool, _run_chunk, batch, job_type.value, parameters, start, cancel_event
+                )
+                in_flight[future] = chunk_index
+                return True
+            return False
+
+        try:
+            while True:
+                while len(in_flight) < self.parallel_chunks and dispatch():
+                    pass
+                if not in_flight:
+                    return completed
+
+                done, _ = await asyncio.wait(
+                    set(in_flight) | {lost_waiter}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if lease_lost.is_set():
+                    return None
+
+                # Chunks finish out of order; progress counts whichever are done
+                for future in done:
+                    chunk_index = in_flight.pop(future)
+                    batch_results = future.result()
+                    if batch_results is None:
+                        return None
+                    completed[chunk_index] = batch_results
+                    self._accumulate(progress.partial, batch_results, member_counts, chunk_start[chunk_index])
+                    progress.advance(chunk_members[chunk_index])
+
+                    still_owned = await self.queue.checkpoint(
+                        job_id, self.worker_id, chunk_base + chunk_index, batch_results,
+                        progress.processed, progress.percentage(), progress.estimated_completion(),
+                        progress.partial.summary_statistics()
+                    )
+                    if not still_owned:
+                        return None
+        finally:
+            # Stop in-flight chunks: queued ones are dropped, running ones see the event
+            if in_flight:
+                cancel_event.set()
+                for future in in_flight:
+                    future.cancel()
+            lost_waiter.cancel()
+
+    @staticmethod
+    def _accumulate(partial: BatchSummaryAccumulator, chunk_results: List[Dict[str, Any]],
+                    member_counts: List[int], chunk_start: int):
+        for position, result in enumerate(chunk_results, start=chunk_start):
+            if not result.get("error"):
+                partial.add(result, member_counts[position])
+
+
+def process_comment_batch(
+    comments: List[str],
+    job_type: BatchJobType,
+    parameters: Dict[str, Any],
+    batch_start_index: int,
+    cancel_event=None
+) -> List[Dict[str, Any]]:
+    """
+    Process a batch of comments based on job type (blocking).
+
+    The chunk goes through the batched analysis path of its job type. If the
+    batch fails as a whole, its comments are analyzed one by one so failures
+    stay aligned with their comment as error results. cancel_event (threading
+    or multiprocessing Event) is checked before the batch and before each
+    retried comment; ChunkCancelled is raised once it is set.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise ChunkCancelled()
+    try:
+        return analyze_comments(comments, batch_start_index, job_type)
+    except Exception as e:
+        print(f"Batch analysis failed, analyzing comments one by one: {e}")
+
+    results = []
+    for offset, comment in enumerate(comments):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ChunkCancelled()
+        try:
+            results.extend(analyze_comments([comment], batch_start_index + offset, job_type))
+        except Exception as e:
+            # Record failed comment
+            results.append({
+                "comment_index": batch_start_index + offset,
+                "comment": comment,
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            })
+    return results
+
+
+def analyze_comments(comments: List[str], batch_start_index: int, job_type: BatchJobType) -> List[Dict[str, Any]]:
+    """Run the batched analysis of the job type over comments; one result per comment."""
+    timestamp = datetime.utcnow().isoformat()
+
+    def result(offset: int, **analysis) -> Dict[str, Any]:
+        return {
+            "comment_index": batch_start_index + offset,
+            "comment": comments[offset],
+            **analysis,
+            "timestamp": timestamp
+        }
+
+    if job_type == BatchJobType.SUMMARIZATION:
+        # Summarization with policy enhancement (no batched model path)
+        summarization_service = get_summarization_service()
+        return [
+            result(offset, summary_result=summarization_service._policy_summary(comment).__dict__)
+            for offset, comment in enumerate(comments)
+        ]
+
+    sentiment_analyzer = get_sentiment_analyzer()
+    if job_type == BatchJobType.SENTIMENT_ANALYSIS:
+        # Basic sentiment analysis, one pipeline call per model
+        return [
+            result(offset, sentiment_results=[r.__dict__ for r in sentiment_results])
+            for offset, sentiment_results in enumerate(sentiment_analyzer._sentiment_batch(comments))
+        ]
+
+    elif job_type == BatchJobType.POLICY_ANALYSIS:
+        # Policy-specific analysis; transformer fallbacks batched per model
+        results = []
+        for offset, policy_result in enumerate(sentiment_analyzer._policy_sentiment_batch(comments)):
+            if policy_result is None:
+                results.append(result(offset, error="Policy sentiment analysis failed"))
+                continue
+            results.append(result(
+                offset,
+                policy_sentiment=policy_result.__dict__,
+                stakeholder_type=sentiment_analyzer._detect_stakeholder_type(comments[offset])
+            ))
+        return results
+
+    elif job_type == BatchJobType.COMPREHENSIVE_ANALYSIS:
+        # Full comprehensive analysis; texts and aspect sentences batched per model
+        return [
+            result(offset, comprehensive_analysis={
+                "sentiment_results": [r.__dict__ for r in comprehensive_result.sentiment_results],
+                "emotion_result": comprehensive_result.emotion_result.__dict__,
+                "aspect_sentiments": [a.__dict__ for a in comprehensive_result.aspect_sentiments],
+                "key_phrases": comprehensive_result.key_phrases,
+                "law_sections_mentioned": comprehensive_result.law_sections_mentioned,
+                "overall_sentiment": comprehensive_result.overall_sentiment.value,
+                "overall_confidence": comprehensive_result.overall_confidence,
+                "processing_time_ms": comprehensive_result.processing_time_ms
+            })
+            for offset, comprehensive_result in enumerate(sentiment_analyzer._comprehensive_batch(comments))
+        ]
+
+    raise ValueError(f"Unsupported job type: {job_type}")
+
+
+async def send_completion_notification(job: Dict):
+    """Send email notification when batch job completes (placeholder)."""
+    # In production, implement actual email sending
+    print(f"Notification: Batch job {job['job_id']} completed. Email would be sent to {job['notification_email']}")
@@ -0,0 +1,376 @@
+"""
+Durable batch job queue backed by MongoDB.
+Jobs are claimed in priority order under a lease that workers renew with
+heartbeats; a job whose worker dies is picked up again once its lease
+expires and resumes from its last checkpointed chunk. Final results live in
+BatchResultStore files; the job record keeps only their summary.
+
+Jobs uploaded in chunks (input_mode "chunked") keep their comments in
+BatchInputStore parts, registered here as they arrive, and become claimable
+as soon as the first part is stored.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from backend.app.core.config import settings
+
+# Job statuses as stored in MongoDB (values of BatchStatus)
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Job input modes
+INLINE_INPUT = "inline"
+CHUNKED_INPUT = "chunked"
+
+# Job priorities: 1 is claimed first
+HIGHEST_PRIORITY = 1
+LOWEST_PRIORITY = 10
+DEFAULT_PRIORITY = 5
+
+
+def normalize_priority(priority: Any) -> int:
+    """Clamp a requested priority to 1-10; missing or invalid values get the default."""
+    try:
+        value = int(priority)
+    except (TypeError, ValueError):
+        return DEFAULT_PRIORITY
+    return min(max(value, HIGHEST_PRIORITY), LOWEST_PRIORITY)
+
+
+class BatchJobQueue:
+    """Priority job queue with lease/heartbeat claiming and chunk checkpoints."""
+
+    jobs_collection = "batch_jobs"
+    chunks_collection = "batch_job_chunks"
+    parts_collection = "batch_job_parts"
+
+    def __init__(self, db: AsyncIOMotorDatabase, lease_seconds: Optional[int] = None,
+                 max_attempts: Optional[int] = None):
+        self.db = db
+        self.lease = timedelta(seconds=lease_seconds or settings.BATCH_LEASE_SECONDS)
+        self.max_attempts = max_attempts or settings.BATCH_MAX_ATTEMPTS
+
+    @property
+    def jobs(self):
+        return self.db[self.jobs_collection]
+
+    @property
+    def chunks(self):
+        return self.db[self.chunks_collection]
+
+    @property
+    def parts(self):
+        return self.db[self.parts_collection]
+
+    async def ensure_indexes(self):
+        """Create the indexes used for claiming, listing and checkpoint lookups."""
+        await self.jobs.create_index([("status", 1), ("priority", 1), ("created_at", 1)])
+        await self.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+        await self.jobs.create_index([("user_id", 1), ("created_at", -1)])
+        await self.chunks.create_index([("job_id", 1), ("chunk_index", 1)], unique=True)
+        await self.parts.create_index([("job_id", 1), ("seq", 1)], unique=True)
+
+    async def enqueue(self, job: Dict[str, Any]) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            job: Job record; job_id becomes the document _id. Its priority is
+                clamped to 1-10 (missing: 5), as a null priority would sort
+                ahead of every other job.
+
+        Returns:
+            str: The job ID
+        """
+        document = dict(job)
+        document["_id"] = job["job_id"]
+        document["priority"] = normalize_priority(job.get("priority"))
+        document.update({
+            "status": QUEUED,
+            "attempts": 0,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "started_at": None,
+            "completed_at": None
+        })
+        await self.jobs.insert_one(document)
+        return job["job_id"]
+
+    async def get(self, job_id: str, include_comments: bool = False) -> Optional[Dict[str, Any]]:
+        """Fetch a job record (without its comments unless requested)."""
+        projection = None if include_comments else {"comments": 0, "clusters": 0}
+        return await self.jobs.find_one({"_id": job_id}, projection)
+
+    async def list(self, user_id: Optional[str] = None, status: Optional[str] = None,
+                   job_type: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List jobs, newest first."""
+        query: Dict[str, Any] = {}
+        if user_id is not None:
+            query["user_id"] = user_id
+        if status:
+            query["status"] = status
+        if job_type:
+            query["job_type"] = job_type
+
+        cursor = self.jobs.find(query, {"comments": 0, "clusters": 0}).sort("created_at", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the highest-priority runnable job.
+
+        Runnable jobs are queued jobs and processing jobs whose lease expired
+        (their worker stopped heartbeating). Priority 1 is claimed first.
+
+        Args:
+            worker_id: ID of the claiming worker
+
+        Returns:
+            dict: The claimed job including comments, or None if nothing is runnable
+        """
+        now = datetime.utcnow()
+
+        # Jobs that keep losing their worker are failed instead of retried forever
+        await self.jobs.update_many(
+            {"status": PROCESSING, "lease_expires_at": {"$lt": now}, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {
+                "status": FAILED,
+                "error_message": f"Job abandoned after {self.max_attempts} attempts",
+                "completed_at": now
+            }}
+        )
+
+        return await self.jobs.find_one_and_update(
+            {"$or": [
+                # Chunked uploads are runnable once their first part is stored
+                {"status": QUEUED, "$or": [{"sealed": {"$ne": False}}, {"input_parts": {"$gt": 0}}]},
+                {"status": PROCESSING, "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": PROCESSING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + self.lease,
+                    "heartbeat_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", 1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend a job's lease.
+
+        Returns:
+            bool: False if the worker no longer owns the job (lease taken over or job cancelled)
+        """
+        now = datetime.utcnow()
+        result = await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": PROCESSING},
+            {"$set": {"lease_expires_at": now + self.lease, "heartbeat_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def mark_started(self, job_id: str, worker_id: str,
+                           clusters: Optional[List[Dict[str, Any]]] = None,
+                           campaign_statistics: Optional[Dict[str, Any]] = None):
+        """
+        Record the first start of a job and the cluster layout its checkpoints refer to.
+        Chunked jobs store their cluster layout per part (save_part_clusters).
+        """
+        update: Dict[str, Any] = {"started_at": datetime.utcnow()}
+        if clusters is not None:
+            update.update({"clusters": clusters, "campaign_statistics": campaign_statistics})
+        await self.jobs.update_one({"_id": job_id, "worker_id": worker_id}, {"$set": update})
+
+    async def reserve_part(self, job_id: str, comment_count: int, max_comments: int) -> Optional[Tuple[int, int]]:
+        """
+        Reserve the next input part of an unsealed chunked job.
+
+        Args:
+            job_id: Job ID
+            comment_count: Comments in the part
+            max_comments: Maximum total comments of the job
+
+        Returns:
+            tuple: (part sequence number, index of its first comment), or None
+                if the job is sealed, finished or would exceed max_comments
+        """
+        job = await self.jobs.find_one_and_update(
+            {
+                "_id": job_id,
+                "input_mode": CHUNKED_INPUT,
+                "sealed": False,
+                "status": {"$in": [QUEUED, PROCESSING]},
+                "total_comments": {"$lte": max_comments - comment_count}
+            },
+            {"$inc": {"input_parts": 1, "total_comments": comment_count}},
+            projection={"input_parts": 1, "total_comments": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if job is None:
+            return None
+        return job["input_parts"], job["total_comments"]
+
+    async def release_part(self, job_id: str, seq: int, start: int, comment_count: int):
+        """
+        Give back a reservation whose part could not be stored.
+
+        The latest reservation is undone, so the next chunk reuses its sequence
+        number and comment indices. If later parts were reserved meanwhile, the
+        sequence number is registered as an empty part instead, and the job's
+        comment total drops by the part's size so the job can still complete.
+        """
+        released = await self.jobs.update_one(
+            {"_id": job_id, "input_parts": seq + 1, "total_comments": start + comment_count},
+            {"$inc": {"input_parts": -1, "total_comments": -comment_count}}
+        )
+        if released.matched_count == 1:
+            return
+        await self.jobs.update_one({"_id": job_id}, {"$inc": {"total_comments": -comment_count}})
+        await self.add_part(job_id, seq, start, 0)
+
+    async def add_part(self, job_id: str, seq: int, start: int, comment_count: int):
+        """Register a stored input part so workers can process it."""
+        now = datetime.utcnow()
+        await self.parts.insert_one({
+            "job_id": job_id, "seq": seq, "start": start, "count": comment_count,
+            "clusters": None, "campaign_statistics": None, "created_at": now
+        })
+        await self.jobs.update_one({"_id": job_id}, {"$set": {"last_append_at": now}})
+
+    async def list_parts(self, job_id: str) -> List[Dict[str, Any]]:
+        """Stored input parts of a job, in upload order."""
+        return await self.parts.find({"job_id": job_id}).sort("seq", 1).to_list(length=None)
+
+    async def save_part_clusters(self, job_id: str, seq: int, clusters: List[Dict[str, Any]],
+                                 campaign_statistics: Dict[str, Any]):
+        """Store the cluster layout a part's checkpoints refer to."""
+        await self.parts.update_one(
+            {"job_id": job_id, "seq": seq},
+            {"$set": {"clusters": clusters, "campaign_statistics": campaign_statistics}}
+        )
+
+    async def seal(self, job_id: str) -> bool:
+        """
+        Mark a chunked job's input complete.
+
+        Returns:
+            bool: False if the job was already sealed or has finished
+        """
+        result = await self.jobs.update_one(
+            {"_id": job_id, "input_mode": CHUNKED_INPUT, "sealed": False, "status": {"$in": [QUEUED, PROCESSING]}},
+            {"$set": {"sealed": True, "sealed_at": datetime.utcnow()}}
+        )
+        return result.matched_count == 1
+
+    async def checkpoint(self, job_id: str, worker_id: str, chunk_index: int,
+                         results: List[Dict[str, Any]], processed_comments: int,
+                         progress_percentage: float,
+                         estimated_completion: Optional[datetime] = None,
+                         partial_summary: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Persist the results of one processed chunk and the job's progress.
+        Chunks may be checkpointed in any order. partial_summary holds the
+        running summary statistics of the chunks processed so far.
+
+        The chunk results are written only after the ownership-checked job
+        update matched, so a worker that lost its lease cannot overwrite the
+        results of the job's new owner.
+
+        Returns:
+            bool: False if the worker no longer owns the job
+        """
+        now = datetime.utcnow()
+        result = await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": PROCESSING},
+            {"$set": {
+                "processed_comments": processed_comments,
+                "progress_percentage": progress_percentage,
+                "estimated_completion": estimated_completion,
+                "partial_summary": partial_summary,
+                "lease_expires_at": now + self.lease,
+                "heartbeat_at": now
+            }}
+        )
+        if result.matched_count != 1:
+            return False
+        await self.chunks.replace_one(
+            {"job_id": job_id, "chunk_index": chunk_index},
+            {"job_id": job_id, "chunk_index": chunk_index, "results": results, "created_at": now},
+            upsert=True
+        )
+        return True
+
+    async def load_checkpoints(self, job_id: str, first: Optional[int] = None,
+                               last: Optional[int] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """Results of already processed chunks, keyed by chunk index (optionally first <= index < last)."""
+        query: Dict[str, Any] = {"job_id": job_id}
+        if first is not None:
+            query["chunk_index"] = {"$gte": first, "$lt": last}
+        checkpoints = {}
+        async for chunk in self.chunks.find(query):
+            checkpoints[chunk["chunk_index"]] = chunk["results"]
+        return checkpoints
+
+    async def complete(self, job_id: str, worker_id: str, result_summary: Dict[str, Any]) -> bool:
+        """
+        Mark the job completed once its result files are written.
+
+        The job's comments and cluster layout are dropped: the result files
+        carry each comment with its analysis.
+
+        Args:
+            result_summary: Summary record returned by BatchResultWriter.close
+
+        Returns:
+            bool: False if the worker no longer owns the job
+        """
+        outcome = await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": PROCESSING},
+            {
+                "$set": {
+                    "status": COMPLETED,
+                    "completed_at": datetime.utcnow(),
+                    "processed_comments": result_summary["result_count"] + result_summary["failed_count"],
+                    "progress_percentage": 100.0,
+                    "failed_count": result_summary["failed_count"],
+                    "estimated_completion": None,
+                    "result_summary": result_summary
+                },
+                "$unset": {"comments": "", "clusters": ""}
+            }
+        )
+        if outcome.matched_count == 1:
+            await self.chunks.delete_many({"job_id": job_id})
+            await self.parts.delete_many({"job_id": job_id})
+        return outcome.matched_count == 1
+
+    async def fail(self, job_id: str, worker_id: str, error: str):
+        """Mark a job failed."""
+        await self.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id, "status": PROCESSING},
+            {"$set": {"status": FAILED, "error_message": error, "completed_at": datetime.utcnow()}}
+        )
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job; its worker stops at the next heartbeat or checkpoint.
+
+        Returns:
+            bool: False if the job had already finished
+        """
+        result = await self.jobs.update_one(
+            {"_id": job_id, "status": {"$in": [QUEUED, PROCESSING]}},
+            {"$set": {"status": CANCELLED, "completed_at": datetime.utcnow()}}
+        )
+        return result.matched_count == 1
@@ -0,0 +1,142 @@
+"""
+Batch job progress fan-out.
+One producer per job watches the job record and publishes progress, partial
+aggregates and the final outcome to every subscriber in this process, so a
+job costs the same database reads whether one or a hundred clients follow it.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.core.config import settings
+from backend.app.services.batch_job_queue import BatchJobQueue, CANCELLED, COMPLETED, FAILED
+
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+
+class _JobTopic:
+    """Subscribers of one job plus the producer task feeding them."""
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_event: Optional[Dict[str, Any]] = None
+        self.producer: Optional[asyncio.Task] = None
+
+
+class BatchProgressBroker:
+    """In-process pub/sub for batch job progress events."""
+
+    def __init__(self, poll_interval: Optional[float] = None, keepalive_seconds: float = 15.0,
+                 subscriber_buffer: int = 16):
+        self.poll_interval = poll_interval or settings.BATCH_STREAM_POLL_SECONDS
+        self.keepalive_seconds = keepalive_seconds
+        self.subscriber_buffer = subscriber_buffer
+        self.topics: Dict[str, _JobTopic] = {}
+
+    async def subscribe(self, queue: BatchJobQueue, job_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield progress events for a job until it reaches a terminal status.
+
+        The latest known event is delivered immediately, so late subscribers
+        do not wait for the next change.
+
+        Args:
+            queue: Job queue used by the producer if one has to be started
+            job_id: Job to follow
+
+        Yields:
+            dict: Events with "event" (progress, completed, failed, cancelled) and "data";
+                None after keepalive_seconds without an event
+        """
+        topic = self.topics.get(job_id)
+        if topic is None:
+            topic = self.topics[job_id] = _JobTopic()
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        topic.subscribers.add(inbox)
+        if topic.last_event is not None:
+            inbox.put_nowait(topic.last_event)
+        if topic.producer is None or topic.producer.done():
+            topic.producer = asyncio.create_task(self._produce(queue, job_id, topic))
+
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(inbox.get(), timeout=self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["event"] != "progress":
+                    return
+        finally:
+            topic.subscribers.discard(inbox)
+            if not topic.subscribers:
+                # Last viewer left: stop the producer and forget the job
+                topic.producer.cancel()
+                if self.topics.get(job_id) is topic:
+                    del self.topics[job_id]
+
+    async def _produce(self, queue: BatchJobQueue, job_id: str, topic: _JobTopic):
+        last_state = None
+        while True:
+            try:
+                job = await queue.get(job_id)
+            except Exception as e:
+                print(f"Progress producer for batch job {job_id} could not read the job: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if job is None:
+                self._publish(topic, {"event": "failed", "data": {"job_id": job_id, "error_message": "Batch job not found"}})
+                return
+
+            state = (job["status"], job.get("processed_comments"))
+            if state != last_state:
+                last_state = state
+                self._publish(topic, self._event(job))
+            if job["status"] in TERMINAL_STATUSES:
+                return
+
+            await asyncio.sleep(self.poll_interval)
+
+    def _publish(self, topic: _JobTopic, event: Dict[str, Any]):
+        topic.last_event = event
+        for inbox in topic.subscribers:
+            if inbox.full():
+                # A slow viewer only needs the newest progress, drop the oldest
+                inbox.get_nowait()
+            inbox.put_nowait(event)
+
+    @staticmethod
+    def _event(job: Dict[str, Any]) -> Dict[str, Any]:
+        status = job["status"]
+        data = {
+            "job_id": job["job_id"],
+            "status": status,
+            "total_comments": job["total_comments"],
+            "processed_comments": job.get("processed_comments", 0),
+            "progress_percentage": job.get("progress_percentage", 0.0),
+        }
+        if status == COMPLETED:
+            result_summary = job.get("result_summary") or {}
+            data.update({
+                "completed_at": job.get("completed_at"),
+                "result_count": result_summary.get("result_count"),
+                "failed_count": result_summary.get("failed_count"),
+                "summary_statistics": result_summary.get("summary_statistics"),
+                "recommendations": result_summary.get("recommendations")
+            })
+        elif status in (FAILED, CANCELLED):
+            data.update({"completed_at": job.get("completed_at"), "error_message": job.get("error_message")})
+        else:
+            data.update({
+                "estimated_completion": job.get("estimated_completion"),
+                "partial_summary": job.get("partial_summary")
+            })
+        return {"event": status if status in TERMINAL_STATUSES else "progress", "data": jsonable_encoder(data)}
+
+
+# Shared broker for the API process
+progress_broker = BatchProgressBroker()
@@ -0,0 +1,302 @@
+"""
+On-disk result storage for batch jobs.
+Each finished job gets one JSONL file of per-comment results and one of failed
+comments, written incrementally, plus a sparse line-offset index so pages can
+be read without scanning the file. Summary statistics and recommendations are
+accumulated while results are written and stored once with the job record.
+
+Files are plain blocking I/O; async callers run them with asyncio.to_thread.
+Result files are kept for BATCH_RESULT_RETENTION_HOURS and then removed by
+purge_expired, which batch workers run periodically.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.app.core.config import settings
+
+
+class BatchSummaryAccumulator:
+    """Running aggregates of a job's results, by job type."""
+
+    def __init__(self, job_type: str):
+        self.job_type = job_type
+        self.total = 0
+
+        # Sentiment and policy analysis
+        self.sentiment_counts: Dict[str, int] = {}
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+        self.high_confidence = 0
+        self.low_confidence = 0
+        self.positive = 0
+        self.negative = 0
+        self.neutral = 0
+        self.ambiguous = 0
+
+        # Comprehensive analysis
+        self.emotion_counts: Dict[str, int] = {}
+        self.aspects = 0
+
+        # Summarization
+        self.summary_characters = 0
+
+    def add(self, result: Dict[str, Any], weight: int = 1):
+        """
+        Fold one successful result into the aggregates.
+
+        Args:
+            result: Per-comment result
+            weight: Number of comments the result stands for (a campaign
+                representative counts for every cluster member)
+        """
+        self.total += weight
+
+        if self.job_type in ("sentiment_analysis", "policy_analysis"):
+            if self.job_type == "policy_analysis":
+                sentiment_data = result.get("policy_sentiment", {})
+                counted = True
+            else:
+                sentiment_results = result.get("sentiment_results", [])
+                sentiment_data = sentiment_results[0] if sentiment_results else {}
+                counted = bool(sentiment_results)
+
+            sentiment = sentiment_data.get("sentiment_label")
+            confidence = sentiment_data.get("confidence_score", 0)
+            if counted:
+                self.sentiment_counts[sentiment] = self.sentiment_counts.get(sentiment, 0) + weight
+                self.confidence_sum += confidence * weight
+                self.confidence_count += weight
+                if confidence > 0.8:
+                    self.high_confidence += weight
+                if confidence < 0.5:
+                    self.low_confidence += weight
+
+            label = (sentiment or "").lower()
+            if label == "positive":
+                self.positive += weight
+            elif label == "negative":
+                self.negative += weight
+            else:
+                self.neutral += weight
+            if confidence < 0.6:
+                self.ambiguous += weight
+
+        elif self.job_type == "comprehensive_analysis":
+            analysis = result.get("comprehensive_analysis", {})
+            overall_sentiment = analysis.get("overall_sentiment")
+            emotion = analysis.get("emotion_result", {}).get("emotion_label")
+            if overall_sentiment:
+                self.sentiment_counts[overall_sentiment] = self.sentiment_counts.get(overall_sentiment, 0) + weight
+            if emotion:
+                self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + weight
+            self.aspects += len(analysis.get("aspect_sentiments", [])) * weight
+
+        else:
+            self.summary_characters += len(result.get("summary_result", {}).get("summary_text", "")) * weight
+
+    def summary_statistics(self) -> Dict[str, Any]:
+        """Summary statistics for the results added so far."""
+        if self.job_type in ("sentiment_analysis", "policy_analysis"):
+            return {
+                "total_comments": self.total,
+                "sentiment_distribution": dict(self.sentiment_counts),
+                "average_confidence": self.confidence_sum / self.confidence_count if self.confidence_count else 0,
+                "high_confidence_comments": self.high_confidence,
+                "low_confidence_comments": self.low_confidence
+            }
+
+        elif self.job_type == "comprehensive_analysis":
+            return {
+                "total_comments": self.total,
+                "sentiment_distribution": dict(self.sentiment_counts),
+                "emotion_distribution": dict(self.emotion_counts),
+                "total_aspects_identified": self.aspects,
+                "average_aspects_per_comment": self.aspects / self.total if self.total > 0 else 0
+            }
+
+        return {
+            "total_comments": self.total,
+            "total_summary_characters": self.summary_characters,
+            "average_summary_length": self.summary_characters / self.total if self.total > 0 else 0
+        }
+
+    def recommendations(self) -> List[str]:
+        """Generate actionable recommendations based on the aggregated results."""
+        if not self.total:
+            return ["No results available for recommendations."]
+
+        recommendations = []
+        total_comments = self.total
+
+        if self.job_type in ("sentiment_analysis", "policy_analysis"):
+            if self.negative > self.positive:
+                recommendations.append(f"High negative sentiment detected ({self.negative}/{total_comments} comments). Consider addressing stakeholder concerns.")
+
+            if self.positive > total_comments * 0.7:
+                recommendations.append(f"Strong positive support ({self.positive}/{total_comments} comments). This policy appears well-received.")
+
+            if self.ambiguous > total_comments * 0.3:
+                recommendations.append(f"Many comments have ambiguous sentiment ({self.ambiguous}/{total_comments}). Manual review recommended for unclear feedback.")
+
+            if self.neutral > total_comments * 0.5:
+                recommendations.append("High neutral sentiment suggests stakeholders need more information or clarification.")
+
+        # Add volume-based recommendations
+        if total_comments > 1000:
+            recommendations.append("High volume of feedback received. Consider categorizing by stakeholder type for targeted responses.")
+
+        if total_comments < 50:
+            recommendations.append("Limited feedback volume. Consider extending consultation period or broader outreach.")
+
+        recommendations.append("Review failed comments for processing issues and ensure comprehensive coverage.")
+        recommendations.append("Use stakeholder categorization to identify different perspectives on the policy.")
+
+        return recommendations
+
+
+class BatchResultWriter:
+    """Writes one job's results incrementally; files become visible on close()."""
+
+    def __init__(self, store: "BatchResultStore", job_id: str, job_type: str):
+        self.store = store
+        self.job_id = job_id
+        self.accumulator = BatchSummaryAccumulator(job_type)
+        self.counts = {"results": 0, "failed": 0}
+        self.offsets: Dict[str, List[int]] = {"results": [], "failed": []}
+        self.files = {
+            kind: open(store.path(job_id, kind) + ".tmp", "wb")
+            for kind in ("results", "failed")
+        }
+
+    def write(self, result: Dict[str, Any], failed: bool = False):
+        """Append one per-comment result."""
+        kind = "failed" if failed else "results"
+        handle = self.files[kind]
+        if self.counts[kind] % self.store.index_interval == 0:
+            self.offsets[kind].append(handle.tell())
+        handle.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.counts[kind] += 1
+        if not failed:
+            self.accumulator.add(result)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Publish the files and return the job's summary record.
+
+        Returns:
+            dict: result_count, failed_count, summary_statistics and recommendations
+        """
+        for kind, handle in self.files.items():
+            handle.close()
+            os.replace(handle.name, self.store.path(self.job_id, kind))
+        with open(self.store.path(self.job_id, "index") + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"interval": self.store.index_interval, "offsets": self.offsets}, f)
+        os.replace(self.store.path(self.job_id, "index") + ".tmp", self.store.path(self.job_id, "index"))
+
+        return {
+            "result_count": self.counts["results"],
+            "failed_count": self.counts["failed"],
+            "summary_statistics": self.accumulator.summary_statistics(),
+            "recommendations": self.accumulator.recommendations()
+        }
+
+    def abort(self):
+        """Discard a partially written result set."""
+        for handle in self.files.values():
+            handle.close()
+            if os.path.exists(handle.name):
+                os.remove(handle.name)
+
+
+class BatchResultStore:
+    """Per-job JSONL result files under BATCH_RESULTS_DIR."""
+
+    def __init__(self, base_dir: Optional[str] = None, index_interval: int = 1000):
+        self.base_dir = base_dir or settings.BATCH_RESULTS_DIR
+        self.index_interval = index_interval
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def path(self, job_id: str, kind: str) -> str:
+        extension = "json" if kind == "index" else "jsonl"
+        return os.path.join(self.base_dir, f"{job_id}.{kind}.{extension}")
+
+    def open_writer(self, job_id: str, job_type: str) -> BatchResultWriter:
+        """Start (or restart) writing a job's results."""
+        return BatchResultWriter(self, job_id, job_type)
+
+    def exists(self, job_id: str) -> bool:
+        return os.path.exists(self.path(job_id, "index"))
+
+    def read_page(self, job_id: str, offset: int = 0, limit: int = 100,
+                  failed: bool = False) -> List[Dict[str, Any]]:
+        """
+        Read a page of results without scanning from the start of the file.
+
+        Args:
+            job_id: Job ID
+            offset: Index of the first result in the page
+            limit: Maximum number of results
+            failed: Read failed comments instead of results
+
+        Returns:
+            list: Results in comment order
+        """
+        kind = "failed" if failed else "results"
+        with open(self.path(job_id, "index"), encoding="utf-8") as f:
+            index = json.load(f)
+        offsets = index["offsets"][kind]
+        block = offset // index["interval"]
+        if limit <= 0 or block >= len(offsets):
+            return []
+
+        page = []
+        with open(self.path(job_id, kind), "rb") as f:
+            f.seek(offsets[block])
+            skip = offset - block * index["interval"]
+            for line in f:
+                if skip:
+                    skip -= 1
+                    continue
+                page.append(json.loads(line))
+                if len(page) >= limit:
+                    break
+        return page
+
+    def iter_lines(self, job_id: str, failed: bool = False, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream a result file as NDJSON bytes without decoding it."""
+        with open(self.path(job_id, "failed" if failed else "results"), "rb") as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    return
+                yield data
+
+    def delete(self, job_id: str):
+        """Remove a job's result files."""
+        for kind in ("results", "failed", "index"):
+            path = self.path(job_id, kind)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def purge_expired(self, max_age_seconds: float) -> int:
+        """
+        Delete result files (including abandoned partial files) not modified
+        for max_age_seconds.
+
+        Returns:
+            int: Number of jobs whose files were removed
+        """
+        cutoff = time.time() - max_age_seconds
+        purged = set()
+        for entry in os.scandir(self.base_dir):
+            try:
+                if not entry.is_file() or entry.stat().st_mtime >= cutoff:
+                    continue
+                os.remove(entry.path)
+            except OSError:
+                continue
+            purged.add(entry.name.split(".", 1)[0])
+        return len(purged)
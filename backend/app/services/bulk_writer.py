@@ -0,0 +1,108 @@
+"""
+Batched, idempotent bulk writer for MongoDB collections.
+Documents are upserted in unordered batches keyed by a set of identity fields,
+so a bad document only fails itself and re-running an import updates records
+instead of duplicating them.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.app.core.config import settings
+
+
+class BulkUpsertWriter:
+    """Writes documents as ordered=False upsert batches with per-batch counts."""
+
+    def __init__(self, collection, key_fields: Sequence[str],
+                 insert_only_fields: Sequence[str] = (),
+                 batch_size: Optional[int] = None):
+        """
+        Args:
+            collection: Motor collection to write to
+            key_fields: Fields that identify a document across re-imports
+            insert_only_fields: Fields written only when the document is new,
+                so values set later (e.g. analysis results) are not overwritten
+            batch_size: Operations per bulk_write call
+        """
+        self.collection = collection
+        self.key_fields = list(key_fields)
+        self.insert_only_fields = set(insert_only_fields)
+        self.batch_size = batch_size or settings.BULK_WRITE_BATCH_SIZE
+
+    def _operation(self, document: Dict[str, Any]) -> UpdateOne:
+        key = {field: document.get(field) for field in self.key_fields}
+        update: Dict[str, Any] = {
+            '$set': {
+                field: value for field, value in document.items()
+                if field not in self.insert_only_fields and field != '_id'
+            }
+        }
+        insert_only = {
+            field: document[field] for field in self.insert_only_fields if field in document
+        }
+        if insert_only:
+            update['$setOnInsert'] = insert_only
+        return UpdateOne(key, update, upsert=True)
+
+    async def write(self, documents: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Upsert documents in batches.
+
+        Args:
+            documents: Documents to write; each must contain the key fields
+
+        Returns:
+            dict: inserted/updated/failed totals, per-batch counts, the _id of
+                each newly inserted document by index, and failed indexes
+        """
+        result: Dict[str, Any] = {
+            'inserted': 0,
+            'updated': 0,
+            'failed': 0,
+            'batches': [],
+            'upserted_ids': {},
+            'failed_indexes': set(),
+            'errors': []
+        }
+
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            batch_stats = await self._write_batch(batch, start, result)
+            batch_stats['batch'] = len(result['batches'])
+            result['batches'].append(batch_stats)
+            result['inserted'] += batch_stats['inserted']
+            result['updated'] += batch_stats['updated']
+            result['failed'] += batch_stats['failed']
+
+        return result
+
+    async def _write_batch(self, batch: Sequence[Dict[str, Any]], offset: int,
+                           result: Dict[str, Any]) -> Dict[str, int]:
+        operations = [self._operation(document) for document in batch]
+        try:
+            outcome = await self.collection.bulk_write(operations, ordered=False)
+            details = outcome.bulk_api_result
+        except BulkWriteError as e:
+            # With ordered=False every other operation in the batch was still applied
+            details = e.details
+            for error in details.get('writeErrors', []):
+                result['failed_indexes'].add(offset + error['index'])
+                result['errors'].append(
+                    f"Write failed for record {offset + error['index']}: {error.get('errmsg', 'unknown error')}"
+                )
+        except Exception as e:
+            result['failed_indexes'].update(range(offset, offset + len(batch)))
+            result['errors'].append(f"Batch write failed: {str(e)}")
+            return {'inserted': 0, 'updated': 0, 'failed': len(batch)}
+
+        for upserted in details.get('upserted', []):
+            result['upserted_ids'][offset + upserted['index']] = upserted['_id']
+
+        return {
+            'inserted': details.get('nUpserted', 0),
+            'updated': details.get('nMatched', 0),
+            'failed': len(details.get('writeErrors', []))
+        }
@@ -0,0 +1,129 @@
+"""
+Campaign (template comment) clustering.
+Groups lightly edited copies of the same template into clusters so that
+expensive analysis runs once per representative and fans out to members.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.app.core.config import settings
+from backend.app.utils.text_utils import DuplicationDetector
+
+
+@dataclass
+class CampaignCluster:
+    """A group of near-identical comments represented by its earliest member."""
+    cluster_id: str
+    representative_index: int
+    representative_text: str
+    member_indexes: List[int] = field(default_factory=list)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_indexes)
+
+
+class CampaignClusterer:
+    """Clusters comments with DuplicationDetector normalization and MinHash LSH."""
+
+    def __init__(self, detector: Optional[DuplicationDetector] = None):
+        self.detector = detector or DuplicationDetector(
+            similarity_threshold=settings.CAMPAIGN_SIMILARITY_THRESHOLD
+        )
+
+    def cluster(self, texts: Sequence[str]) -> List[CampaignCluster]:
+        """
+        Group texts into campaign clusters.
+
+        Args:
+            texts: Comment texts
+
+        Returns:
+            list: Clusters ordered by representative index; singletons included
+        """
+        # Each duplicate points at an earlier comment; resolve chains to the root
+        root = list(range(len(texts)))
+        for original_idx, duplicate_idx in sorted(self.detector.find_duplicates(list(texts)), key=lambda p: p[1]):
+            root[duplicate_idx] = root[original_idx]
+
+        clusters: Dict[int, CampaignCluster] = {}
+        for index, representative in enumerate(root):
+            if representative not in clusters:
+                clusters[representative] = CampaignCluster(
+                    cluster_id=uuid.uuid4().hex,
+                    representative_index=representative,
+                    representative_text=texts[representative]
+                )
+            clusters[representative].member_indexes.append(index)
+
+        return [clusters[key] for key in sorted(clusters)]
+
+    def group(self, texts: Sequence[str],
+              cluster_ids: Sequence[Optional[str]]) -> List[CampaignCluster]:
+        """
+        Build clusters from cluster IDs assigned at ingestion, without re-clustering.
+
+        Texts without an ID are grouped only with exact copies (after normalization).
+
+        Args:
+            texts: Comment texts
+            cluster_ids: campaign_cluster_id per text, or None
+
+        Returns:
+            list: Clusters ordered by representative index
+        """
+        clusters: Dict[str, CampaignCluster] = {}
+        for index, text in enumerate(texts):
+            cluster_id = cluster_ids[index] if index < len(cluster_ids) else None
+            key = cluster_id or "text:" + self.detector.normalize_text(text or "")
+            if key not in clusters:
+                clusters[key] = CampaignCluster(
+                    cluster_id=cluster_id or uuid.uuid4().hex,
+                    representative_index=index,
+                    representative_text=text
+                )
+            clusters[key].member_indexes.append(index)
+        return list(clusters.values())
+
+    def fan_out(self, representative_results: Sequence[Any],
+                clusters: Sequence[CampaignCluster], total: int) -> List[Any]:
+        """
+        Expand one result per cluster back to one result per member.
+
+        Args:
+            representative_results: Results aligned with clusters
+            clusters: Clusters from cluster()
+            total: Number of original texts
+
+        Returns:
+            list: Results aligned with the original texts
+        """
+        expanded: List[Any] = [None] * total
+        for cluster, result in zip(clusters, representative_results):
+            for index in cluster.member_indexes:
+                expanded[index] = result
+        return expanded
+
+
+def campaign_summary(clusters: Sequence[CampaignCluster], top_n: int = 10) -> Dict[str, Any]:
+    """Summarize campaign activity for API responses."""
+    campaigns = [cluster for cluster in clusters if cluster.member_count > 1]
+    campaigns.sort(key=lambda cluster: cluster.member_count, reverse=True)
+    total = sum(cluster.member_count for cluster in clusters)
+    return {
+        "total_comments": total,
+        "unique_clusters": len(clusters),
+        "campaign_clusters": len(campaigns),
+        "comments_in_campaigns": sum(cluster.member_count for cluster in campaigns),
+        "analysis_reduction_ratio": 1 - (len(clusters) / total) if total else 0.0,
+        "top_campaigns": [
+            {
+                "cluster_id": cluster.cluster_id,
+                "member_count": cluster.member_count,
+                "representative_text": cluster.representative_text[:200]
+            }
+            for cluster in campaigns[:top_n]
+        ]
+    }
@@ -0,0 +1,135 @@
+"""
+Persistent MinHash signature index for cross-upload duplicate detection.
+Stores LSH band keys per consultation in MongoDB so new uploads are checked
+against previously stored comments, not only within the current batch.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from backend.app.utils.text_utils import DuplicationDetector
+
+
+class DuplicateSignatureIndex:
+    """Per-consultation LSH index persisted in the duplicate_signatures collection."""
+
+    collection_name = "duplicate_signatures"
+
+    def __init__(self, db: AsyncIOMotorDatabase, detector: DuplicationDetector,
+                 query_batch_size: int = 500):
+        self.db = db
+        self.detector = detector
+        self.query_batch_size = query_batch_size
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    async def ensure_indexes(self):
+        """Create the indexes used for band and exact-hash lookups."""
+        await self.collection.create_index([("consultation_id", 1), ("bands", 1)])
+        await self.collection.create_index([("consultation_id", 1), ("text_hash", 1)])
+        await self.collection.create_index("comment_id")
+
+    async def find_matches(self, consultation_id: Optional[str],
+                           texts: Sequence[str]) -> Dict[int, Any]:
+        """
+        Match texts against comments already stored for a consultation.
+
+        Args:
+            consultation_id: Consultation whose stored comments are searched
+            texts: Texts of the new comments
+
+        Returns:
+            dict: index into texts -> _id of the stored comment it duplicates
+        """
+        matches: Dict[int, Any] = {}
+
+        for start in range(0, len(texts), self.query_batch_size):
+            batch = list(texts[start:start + self.query_batch_size])
+            normalized = [self.detector.normalize_text(text) for text in batch]
+            hashes = [self._text_hash(text) for text in normalized]
+            bands = [self.detector.lsh.band_keys(self.detector.lsh.signature(text)) for text in normalized]
+
+            # Candidate stored comments: same exact hash or a shared LSH band
+            cursor = self.collection.find(
+                {
+                    "consultation_id": consultation_id,
+                    "$or": [
+                        {"text_hash": {"$in": list(set(hashes))}},
+                        {"bands": {"$in": list({key for keys in bands for key in keys})}}
+                    ]
+                },
+                {"comment_id": 1, "text_hash": 1, "bands": 1}
+            )
+            stored = await cursor.to_list(length=None)
+            if not stored:
+                continue
+
+            by_hash = {}
+            by_band = defaultdict(list)
+            for entry in stored:
+                by_hash.setdefault(entry["text_hash"], entry["comment_id"])
+                for key in entry.get("bands", []):
+                    by_band[key].append(entry["comment_id"])
+
+            # Verify band candidates against the stored comment text
+            candidates_per_text: Dict[int, List[Any]] = {}
+            needed_ids = set()
+            for offset, (text_hash, keys) in enumerate(zip(hashes, bands)):
+                if text_hash in by_hash:
+                    matches[start + offset] = by_hash[text_hash]
+                    continue
+                candidate_ids = list(dict.fromkeys(cid for key in keys for cid in by_band.get(key, [])))
+                if candidate_ids:
+                    candidates_per_text[offset] = candidate_ids
+                    needed_ids.update(candidate_ids)
+
+            if not needed_ids:
+                continue
+
+            texts_by_id = {}
+            async for comment in self.db.comments.find(
+                {"_id": {"$in": list(needed_ids)}}, {"original_text": 1}
+            ):
+                texts_by_id[comment["_id"]] = self.detector.normalize_text(comment.get("original_text", ""))
+
+            for offset, candidate_ids in candidates_per_text.items():
+                for comment_id in candidate_ids:
+                    stored_text = texts_by_id.get(comment_id)
+                    if stored_text is not None and self.detector.normalized_similar(stored_text, normalized[offset]):
+                        matches[start + offset] = comment_id
+                        break
+
+        return matches
+
+    async def register(self, consultation_id: Optional[str],
+                       comment_ids: Sequence[Any], texts: Sequence[str]):
+        """
+        Add stored comments to the consultation's signature index.
+
+        Args:
+            consultation_id: Consultation the comments belong to
+            comment_ids: MongoDB _ids of the stored comments
+            texts: Comment texts, aligned with comment_ids
+        """
+        documents = []
+        for comment_id, text in zip(comment_ids, texts):
+            normalized = self.detector.normalize_text(text)
+            documents.append({
+                "consultation_id": consultation_id,
+                "comment_id": comment_id,
+                "text_hash": self._text_hash(normalized),
+                "bands": self.detector.lsh.band_keys(self.detector.lsh.signature(normalized)),
+                "created_at": datetime.utcnow()
+            })
+
+        if documents:
+            await self.collection.insert_many(documents, ordered=False)
+
+    def _text_hash(self, normalized_text: str) -> str:
+        return hashlib.md5(normalized_text.encode()).hexdigest()
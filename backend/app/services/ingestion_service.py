@@ -2,25 +2,53 @@
 Data ingestion service for processing uploaded files and extracting comments.
 Supports CSV, Excel, and text files with deduplication and validation.
 MongoDB-compatible version.
+
+Files are streamed: uploads are spooled to disk in fixed-size chunks and
+records are read, validated, deduplicated and inserted one chunk at a time,
+so peak memory is bounded by INGESTION_CHUNK_ROWS rather than the file size.
+Comments are upserted in unordered batches keyed by content hash and source
+position, so re-ingesting a file updates records instead of duplicating them.
 """
 
 import pandas as pd
+import numpy as np
 import aiofiles
+import asyncio
+import codecs
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, AsyncIterator, Iterator
 from datetime import datetime
 import hashlib
 import json
+import uuid
+from collections import OrderedDict
 from io import BytesIO, StringIO
-import re
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 from fastapi import UploadFile, HTTPException
 
 from backend.app.core.config import settings
 from backend.app.models.mongo_models import CommentCreate, CommentInDB, SystemLogBase
+from backend.app.services.bulk_writer import BulkUpsertWriter
+from backend.app.services.campaign_clustering import CampaignCluster, CampaignClusterer
+from backend.app.services.duplicate_index_service import DuplicateSignatureIndex
 from backend.app.utils.text_utils import TextValidator, DuplicationDetector
 
 
+# Per-file progress of directory ingestion runs, keyed by run ID; only the
+# latest DIRECTORY_RUN_HISTORY runs are kept (running ones are never dropped)
+directory_runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _track_directory_run(run_id: str, progress: Dict[str, Any]):
+    """Publish a directory run's progress, evicting the oldest finished runs."""
+    directory_runs.pop(run_id, None)
+    directory_runs[run_id] = progress
+    finished = [key for key, run in directory_runs.items() if run['status'] != 'running']
+    for key in finished[:max(0, len(directory_runs) - settings.DIRECTORY_RUN_HISTORY)]:
+        del directory_runs[key]
+
+
 class IngestionService:
     """Service for processing and ingesting comment data from various file formats."""
 
@@ -28,8 +56,19 @@ class IngestionService:
         self.db = db
         self.validator = TextValidator()
         self.deduplicator = DuplicationDetector()
+        self.signature_index = DuplicateSignatureIndex(db, self.deduplicator)
+        self.campaign_clusterer = CampaignClusterer(self.deduplicator)
+
+        # Comments are identified across re-imports by consultation, content and
+        # source position (files of different consultations may share a name);
+        # analysis results written later must survive a re-import
+        self.comment_writer = BulkUpsertWriter(
+            db.comments,
+            key_fields=('consultation_id', 'content_hash', 'source_file', 'source_row'),
+            insert_only_fields=('created_at', 'sentiment')
+        )
         
-        # Supported file extensions
+        # Supported file extensions, each mapped to a chunked record reader
         self.supported_extensions = {
             '.csv': self._process_csv,
             '.xlsx': self._process_excel,
@@ -38,6 +77,10 @@ class IngestionService:
             '.json': self._process_json
         }
         
+        # Candidate encodings, tried once against a sample of the file
+        self.candidate_encodings = ['utf-8', 'latin-1', 'cp1252']
+        self.chunk_rows = settings.INGESTION_CHUNK_ROWS
+        
         # Common column mappings for CSV/Excel files
         self.column_mappings = {
             'comment': ['comment', 'text', 'feedback', 'response', 'content', 'message'],
@@ -63,14 +106,12 @@ class IngestionService:
         Returns:
             dict: Processing results with statistics
         """
+        file_path = None
         try:
             # Validate file
             self._validate_file(file)
 
-            # Save file temporarily
-            file_path = await self._save_temp_file(file)
-
-            # Process based on file type
+            # Resolve the chunked reader for this file type
             file_extension = Path(file.filename).suffix.lower()
             processor = self.supported_extensions.get(file_extension)
 
@@ -80,17 +121,14 @@ class IngestionService:
                     detail=f"Unsupported file format: {file_extension}"
                 )
 
-            # Extract data from file
-            raw_data = await processor(file_path)
+            # Spool the upload to disk without holding it in memory
+            file_path = await self._save_temp_file(file)
 
-            # Process and save comments
-            result = await self._process_comments(
-                raw_data, file.filename, user_id, consultation_id
+            # Read, validate, deduplicate and save one chunk at a time
+            result = await self._ingest_file(
+                file_path, processor, file.filename, user_id, consultation_id
             )
 
-            # Clean up temp file
-            Path(file_path).unlink(missing_ok=True)
-
             # Log successful ingestion
             await self._log_ingestion(
                 user_id=user_id,
@@ -112,6 +150,91 @@ class IngestionService:
             )
             raise
 
+        finally:
+            # Clean up temp file
+            if file_path:
+                Path(file_path).unlink(missing_ok=True)
+
+    async def _ingest_file(self, file_path: str, processor, source_file: str,
+                         user_id: str, consultation_id: str = None,
+                         progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Stream records from a file through validation, deduplication and storage.
+
+        Args:
+            file_path: Path of the file on disk
+            processor: Chunked reader returned from supported_extensions
+            source_file: Original filename recorded on each comment
+            user_id: ID of user who uploaded the file
+            consultation_id: Optional consultation process ID
+            progress: Optional status record updated as chunks complete
+
+        Returns:
+            dict: Processing statistics aggregated over all chunks
+        """
+        stats = self._empty_stats()
+        stats['chunks_processed'] = 0
+
+        # Hashes of comments saved from earlier chunks of the same file
+        dedup_state: Dict[str, Any] = {'seen_hashes': {}}
+
+        # Chunk N is deduplicated and written while chunk N+1 is parsed; chunks
+        # still complete in order so cross-chunk duplicate checks see earlier writes
+        pending: Optional[asyncio.Task] = None
+
+        def complete(chunk_stats: Dict[str, Any]):
+            self._merge_stats(stats, chunk_stats)
+            if progress is not None:
+                progress['chunks_processed'] = progress.get('chunks_processed', 0) + 1
+                progress['comments_saved'] = stats['comments_saved']
+
+        try:
+            async for records in processor(file_path):
+                if pending is not None:
+                    complete(await pending)
+                pending = asyncio.create_task(self._process_comments(
+                    records, source_file, user_id, consultation_id, dedup_state
+                ))
+                stats['chunks_processed'] += 1
+
+            if pending is not None:
+                complete(await pending)
+                pending = None
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        for number, batch in enumerate(stats['write_batches']):
+            batch['batch'] = number
+
+        return stats
+
+    def _empty_stats(self) -> Dict[str, Any]:
+        """Create an empty processing statistics record."""
+        return {
+            'total_records': 0,
+            'valid_comments': 0,
+            'invalid_comments': 0,
+            'duplicates_found': 0,
+            'comments_saved': 0,
+            'comments_inserted': 0,
+            'comments_updated': 0,
+            'comments_failed': 0,
+            'already_ingested': 0,
+            'decode_replacements': 0,
+            'total_processed': 0,
+            'write_batches': [],
+            'errors': []
+        }
+
+    def _merge_stats(self, total: Dict[str, Any], chunk: Dict[str, Any]):
+        """Accumulate chunk statistics into the running totals."""
+        for key, value in chunk.items():
+            if isinstance(value, list):
+                total.setdefault(key, []).extend(value)
+            elif isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
+
     async def _log_ingestion(self, user_id: str, filename: str,
                            records_processed: int, success: bool,
                            error: str = None):
@@ -153,76 +276,166 @@ class IngestionService:
                 )
     
     async def _save_temp_file(self, file: UploadFile) -> str:
-        """Save uploaded file temporarily."""
+        """Spool an uploaded file to disk in fixed-size chunks."""
         # Create unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filename = f"{timestamp}_{Path(file.filename).name}"
         file_path = Path(settings.UPLOAD_DIR) / filename
         
         # Ensure directory exists
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        # Copy chunk by chunk, enforcing the size limit as we go
+        total_bytes = 0
+        try:
+            async with aiofiles.open(file_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total_bytes += len(chunk)
+                    if total_bytes > settings.MAX_UPLOAD_SIZE:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024):.1f}MB"
+                        )
+                    await f.write(chunk)
+        except Exception:
+            file_path.unlink(missing_ok=True)
+            raise
         
         return str(file_path)
     
-    async def _process_csv(self, file_path: str) -> List[Dict[str, Any]]:
-        """Process CSV file."""
+    def _detect_encoding(self, file_path: str) -> str:
+        """
+        Detect the text encoding of a file once, from a leading sample.
+
+        Bytes past the sample that do not decode are replaced with U+FFFD by
+        the readers instead of aborting a half-ingested file; comments holding
+        replacements are counted in the 'decode_replacements' statistic.
+        """
+        with open(file_path, 'rb') as f:
+            sample = f.read(settings.ENCODING_SAMPLE_SIZE)
+        
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        
+        for encoding in self.candidate_encodings:
+            try:
+                # Incremental decode tolerates a multi-byte character cut at the sample end
+                codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        
+        raise ValueError("Could not read file with any supported encoding")
+    
+    async def _iterate_in_thread(self, iterator: Iterator[pd.DataFrame]) -> AsyncIterator[pd.DataFrame]:
+        """Drive a blocking chunk iterator from a worker thread, one chunk at a time."""
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    
+    async def _process_csv(self, file_path: str) -> AsyncIterator[pd.DataFrame]:
+        """Process CSV file in chunks of INGESTION_CHUNK_ROWS rows."""
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
-            df = None
-            
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(file_path, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if df is None:
-                raise ValueError("Could not read CSV file with any supported encoding")
-            
-            return self._dataframe_to_records(df)
-            
+            encoding = self._detect_encoding(file_path)
+            reader = pd.read_csv(
+                file_path, encoding=encoding, encoding_errors='replace', chunksize=self.chunk_rows
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error processing CSV file: {str(e)}"
             )
-    
-    async def _process_excel(self, file_path: str) -> List[Dict[str, Any]]:
-        """Process Excel file."""
+        
+        def record_chunks() -> Iterator[pd.DataFrame]:
+            row_offset = 0
+            with reader:
+                for df in reader:
+                    yield self._prepare_frame(df, row_offset)
+                    row_offset += len(df)
+        
         try:
-            # Read Excel file (first sheet by default)
-            df = pd.read_excel(file_path, engine='openpyxl')
-            return self._dataframe_to_records(df)
+            async for records in self._iterate_in_thread(record_chunks()):
+                yield records
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Error processing CSV file: {str(e)}"
+            )
+    
+    async def _process_excel(self, file_path: str) -> AsyncIterator[pd.DataFrame]:
+        """Process Excel file (first sheet) in chunks using read-only iteration."""
+        def record_chunks() -> Iterator[pd.DataFrame]:
+            if Path(file_path).suffix.lower() == '.xls':
+                # Legacy .xls has no streaming reader; chunk the loaded frame instead
+                df = pd.read_excel(file_path)
+                for start in range(0, len(df), self.chunk_rows):
+                    yield self._prepare_frame(df.iloc[start:start + self.chunk_rows].copy(), start)
+                return
             
+            from openpyxl import load_workbook
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    return
+                columns = self._normalize_columns(header)
+                
+                records = []
+                row_numbers = []
+                row_number = 1
+                for row in rows:
+                    row_number += 1
+                    if row is None or all(value is None for value in row):
+                        continue
+                    records.append(row)
+                    row_numbers.append(row_number)
+                    if len(records) >= self.chunk_rows:
+                        yield self._rows_to_frame(records, columns, row_numbers)
+                        records, row_numbers = [], []
+                if records:
+                    yield self._rows_to_frame(records, columns, row_numbers)
+            finally:
+                workbook.close()
+        
+        try:
+            async for records in self._iterate_in_thread(record_chunks()):
+                yield records
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error processing Excel file: {str(e)}"
             )
     
-    async def _process_text(self, file_path: str) -> List[Dict[str, Any]]:
-        """Process plain text file."""
+    async def _process_text(self, file_path: str) -> AsyncIterator[pd.DataFrame]:
+        """Process plain text file line by line, each line as a comment."""
         try:
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
+            encoding = self._detect_encoding(file_path)
+            lines = []
+            row_number = 0
             
-            # Split into lines/paragraphs and treat each as a comment
-            lines = [line.strip() for line in content.split('\n') if line.strip()]
+            async with aiofiles.open(file_path, 'r', encoding=encoding, errors='replace') as f:
+                async for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines.append(line)
+                    if len(lines) >= self.chunk_rows:
+                        yield self._lines_to_frame(lines, row_number)
+                        row_number += len(lines)
+                        lines = []
             
-            return [
-                {
-                    'comment': line,
-                    'row_number': i + 1
-                }
-                for i, line in enumerate(lines)
-            ]
+            if lines:
+                yield self._lines_to_frame(lines, row_number)
             
         except Exception as e:
             raise HTTPException(
@@ -230,8 +443,8 @@ class IngestionService:
                 detail=f"Error processing text file: {str(e)}"
             )
     
-    async def _process_json(self, file_path: str) -> List[Dict[str, Any]]:
-        """Process JSON file."""
+    async def _process_json(self, file_path: str) -> AsyncIterator[pd.DataFrame]:
+        """Process JSON file, yielding its records in chunks."""
         try:
             async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
                 content = await f.read()
@@ -239,15 +452,18 @@ class IngestionService:
             
             # If it's a list of objects, return as is
             if isinstance(data, list):
-                return data
+                records = data
             # If it's a single object with a list inside, extract it
             elif isinstance(data, dict):
+                records = None
                 # Look for common list keys
                 for key in ['comments', 'data', 'records', 'responses']:
                     if key in data and isinstance(data[key], list):
-                        return data[key]
+                        records = data[key]
+                        break
                 # If no list found, wrap the object in a list
-                return [data]
+                if records is None:
+                    records = [data]
             else:
                 raise ValueError("JSON must contain a list of objects or an object with a list")
                 
@@ -256,205 +472,377 @@ class IngestionService:
                 status_code=400,
                 detail=f"Error processing JSON file: {str(e)}"
             )
-    
-    def _dataframe_to_records(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Convert pandas DataFrame to list of records."""
-        # Normalize column names
-        df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
         
-        # Convert to records
-        records = df.to_dict('records')
-        
-        # Add row numbers
-        for i, record in enumerate(records):
-            record['row_number'] = i + 2  # +2 because Excel/CSV rows start at 1 and we skip header
-        
-        return records
+        for start in range(0, len(records), self.chunk_rows):
+            df = pd.DataFrame.from_records(records[start:start + self.chunk_rows])
+            if 'row_number' not in df.columns:
+                # Position in the file identifies the record for idempotent upserts
+                df['row_number'] = range(start + 1, start + len(df) + 1)
+            yield df
     
-    async def _process_comments(self, raw_data: List[Dict[str, Any]],
+    def _normalize_columns(self, columns) -> List[str]:
+        """Normalize column names for flexible field mapping."""
+        return [str(col).strip().lower().replace(' ', '_') for col in columns]
+    
+    def _prepare_frame(self, df: pd.DataFrame, row_offset: int = 0) -> pd.DataFrame:
+        """Normalize a DataFrame chunk's columns and attach source row numbers."""
+        df.columns = self._normalize_columns(df.columns)
+        # Later columns win when normalization makes names collide
+        df = df.loc[:, ~df.columns.duplicated(keep='last')]
+        # +2 because Excel/CSV rows start at 1 and we skip header
+        return df.assign(row_number=np.arange(row_offset + 2, row_offset + 2 + len(df)))
+
+    def _rows_to_frame(self, rows: List[tuple], columns: List[str],
+                       row_numbers: List[int]) -> pd.DataFrame:
+        """Build a DataFrame chunk from worksheet rows."""
+        width = len(columns)
+        # object dtype keeps cell values as openpyxl returned them (ints stay ints)
+        df = pd.DataFrame(
+            [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows],
+            columns=range(width),
+            dtype=object
+        )
+        df.columns = columns
+        df = df.loc[:, ~df.columns.duplicated(keep='last')]
+        return df.assign(row_number=row_numbers)
+
+    def _lines_to_frame(self, lines: List[str], row_offset: int) -> pd.DataFrame:
+        """Build a DataFrame chunk from text lines, one comment per line."""
+        return pd.DataFrame({
+            'comment': lines,
+            'row_number': np.arange(row_offset + 1, row_offset + 1 + len(lines))
+        })
+    
+    async def _process_comments(self, raw_data: Union[pd.DataFrame, List[Dict[str, Any]]],
                               source_file: str, user_id: str,
-                              consultation_id: str = None) -> Dict[str, Any]:
+                              consultation_id: str = None,
+                              dedup_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Process raw comment data and save to database.
+        Process a chunk of raw comment data and save to database.
+
+        Extraction and validation run column-wise on the chunk; comment
+        dictionaries are only built for rows that pass validation.
         
         Args:
-            raw_data: List of raw comment records
+            raw_data: DataFrame chunk (or list of raw records)
             source_file: Original filename
             user_id: ID of user who uploaded the file
             consultation_id: Optional consultation process ID
+            dedup_state: Optional state shared across chunks of one file
             
         Returns:
             dict: Processing statistics
         """
-        stats = {
-            'total_records': len(raw_data),
-            'valid_comments': 0,
-            'invalid_comments': 0,
-            'duplicates_found': 0,
-            'comments_saved': 0,
-            'total_processed': 0,
-            'errors': []
-        }
-        
+        df = raw_data if isinstance(raw_data, pd.DataFrame) else pd.DataFrame.from_records(raw_data)
+        df = df.reset_index(drop=True)
+
+        stats = self._empty_stats()
+        stats['total_records'] = len(df)
+
+        texts = self._extract_column(df, 'comment')
+        missing = texts.isna()
+        valid = ~missing & self.validator.valid_mask(texts.fillna(''))
+        invalid = ~missing & ~valid
+
+        stats['valid_comments'] = int(valid.sum())
+        stats['invalid_comments'] = int(missing.sum() + invalid.sum())
+
+        # Row-level errors from masks, in row order
+        if stats['invalid_comments']:
+            rows = df['row_number'] if 'row_number' in df.columns else pd.Series(None, index=df.index, dtype=object)
+            rows = rows.astype(object).where(rows.notna(), '?').astype(str)
+            messages = pd.Series(None, index=df.index, dtype=object)
+            messages[missing] = 'No comment text found'
+            messages[invalid] = 'Invalid comment format'
+            errors = 'Row ' + rows + ': ' + messages
+            stats['errors'].extend(errors[messages.notna()].tolist())
+
         processed_comments = []
-        
-        for record in raw_data:
-            try:
-                # Extract comment text
-                comment_text = self._extract_comment_text(record)
-                
-                if not comment_text:
-                    stats['invalid_comments'] += 1
-                    stats['errors'].append(f"Row {record.get('row_number', '?')}: No comment text found")
-                    continue
-                
-                # Validate comment
-                if not self.validator.is_valid_comment(comment_text):
-                    stats['invalid_comments'] += 1
-                    stats['errors'].append(f"Row {record.get('row_number', '?')}: Invalid comment format")
-                    continue
-                
-                stats['valid_comments'] += 1
+        if stats['valid_comments']:
+            rows = df.loc[valid]
+            texts = texts[valid]
+            stats['decode_replacements'] = int(texts.str.contains('\ufffd', regex=False).sum())
+            pii = self.validator.pii_scanner.scan_series(texts)
+            consultations = (
+                pd.Series(consultation_id, index=rows.index, dtype=object)
+                if consultation_id else self._extract_column(rows, 'consultation_id')
+            )
+            columns = {
+                'text': texts,
+                'source_row': rows['row_number'] if 'row_number' in rows.columns else None,
+                'comment_id_external': self._extract_column(rows, 'id'),
+                'law_section': self._extract_column(rows, 'law_section'),
+                'consultation_id': consultations,
+                'stakeholder_type': self._extract_column(rows, 'stakeholder_type'),
+                'stakeholder_category': self._extract_column(rows, 'stakeholder_category'),
+                'location': self._extract_column(rows, 'location'),
+                'submitted_at': self._parse_datetime_column(self._extract_column(rows, 'submitted_at')),
+                'word_count': texts.str.count(r'\S+'),
+                'character_count': texts.str.len(),
+                'has_pii': pii['has_pii'],
+                'pii_types': pii['pii_types']
+            }
+            values = {name: self._column_values(column, len(rows)) for name, column in columns.items()}
 
-                # Create comment dictionary for MongoDB (matching schema validation)
-                comment_dict = {
+            now = datetime.utcnow()
+            for row in zip(*values.values()):
+                comment = dict(zip(values.keys(), row))
+                comment_text = comment['text']
+
+                # Comment dictionary for MongoDB (matching schema validation)
+                processed_comments.append({
                     'text': comment_text,
                     'original_text': comment_text,  # Keep both for compatibility
                     'source_file': source_file,
-                    'source_row': record.get('row_number'),
-                    'comment_id_external': self._extract_field(record, 'id'),
-                    'law_section': self._extract_field(record, 'law_section'),
-                    'consultation_id': consultation_id or self._extract_field(record, 'consultation_id'),
-                    'stakeholder_type': self._extract_field(record, 'stakeholder_type'),
-                    'stakeholder_category': self._extract_field(record, 'stakeholder_category'),
-                    'location': self._extract_field(record, 'location'),
-                    'submitted_at': self._parse_datetime(self._extract_field(record, 'submitted_at')),
+                    'source_row': comment['source_row'],
+                    'content_hash': hashlib.sha256(comment_text.encode()).hexdigest(),
+                    'comment_id_external': comment['comment_id_external'],
+                    'law_section': comment['law_section'],
+                    'consultation_id': comment['consultation_id'],
+                    'stakeholder_type': comment['stakeholder_type'],
+                    'stakeholder_category': comment['stakeholder_category'],
+                    'location': comment['location'],
+                    'submitted_at': comment['submitted_at'],
                     'uploaded_by': user_id,
-                    'word_count': len(comment_text.split()),
-                    'character_count': len(comment_text),
+                    'word_count': comment['word_count'],
+                    'character_count': comment['character_count'],
+                    'has_pii': comment['has_pii'],
+                    'pii_types': comment['pii_types'],
                     'sentiment': {'label': 'neutral', 'score': 0.0},  # Default sentiment
-                    'created_at': datetime.utcnow(),
-                    'updated_at': datetime.utcnow()
-                }
-
-                processed_comments.append(comment_dict)
-                
-            except Exception as e:
-                stats['invalid_comments'] += 1
-                stats['errors'].append(f"Row {record.get('row_number', '?')}: {str(e)}")
+                    'created_at': now,
+                    'updated_at': now
+                })
         
-        # Detect duplicates using text-based comparison
-        duplicate_pairs = self._find_duplicates_by_text(processed_comments)
+        # Rows already stored by an earlier import of this file keep their
+        # duplicate and cluster assignments; only new rows are deduplicated
+        existing = await self._find_existing_comments(processed_comments, stats)
+        for index, stored in existing.items():
+            for field in ('is_duplicate', 'duplicate_of', 'campaign_cluster_id'):
+                if field in stored:
+                    processed_comments[index][field] = stored[field]
+        stats['already_ingested'] = len(existing)
+        new_comments = [comment for index, comment in enumerate(processed_comments) if index not in existing]
 
-        # Mark duplicates
-        for original_idx, duplicate_idx in duplicate_pairs:
-            processed_comments[duplicate_idx]['is_duplicate'] = True
-            processed_comments[duplicate_idx]['duplicate_of'] = str(original_idx)
-            stats['duplicates_found'] += 1
+        # Group the chunk into campaign clusters; every member other than the
+        # representative is a duplicate of it
+        clusters = self.campaign_clusterer.cluster([comment['original_text'] for comment in new_comments])
+        seen_hashes = dedup_state['seen_hashes'] if dedup_state is not None else {}
 
-        # Save comments to database
-        if processed_comments:
-            try:
-                result = await self.db.comments.insert_many(processed_comments)
-                stats['comments_saved'] = len(result.inserted_ids)
-            except Exception as e:
-                stats['errors'].append(f"Database error: {str(e)}")
+        for cluster in clusters:
+            representative = new_comments[cluster.representative_index]
+            text_hash = representative['content_hash']
+            seen = seen_hashes.get(text_hash)
+            if seen is not None:
+                # Exact duplicate of a comment from an earlier chunk of the same file
+                source_row, cluster_id = seen
+                representative['is_duplicate'] = True
+                representative['duplicate_of'] = str(source_row)
+                stats['duplicates_found'] += 1
+            else:
+                cluster_id = cluster.cluster_id
 
-        stats['total_processed'] = len(processed_comments)
+            for index in cluster.member_indexes:
+                comment = new_comments[index]
+                comment['campaign_cluster_id'] = cluster_id
+                if index != cluster.representative_index:
+                    comment['is_duplicate'] = True
+                    comment['duplicate_of'] = str(representative['source_row'])
+                    stats['duplicates_found'] += 1
 
-        return stats
+        # Check remaining comments against those stored by earlier uploads
+        await self._mark_stored_duplicates(new_comments, clusters, stats)
 
-    def _find_duplicates_by_text(self, comments: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
-        """Find duplicate comments using text-based comparison."""
-        duplicates = []
+        # Remember each template under its final cluster ID, which the stored
+        # duplicate pass may have replaced, so copies in later chunks join it
+        for cluster in clusters:
+            representative = new_comments[cluster.representative_index]
+            seen_hashes.setdefault(
+                representative['content_hash'],
+                (representative['source_row'], representative['campaign_cluster_id'])
+            )
 
-        # First pass: exact matches using hash
-        hash_to_index = {}
+        # Upsert comments in unordered batches
+        if processed_comments:
+            write_result = await self.comment_writer.write(processed_comments)
+            stats['comments_inserted'] = write_result['inserted']
+            stats['comments_updated'] = write_result['updated']
+            stats['comments_failed'] = write_result['failed']
+            stats['comments_saved'] = write_result['inserted'] + write_result['updated']
+            stats['write_batches'] = write_result['batches']
+            stats['errors'].extend(write_result['errors'])
 
-        for i, comment in enumerate(comments):
-            text = comment['original_text']
-            text_hash = hashlib.md5(text.encode()).hexdigest()
+            # Index and count only the comments this write actually created
+            inserted = [
+                (processed_comments[index], comment_id)
+                for index, comment_id in sorted(write_result['upserted_ids'].items())
+            ]
+            if inserted:
+                await self._register_signatures(
+                    [comment for comment, _ in inserted], [comment_id for _, comment_id in inserted], stats
+                )
+                await self._update_campaign_clusters([comment for comment, _ in inserted], stats)
 
-            if text_hash in hash_to_index:
-                duplicates.append((hash_to_index[text_hash], i))
-            else:
-                hash_to_index[text_hash] = i
+        stats['total_processed'] = len(processed_comments)
 
-        # Second pass: near-duplicates using similarity
-        processed = set()
-        similarity_threshold = 0.85
+        return stats
 
-        for i, comment1 in enumerate(comments):
-            if i in processed:
-                continue
+    async def _find_existing_comments(self, comments: List[Dict[str, Any]],
+                                      stats: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """Find comments already stored under the same consultation, content hash and source position."""
+        keys = {
+            (comment['consultation_id'], comment['content_hash'], comment['source_file'], comment['source_row']): index
+            for index, comment in enumerate(comments)
+        }
+        if not keys:
+            return {}
 
-            text1 = comment1['original_text']
+        existing = {}
+        try:
+            async for stored in self.db.comments.find(
+                {
+                    'source_file': comments[0]['source_file'],
+                    'consultation_id': {'$in': list({key[0] for key in keys})},
+                    'content_hash': {'$in': list({key[1] for key in keys})}
+                },
+                {'consultation_id': 1, 'content_hash': 1, 'source_file': 1, 'source_row': 1,
+                 'is_duplicate': 1, 'duplicate_of': 1, 'campaign_cluster_id': 1}
+            ):
+                index = keys.get((
+                    stored.get('consultation_id'), stored.get('content_hash'),
+                    stored.get('source_file'), stored.get('source_row')
+                ))
+                if index is not None:
+                    existing[index] = stored
+        except Exception as e:
+            stats['errors'].append(f"Existing comment lookup failed: {str(e)}")
 
-            for j, comment2 in enumerate(comments[i+1:], i+1):
-                if j in processed:
-                    continue
+        return existing
 
-                text2 = comment2['original_text']
+    async def _mark_stored_duplicates(self, comments: List[Dict[str, Any]],
+                                      clusters: List[CampaignCluster], stats: Dict[str, Any]):
+        """Attach clusters to comments already stored for the same consultation."""
+        by_consultation: Dict[Any, List[CampaignCluster]] = {}
+        for cluster in clusters:
+            representative = comments[cluster.representative_index]
+            if not representative.get('is_duplicate'):
+                by_consultation.setdefault(representative.get('consultation_id'), []).append(cluster)
 
-                if self._are_texts_similar(text1, text2, similarity_threshold):
-                    duplicates.append((i, j))
-                    processed.add(j)
+        for consultation_id, pending in by_consultation.items():
+            try:
+                matches = await self.signature_index.find_matches(
+                    consultation_id, [comments[c.representative_index]['original_text'] for c in pending]
+                )
+                stored_clusters = {}
+                if matches:
+                    async for stored in self.db.comments.find(
+                        {'_id': {'$in': list(set(matches.values()))}}, {'campaign_cluster_id': 1}
+                    ):
+                        stored_clusters[stored['_id']] = stored.get('campaign_cluster_id')
+            except Exception as e:
+                stats['errors'].append(f"Duplicate index lookup failed: {str(e)}")
+                continue
 
-        return duplicates
+            for offset, stored_id in matches.items():
+                cluster = pending[offset]
+                representative = comments[cluster.representative_index]
+                representative['is_duplicate'] = True
+                representative['duplicate_of'] = str(stored_id)
+                stats['duplicates_found'] += 1
 
-    def _are_texts_similar(self, text1: str, text2: str, threshold: float) -> bool:
-        """Check if two texts are similar using sequence matching."""
-        from difflib import SequenceMatcher
+                # Comments stored before clustering existed get a cluster named after them
+                cluster_id = stored_clusters.get(stored_id)
+                if not cluster_id:
+                    cluster_id = str(stored_id)
+                    await self.db.comments.update_one(
+                        {'_id': stored_id}, {'$set': {'campaign_cluster_id': cluster_id}}
+                    )
+                    await self.db.campaign_clusters.update_one(
+                        {'_id': cluster_id},
+                        {'$setOnInsert': {
+                            'consultation_id': consultation_id,
+                            'representative_text': representative['original_text'],
+                            'created_at': datetime.utcnow()
+                        }, '$inc': {'member_count': 1}},
+                        upsert=True
+                    )
+                for index in cluster.member_indexes:
+                    comments[index]['campaign_cluster_id'] = cluster_id
 
-        # Normalize texts
-        norm1 = self._normalize_text(text1)
-        norm2 = self._normalize_text(text2)
+    async def _update_campaign_clusters(self, comments: List[Dict[str, Any]], stats: Dict[str, Any]):
+        """Upsert campaign cluster records with representative text and member counts."""
+        members: Dict[str, Dict[str, Any]] = {}
+        for comment in comments:
+            cluster = members.setdefault(comment['campaign_cluster_id'], {
+                'consultation_id': comment.get('consultation_id'),
+                'representative_text': comment['original_text'],
+                'count': 0
+            })
+            cluster['count'] += 1
 
-        # Skip if texts are too different in length
-        len_ratio = min(len(norm1), len(norm2)) / max(len(norm1), len(norm2))
-        if len_ratio < 0.5:
-            return False
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': cluster_id},
+                {
+                    '$setOnInsert': {
+                        'consultation_id': data['consultation_id'],
+                        'representative_text': data['representative_text'],
+                        'created_at': now
+                    },
+                    '$inc': {'member_count': data['count']},
+                    '$set': {'updated_at': now}
+                },
+                upsert=True
+            )
+            for cluster_id, data in members.items()
+        ]
 
-        # Calculate similarity
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity >= threshold
+        if operations:
+            try:
+                await self.db.campaign_clusters.bulk_write(operations, ordered=False)
+            except Exception as e:
+                stats['errors'].append(f"Campaign cluster update failed: {str(e)}")
 
-    def _normalize_text(self, text: str) -> str:
-        """Normalize text for comparison."""
-        # Convert to lowercase
-        text = text.lower()
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
-        return text
-    
-    def _extract_comment_text(self, record: Dict[str, Any]) -> Optional[str]:
-        """Extract comment text from record using flexible column mapping."""
-        for possible_key in self.column_mappings['comment']:
-            if possible_key in record and record[possible_key]:
-                text = str(record[possible_key]).strip()
-                if text and text.lower() != 'nan':
-                    return text
-        return None
+    async def _register_signatures(self, comments: List[Dict[str, Any]],
+                                   inserted_ids: List[Any], stats: Dict[str, Any]):
+        """Add newly stored, non-duplicate comments to the persistent signature index."""
+        by_consultation: Dict[Any, Tuple[List[Any], List[str]]] = {}
+        for comment, comment_id in zip(comments, inserted_ids):
+            if comment.get('is_duplicate'):
+                continue
+            ids, texts = by_consultation.setdefault(comment.get('consultation_id'), ([], []))
+            ids.append(comment_id)
+            texts.append(comment['original_text'])
+
+        for consultation_id, (ids, texts) in by_consultation.items():
+            try:
+                await self.signature_index.register(consultation_id, ids, texts)
+            except Exception as e:
+                stats['errors'].append(f"Duplicate index update failed: {str(e)}")
     
-    def _extract_field(self, record: Dict[str, Any], field_type: str) -> Optional[str]:
-        """Extract a specific field from record using flexible column mapping."""
+    def _extract_column(self, df: pd.DataFrame, field_type: str) -> pd.Series:
+        """
+        Resolve a field from the chunk's columns using flexible column mapping.
+
+        Candidate columns are checked in mapping order; the first truthy,
+        non-blank, non-'nan' value per row wins. Missing values are NaN.
+        """
         possible_keys = self.column_mappings.get(field_type, [field_type])
-        
+        result = pd.Series(np.nan, index=df.index, dtype=object)
+
         for key in possible_keys:
-            if key in record and record[key]:
-                value = str(record[key]).strip()
-                if value and value.lower() != 'nan':
-                    return value
-        return None
-    
-    def _parse_datetime(self, date_str: Optional[str]) -> Optional[datetime]:
-        """Parse datetime string with multiple format support."""
-        if not date_str:
-            return None
-        
-        # Common datetime formats
+            if key not in df.columns:
+                continue
+            column = df[key]
+            values = column.astype(str).str.strip()
+            usable = column.notna() & column.astype(bool) & values.ne('') & values.str.lower().ne('nan')
+            result = result.where(result.notna(), values.where(usable))
+
+        return result
+
+    def _parse_datetime_column(self, values: pd.Series) -> pd.Series:
+        """Parse datetime strings column-wise with multiple format support."""
+        # Common datetime formats, tried in order
         formats = [
             '%Y-%m-%d %H:%M:%S',
             '%Y-%m-%d',
@@ -465,14 +853,25 @@ class IngestionService:
             '%d-%m-%Y %H:%M:%S',
             '%d-%m-%Y'
         ]
-        
+
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        pending = values.notna()
         for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        return None
+            if not pending.any():
+                break
+            attempt = pd.to_datetime(values[pending], format=fmt, errors='coerce')
+            parsed[attempt.index] = parsed[attempt.index].fillna(attempt)
+            pending &= parsed.isna()
+
+        return parsed
+
+    def _column_values(self, column: Optional[pd.Series], length: int) -> List[Any]:
+        """Convert a column to Python values, with None for missing entries."""
+        if column is None:
+            return [None] * length
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return [value.to_pydatetime() if not pd.isna(value) else None for value in column]
+        return column.astype(object).where(column.notna(), None).tolist()
     
     async def get_ingestion_stats(self, user_id: str = None) -> Dict[str, Any]:
         """Get ingestion statistics."""
@@ -505,15 +904,24 @@ class IngestionService:
         }
     
     async def bulk_process_directory(self, directory_path: str, user_id: str,
-                                   consultation_id: str = None) -> Dict[str, Any]:
+                                   consultation_id: str = None,
+                                   max_workers: Optional[int] = None,
+                                   force: bool = False,
+                                   run_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Process all supported files in a directory.
-        
+        Process all supported files in a directory with bounded concurrency.
+
+        Files are streamed straight from disk. A manifest of file hashes and
+        modification times lets re-runs skip files that have not changed.
+
         Args:
             directory_path: Path to directory containing files
-            user: User performing the bulk processing
+            user_id: User performing the bulk processing
             consultation_id: Optional consultation process ID
-            
+            max_workers: Files processed concurrently (default DIRECTORY_INGESTION_WORKERS)
+            force: Re-ingest files even if the manifest marks them unchanged
+            run_id: Optional ID under which per-file progress is published
+
         Returns:
             dict: Bulk processing results
         """
@@ -525,54 +933,153 @@ class IngestionService:
                 detail="Directory does not exist"
             )
         
+        # Single directory scan for all supported extensions
+        supported_files = sorted(
+            path for path in directory.iterdir()
+            if path.is_file() and path.suffix.lower() in self.supported_extensions
+        )
+
+        run_id = run_id or uuid.uuid4().hex
+        progress = {
+            'run_id': run_id,
+            'directory': str(directory),
+            'status': 'running',
+            'started_at': datetime.utcnow().isoformat(),
+            'completed_at': None,
+            'files': {
+                path.name: {'status': 'pending', 'chunks_processed': 0, 'comments_saved': 0}
+                for path in supported_files
+            }
+        }
+        _track_directory_run(run_id, progress)
+        
         results = {
-            'total_files': 0,
+            'run_id': run_id,
+            'total_files': len(supported_files),
             'processed_files': 0,
+            'skipped_files': 0,
             'failed_files': 0,
             'total_comments': 0,
             'file_results': [],
             'errors': []
         }
-        
-        # Get all supported files
-        supported_files = []
-        for ext in self.supported_extensions.keys():
-            supported_files.extend(directory.glob(f"*{ext}"))
-        
-        results['total_files'] = len(supported_files)
-        
-        for file_path in supported_files:
-            try:
-                # Create a mock UploadFile
-                class MockUploadFile:
-                    def __init__(self, path: Path):
-                        self.filename = path.name
-                        self.file = open(path, 'rb')
-                    
-                    async def read(self):
-                        content = self.file.read()
-                        self.file.close()
-                        return content
-                
-                mock_file = MockUploadFile(file_path)
-                file_result = await self.process_upload(mock_file, user_id, consultation_id)
-                
+
+        semaphore = asyncio.Semaphore(max(1, max_workers or settings.DIRECTORY_INGESTION_WORKERS))
+
+        async def worker(path: Path) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._ingest_directory_file(
+                    path, user_id, consultation_id, force, progress['files'][path.name]
+                )
+
+        try:
+            file_results = await asyncio.gather(*(worker(path) for path in supported_files))
+        except Exception:
+            progress['status'] = 'failed'
+            progress['completed_at'] = datetime.utcnow().isoformat()
+            raise
+
+        for file_result in file_results:
+            results['file_results'].append(file_result)
+            if not file_result['success']:
+                results['failed_files'] += 1
+                results['errors'].append(f"{file_result['filename']}: {file_result['error']}")
+            elif file_result.get('skipped'):
+                results['skipped_files'] += 1
+            else:
                 results['processed_files'] += 1
                 results['total_comments'] += file_result['comments_saved']
-                results['file_results'].append({
-                    'filename': file_path.name,
-                    'success': True,
-                    'comments_saved': file_result['comments_saved'],
-                    'total_processed': file_result['total_processed']
-                })
-                
-            except Exception as e:
-                results['failed_files'] += 1
-                results['errors'].append(f"{file_path.name}: {str(e)}")
-                results['file_results'].append({
-                    'filename': file_path.name,
-                    'success': False,
-                    'error': str(e)
-                })
+
+        progress['status'] = 'completed'
+        progress['completed_at'] = datetime.utcnow().isoformat()
         
-        return results
\ No newline at end of file
+        return results
+
+    async def _ingest_directory_file(self, path: Path, user_id: str,
+                                     consultation_id: Optional[str], force: bool,
+                                     file_progress: Dict[str, Any]) -> Dict[str, Any]:
+        """Ingest one file of a directory run unless the manifest shows it unchanged."""
+        manifest_key = {'path': str(path.resolve()), 'consultation_id': consultation_id}
+
+        try:
+            file_progress['status'] = 'checking'
+            file_stat = path.stat()
+            entry = await self.db.ingestion_manifest.find_one(manifest_key)
+
+            # Cheap mtime/size check first; hash only when they differ
+            file_hash = None
+            if entry and entry.get('status') == 'completed' and not force:
+                unchanged = entry.get('mtime') == file_stat.st_mtime and entry.get('size') == file_stat.st_size
+                if not unchanged:
+                    file_hash = await asyncio.to_thread(self._hash_file, str(path))
+                    unchanged = file_hash == entry.get('file_hash')
+                    if unchanged:
+                        await self.db.ingestion_manifest.update_one(
+                            manifest_key, {'$set': {'mtime': file_stat.st_mtime, 'size': file_stat.st_size}}
+                        )
+                if unchanged:
+                    file_progress['status'] = 'skipped'
+                    return {'filename': path.name, 'success': True, 'skipped': True, 'comments_saved': 0}
+
+            if file_hash is None:
+                file_hash = await asyncio.to_thread(self._hash_file, str(path))
+
+            file_progress['status'] = 'processing'
+            processor = self.supported_extensions[path.suffix.lower()]
+            file_result = await self._ingest_file(
+                str(path), processor, path.name, user_id, consultation_id, progress=file_progress
+            )
+
+            await self._log_ingestion(
+                user_id=user_id,
+                filename=path.name,
+                records_processed=file_result['total_processed'],
+                success=True
+            )
+            await self.db.ingestion_manifest.update_one(
+                manifest_key,
+                {'$set': {
+                    'file_hash': file_hash,
+                    'mtime': file_stat.st_mtime,
+                    'size': file_stat.st_size,
+                    'status': 'completed',
+                    'comments_saved': file_result['comments_saved'],
+                    'total_processed': file_result['total_processed'],
+                    'processed_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+
+            file_progress['status'] = 'completed'
+            file_progress['comments_saved'] = file_result['comments_saved']
+            return {
+                'filename': path.name,
+                'success': True,
+                'skipped': False,
+                'comments_saved': file_result['comments_saved'],
+                'total_processed': file_result['total_processed']
+            }
+
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            file_progress['status'] = 'failed'
+            file_progress['error'] = error
+            try:
+                await self._log_ingestion(
+                    user_id=user_id,
+                    filename=path.name,
+                    records_processed=0,
+                    success=False,
+                    error=error
+                )
+            except Exception:
+                pass
+            return {'filename': path.name, 'success': False, 'error': error}
+
+    def _hash_file(self, file_path: str) -> str:
+        """SHA-256 of a file, read in UPLOAD_CHUNK_SIZE blocks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,285 @@
+"""
+Server-side legislation sessions.
+A bill's structure is uploaded once; its keyword table and vector index are
+built when the session is created, comments are mapped to provisions as
+they arrive and the mapping table is kept with the session. Provision,
+cross-provision and coverage queries then read the stored mappings instead
+of re-sending and re-mapping everything. Sessions live in the memory of the
+API process that created them and hold at most LEGISLATION_SESSION_MAX_COMMENTS
+comments each.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.app.core.config import settings
+from backend.app.services.legislative_context_service import (
+    LegislativeContextResult,
+    LegislativeContextService,
+    LegislativeProvision,
+    ProvisionAnalysis,
+    ProvisionMapping,
+    ProvisionType
+)
+
+
+class LegislationSession:
+    """One bill structure plus every comment mapped against it so far."""
+
+    def __init__(self, service: LegislativeContextService, user_id: Any,
+                 provisions: List[LegislativeProvision], title: Optional[str] = None,
+                 legislation_type: Optional[str] = None, max_comments: Optional[int] = None):
+        self.session_id = uuid.uuid4().hex
+        self.service = service
+        self.user_id = user_id
+        self.title = title or "Draft Legislation"
+        self.legislation_type = legislation_type or "bill"
+        self.provisions = list(provisions)
+        self.provisions_by_id: Dict[str, LegislativeProvision] = {}
+        for provision in self.provisions:
+            self.provisions_by_id.setdefault(provision.provision_id, provision)
+
+        self.keyword_table = service.get_keyword_table(self.provisions)
+        self.provision_index = None
+
+        # Mapping table: comments, their mappings and comment positions per provision
+        self.comments: List[str] = []
+        self.comment_mappings: List[List[ProvisionMapping]] = []
+        self.provision_comments: Dict[str, List[int]] = {}
+        self._analyses: Dict[str, ProvisionAnalysis] = {}
+        self.max_comments = max_comments if max_comments is not None else settings.LEGISLATION_SESSION_MAX_COMMENTS
+
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+        self.last_access = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def build_indexes(self):
+        """Build the provision vector index (spaCy work runs off the event loop)."""
+        self.provision_index = await asyncio.to_thread(self.service.get_provision_index, self.provisions)
+
+    async def add_comments(self, comments: List[str]) -> List[List[ProvisionMapping]]:
+        """
+        Map new comments and append them to the mapping table.
+
+        Only provisions that receive new comments lose their cached analysis.
+
+        Args:
+            comments: Comment texts to add
+
+        Returns:
+            list: Mappings of each added comment, in input order
+
+        Raises:
+            ValueError: If the session would exceed max_comments
+        """
+        async with self.lock:
+            if len(self.comments) + len(comments) > self.max_comments:
+                raise ValueError(
+                    f"Session holds {len(self.comments):,} comments; adding {len(comments):,} "
+                    f"would exceed the limit of {self.max_comments:,}"
+                )
+            comment_mappings = await self.service.map_comments(
+                comments, self.provisions, self.keyword_table, self.provision_index
+            )
+            for comment, mappings in zip(comments, comment_mappings):
+                position = len(self.comments)
+                self.comments.append(comment)
+                self.comment_mappings.append(mappings)
+                for mapping in mappings:
+                    self.provision_comments.setdefault(mapping.provision_id, []).append(position)
+                    self._analyses.pop(mapping.provision_id, None)
+            self.updated_at = datetime.utcnow()
+            return comment_mappings
+
+    @property
+    def mapping_count(self) -> int:
+        return sum(len(positions) for positions in self.provision_comments.values())
+
+    @property
+    def mapped_comment_count(self) -> int:
+        return sum(1 for mappings in self.comment_mappings if mappings)
+
+    def mappings(self, provision_id: Optional[str] = None) -> List[ProvisionMapping]:
+        """Stored mappings in comment order, optionally for one provision."""
+        return [
+            mapping
+            for mappings in self.comment_mappings
+            for mapping in mappings
+            if provision_id is None or mapping.provision_id == provision_id
+        ]
+
+    def comments_for(self, provision_id: str) -> List[str]:
+        """Comments mapped to a provision (once per mapping), in arrival order."""
+        return [self.comments[position] for position in self.provision_comments.get(provision_id, [])]
+
+    def provision(self, provision_id: str) -> LegislativeProvision:
+        """Provision from the structure, or a placeholder for references outside it."""
+        provision = self.provisions_by_id.get(provision_id)
+        if provision is None:
+            provision = LegislativeProvision(
+                provision_id=provision_id,
+                provision_type=ProvisionType.SECTION,
+                title=provision_id.replace('_', ' ').title(),
+                content=""
+            )
+        return provision
+
+    async def provision_analysis(self, provision_id: str) -> Optional[ProvisionAnalysis]:
+        """
+        Analysis of one provision's stored comments, cached until it gets new comments.
+
+        Returns:
+            ProvisionAnalysis or None if no comment is mapped to the provision
+        """
+        analysis = self._analyses.get(provision_id)
+        if analysis is not None:
+            return analysis
+
+        comments = self.comments_for(provision_id)
+        if not comments:
+            return None
+        analysis = await self.service._analyze_provision_comments(
+            provision_id, comments, [self.provision(provision_id)]
+        )
+        if len(self.provision_comments.get(provision_id, [])) == len(comments):
+            self._analyses[provision_id] = analysis
+        return analysis
+
+    async def analyze(self) -> LegislativeContextResult:
+        """Complete legislative context analysis over the stored mappings."""
+        stage_timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        provision_analyses = await self.provision_analyses(stage_timings)
+        result = self.service.build_context_result(
+            len(self.comments), self.mapping_count, provision_analyses, stage_timings
+        )
+        stage_timings["total"] = time.perf_counter() - started
+        return result
+
+    async def provision_analyses(self, stage_timings: Optional[Dict[str, float]] = None) -> List[ProvisionAnalysis]:
+        """
+        Analyses of every provision with mapped comments, in first-mapping order.
+
+        Provisions without a cached analysis are analyzed together, sharing
+        one sentiment pass and running concurrently.
+
+        Args:
+            stage_timings: Optional dict receiving the analysis stage timings
+        """
+        provision_ids = list(self.provision_comments)
+        analyses = {provision_id: self._analyses.get(provision_id) for provision_id in provision_ids}
+        stale = {
+            provision_id: self.comments_for(provision_id)
+            for provision_id, analysis in analyses.items()
+            if analysis is None
+        }
+        if stale:
+            for analysis in await self.service.analyze_provision_groups(stale, self.provisions, stage_timings):
+                provision_id = analysis.provision.provision_id
+                analyses[provision_id] = analysis
+                if len(self.provision_comments.get(provision_id, [])) == analysis.comment_count:
+                    self._analyses[provision_id] = analysis
+
+        return [analyses[provision_id] for provision_id in provision_ids]
+
+    def coverage(self) -> Dict[str, Any]:
+        """
+        Provision coverage computed from the mapping table.
+
+        Returns:
+            dict: Totals, per-provision comment counts, provisions without
+                feedback and references to provisions outside the structure
+        """
+        comment_counts = {
+            provision.provision_id: len(set(self.provision_comments.get(provision.provision_id, [])))
+            for provision in self.provisions
+        }
+        without_feedback = [provision_id for provision_id, count in comment_counts.items() if count == 0]
+        unknown_references = {
+            provision_id: len(set(positions))
+            for provision_id, positions in self.provision_comments.items()
+            if provision_id not in self.provisions_by_id
+        }
+        return {
+            "total_provisions": len(comment_counts),
+            "provisions_with_feedback": len(comment_counts) - len(without_feedback),
+            "provisions_without_feedback": len(without_feedback),
+            "uncovered_provision_ids": without_feedback,
+            "comments_per_provision": comment_counts,
+            "total_comments": len(self.comments),
+            "mapped_comments": self.mapped_comment_count,
+            "unmapped_comments": len(self.comments) - self.mapped_comment_count,
+            "references_outside_structure": unknown_references
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Session metadata and mapping totals."""
+        return {
+            "session_id": self.session_id,
+            "legislation_title": self.title,
+            "legislation_type": self.legislation_type,
+            "total_provisions": len(self.provisions),
+            "total_comments": len(self.comments),
+            "mapped_comments": self.mapped_comment_count,
+            "provisions_referenced": len(self.provision_comments),
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+class LegislationSessionStore:
+    """Bounded in-memory session registry with idle expiry (LRU beyond max_sessions)."""
+
+    def __init__(self, service: LegislativeContextService, max_sessions: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, max_comments: Optional[int] = None):
+        self.service = service
+        self.max_comments = max_comments
+        self.max_sessions = max_sessions if max_sessions is not None else settings.LEGISLATION_SESSION_MAX
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.LEGISLATION_SESSION_TTL_SECONDS
+        self._sessions: "OrderedDict[str, LegislationSession]" = OrderedDict()
+
+    async def create(self, user_id: Any, provisions: List[LegislativeProvision],
+                     title: Optional[str] = None, legislation_type: Optional[str] = None) -> LegislationSession:
+        """
+        Register a bill structure and build its indexes.
+
+        Args:
+            user_id: Owner of the session
+            provisions: Provisions of the legislation
+            title: Legislation title
+            legislation_type: "bill", "amendment", "regulation", etc.
+
+        Returns:
+            LegislationSession: The new session
+        """
+        session = LegislationSession(self.service, user_id, provisions, title, legislation_type, self.max_comments)
+        await session.build_indexes()
+
+        self._expire()
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, _ = self._sessions.popitem(last=False)
+            print(f"Evicted legislation session {evicted_id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[LegislationSession]:
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for session_id in [sid for sid, session in self._sessions.items() if session.last_access < cutoff]:
+            del self._sessions[session_id]
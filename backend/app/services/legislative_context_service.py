@@ -4,22 +4,31 @@ and providing context-aware analysis for draft legislation feedback.
 """
 
 import re
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+import functools
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 
-# NLP libraries
-try:
-    import spacy
-    _SPACY_AVAILABLE = True
-except Exception:
-    spacy = None
-    _SPACY_AVAILABLE = False
+import numpy as np
 
-from backend.app.services.sentiment_service import SentimentAnalyzer
-from backend.app.services.summarization_service import SummarizationService
+from backend.app.core.config import settings
+from backend.app.services.spacy_service import SpacyService, get_spacy_service
+
+if TYPE_CHECKING:
+    from backend.app.services.sentiment_service import SentimentAnalyzer
+    from backend.app.services.summarization_service import SummarizationService
+
+# Minimum cosine similarity for a semantic provision mapping
+SEMANTIC_SIMILARITY_THRESHOLD = 0.3
+# Comments vectorized per block when mapping semantically
+SEMANTIC_MAPPING_BLOCK_SIZE = 1000
 
 class ProvisionType(str, Enum):
     SECTION = "section"
@@ -73,14 +82,142 @@ class LegislativeContextResult:
     cross_provision_themes: List[str]
     legislative_recommendations: List[str]
     implementation_considerations: List[str]
+    stage_timings: Dict[str, float] = field(default_factory=dict)  # seconds per analysis stage
+
+class ProvisionIndex:
+    """
+    Unit-length provision vectors of one legislation structure.
+
+    Cosine similarities of any number of comments against every provision
+    are a single matrix product; provisions or comments without a vector
+    get a zero row and never match.
+    """
+
+    def __init__(self, provisions: List[LegislativeProvision], vectors: np.ndarray):
+        self.provisions = list(provisions)
+        self.matrix = normalize_rows(vectors)
+
+    def top_k(self, vectors: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best matching provisions for each comment vector.
+
+        Args:
+            vectors: Comment vectors, one row per comment
+            k: Number of provisions to return per comment
+
+        Returns:
+            tuple: (indices, scores), both (comments, k) arrays sorted by
+                descending similarity, earlier provisions first on ties
+        """
+        similarities = normalize_rows(vectors) @ self.matrix.T
+        k = min(k, similarities.shape[1])
+        if k < similarities.shape[1]:
+            candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+        scores = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.lexsort((candidates, -scores), axis=1)
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+class KeywordMatcher:
+    """
+    Counts, per concept, how many of its keywords occur in a text.
+
+    All keywords are found in one regex pass: at each position the longest
+    keyword wins, and every keyword it contains is implied, so overlapping
+    keywords ("right" inside "rights") are still counted. Texts are expected
+    to be lower-cased.
+    """
+
+    def __init__(self, concept_keywords: Dict[str, List[str]]):
+        self.concepts = list(concept_keywords)
+        self.keywords = list(dict.fromkeys(
+            keyword for keywords in concept_keywords.values() for keyword in keywords
+        ))
+        position = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        # keywords x concepts: how often a keyword is listed under a concept
+        self.concept_weights = np.zeros((len(self.keywords), len(self.concepts)), dtype=np.int64)
+        for column, keywords in enumerate(concept_keywords.values()):
+            for keyword in keywords:
+                self.concept_weights[position[keyword], column] += 1
+
+        # Keywords present whenever a given keyword is
+        self.implied = {
+            keyword: [position[other] for other in self.keywords if other in keyword]
+            for keyword in self.keywords
+        }
+        alternation = "|".join(re.escape(keyword) for keyword in sorted(self.keywords, key=len, reverse=True))
+        self.pattern = re.compile(f"(?=({alternation}))")
+
+    def concept_counts(self, text: str) -> np.ndarray:
+        """Number of distinct keywords of each concept found in text."""
+        found = np.zeros(len(self.keywords), dtype=np.int64)
+        for keyword in set(match.group(1) for match in self.pattern.finditer(text)):
+            found[self.implied[keyword]] = 1
+        return found @ self.concept_weights
+
+
+class ProvisionKeywordTable:
+    """Concept keyword counts of every provision, one row per provision."""
+
+    def __init__(self, provisions: List[LegislativeProvision], matcher: KeywordMatcher):
+        self.provisions = list(provisions)
+        self.matcher = matcher
+        self.by_id: Dict[str, LegislativeProvision] = {}
+        for provision in self.provisions:
+            self.by_id.setdefault(provision.provision_id, provision)
+        self.counts = np.array(
+            [matcher.concept_counts(provision.content.lower()) for provision in self.provisions],
+            dtype=np.int64
+        ).reshape(len(self.provisions), len(matcher.concepts))
+
+    def best_match(self, comment_counts: np.ndarray) -> Optional[Tuple[LegislativeProvision, int]]:
+        """
+        Provision sharing the most concept keywords with a comment.
+
+        The score is the dot product of the concept counts; the first
+        provision wins ties.
+
+        Returns:
+            tuple: (provision, score) or None if no provision scores above zero
+        """
+        if not self.provisions or not comment_counts.any():
+            return None
+        scores = self.counts @ comment_counts
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return None
+        return self.by_id[self.provisions[best].provision_id], int(scores[best])
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length, leaving all-zero rows at zero."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
 
 class LegislativeContextService:
     """Service for legislative context analysis and provision mapping."""
     
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm") if _SPACY_AVAILABLE else None
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.summarization_service = SummarizationService()
+    def __init__(self, provision_index_cache_size: Optional[int] = None,
+                 analysis_workers: Optional[int] = None,
+                 spacy_service: Optional[SpacyService] = None,
+                 sentiment_analyzer: Optional["SentimentAnalyzer"] = None,
+                 summarization_service: Optional["SummarizationService"] = None):
+        self.spacy_service = spacy_service or get_spacy_service("en_core_web_sm")
+        self.nlp = self.spacy_service.nlp
+        # Model-backed services are imported only when they have to be built
+        if sentiment_analyzer is None:
+            from backend.app.services.sentiment_service import SentimentAnalyzer
+            sentiment_analyzer = SentimentAnalyzer()
+        if summarization_service is None:
+            from backend.app.services.summarization_service import SummarizationService
+            summarization_service = SummarizationService()
+        self.sentiment_analyzer = sentiment_analyzer
+        self.summarization_service = summarization_service
         
         # Legislative patterns for identifying references
         self.provision_patterns = {
@@ -104,6 +241,25 @@ class LegislativeContextService:
             'compliance': ['compliance', 'conform', 'adhere', 'follow', 'observe'],
             'enforcement': ['enforcement', 'implement', 'execute', 'apply', 'ensure']
         }
+        
+        self.keyword_matcher = KeywordMatcher(self.legal_keywords)
+        
+        # Per-legislation keyword tables and vector indexes keyed by content hash (LRU)
+        self.provision_index_cache_size = (
+            provision_index_cache_size if provision_index_cache_size is not None
+            else settings.PROVISION_INDEX_CACHE_SIZE
+        )
+        self._keyword_tables: "OrderedDict[str, ProvisionKeywordTable]" = OrderedDict()
+        self._provision_indexes: "OrderedDict[str, ProvisionIndex]" = OrderedDict()
+        # The caches are used from the event loop and from worker threads
+        self._cache_lock = threading.Lock()
+        
+        # Inference worker pool: sentiment and summarization models run
+        # synchronously, so they execute here instead of on the event loop
+        self.analysis_workers = max(1, analysis_workers or settings.LEGISLATIVE_ANALYSIS_WORKERS)
+        self._inference_pool = ThreadPoolExecutor(
+            max_workers=self.analysis_workers, thread_name_prefix="legislative-inference"
+        )
     
     async def analyze_legislative_context(
         self, 
@@ -120,38 +276,141 @@ class LegislativeContextService:
         Returns:
             LegislativeContextResult: Complete analysis
         """
+        stage_timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        
         # Step 1: Map comments to provisions
         provision_mappings = await self.map_comments_to_provisions(comments, legislation_structure)
+        stage_timings["mapping"] = time.perf_counter() - started
         
         # Step 2: Group comments by provision
         comments_by_provision = self._group_comments_by_provision(provision_mappings)
         
-        # Step 3: Analyze each provision
-        provision_analyses = []
-        for provision_id, provision_comments in comments_by_provision.items():
-            if provision_comments:
-                analysis = await self._analyze_provision_comments(
-                    provision_id, provision_comments, legislation_structure
+        # Step 3: Analyze the provisions concurrently
+        provision_analyses = await self.analyze_provision_groups(
+            comments_by_provision, legislation_structure, stage_timings
+        )
+        
+        mapped_count = sum(len(mappings) for mappings in comments_by_provision.values())
+        result = self.build_context_result(len(comments), mapped_count, provision_analyses, stage_timings)
+        stage_timings["total"] = time.perf_counter() - started
+        return result
+    
+    async def analyze_provision_groups(
+        self,
+        comments_by_provision: Dict[str, List[str]],
+        legislation_structure: Optional[List[LegislativeProvision]] = None,
+        stage_timings: Optional[Dict[str, float]] = None
+    ) -> List[ProvisionAnalysis]:
+        """
+        Analyze the comments of many provisions.
+        
+        Sentiment is scored once for all distinct mapped comments and shared by
+        the provisions; the provision analyses then run concurrently, at most
+        analysis_workers at a time.
+        
+        Args:
+            comments_by_provision: Comments per provision ID
+            legislation_structure: Optional structure of the legislation
+            stage_timings: Optional dict receiving "sentiment" and "provision_analysis" seconds
+            
+        Returns:
+            list: Analyses in the order of comments_by_provision (provisions without comments skipped)
+        """
+        stage_timings = stage_timings if stage_timings is not None else {}
+        groups = [(provision_id, comments) for provision_id, comments in comments_by_provision.items() if comments]
+        
+        started = time.perf_counter()
+        sentiments = await self.score_sentiments(
+            [comment for _, comments in groups for comment in comments]
+        )
+        stage_timings["sentiment"] = time.perf_counter() - started
+        
+        provisions_by_id: Dict[str, LegislativeProvision] = {}
+        for provision in legislation_structure or []:
+            provisions_by_id.setdefault(provision.provision_id, provision)
+        
+        semaphore = asyncio.Semaphore(self.analysis_workers)
+        
+        async def analyze(provision_id: str, comments: List[str]) -> ProvisionAnalysis:
+            async with semaphore:
+                provision = provisions_by_id.get(provision_id)
+                return await self._analyze_provision_comments(
+                    provision_id, comments, [provision] if provision else None, sentiments
                 )
-                provision_analyses.append(analysis)
         
-        # Step 4: Find cross-provision themes
+        started = time.perf_counter()
+        provision_analyses = await asyncio.gather(
+            *(analyze(provision_id, comments) for provision_id, comments in groups)
+        )
+        stage_timings["provision_analysis"] = time.perf_counter() - started
+        return list(provision_analyses)
+    
+    async def score_sentiments(self, comments: List[str]) -> Dict[str, Any]:
+        """
+        Policy sentiment of each distinct comment, scored in one batch call on the inference pool.
+        
+        Returns:
+            dict: SentimentResult per comment text
+        """
+        texts = list(dict.fromkeys(comments))
+        if not texts:
+            return {}
+        
+        results = await self._run_inference(self.sentiment_analyzer._policy_sentiment_batch, texts)
+        return dict(zip(texts, results))
+    
+    async def _run_inference(self, func, *args):
+        """
+        Run a blocking model call on the inference pool.
+        
+        Only the services' synchronous entry points go here: they read the
+        shared models and keyword tables without mutating them (transformer
+        pipelines are loaded once under the analyzer's lock), so several pool
+        threads may run them at once. Coroutines are not run on pool threads.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._inference_pool, functools.partial(func, *args))
+    
+    def build_context_result(
+        self,
+        total_comments: int,
+        mapped_count: int,
+        provision_analyses: List[ProvisionAnalysis],
+        stage_timings: Optional[Dict[str, float]] = None
+    ) -> LegislativeContextResult:
+        """
+        Combine per-provision analyses into a complete result.
+        
+        Args:
+            total_comments: Number of comments analyzed
+            mapped_count: Number of comment-to-provision mappings
+            provision_analyses: Analyses of the provisions that received comments
+            stage_timings: Optional stage timings so far; "synthesis" is added
+            
+        Returns:
+            LegislativeContextResult: Complete analysis
+        """
+        stage_timings = stage_timings if stage_timings is not None else {}
+        started = time.perf_counter()
+        
+        # Find cross-provision themes
         cross_themes = self._find_cross_provision_themes(provision_analyses)
         
-        # Step 5: Generate recommendations
+        # Generate recommendations
         recommendations = self._generate_legislative_recommendations(provision_analyses)
         implementation_considerations = self._generate_implementation_considerations(provision_analyses)
-        
-        mapped_count = sum(len(mappings) for mappings in comments_by_provision.values())
+        stage_timings["synthesis"] = time.perf_counter() - started
         
         return LegislativeContextResult(
-            total_comments=len(comments),
+            total_comments=total_comments,
             mapped_comments=mapped_count,
-            unmapped_comments=len(comments) - mapped_count,
+            unmapped_comments=total_comments - mapped_count,
             provision_analyses=provision_analyses,
             cross_provision_themes=cross_themes,
             legislative_recommendations=recommendations,
-            implementation_considerations=implementation_considerations
+            implementation_considerations=implementation_considerations,
+            stage_timings=stage_timings
         )
     
     async def map_comments_to_provisions(
@@ -160,27 +419,60 @@ class LegislativeContextService:
         legislation_structure: Optional[List[LegislativeProvision]] = None
     ) -> List[ProvisionMapping]:
         """Map individual comments to specific legislative provisions."""
-        mappings = []
+        comment_mappings = await self.map_comments(comments, legislation_structure)
+        return [mapping for mappings in comment_mappings for mapping in mappings]
+    
+    async def map_comments(
+        self,
+        comments: List[str],
+        legislation_structure: Optional[List[LegislativeProvision]] = None,
+        keyword_table: Optional[ProvisionKeywordTable] = None,
+        provision_index: Optional[ProvisionIndex] = None
+    ) -> List[List[ProvisionMapping]]:
+        """
+        Map comments to provisions, keeping the mappings of each comment together.
+        
+        Args:
+            comments: Comment texts
+            legislation_structure: Optional structure of the legislation
+            keyword_table: Prebuilt keyword table of the structure (looked up if omitted)
+            provision_index: Prebuilt vector index of the structure (looked up if omitted)
+            
+        Returns:
+            list: For each comment, its provision mappings (possibly empty)
+        """
+        comment_mappings: List[List[ProvisionMapping]] = []
+        semantic_pending: List[int] = []
+        if legislation_structure and keyword_table is None:
+            keyword_table = self.get_keyword_table(legislation_structure)
         
         for comment in comments:
             # Try explicit reference mapping first
             explicit_mappings = self._find_explicit_provision_references(comment)
             
             if explicit_mappings:
-                mappings.extend(explicit_mappings)
+                comment_mappings.append(explicit_mappings)
             else:
                 # Try keyword-based mapping
-                keyword_mapping = self._find_keyword_based_mapping(comment, legislation_structure)
+                keyword_mapping = self._find_keyword_based_mapping(comment, keyword_table)
                 if keyword_mapping:
-                    mappings.append(keyword_mapping)
+                    comment_mappings.append([keyword_mapping])
                 else:
+                    comment_mappings.append([])
                     # Try semantic similarity (if structure provided)
                     if legislation_structure:
-                        semantic_mapping = await self._find_semantic_mapping(comment, legislation_structure)
-                        if semantic_mapping:
-                            mappings.append(semantic_mapping)
+                        semantic_pending.append(len(comment_mappings) - 1)
         
-        return mappings
+        # Remaining comments are matched semantically in one batch
+        if semantic_pending:
+            semantic_mappings = await self._find_semantic_mappings(
+                [comments[i] for i in semantic_pending], legislation_structure, provision_index
+            )
+            for i, semantic_mapping in zip(semantic_pending, semantic_mappings):
+                if semantic_mapping:
+                    comment_mappings[i].append(semantic_mapping)
+        
+        return comment_mappings
     
     def _find_explicit_provision_references(self, comment: str) -> List[ProvisionMapping]:
         """Find explicit references to provisions in comment text."""
@@ -214,87 +506,147 @@ class LegislativeContextService:
     def _find_keyword_based_mapping(
         self, 
         comment: str, 
-        legislation_structure: Optional[List[LegislativeProvision]]
+        keyword_table: Optional[ProvisionKeywordTable]
     ) -> Optional[ProvisionMapping]:
         """Find provision mapping based on legal concept keywords."""
-        comment_lower = comment.lower()
+        if keyword_table is None:
+            return None
         
-        # Score provisions based on keyword matches
-        provision_scores = {}
+        # Score provisions by shared concept keywords
+        match = keyword_table.best_match(self.keyword_matcher.concept_counts(comment.lower()))
+        if match is None:
+            return None
         
-        if legislation_structure:
-            for provision in legislation_structure:
-                score = 0
-                
-                # Check if provision content contains keywords found in comment
-                provision_content = provision.content.lower()
-                
-                for concept, keywords in self.legal_keywords.items():
-                    comment_keyword_count = sum(1 for keyword in keywords if keyword in comment_lower)
-                    provision_keyword_count = sum(1 for keyword in keywords if keyword in provision_content)
-                    
-                    if comment_keyword_count > 0 and provision_keyword_count > 0:
-                        score += comment_keyword_count * provision_keyword_count
-                
-                if score > 0:
-                    provision_scores[provision.provision_id] = score
+        best_provision, score = match
+        confidence = min(0.8, score / 10)  # Normalize confidence
+        
+        return ProvisionMapping(
+            comment_text=comment,
+            provision_id=best_provision.provision_id,
+            provision_type=best_provision.provision_type,
+            provision_title=best_provision.title,
+            mapping_confidence=confidence,
+            mapping_method="keyword_match",
+            context_snippet=comment[:100]  # First 100 characters as context
+        )
+    
+    def get_keyword_table(self, legislation_structure: List[LegislativeProvision]) -> ProvisionKeywordTable:
+        """Concept keyword table of a legislation structure, built once per distinct content."""
+        key = self._legislation_key(legislation_structure)
+        table = self._cache_get(self._keyword_tables, key)
+        if table is None:
+            table = ProvisionKeywordTable(legislation_structure, self.keyword_matcher)
+            self._cache_put(self._keyword_tables, key, table)
+        return table
+    
+    def get_provision_index(self, legislation_structure: List[LegislativeProvision]) -> Optional[ProvisionIndex]:
+        """
+        Vector index of a legislation structure, built once per distinct content.
         
-        if provision_scores:
-            # Select provision with highest score
-            best_provision_id = max(provision_scores, key=provision_scores.get)
-            best_provision = next(p for p in legislation_structure if p.provision_id == best_provision_id)
-            
-            confidence = min(0.8, provision_scores[best_provision_id] / 10)  # Normalize confidence
+        Args:
+            legislation_structure: Provisions of the legislation
             
-            return ProvisionMapping(
-                comment_text=comment,
-                provision_id=best_provision_id,
-                provision_type=best_provision.provision_type,
-                provision_title=best_provision.title,
-                mapping_confidence=confidence,
-                mapping_method="keyword_match",
-                context_snippet=comment[:100]  # First 100 characters as context
-            )
+        Returns:
+            ProvisionIndex or None if no spaCy model is available
+        """
+        if not self.nlp:
+            return None
         
-        return None
+        key = self._legislation_key(legislation_structure)
+        index = self._cache_get(self._provision_indexes, key)
+        if index is not None:
+            return index
+        
+        docs = self.spacy_service.pipe(
+            [provision.content for provision in legislation_structure], task='vectors'
+        )
+        width = max((doc.vector.size for doc in docs), default=0)
+        index = ProvisionIndex(legislation_structure, self._doc_vectors(docs, width))
+        self._cache_put(self._provision_indexes, key, index)
+        return index
     
-    async def _find_semantic_mapping(
+    def _cache_get(self, cache: OrderedDict, key: str):
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value):
+        if self.provision_index_cache_size <= 0:
+            return
+        with self._cache_lock:
+            cache[key] = value
+            while len(cache) > self.provision_index_cache_size:
+                cache.popitem(last=False)
+    
+    @staticmethod
+    def _legislation_key(legislation_structure: List[LegislativeProvision]) -> str:
+        payload = json.dumps(
+            [[p.provision_id, p.provision_type, p.title, p.content] for p in legislation_structure],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _doc_vectors(docs: List, width: int) -> np.ndarray:
+        """Stack Doc vectors; empty Docs (no vector) become zero rows."""
+        vectors = np.zeros((len(docs), width), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            if doc.vector.size == width:
+                vectors[row] = doc.vector
+        return vectors
+    
+    async def _find_semantic_mappings(
         self, 
-        comment: str, 
-        legislation_structure: List[LegislativeProvision]
-    ) -> Optional[ProvisionMapping]:
-        """Find provision mapping using semantic similarity."""
+        comments: List[str], 
+        legislation_structure: List[LegislativeProvision],
+        provision_index: Optional[ProvisionIndex] = None
+    ) -> List[Optional[ProvisionMapping]]:
+        """Find provision mappings for many comments using semantic similarity."""
         if not self.nlp:
-            return None
+            return [None] * len(comments)
         
         try:
-            comment_doc = self.nlp(comment)
-            best_similarity = 0
-            best_provision = None
-            
-            for provision in legislation_structure:
-                provision_doc = self.nlp(provision.content)
-                similarity = comment_doc.similarity(provision_doc)
-                
-                if similarity > best_similarity and similarity > 0.3:  # Minimum threshold
-                    best_similarity = similarity
-                    best_provision = provision
+            # spaCy parsing and the similarity products are CPU-bound
+            return await asyncio.to_thread(
+                self._match_semantically, comments, legislation_structure, provision_index
+            )
+        except Exception as e:
+            print(f"Error in semantic mapping: {e}")
+            return [None] * len(comments)
+    
+    def _match_semantically(
+        self,
+        comments: List[str],
+        legislation_structure: List[LegislativeProvision],
+        index: Optional[ProvisionIndex] = None
+    ) -> List[Optional[ProvisionMapping]]:
+        index = index or self.get_provision_index(legislation_structure)
+        mappings: List[Optional[ProvisionMapping]] = []
+        
+        for start in range(0, len(comments), SEMANTIC_MAPPING_BLOCK_SIZE):
+            block = comments[start:start + SEMANTIC_MAPPING_BLOCK_SIZE]
+            # One-off bulk work: bypass the shared Doc cache and lock per spaCy batch
+            docs = self.spacy_service.pipe(block, task='vectors', use_cache=False)
+            best, scores = index.top_k(self._doc_vectors(docs, index.matrix.shape[1]), k=1)
             
-            if best_provision:
-                return ProvisionMapping(
+            for comment, position, similarity in zip(block, best[:, 0], scores[:, 0]):
+                if similarity <= SEMANTIC_SIMILARITY_THRESHOLD:  # Minimum threshold
+                    mappings.append(None)
+                    continue
+                provision = index.provisions[position]
+                mappings.append(ProvisionMapping(
                     comment_text=comment,
-                    provision_id=best_provision.provision_id,
-                    provision_type=best_provision.provision_type,
-                    provision_title=best_provision.title,
-                    mapping_confidence=best_similarity,
+                    provision_id=provision.provision_id,
+                    provision_type=provision.provision_type,
+                    provision_title=provision.title,
+                    mapping_confidence=float(similarity),
                     mapping_method="semantic_similarity",
                     context_snippet=comment[:100]
-                )
+                ))
         
-        except Exception as e:
-            print(f"Error in semantic mapping: {e}")
-        
-        return None
+        return mappings
     
     def _group_comments_by_provision(self, mappings: List[ProvisionMapping]) -> Dict[str, List[str]]:
         """Group comments by their mapped provisions."""
@@ -309,9 +661,10 @@ class LegislativeContextService:
         self,
         provision_id: str,
         comments: List[str],
-        legislation_structure: Optional[List[LegislativeProvision]]
+        legislation_structure: Optional[List[LegislativeProvision]],
+        sentiments: Optional[Dict[str, Any]] = None
     ) -> ProvisionAnalysis:
-        """Analyze comments for a specific provision."""
+        """Analyze comments for a specific provision (sentiments: precomputed results per comment)."""
         
         # Find provision details
         provision = None
@@ -328,10 +681,9 @@ class LegislativeContextService:
             )
         
         # Analyze sentiment for all comments
-        sentiment_results = []
-        for comment in comments:
-            result = await self.sentiment_analyzer.analyze_policy_sentiment(comment)
-            sentiment_results.append(result)
+        if sentiments is None:
+            sentiments = await self.score_sentiments(comments)
+        sentiment_results = [sentiments[comment] for comment in comments]
         
         # Calculate sentiment distribution
         sentiment_counts = Counter()
@@ -347,11 +699,11 @@ class LegislativeContextService:
         suggested_amendments = self._extract_suggested_amendments(comments)
         
         # Analyze by stakeholder type
-        stakeholder_perspectives = await self._analyze_stakeholder_perspectives(comments)
+        stakeholder_perspectives = await self._analyze_stakeholder_perspectives(comments, sentiments)
         
         # Generate provision-specific summary
         combined_text = " ".join(comments)
-        summary_result = await self.summarization_service.policy_summarization(combined_text)
+        summary_result = await self._run_inference(self.summarization_service._policy_summary, combined_text)
         
         return ProvisionAnalysis(
             provision=provision,
@@ -412,8 +764,15 @@ class LegislativeContextService:
         # Return unique amendments
         return list(set(amendments))[:5]
     
-    async def _analyze_stakeholder_perspectives(self, comments: List[str]) -> Dict[str, Dict[str, Any]]:
+    async def _analyze_stakeholder_perspectives(
+        self,
+        comments: List[str],
+        sentiments: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """Analyze perspectives by stakeholder type for provision-specific comments."""
+        if sentiments is None:
+            sentiments = await self.score_sentiments(comments)
+        
         stakeholder_comments = defaultdict(list)
         
         # Group comments by stakeholder type
@@ -426,14 +785,11 @@ class LegislativeContextService:
         for stakeholder_type, group_comments in stakeholder_comments.items():
             if group_comments:
                 # Analyze sentiment for this stakeholder group
-                sentiment_results = []
-                for comment in group_comments:
-                    result = await self.sentiment_analyzer.analyze_policy_sentiment(comment)
-                    sentiment_results.append(result)
+                sentiment_results = [sentiments[comment] for comment in group_comments]
                 
                 # Calculate group statistics
-                sentiments = [r.sentiment_label.value for r in sentiment_results]
-                sentiment_counts = Counter(sentiments)
+                labels = [r.sentiment_label.value for r in sentiment_results]
+                sentiment_counts = Counter(labels)
                 dominant_sentiment = sentiment_counts.most_common(1)[0][0] if sentiment_counts else "neutral"
                 
                 perspectives[stakeholder_type] = {
@@ -5,12 +5,15 @@ Supports all Indian languages and mixed text for generating word clouds from use
 
 import re
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Any
 import matplotlib.pyplot as plt
 from collections import Counter, defaultdict
 import base64
 from io import BytesIO
 
+from backend.app.services.wordcloud_cache import wordcloud_cache_key, wordcloud_image_cache
+
 # Word cloud libraries
 try:
     from wordcloud import WordCloud
@@ -36,6 +39,47 @@ try:
 except ImportError:
     INDIC_SUPPORT = False
 
+# Unicode blocks of the supported scripts (Latin letters are "english")
+SCRIPT_RANGES = {
+    'devanagari': ('\u0900', '\u097F'),
+    'tamil': ('\u0B80', '\u0BFF'),
+    'telugu': ('\u0C00', '\u0C7F'),
+    'kannada': ('\u0C80', '\u0CFF'),
+    'malayalam': ('\u0D00', '\u0D7F'),
+    'bengali': ('\u0980', '\u09FF'),
+    'gujarati': ('\u0A80', '\u0AFF'),
+    'punjabi': ('\u0A00', '\u0A7F')
+}
+SCRIPT_PATTERNS = {'english': re.compile(r'[a-zA-Z]')}
+SCRIPT_PATTERNS.update({
+    script: re.compile(f'[{low}-{high}]') for script, (low, high) in SCRIPT_RANGES.items()
+})
+
+# Stopword language codes and the script each is written in
+LANGUAGE_SCRIPTS = {
+    'en': 'english', 'hi': 'devanagari', 'mr': 'devanagari', 'bn': 'bengali', 'te': 'telugu',
+    'ta': 'tamil', 'gu': 'gujarati', 'kn': 'kannada', 'ml': 'malayalam', 'pa': 'punjabi'
+}
+
+# One pass per text: URLs, @mentions and #hashtags are matched (and skipped)
+# before word characters, so their parts never become tokens. Words are runs
+# of \w plus the Indic blocks (U+0900-U+0D7F, which also keeps vowel signs
+# that \w misses) without the danda punctuation marks.
+WORD_CHARACTERS = r'\w\u0900-\u0963\u0966-\u0D7F'
+TOKEN_PATTERN = re.compile(rf'https?://\S+|[@#][{WORD_CHARACTERS}]+|([{WORD_CHARACTERS}]+)')
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 50
+
+
+def script_of(word: str) -> str:
+    """Script of the first character of word that belongs to a known script ('english' otherwise)."""
+    for char in word:
+        for script, (low, high) in SCRIPT_RANGES.items():
+            if low <= char <= high:
+                return script
+    return 'english'
+
+
 class MultilingualWordCloudGenerator:
     """
     Advanced word cloud generator supporting all Indian languages and mixed text
@@ -111,6 +155,15 @@ class MultilingualWordCloudGenerator:
                 self.stopwords['en'].update(english_stopwords)
             except:
                 pass
+
+        # Merged lookup: every stopword of every language, tagged with its script
+        self.stopword_scripts: Dict[str, str] = {}
+        for words in self.stopwords.values():
+            for word in words:
+                self.stopword_scripts.setdefault(word.lower(), script_of(word))
+        self._stopword_sets: Dict[Optional[frozenset], frozenset] = {
+            None: frozenset(self.stopword_scripts)
+        }
     
     def initialize_fonts(self):
         """Initialize fonts for different scripts"""
@@ -153,98 +206,76 @@ class MultilingualWordCloudGenerator:
     
     def detect_script(self, text: str) -> Dict[str, bool]:
         """Detect which scripts are present in the text"""
-        scripts = {
-            'english': bool(re.search(r'[a-zA-Z]', text)),
-            'devanagari': bool(re.search(r'[\u0900-\u097F]', text)),
-            'tamil': bool(re.search(r'[\u0B80-\u0BFF]', text)),
-            'telugu': bool(re.search(r'[\u0C00-\u0C7F]', text)),
-            'kannada': bool(re.search(r'[\u0C80-\u0CFF]', text)),
-            'malayalam': bool(re.search(r'[\u0D00-\u0D7F]', text)),
-            'bengali': bool(re.search(r'[\u0980-\u09FF]', text)),
-            'gujarati': bool(re.search(r'[\u0A80-\u0AFF]', text)),
-            'punjabi': bool(re.search(r'[\u0A00-\u0A7F]', text))
-        }
-        return scripts
+        return {script: bool(pattern.search(text)) for script, pattern in SCRIPT_PATTERNS.items()}
     
-    def clean_and_tokenize(self, text: str, languages: List[str] = None) -> List[str]:
-        """Clean and tokenize text for word cloud generation"""
-        if not text or pd.isna(text):
-            return []
-        
-        # Convert to string and normalize
-        text = str(text).strip()
-        
-        if not text:
-            return []
-        
-        # Detect scripts if languages not provided
+    def _stopword_set(self, languages: Optional[List[str]]) -> frozenset:
+        """Stopwords of the given languages or scripts (all of them when None)."""
         if languages is None:
-            script_detection = self.detect_script(text)
-            languages = [script for script, present in script_detection.items() if present]
-        
-        # Clean text - remove URLs, mentions, hashtags, special chars
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        text = re.sub(r'@\w+', '', text)
-        text = re.sub(r'#\w+', '', text)
-        text = re.sub(r'[^\w\s\u0900-\u097F\u0980-\u09FF\u0A00-\u0A7F\u0A80-\u0AFF\u0B80-\u0BFF\u0C00-\u0C7F\u0C80-\u0CFF\u0D00-\u0D7F]', ' ', text)
-        
-        # Tokenize based on script
-        words = []
-        
-        # Simple whitespace tokenization for most cases
-        tokens = text.split()
+            return self._stopword_sets[None]
+        scripts = frozenset(LANGUAGE_SCRIPTS.get(language, language) for language in languages)
+        stopword_set = self._stopword_sets.get(scripts)
+        if stopword_set is None:
+            stopword_set = frozenset(
+                word for word, script in self.stopword_scripts.items() if script in scripts
+            )
+            self._stopword_sets[scripts] = stopword_set
+        return stopword_set
+    
+    def _tokens(self, text: Any, stopword_set: frozenset) -> Iterator[str]:
+        if not isinstance(text, str):
+            # Missing values (None/NaN in a pandas Series) have no words
+            if text is None or pd.isna(text):
+                return
+            text = str(text)
         
-        for token in tokens:
-            # Remove very short words (less than 2 characters) unless they are meaningful
-            if len(token) < 2:
+        for token in TOKEN_PATTERN.findall(text):
+            # Non-word alternatives (URLs, mentions, hashtags) yield ''
+            if not MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH:
                 continue
-                
-            # Remove very long words (likely noise)
-            if len(token) > 50:
+            lowered = token.lower()
+            if lowered in stopword_set:
                 continue
-            
-            # Convert to lowercase for English words
-            if re.match(r'^[a-zA-Z]+$', token):
-                token = token.lower()
-            
-            words.append(token)
-        
-        # Remove stopwords
-        filtered_words = []
-        for word in words:
-            is_stopword = False
-            
-            # Check against stopwords for detected languages
-            for lang_code in languages:
-                if lang_code == 'english':
-                    lang_code = 'en'
-                elif lang_code == 'devanagari':
-                    lang_code = 'hi'  # Default to Hindi for Devanagari
-                
-                if lang_code in self.stopwords and word.lower() in self.stopwords[lang_code]:
-                    is_stopword = True
-                    break
-            
-            if not is_stopword:
-                filtered_words.append(word)
+            # Only plain English words are lower-cased
+            yield lowered if token.isascii() and token.isalpha() else token
+    
+    def clean_and_tokenize(self, text: str, languages: List[str] = None) -> List[str]:
+        """
+        Clean and tokenize text for word cloud generation.
         
-        return filtered_words
+        URLs, mentions and hashtags are dropped, words shorter than 2 or
+        longer than 50 characters are skipped and stopwords are removed.
+        Since a word's script is always present in its own text, stopwords of
+        every script apply unless languages (codes such as 'hi' or script
+        names such as 'tamil') restrict them.
+        """
+        return list(self._tokens(text, self._stopword_set(languages)))
     
-    def generate_word_frequencies(self, texts: List[str], min_freq: int = 2) -> Dict[str, int]:
-        """Generate word frequencies from a list of texts"""
-        all_words = []
+    def tokenize_batch(self, texts: Iterable[Any], languages: List[str] = None) -> List[List[str]]:
+        """
+        Tokenize many texts (a list or a pandas Series).
         
+        Args:
+            texts: Texts to tokenize; None/NaN entries give no tokens
+            languages: Optional stopword languages, as in clean_and_tokenize
+            
+        Returns:
+            list: Tokens of each text, in input order
+        """
+        stopword_set = self._stopword_set(languages)
+        return [list(self._tokens(text, stopword_set)) for text in texts]
+    
+    def iter_tokens(self, texts: Iterable[Any], languages: List[str] = None) -> Iterator[str]:
+        """Tokens of all texts as one stream, without per-text lists."""
+        stopword_set = self._stopword_set(languages)
         for text in texts:
-            words = self.clean_and_tokenize(text)
-            all_words.extend(words)
-        
-        # Count frequencies
-        word_freq = Counter(all_words)
+            yield from self._tokens(text, stopword_set)
+    
+    def generate_word_frequencies(self, texts: Iterable[str], min_freq: int = 2) -> Dict[str, int]:
+        """Generate word frequencies from a list of texts"""
+        word_freq = Counter(self.iter_tokens(texts))
         
         # Filter by minimum frequency
-        filtered_freq = {word: freq for word, freq in word_freq.items() if freq >= min_freq}
-        
-        return filtered_freq
+        return {word: freq for word, freq in word_freq.items() if freq >= min_freq}
     
     def create_wordcloud(self, word_frequencies: Dict[str, int], 
                         width: int = 800, height: int = 400,
@@ -269,48 +300,62 @@ class MultilingualWordCloudGenerator:
             primary_script = max(scripts.keys(), key=scripts.get) if scripts else 'english'
             font_path = self.fonts.get(primary_script)
             
-            # Create WordCloud object
-            wc_params = {
-                'width': width,
-                'height': height,
-                'background_color': background_color,
-                'colormap': colormap,
-                'max_words': max_words,
-                'relative_scaling': 0.5,
-                'min_font_size': 10,
-                'max_font_size': 100,
-                'prefer_horizontal': 0.7,
-                'random_state': 42
-            }
-            
-            if font_path:
-                wc_params['font_path'] = font_path
-            
-            wordcloud = WordCloud(**wc_params)
-            
-            # Generate word cloud
-            wordcloud.generate_from_frequencies(word_frequencies)
-            
-            # Convert to image
-            fig, ax = plt.subplots(figsize=(width/100, height/100))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis('off')
-            plt.tight_layout(pad=0)
-            
-            # Save to base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100, facecolor='white')
-            buffer.seek(0)
-            
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close(fig)
-            
-            return image_base64
+            # Layout is the expensive part; reuse the PNG of an identical request
+            cache_key = wordcloud_cache_key(
+                word_frequencies, width, height, colormap=colormap, font=font_path,
+                top_n=max_words, style="multilingual", background_color=background_color
+            )
+            image_bytes = wordcloud_image_cache.get_or_render(
+                cache_key,
+                lambda: self._render_wordcloud(
+                    word_frequencies, width, height, background_color, colormap, max_words, font_path
+                )
+            )
+            return base64.b64encode(image_bytes).decode()
             
         except Exception as e:
             print(f"Error creating word cloud: {e}")
             return None
     
+    def _render_wordcloud(self, word_frequencies: Dict[str, int], width: int, height: int,
+                          background_color: str, colormap: str, max_words: int,
+                          font_path: Optional[str]) -> bytes:
+        """Lay out the word cloud and encode it as PNG bytes."""
+        # Create WordCloud object
+        wc_params = {
+            'width': width,
+            'height': height,
+            'background_color': background_color,
+            'colormap': colormap,
+            'max_words': max_words,
+            'relative_scaling': 0.5,
+            'min_font_size': 10,
+            'max_font_size': 100,
+            'prefer_horizontal': 0.7,
+            'random_state': 42
+        }
+        
+        if font_path:
+            wc_params['font_path'] = font_path
+        
+        wordcloud = WordCloud(**wc_params)
+        
+        # Generate word cloud
+        wordcloud.generate_from_frequencies(word_frequencies)
+        
+        # Convert to image
+        fig, ax = plt.subplots(figsize=(width/100, height/100))
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis('off')
+        plt.tight_layout(pad=0)
+        
+        # Save as PNG
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100, facecolor='white')
+        plt.close(fig)
+        
+        return buffer.getvalue()
+    
     def create_sentiment_wordcloud(self, texts_with_sentiment: List[Tuple[str, str]], 
                                  sentiment_filter: str = None) -> Optional[str]:
         """Create word cloud filtered by sentiment"""
@@ -4,12 +4,6 @@ Supports English and Hindi text processing with comprehensive cleaning pipeline.
 """
 
 import re
-try:
-    import spacy
-    _SPACY_PREPROC_AVAILABLE = True
-except Exception:
-    spacy = None  # type: ignore
-    _SPACY_PREPROC_AVAILABLE = False
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize, sent_tokenize
@@ -25,6 +19,7 @@ from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
 from backend.app.core.config import settings
+from backend.app.services.spacy_service import get_spacy_service
 from backend.app.utils.text_utils import TextCleaner
 
 
@@ -53,23 +48,15 @@ class TextPreprocessor:
         
     def _initialize_nlp_models(self):
         """Initialize spaCy models for different languages."""
-        try:
-            # Load English model
-            self.nlp_en = spacy.load("en_core_web_sm") if _SPACY_PREPROC_AVAILABLE else None
-            
-            # Configure pipeline - disable unnecessary components for performance
-            if self.nlp_en:
-                try:
-                    # Try to disable components we don't need
-                    self.nlp_en.disable_pipes(["parser", "ner"])
-                except Exception:
-                    # If some components don't exist or nlp is None, continue
-                    pass
-            
+        # Shared service: components are selected per task instead of being
+        # disabled globally, so key phrase extraction keeps parser and NER
+        self.spacy_service = get_spacy_service("en_core_web_sm")
+        self.nlp_en = self.spacy_service.nlp
+
+        if self.nlp_en:
             print("✅ English NLP model loaded successfully")
-        except IOError:
+        else:
             print("❌ English spaCy model not found. Please run: python -m spacy download en_core_web_sm")
-            self.nlp_en = None
         
         # For Hindi, we'll use basic processing since advanced models may not be available
         self.nlp_hi = None  # Placeholder for Hindi model
@@ -337,8 +324,8 @@ class TextPreprocessor:
         if not self.nlp_en or not text:
             return await self._process_basic_text(text, remove_stopwords)
         
-        # Process with spaCy
-        doc = self.nlp_en(text)
+        # Process with spaCy (lemmas and sentences only)
+        doc = self.spacy_service.process(text, task='lemmas')
         
         # Extract sentences
         sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
@@ -513,7 +500,8 @@ class TextPreprocessor:
         if not self.nlp_en or not text:
             return []
         
-        doc = self.nlp_en(text)
+        # Needs parser (noun_chunks) and NER (ents); reuses a cached Doc if present
+        doc = self.spacy_service.process(text, task='phrases')
         
         # Extract noun phrases and named entities
         phrases = []
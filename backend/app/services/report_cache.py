@@ -0,0 +1,226 @@
+"""
+Background report rendering with cached artifacts.
+Consultation reports are rendered once per data version (the latest comment
+and analysis timestamps plus the row count) by a background job into a file
+on disk. Later downloads of the same version are served from that file;
+when the data changes, the version changes and the report is rendered again,
+replacing the older artifact of that consultation and format once downloads
+of it have had REPORT_SUPERSEDED_GRACE_SECONDS to finish.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from backend.app.core.config import settings
+from backend.app.services.report_export import XLSX_MEDIA_TYPE
+
+# Report format -> (file extension, media type)
+REPORT_FORMATS: Dict[str, tuple] = {
+    "excel": (".xlsx", XLSX_MEDIA_TYPE),
+    "pdf": (".pdf", "application/pdf")
+}
+
+# Writes the report to a binary file, returns the number of comment rows (0: no report)
+ReportRenderer = Callable[[BinaryIO], int]
+
+
+def report_key(report_format: str, consultation_id: str, data_version: str) -> str:
+    """Deterministic key of one rendering of a consultation report."""
+    payload = json.dumps([report_format, consultation_id, data_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportJob:
+    """Rendering state of one report version."""
+
+    def __init__(self, report_format: str, consultation_id: str, data_version: str, path: str):
+        self.key = report_key(report_format, consultation_id, data_version)
+        self.report_format = report_format
+        self.consultation_id = consultation_id
+        self.data_version = data_version
+        self.path = path
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.row_count: Optional[int] = None
+        self.requested_at = datetime.utcnow()
+        self.completed_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("ready", "empty", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "report_key": self.key,
+            "report_format": self.report_format,
+            "consultation_id": self.consultation_id,
+            "data_version": self.data_version,
+            "status": self.status,
+            "error": self.error,
+            "row_count": self.row_count,
+            "requested_at": self.requested_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class ReportArtifactStore:
+    """
+    Report jobs of this process and their rendered files on disk.
+
+    Only running jobs and the latest max_finished_jobs empty or failed ones
+    are kept in memory; a ready job is dropped once its artifact is on disk,
+    where status() finds it again.
+    """
+
+    def __init__(self, directory: Optional[str] = None, superseded_grace_seconds: Optional[float] = None,
+                 max_finished_jobs: Optional[int] = None):
+        self.directory = directory if directory is not None else settings.REPORT_CACHE_DIR
+        self.superseded_grace_seconds = (
+            superseded_grace_seconds if superseded_grace_seconds is not None
+            else settings.REPORT_SUPERSEDED_GRACE_SECONDS
+        )
+        self.max_finished_jobs = (
+            max_finished_jobs if max_finished_jobs is not None else settings.REPORT_FINISHED_JOBS
+        )
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consultation_directory(self, report_format: str, consultation_id: str) -> str:
+        consultation_hash = hashlib.sha256(consultation_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, report_format, consultation_hash)
+
+    def path(self, report_format: str, consultation_id: str, data_version: str) -> str:
+        extension = REPORT_FORMATS[report_format][0]
+        key = report_key(report_format, consultation_id, data_version)
+        return os.path.join(self.consultation_directory(report_format, consultation_id), f"{key}{extension}")
+
+    def status(self, report_format: str, consultation_id: str, data_version: str) -> Optional[ReportJob]:
+        """
+        Job of a report version: the one running or finished in this process,
+        a ready job when the artifact is already on disk, otherwise None.
+        """
+        key = report_key(report_format, consultation_id, data_version)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+
+        path = self.path(report_format, consultation_id, data_version)
+        if not os.path.exists(path):
+            return None
+        job = ReportJob(report_format, consultation_id, data_version, path)
+        job.status = "ready"
+        job.completed_at = datetime.utcfromtimestamp(os.path.getmtime(path))
+        return job
+
+    def ensure(self, report_format: str, consultation_id: str, data_version: str,
+               render: ReportRenderer) -> ReportJob:
+        """
+        Job of a report version, starting a background rendering unless the
+        artifact is ready or already being rendered (failed jobs are retried).
+
+        Args:
+            report_format: Key of REPORT_FORMATS
+            consultation_id: Consultation ID
+            data_version: Version of the consultation's analyzed data
+            render: Writes the report, run in a worker thread
+
+        Returns:
+            ReportJob: The job (ready, or pending/running with a task to await)
+        """
+        job = self.status(report_format, consultation_id, data_version)
+        if job is not None and job.status == "ready":
+            self._remove_other_versions(job)
+        with self._lock:
+            if job is not None and job.status != "failed":
+                return job
+            job = ReportJob(report_format, consultation_id, data_version,
+                            self.path(report_format, consultation_id, data_version))
+            self._jobs[job.key] = job
+        job.task = asyncio.ensure_future(asyncio.to_thread(self._render, job, render))
+        return job
+
+    def _render(self, job: ReportJob, render: ReportRenderer):
+        job.status = "running"
+        temporary = f"{job.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(job.path), exist_ok=True)
+            with open(temporary, "wb") as f:
+                job.row_count = render(f)
+            if job.row_count:
+                os.replace(temporary, job.path)
+                self._remove_other_versions(job)
+                job.status = "ready"
+            else:
+                os.remove(temporary)
+                job.status = "empty"
+        except Exception as e:
+            print(f"Report rendering failed for consultation {job.consultation_id} ({job.report_format}): {e}")
+            job.status = "failed"
+            job.error = str(e)
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        finally:
+            job.completed_at = datetime.utcnow()
+            self._finish(job)
+
+    def _finish(self, job: ReportJob):
+        with self._lock:
+            if self._jobs.get(job.key) is not job:
+                return
+            if job.status == "ready":
+                # Found on disk from now on
+                del self._jobs[job.key]
+                return
+            self._jobs.move_to_end(job.key)
+            finished = [key for key, other in self._jobs.items() if other.done]
+            for key in finished[:len(finished) - self.max_finished_jobs]:
+                del self._jobs[key]
+
+    def _remove_other_versions(self, job: ReportJob):
+        """
+        Delete artifacts (and forget jobs) of older versions of the same report.
+
+        A download may still be streaming an older artifact, so each is kept
+        until superseded_grace_seconds after the next newer one was written.
+        """
+        directory = os.path.dirname(job.path)
+        extension = REPORT_FORMATS[job.report_format][0]
+        current = os.path.basename(job.path)
+        artifacts = []
+        for name in os.listdir(directory):
+            if name.endswith(extension):
+                try:
+                    artifacts.append((os.path.getmtime(os.path.join(directory, name)), name == current, name))
+                except OSError:
+                    continue
+        # Oldest first; the current version sorts last among equal times
+        artifacts.sort()
+
+        cutoff = time.time() - self.superseded_grace_seconds
+        for (_, _, name), (superseded_at, _, _) in zip(artifacts, artifacts[1:]):
+            if name == current or superseded_at > cutoff:
+                continue
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                continue
+        with self._lock:
+            for key in [key for key, other in self._jobs.items()
+                        if other is not job
+                        and other.report_format == job.report_format
+                        and other.consultation_id == job.consultation_id
+                        and other.done]:
+                del self._jobs[key]
+
+
+# Shared store for the process
+report_artifact_store = ReportArtifactStore()
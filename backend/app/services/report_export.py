@@ -0,0 +1,104 @@
+"""
+Streaming consultation report export.
+Analyzed comment rows arrive in database batches and are appended to a
+write-only openpyxl workbook as they come; sentiment counts and keyword
+frequencies are accumulated on the way, so no full row table is held in
+memory.
+"""
+
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+
+from backend.app.services.term_matrix import TermAnalyzer
+
+REPORT_COLUMNS = ["comment_id", "text", "law_section", "submitted_at", "sentiment", "confidence", "summary"]
+SENTIMENT_ORDER = ["positive", "negative", "neutral"]
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def label_value(label: Any) -> Any:
+    """Plain value of a sentiment label (enum members are written by value)."""
+    return getattr(label, "value", label)
+
+
+class KeywordAccumulator:
+    """
+    Running keyword counts of report rows.
+
+    Summaries are counted; original texts are counted only until the first
+    non-empty summary shows up, as they are used only when no row has one.
+    """
+
+    def __init__(self, analyzer: TermAnalyzer):
+        self.analyzer = analyzer
+        self.summary_counts: Counter = Counter()
+        self.text_counts: Counter = Counter()
+        self.has_summary = False
+
+    def add(self, summary: Optional[str], text: Optional[str]):
+        if summary:
+            if not self.has_summary:
+                self.has_summary = True
+                self.text_counts = Counter()
+            self.summary_counts.update(self.analyzer.tokenize(summary))
+        elif not self.has_summary:
+            self.text_counts.update(self.analyzer.tokenize(text or ""))
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        counts = self.summary_counts if self.has_summary else self.text_counts
+        return counts.most_common(n)
+
+
+def write_excel_report(row_batches: Iterable[Sequence[Sequence[Any]]], output,
+                       analyzer: TermAnalyzer, max_keywords: int = 200) -> int:
+    """
+    Write the Summary, Comments and Keywords sheets of a consultation report.
+
+    Args:
+        row_batches: Batches of rows with the REPORT_COLUMNS fields
+        output: Binary file object the workbook is saved to
+        analyzer: Keyword tokenization rules
+        max_keywords: Keywords listed in the Keywords sheet
+
+    Returns:
+        int: Number of comment rows written (0: nothing was saved)
+    """
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet("Summary")
+    comments_sheet = workbook.create_sheet("Comments")
+    keywords_sheet = workbook.create_sheet("Keywords")
+
+    sentiment_counts: Counter = Counter()
+    keywords = KeywordAccumulator(analyzer)
+    row_count = 0
+
+    sentiment_column = REPORT_COLUMNS.index("sentiment")
+    for batch in row_batches:
+        for row in batch:
+            if not row_count:
+                comments_sheet.append(REPORT_COLUMNS)
+            values = list(row)
+            values[sentiment_column] = label_value(values[sentiment_column])
+            comments_sheet.append(values)
+
+            record = dict(zip(REPORT_COLUMNS, values))
+            sentiment_counts[record["sentiment"]] += 1
+            keywords.add(record["summary"], record["text"])
+            row_count += 1
+
+    if not row_count:
+        return 0
+
+    summary_sheet.append(["sentiment", "count"])
+    for label in SENTIMENT_ORDER:
+        summary_sheet.append([label, sentiment_counts.get(label, 0)])
+
+    keywords_sheet.append(["keyword", "count"])
+    for keyword, count in keywords.top(max_keywords):
+        keywords_sheet.append([keyword, count])
+
+    workbook.save(output)
+    return row_count
@@ -8,6 +8,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
 # Sentiment analysis libraries
@@ -115,6 +116,8 @@ class SentimentAnalyzer:
     
     def __init__(self):
         self.preprocessor = TextPreprocessor()
+        # Blocking entry points run on worker threads; pipelines load once under this lock
+        self._transformer_lock = threading.Lock()
         self._initialize_analyzers()
         self._initialize_emotion_patterns()
         self._initialize_aspect_patterns()
@@ -284,105 +287,146 @@ class SentimentAnalyzer:
         """Lazy-load transformer pipelines for English and multilingual texts."""
         if not self._transformer_ready:
             return
-        try:
-            if self._transformer_en is None:
-                # RoBERTa base sentiment for English
-                # cardiffnlp/twitter-roberta-base-sentiment-latest returns labels: negative/neutral/positive
-                self._transformer_en = pipeline(
-                    "text-classification",
-                    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                    top_k=None,
-                    device=-1
-                )
-            if self._transformer_multi is None:
-                # XLM-R multilingual sentiment
-                self._transformer_multi = pipeline(
-                    "text-classification",
-                    model="cardiffnlp/twitter-xlm-roberta-base-sentiment",
-                    top_k=None,
-                    device=-1
-                )
-
-                # IndicBERT for Indian languages (Hindi, etc.)
-                try:
-                    self._transformer_indic = pipeline(
+        with self._transformer_lock:
+            try:
+                if self._transformer_en is None:
+                    # RoBERTa base sentiment for English
+                    # cardiffnlp/twitter-roberta-base-sentiment-latest returns labels: negative/neutral/positive
+                    self._transformer_en = pipeline(
                         "text-classification",
-                        model="ai4bharat/indic-bert",
-                        tokenizer="ai4bharat/indic-bert",
+                        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
                         top_k=None,
                         device=-1
                     )
-                except Exception as e:
-                    print(f"⚠️ IndicBERT not available: {e}")
-                    self._transformer_indic = None
-        except Exception as e:
-            print(f"⚠️ Failed to initialize transformer pipelines: {e}")
-            self._transformer_ready = False
+                if self._transformer_multi is None:
+                    # XLM-R multilingual sentiment
+                    self._transformer_multi = pipeline(
+                        "text-classification",
+                        model="cardiffnlp/twitter-xlm-roberta-base-sentiment",
+                        top_k=None,
+                        device=-1
+                    )
+
+                    # IndicBERT for Indian languages (Hindi, etc.)
+                    try:
+                        self._transformer_indic = pipeline(
+                            "text-classification",
+                            model="ai4bharat/indic-bert",
+                            tokenizer="ai4bharat/indic-bert",
+                            top_k=None,
+                            device=-1
+                        )
+                    except Exception as e:
+                        print(f"⚠️ IndicBERT not available: {e}")
+                        self._transformer_indic = None
+            except Exception as e:
+                print(f"⚠️ Failed to initialize transformer pipelines: {e}")
+                self._transformer_ready = False
 
     async def _analyze_with_transformer(self, text: str) -> Optional[SentimentResult]:
         """Analyze sentiment using transformer models (English and multilingual)."""
+        return self._transformer_sentiment(text)
+
+    def _transformer_classifier(self, text: str) -> Tuple[Any, str]:
+        """Pick the transformer pipeline for the text's language; returns (pipeline or None, language)."""
+        self._ensure_transformers()
+        if not self._transformer_ready:
+            return None, ''
+        # Detect language to pick pipeline
+        lang, _ = self.preprocessor._detect_language(text)
+
+        # Select appropriate model based on language
+        if lang == 'en' and self._transformer_en is not None:
+            clf = self._transformer_en
+        elif lang in ['hi', 'bn', 'te', 'mr', 'ta', 'ur', 'gu', 'pa', 'or', 'as', 'mai', 'bho', 'awa', 'bh', 'new'] and self._transformer_indic is not None:
+            # Indic languages: Hindi, Bengali, Telugu, Marathi, Tamil, Urdu, Gujarati, Punjabi, Oriya, Assamese, Maithili, Bhojpuri, Awadhi, Bihari, Nepali
+            clf = self._transformer_indic
+        else:
+            clf = self._transformer_multi
+        return clf, lang
+
+    def _transformer_sentiment(self, text: str) -> Optional[SentimentResult]:
+        """Blocking transformer analysis of one text."""
         try:
-            self._ensure_transformers()
-            if not self._transformer_ready:
-                return None
-            # Detect language to pick pipeline
-            lang, _ = self.preprocessor._detect_language(text)
-
-            # Select appropriate model based on language
-            if lang == 'en' and self._transformer_en is not None:
-                clf = self._transformer_en
-            elif lang in ['hi', 'bn', 'te', 'mr', 'ta', 'ur', 'gu', 'pa', 'or', 'as', 'mai', 'bho', 'awa', 'bh', 'new'] and self._transformer_indic is not None:
-                # Indic languages: Hindi, Bengali, Telugu, Marathi, Tamil, Urdu, Gujarati, Punjabi, Oriya, Assamese, Maithili, Bhojpuri, Awadhi, Bihari, Nepali
-                clf = self._transformer_indic
-            else:
-                clf = self._transformer_multi
+            clf, lang = self._transformer_classifier(text)
             if clf is None:
                 return None
-            preds = clf(text)
-            # HF may return list of dicts or list[list[dict]] depending on top_k
-            scores_map: Dict[str, float] = { }
-            if preds and isinstance(preds, list):
-                first = preds[0]
-                if isinstance(first, dict) and 'label' in first:
-                    # Single best label only
-                    scores_map[first['label'].lower()] = float(first['score'])
-                elif isinstance(first, list):
-                    for item in first:
-                        scores_map[item['label'].lower()] = float(item['score'])
-            # Normalize keys to positive/neutral/negative
-            positive = scores_map.get('positive', scores_map.get('pos', 0.0))
-            neutral = scores_map.get('neutral', scores_map.get('neu', 0.0))
-            negative = scores_map.get('negative', scores_map.get('neg', 0.0))
-            # Pick label and confidence
-            components = {'positive': positive, 'negative': negative, 'neutral': neutral}
-            label_str = max(components, key=components.get) if components else 'neutral'
-            confidence = components.get(label_str, 0.0)
-
-            sentiment_label = {
-                'positive': SentimentLabel.POSITIVE,
-                'negative': SentimentLabel.NEGATIVE,
-                'neutral': SentimentLabel.NEUTRAL,
-            }[label_str]
-
-            # Generate explanation
-            explanation = f"Analysis using transformer model for language '{lang}'. "
-            explanation += f"Detected sentiment: {sentiment_label.value} with {confidence:.1%} confidence. "
-            explanation += f"Scores: Positive={positive:.2f}, Negative={negative:.2f}, Neutral={neutral:.2f}."
-
-            return SentimentResult(
-                method="Transformer",
-                sentiment_label=sentiment_label,
-                confidence_score=confidence,
-                positive_score=positive,
-                negative_score=negative,
-                neutral_score=neutral,
-                compound_score=None,
-                raw_scores={"model": "transformer", "lang": lang, **components},
-                explanation=explanation
-            )
+            return self._transformer_result(clf(text), lang)
         except Exception as e:
             print(f"Error in Transformer analysis: {e}")
             return None
+
+    def _transformer_sentiment_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        """Blocking transformer analysis of many texts: one pipeline call per model."""
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+
+        # Group the texts by pipeline so each model runs once over its texts
+        groups: Dict[int, Tuple[Any, List[Tuple[int, str]]]] = {}
+        for index, text in enumerate(texts):
+            try:
+                clf, lang = self._transformer_classifier(text)
+            except Exception as e:
+                print(f"Error in Transformer analysis: {e}")
+                continue
+            if clf is not None:
+                groups.setdefault(id(clf), (clf, []))[1].append((index, lang))
+
+        for clf, members in groups.values():
+            try:
+                predictions = clf([texts[index] for index, _ in members])
+                for (index, lang), preds in zip(members, predictions):
+                    results[index] = self._transformer_result([preds], lang)
+            except Exception as e:
+                print(f"Error in Transformer analysis: {e}")
+        return results
+
+    def _sentiment_batch(self, texts: List[str]) -> List[List[SentimentResult]]:
+        """Blocking batch counterpart of analyze_sentiment with its default (transformer) method."""
+        return [[result] if result else [] for result in self._transformer_sentiment_batch(texts)]
+
+    def _transformer_result(self, preds: Any, lang: str) -> SentimentResult:
+        """Build a SentimentResult from a pipeline's predictions for one text."""
+        # HF may return list of dicts or list[list[dict]] depending on top_k
+        scores_map: Dict[str, float] = { }
+        if preds and isinstance(preds, list):
+            first = preds[0]
+            if isinstance(first, dict) and 'label' in first:
+                # Single best label only
+                scores_map[first['label'].lower()] = float(first['score'])
+            elif isinstance(first, list):
+                for item in first:
+                    scores_map[item['label'].lower()] = float(item['score'])
+        # Normalize keys to positive/neutral/negative
+        positive = scores_map.get('positive', scores_map.get('pos', 0.0))
+        neutral = scores_map.get('neutral', scores_map.get('neu', 0.0))
+        negative = scores_map.get('negative', scores_map.get('neg', 0.0))
+        # Pick label and confidence
+        components = {'positive': positive, 'negative': negative, 'neutral': neutral}
+        label_str = max(components, key=components.get) if components else 'neutral'
+        confidence = components.get(label_str, 0.0)
+
+        sentiment_label = {
+            'positive': SentimentLabel.POSITIVE,
+            'negative': SentimentLabel.NEGATIVE,
+            'neutral': SentimentLabel.NEUTRAL,
+        }[label_str]
+
+        # Generate explanation
+        explanation = f"Analysis using transformer model for language '{lang}'. "
+        explanation += f"Detected sentiment: {sentiment_label.value} with {confidence:.1%} confidence. "
+        explanation += f"Scores: Positive={positive:.2f}, Negative={negative:.2f}, Neutral={neutral:.2f}."
+
+        return SentimentResult(
+            method="Transformer",
+            sentiment_label=sentiment_label,
+            confidence_score=confidence,
+            positive_score=positive,
+            negative_score=negative,
+            neutral_score=neutral,
+            compound_score=None,
+            raw_scores={"model": "transformer", "lang": lang, **components},
+            explanation=explanation
+        )
     
     async def _analyze_with_vader(self, text: str) -> Optional[SentimentResult]:
         """Analyze sentiment using VADER."""
@@ -561,7 +605,10 @@ class SentimentAnalyzer:
         Returns:
             EmotionResult: Detected emotions with scores
         """
-        text_lower = text.lower()
+        return self._emotions(text)
+
+    def _emotions(self, text: str) -> EmotionResult:
+        """Keyword-based emotions of one text."""
         emotion_scores = {}
         detected_emotions = []
         
@@ -606,79 +653,119 @@ class SentimentAnalyzer:
         Returns:
             SentimentResult: Policy-specific sentiment analysis
         """
-        try:
-            text_lower = text.lower()
-            
-            # Initialize scores
-            policy_scores = {
-                'strong_support': 0,
-                'support': 0,
-                'neutral_support': 0,
-                'neutral': 0,
-                'neutral_oppose': 0,
-                'oppose': 0,
-                'strong_oppose': 0
-            }
-            
-            # Count policy-specific keywords
-            word_count = len(text.split())
-            for category, keywords in self.policy_keywords.items():
-                if category in policy_scores:
-                    matches = sum(1 for keyword in keywords if keyword in text_lower)
-                    policy_scores[category] = matches / word_count if word_count > 0 else 0
-            
-            # Determine sentiment based on policy keywords
-            max_category = max(policy_scores, key=policy_scores.get)
-            max_score = policy_scores[max_category]
-            
-            # Map to sentiment labels
-            if max_category in ['strong_support', 'support', 'neutral_support']:
-                sentiment_label = SentimentLabel.POSITIVE
-                confidence = max_score * 2  # Boost confidence for clear policy language
-            elif max_category in ['strong_oppose', 'oppose', 'neutral_oppose']:
-                sentiment_label = SentimentLabel.NEGATIVE
-                confidence = max_score * 2
-            else:
-                sentiment_label = SentimentLabel.NEUTRAL
-                confidence = 0.7  # Default confidence for neutral
-            
-            # Ensure confidence is in valid range
-            confidence = min(confidence, 1.0)
-            if confidence < 0.3:  # If no clear policy keywords, fall back to transformer
-                transformer_result = await self._analyze_with_transformer(text)
-                if transformer_result:
-                    return transformer_result
-            
-            # Calculate component scores
-            positive_score = policy_scores['strong_support'] + policy_scores['support'] + policy_scores['neutral_support']
-            negative_score = policy_scores['strong_oppose'] + policy_scores['oppose'] + policy_scores['neutral_oppose']
-            neutral_score = policy_scores['neutral'] + (1 - positive_score - negative_score)
-            
-            # Normalize scores
-            total = positive_score + negative_score + neutral_score
-            if total > 0:
-                positive_score /= total
-                negative_score /= total
-                neutral_score /= total
-            
-            return SentimentResult(
-                method="Policy-Enhanced",
-                sentiment_label=sentiment_label,
-                confidence_score=confidence,
-                positive_score=positive_score,
-                negative_score=negative_score,
-                neutral_score=neutral_score,
-                raw_scores={
-                    "policy_categories": policy_scores,
-                    "max_category": max_category,
-                    "stakeholder_type": self._detect_stakeholder_type(text)
-                }
-            )
+        return self._policy_sentiment(text)
+
+    async def analyze_policy_sentiment_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        """
+        Policy sentiment for many comments in one call, run in a worker thread.
+        Comments without clear policy language fall back to the transformer
+        models in one pipeline call per model instead of one call per comment.
+        
+        Args:
+            texts: Comment texts to analyze
             
+        Returns:
+            list: One result per text (None where no analysis succeeded)
+        """
+        return await asyncio.to_thread(self._policy_sentiment_batch, texts)
+
+    def _policy_sentiment(self, text: str) -> Optional[SentimentResult]:
+        """Blocking policy sentiment of one text, with the transformer fallback."""
+        try:
+            result = self._policy_keyword_sentiment(text)
         except Exception as e:
             print(f"Error in policy sentiment analysis: {e}")
             # Fall back to transformer analysis
-            return await self._analyze_with_transformer(text)
+            return self._transformer_sentiment(text)
+        if result.confidence_score < 0.3:  # If no clear policy keywords, fall back to transformer
+            transformer_result = self._transformer_sentiment(text)
+            if transformer_result:
+                return transformer_result
+        return result
+
+    def _policy_sentiment_batch(self, texts: List[str]) -> List[Optional[SentimentResult]]:
+        """Blocking policy sentiment of many texts, batching the transformer fallbacks."""
+        results = [self._policy_keyword_sentiment_or_none(text) for text in texts]
+        fallbacks = [index for index, result in enumerate(results)
+                     if result is None or result.confidence_score < 0.3]
+        transformer_results = self._transformer_sentiment_batch([texts[index] for index in fallbacks])
+        for index, transformer_result in zip(fallbacks, transformer_results):
+            if transformer_result:
+                results[index] = transformer_result
+        return results
+
+    def _policy_keyword_sentiment_or_none(self, text: str) -> Optional[SentimentResult]:
+        try:
+            return self._policy_keyword_sentiment(text)
+        except Exception as e:
+            print(f"Error in policy sentiment analysis: {e}")
+            return None
+
+    def _policy_keyword_sentiment(self, text: str) -> SentimentResult:
+        """Score a comment by its policy keywords alone."""
+        text_lower = text.lower()
+        
+        # Initialize scores
+        policy_scores = {
+            'strong_support': 0,
+            'support': 0,
+            'neutral_support': 0,
+            'neutral': 0,
+            'neutral_oppose': 0,
+            'oppose': 0,
+            'strong_oppose': 0
+        }
+        
+        # Count policy-specific keywords
+        word_count = len(text.split())
+        for category, keywords in self.policy_keywords.items():
+            if category in policy_scores:
+                matches = sum(1 for keyword in keywords if keyword in text_lower)
+                policy_scores[category] = matches / word_count if word_count > 0 else 0
+        
+        # Determine sentiment based on policy keywords
+        max_category = max(policy_scores, key=policy_scores.get)
+        max_score = policy_scores[max_category]
+        
+        # Map to sentiment labels
+        if max_category in ['strong_support', 'support', 'neutral_support']:
+            sentiment_label = SentimentLabel.POSITIVE
+            confidence = max_score * 2  # Boost confidence for clear policy language
+        elif max_category in ['strong_oppose', 'oppose', 'neutral_oppose']:
+            sentiment_label = SentimentLabel.NEGATIVE
+            confidence = max_score * 2
+        else:
+            sentiment_label = SentimentLabel.NEUTRAL
+            confidence = 0.7  # Default confidence for neutral
+        
+        # Ensure confidence is in valid range
+        confidence = min(confidence, 1.0)
+        
+        # Calculate component scores
+        positive_score = policy_scores['strong_support'] + policy_scores['support'] + policy_scores['neutral_support']
+        negative_score = policy_scores['strong_oppose'] + policy_scores['oppose'] + policy_scores['neutral_oppose']
+        neutral_score = policy_scores['neutral'] + (1 - positive_score - negative_score)
+        
+        # Normalize scores
+        total = positive_score + negative_score + neutral_score
+        if total > 0:
+            positive_score /= total
+            negative_score /= total
+            neutral_score /= total
+        
+        return SentimentResult(
+            method="Policy-Enhanced",
+            sentiment_label=sentiment_label,
+            confidence_score=confidence,
+            positive_score=positive_score,
+            negative_score=negative_score,
+            neutral_score=neutral_score,
+            raw_scores={
+                "policy_categories": policy_scores,
+                "max_category": max_category,
+                "stakeholder_type": self._detect_stakeholder_type(text)
+            }
+        )
     
     def _detect_stakeholder_type(self, text: str) -> str:
         """Detect the type of stakeholder based on text content."""
@@ -708,37 +795,42 @@ class SentimentAnalyzer:
         """
         results = []
         
-        # Find law sections mentioned
-        law_sections = self._extract_law_sections(text)
-        
         # Analyze sentiment for each detected aspect
-        sentences = text.split('.')
+        for sentence, aspects in self._aspect_sentences(text):
+            # Analyze sentiment of this sentence
+            sentiment_results = await self.analyze_sentiment(sentence, [AnalysisMethod.TRANSFORMER])
+            
+            if sentiment_results:
+                results.extend(self._aspect_results(sentence, aspects, sentiment_results[0]))
         
-        for sentence in sentences:
+        return results
+
+    def _aspect_sentences(self, text: str) -> List[Tuple[str, List[str]]]:
+        """Sentences of a text that mention aspects, with those aspects."""
+        sentences = []
+        for sentence in text.split('.'):
             sentence = sentence.strip()
             if len(sentence) < 10:  # Skip very short sentences
                 continue
             
             # Check if sentence mentions legal terms or sections
             aspects = self._identify_aspects_in_sentence(sentence)
-            
             if aspects:
-                # Analyze sentiment of this sentence
-                sentiment_results = await self.analyze_sentiment(sentence, [AnalysisMethod.TRANSFORMER])
-                
-                if sentiment_results:
-                    sentiment_result = sentiment_results[0]
-                    
-                    for aspect in aspects:
-                        results.append(AspectSentimentResult(
-                            aspect=aspect,
-                            sentiment=sentiment_result.sentiment_label,
-                            confidence=sentiment_result.confidence_score,
-                            context=sentence,
-                            law_section=self._find_law_section_in_text(sentence)
-                        ))
-        
-        return results
+                sentences.append((sentence, aspects))
+        return sentences
+
+    def _aspect_results(self, sentence: str, aspects: List[str],
+                        sentiment_result: SentimentResult) -> List[AspectSentimentResult]:
+        return [
+            AspectSentimentResult(
+                aspect=aspect,
+                sentiment=sentiment_result.sentiment_label,
+                confidence=sentiment_result.confidence_score,
+                context=sentence,
+                law_section=self._find_law_section_in_text(sentence)
+            )
+            for aspect in aspects
+        ]
     
     def _extract_law_sections(self, text: str) -> List[str]:
         """Extract mentioned law sections from text."""
@@ -808,6 +900,49 @@ class SentimentAnalyzer:
         if policy_result:
             sentiment_results.append(policy_result)
         
+        processing_time = int((time.time() - start_time) * 1000)
+        return self._comprehensive_result(text, sentiment_results, emotion_result, aspect_sentiments, processing_time)
+
+    def _comprehensive_batch(self, texts: List[str]) -> List[ComprehensiveAnalysisResult]:
+        """
+        Blocking batch counterpart of comprehensive_analysis: the texts and
+        all their aspect sentences go through the transformer models in one
+        call per model, and the policy fallback reuses the text's result.
+        """
+        import time
+        start_time = time.time()
+
+        aspect_sentences = [self._aspect_sentences(text) for text in texts]
+        sentences = [sentence for per_text in aspect_sentences for sentence, _ in per_text]
+        transformer_results = self._transformer_sentiment_batch(list(texts) + sentences)
+        sentence_results = iter(transformer_results[len(texts):])
+
+        partial_results = []
+        for text, transformer_result, per_text in zip(texts, transformer_results, aspect_sentences):
+            sentiment_results = [transformer_result] if transformer_result else []
+
+            # Policy sentiment falls back to the transformer result without clear policy keywords
+            policy_result = self._policy_keyword_sentiment_or_none(text)
+            if (policy_result is None or policy_result.confidence_score < 0.3) and transformer_result:
+                policy_result = transformer_result
+            if policy_result:
+                sentiment_results.append(policy_result)
+
+            aspect_sentiments = []
+            for sentence, aspects in per_text:
+                sentence_result = next(sentence_results)
+                if sentence_result:
+                    aspect_sentiments.extend(self._aspect_results(sentence, aspects, sentence_result))
+            partial_results.append((text, sentiment_results, self._emotions(text), aspect_sentiments))
+
+        # The batch's processing time is shared evenly by its texts
+        processing_time = int((time.time() - start_time) * 1000 / max(1, len(texts)))
+        return [self._comprehensive_result(*partial, processing_time) for partial in partial_results]
+
+    def _comprehensive_result(self, text: str, sentiment_results: List[SentimentResult],
+                              emotion_result: EmotionResult, aspect_sentiments: List[AspectSentimentResult],
+                              processing_time: int) -> ComprehensiveAnalysisResult:
+        """Combine the analyses of one text into its comprehensive result."""
         # Extract key phrases
         key_phrases = []
         if self.preprocessor:
@@ -842,8 +977,6 @@ class SentimentAnalyzer:
             sentiment_results, emotion_result, aspect_sentiments, key_phrases
         )
         
-        processing_time = int((time.time() - start_time) * 1000)
-        
         return ComprehensiveAnalysisResult(
             text=text,
             sentiment_results=sentiment_results,
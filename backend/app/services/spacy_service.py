@@ -0,0 +1,215 @@
+"""
+Shared spaCy service with per-task pipeline selection and a Doc cache.
+Loads each spaCy model once, runs only the components a task needs and
+lets later stages reuse Docs that an earlier stage already produced.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    import spacy
+    _SPACY_AVAILABLE = True
+except Exception:
+    spacy = None  # type: ignore
+    _SPACY_AVAILABLE = False
+
+from backend.app.core.config import settings
+
+
+# Components each task depends on. Components missing from a model's
+# pipeline are simply skipped, so the same table works for small models,
+# large models and blank pipelines with a sentencizer.
+TASK_COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    # Tokens, lemmas and sentence boundaries for preprocessing
+    'lemmas': ('tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer', 'parser', 'senter', 'sentencizer'),
+    # noun_chunks need the parser, ents need the NER component
+    'phrases': ('tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer', 'parser', 'ner'),
+    # Doc.similarity only needs vectors / tensors
+    'vectors': ('tok2vec',),
+    'full': (),
+}
+
+
+class SpacyService:
+    """Wrapper around a spaCy model with task profiles and a bounded Doc cache."""
+
+    def __init__(self, model_name: str = "en_core_web_sm",
+                 cache_size: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 nlp=None):
+        self.model_name = model_name
+        self.cache_size = cache_size if cache_size is not None else settings.SPACY_DOC_CACHE_SIZE
+        self.batch_size = batch_size or settings.SPACY_PIPE_BATCH_SIZE
+        self._cache: "OrderedDict[str, Tuple[FrozenSet[str], object]]" = OrderedDict()
+        # select_pipes mutates the shared pipeline, so processing is serialized
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.truncated = 0
+
+        if nlp is not None:
+            self.nlp = nlp
+            return
+        try:
+            self.nlp = spacy.load(model_name) if _SPACY_AVAILABLE else None
+        except Exception:
+            print(f"⚠️ spaCy model {model_name} not available")
+            self.nlp = None
+
+    @property
+    def available(self) -> bool:
+        return self.nlp is not None
+
+    def components_for(self, task: str) -> FrozenSet[str]:
+        """Resolve the pipeline components a task needs for the loaded model."""
+        if not self.nlp:
+            return frozenset()
+        wanted = TASK_COMPONENTS.get(task, ())
+        if not wanted:
+            return frozenset(self.nlp.pipe_names)
+        return frozenset(name for name in self.nlp.pipe_names if name in wanted)
+
+    def process(self, text: str, task: str = 'full'):
+        """
+        Process a single text, reusing a cached Doc when possible.
+
+        Args:
+            text: Text to process
+            task: Task profile from TASK_COMPONENTS
+
+        Returns:
+            Doc or None if no model is loaded
+        """
+        docs = self.pipe([text], task=task)
+        return docs[0] if docs else None
+
+    def pipe(self, texts: Iterable[str], task: str = 'full',
+             batch_size: Optional[int] = None, use_cache: bool = True) -> List:
+        """
+        Process many texts with nlp.pipe in chunks, serving cache hits directly.
+
+        Args:
+            texts: Texts to process
+            task: Task profile from TASK_COMPONENTS
+            batch_size: Optional override of the nlp.pipe batch size
+            use_cache: Read and fill the Doc cache. Bulk one-off work (e.g.
+                vectorizing thousands of comments) passes False: it neither
+                evicts the cached Docs of interactive callers nor holds the
+                pipeline lock for longer than one batch at a time.
+
+        Returns:
+            list: Docs in the same order as the input texts
+        """
+        texts = [text or "" for text in texts]
+        if not self.nlp or not texts:
+            return []
+
+        components = self.components_for(task)
+        if not use_cache:
+            return self._pipe_uncached(texts, components, batch_size or self.batch_size)
+        docs: List = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._text_key(text)
+                cached = self._cache_get(key, components)
+                if cached is not None:
+                    docs[i] = cached
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending:
+                keys = list(pending.keys())
+                to_process = [self._fit_length(texts[pending[key][0]]) for key in keys]
+                disabled = [name for name in self.nlp.pipe_names if name not in components]
+
+                with self.nlp.select_pipes(disable=disabled):
+                    processed = self.nlp.pipe(to_process, batch_size=batch_size or self.batch_size)
+                    for key, doc in zip(keys, processed):
+                        self._cache_put(key, components, doc)
+                        for i in pending[key]:
+                            docs[i] = doc
+
+        return docs
+
+    def _pipe_uncached(self, texts: List[str], components: FrozenSet[str], batch_size: int) -> List:
+        """Process texts batch by batch, taking the pipeline lock per batch only."""
+        disabled = [name for name in self.nlp.pipe_names if name not in components]
+        docs: List = []
+        for start in range(0, len(texts), batch_size):
+            batch = [self._fit_length(text) for text in texts[start:start + batch_size]]
+            with self._lock:
+                with self.nlp.select_pipes(disable=disabled):
+                    docs.extend(self.nlp.pipe(batch, batch_size=batch_size))
+        return docs
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Return Doc cache statistics."""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.cache_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'truncated': self.truncated
+        }
+
+    def clear_cache(self):
+        """Drop all cached Docs."""
+        with self._lock:
+            self._cache.clear()
+
+    def _fit_length(self, text: str) -> str:
+        """
+        Truncate texts that would exceed the model's max_length.
+
+        Truncations are logged and counted in cache_stats(); the Doc of a
+        truncated text is cached like any other, as the same text is always
+        cut at the same point.
+        """
+        max_length = self.nlp.max_length
+        if len(text) <= max_length:
+            return text
+        self.truncated += 1
+        print(f"⚠️ spaCy input of {len(text)} characters truncated to max_length {max_length}")
+        return text[:max_length]
+
+    def _text_key(self, text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8', 'ignore')).hexdigest()
+
+    def _cache_get(self, key: str, components: FrozenSet[str]):
+        entry = self._cache.get(key)
+        # A Doc built with a superset of the needed components is reusable
+        if entry is not None and components <= entry[0]:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def _cache_put(self, key: str, components: FrozenSet[str], doc):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (components, doc)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+_services: Dict[str, SpacyService] = {}
+_services_lock = threading.Lock()
+
+
+def get_spacy_service(model_name: str = "en_core_web_sm") -> SpacyService:
+    """Return the process-wide SpacyService for a model, loading it on first use."""
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = SpacyService(model_name)
+            _services[model_name] = service
+        return service
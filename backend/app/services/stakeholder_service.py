@@ -0,0 +1,318 @@
+"""
+Stakeholder analysis pipeline.
+Every comment is scored exactly once into a table and tokenized once into the
+shared term-document matrix; stakeholder group profiles are group-by
+aggregations over them. Tables are cached
+by content hash so comparison, insight and word cloud requests over the same
+comments reuse them instead of re-analyzing.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.app.core.config import settings
+from backend.app.services.term_matrix import TermAnalyzer, TermDocumentMatrix, term_matrix_engine
+
+if TYPE_CHECKING:
+    from backend.app.services.sentiment_service import SentimentAnalyzer
+
+# Concern vocabulary per stakeholder type
+CONCERN_KEYWORDS: Dict[str, List[str]] = {
+    'business': ['cost', 'compliance', 'burden', 'impact', 'implementation', 'timeline'],
+    'individual': ['rights', 'privacy', 'access', 'fairness', 'transparency'],
+    'ngo': ['social', 'environment', 'community', 'protection', 'welfare'],
+    'academic': ['research', 'evidence', 'methodology', 'data', 'analysis'],
+    'legal': ['constitution', 'jurisdiction', 'precedent', 'enforcement', 'liability'],
+    'government': ['coordination', 'resources', 'authority', 'implementation', 'oversight']
+}
+ALL_CONCERNS: List[str] = list(dict.fromkeys(
+    keyword for keywords in CONCERN_KEYWORDS.values() for keyword in keywords
+))
+
+
+class ProfileVectors:
+    """
+    Stakeholder profiles encoded as matrices for pairwise comparison.
+
+    Rows follow the profile order. sentiment is a one-hot of the dominant
+    sentiment, stance a one-hot of the policy stance and concerns a binary
+    bag-of-words over every group's key concerns (columns in order of first
+    appearance). Profiles are objects with dominant_sentiment, policy_stance
+    and key_concerns attributes.
+    """
+
+    def __init__(self, profiles: Dict[str, Any]):
+        self.types = list(profiles)
+        items = list(profiles.values())
+
+        sentiments = [profile.dominant_sentiment for profile in items]
+        self.sentiment_labels = list(dict.fromkeys(sentiments))
+        self.sentiment = self._one_hot(sentiments, self.sentiment_labels)
+
+        stances = [profile.policy_stance for profile in items]
+        self.stances = list(dict.fromkeys(stances))
+        self.stance = self._one_hot(stances, self.stances)
+
+        self.vocabulary = list(dict.fromkeys(concern for profile in items for concern in profile.key_concerns))
+        column = {concern: index for index, concern in enumerate(self.vocabulary)}
+        self.concerns = np.zeros((len(items), len(self.vocabulary)), dtype=np.float64)
+        rows = [row for row, profile in enumerate(items) for concern in profile.key_concerns]
+        columns = [column[concern] for profile in items for concern in profile.key_concerns]
+        self.concerns[rows, columns] = 1.0
+
+    @staticmethod
+    def _one_hot(values: List[str], labels: List[str]) -> np.ndarray:
+        index = {label: position for position, label in enumerate(labels)}
+        matrix = np.zeros((len(values), len(labels)), dtype=np.float64)
+        matrix[np.arange(len(values)), [index[value] for value in values]] = 1.0
+        return matrix
+
+    def concern_jaccard(self) -> np.ndarray:
+        """Pairwise Jaccard similarity of the groups' concern sets (0 when both are empty)."""
+        intersection = self.concerns @ self.concerns.T
+        sizes = self.concerns.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - intersection
+        return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    def alignment(self, sentiment_weight: float = 0.4, concern_weight: float = 0.4,
+                  stance_weight: float = 0.2) -> np.ndarray:
+        """
+        Pairwise alignment: weighted agreement on dominant sentiment, concern
+        overlap and policy stance, with 1.0 on the diagonal.
+        """
+        matrix = (
+            (self.sentiment @ self.sentiment.T) * sentiment_weight
+            + self.concern_jaccard() * concern_weight
+            + (self.stance @ self.stance.T) * stance_weight
+        )
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+    def concern_counts(self) -> np.ndarray:
+        """Number of groups raising each concern (vocabulary order)."""
+        return self.concerns.sum(axis=0)
+
+    def groups_with_unique_concerns(self) -> np.ndarray:
+        """Boolean mask of groups raising a concern no other group raises."""
+        if not self.vocabulary:
+            return np.zeros(len(self.types), dtype=bool)
+        return (self.concerns[:, self.concern_counts() == 1] > 0).any(axis=1)
+
+    def stance_counts(self) -> Dict[str, int]:
+        return dict(zip(self.stances, self.stance.sum(axis=0).astype(int).tolist()))
+
+    def dominant_sentiment_counts(self) -> Dict[str, int]:
+        """Groups per dominant sentiment, in order of first appearance."""
+        counts = self.sentiment.sum(axis=0).astype(int).tolist()
+        return {label: count for label, count in zip(self.sentiment_labels, counts) if count}
+
+
+# Key phrase terms: lower-cased alphabetic words longer than three characters
+PHRASE_ANALYZER = TermAnalyzer(name="stakeholder_phrases", min_length=4, alpha_only=True)
+
+
+def tokenize_for_phrases(text: str) -> List[str]:
+    """Lower-cased alphabetic words longer than three characters."""
+    return PHRASE_ANALYZER.tokenize(text)
+
+
+class StakeholderTable:
+    """
+    Scored comments plus their stakeholder group membership.
+
+    scores has one row per distinct comment (text, sentiment, confidence,
+    positive/negative scores, word count and one boolean column per concern
+    keyword); membership maps each group to score rows, in the order
+    comments were submitted. Key phrase counts come from the term-document
+    matrix of the score rows.
+    """
+
+    def __init__(self, table_id: str, scores: pd.DataFrame, membership: pd.DataFrame):
+        self.table_id = table_id
+        self.scores = scores
+        self.membership = membership
+        self._profiles: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def terms(self) -> TermDocumentMatrix:
+        """Phrase term-document matrix of the score rows (shared engine cache)."""
+        return term_matrix_engine.build(self.scores["text"].tolist(), PHRASE_ANALYZER)
+
+    @property
+    def groups(self) -> List[str]:
+        return list(dict.fromkeys(self.membership["group"]))
+
+    def group_rows(self, stakeholder_type: str) -> pd.DataFrame:
+        """Scored comments of one stakeholder group, in submission order."""
+        rows = self.membership.loc[self.membership["group"] == stakeholder_type, "row"]
+        return self.scores.loc[rows.to_numpy()]
+
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Profile fields per stakeholder group (computed once per table)."""
+        if self._profiles is None:
+            self._profiles = self._build_profiles()
+        return self._profiles
+
+    def _build_profiles(self) -> Dict[str, Dict[str, Any]]:
+        frame = self.scores.loc[self.membership["row"].to_numpy()].reset_index(drop=True)
+        frame["group"] = self.membership["group"].to_numpy()
+        grouped = frame.groupby("group", sort=False)
+
+        counts = grouped.size()
+        confidence = grouped["confidence"].mean()
+
+        # Sentiment counts in order of first appearance within each group
+        sentiment_counts = frame.groupby(["group", "sentiment"], sort=False).size()
+
+        # Concerns: keywords of the group's own vocabulary found in any of its comments
+        concern_hits = grouped[ALL_CONCERNS].any() if ALL_CONCERNS else None
+
+        # Key phrases: most frequent terms over the group's rows, ties in order of first appearance
+        terms = self.terms
+        group_rows = self.membership.groupby("group", sort=False)["row"]
+
+        # Representatives: per sentiment, the comment closest to 20 words
+        frame["length_distance"] = (frame["word_count"] - 20).abs()
+        representatives = frame.groupby(["group", "sentiment"], sort=False)["length_distance"].idxmin()
+
+        profiles = {}
+        for group, comment_count in counts.items():
+            distribution = sentiment_counts.loc[group]
+            positive_ratio = distribution.get("positive", 0) / comment_count
+            negative_ratio = distribution.get("negative", 0) / comment_count
+            if positive_ratio > 0.6:
+                policy_stance = "support"
+            elif negative_ratio > 0.6:
+                policy_stance = "oppose"
+            else:
+                policy_stance = "neutral"
+
+            concerns = [
+                keyword for keyword in CONCERN_KEYWORDS.get(group, [])
+                if concern_hits is not None and concern_hits.at[group, keyword]
+            ]
+            phrases = [term for term, _ in terms.top_terms(10, rows=group_rows.get_group(group).to_numpy())]
+
+            profiles[group] = {
+                "stakeholder_type": group,
+                "comment_count": int(comment_count),
+                "sentiment_distribution": {label: int(count) for label, count in distribution.items()},
+                "dominant_sentiment": distribution.idxmax() if len(distribution) else "neutral",
+                "average_confidence": float(confidence.loc[group]),
+                "key_concerns": concerns[:5],
+                "key_phrases": phrases,
+                "representative_comments": frame.loc[representatives.loc[group].to_numpy(), "text"].tolist()[:3],
+                "policy_stance": policy_stance
+            }
+        return profiles
+
+
+class StakeholderAnalysisService:
+    """Scores comments once and serves stakeholder tables from a bounded cache."""
+
+    def __init__(self, sentiment_analyzer: Optional["SentimentAnalyzer"] = None,
+                 cache_size: Optional[int] = None):
+        if sentiment_analyzer is None:
+            # Imported here so the service can be built around any analyzer
+            # without loading the sentiment models
+            from backend.app.services.sentiment_service import SentimentAnalyzer
+            sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment_analyzer = sentiment_analyzer
+        self.cache_size = cache_size if cache_size is not None else settings.STAKEHOLDER_TABLE_CACHE_SIZE
+        self._tables: "OrderedDict[str, StakeholderTable]" = OrderedDict()
+
+    async def analyze(self, texts: List[str],
+                      groups: Optional[Dict[str, List[int]]] = None) -> StakeholderTable:
+        """
+        Build (or fetch from cache) the stakeholder table for a set of comments.
+
+        Args:
+            texts: Comment texts
+            groups: Optional stakeholder_type -> comment indices; stakeholder
+                types are auto-detected when omitted
+
+        Returns:
+            StakeholderTable: Scored comments and group membership
+        """
+        table_id = self._table_id(texts, groups)
+        table = self.get(table_id)
+        if table is not None:
+            return table
+
+        # Identical comments (campaign copies) are scored once
+        unique_texts = list(dict.fromkeys(texts))
+        row_of = {text: row for row, text in enumerate(unique_texts)}
+        scores = await self.score_comments(unique_texts)
+
+        if groups is None:
+            detected = [self.sentiment_analyzer._detect_stakeholder_type(text) for text in unique_texts]
+            membership = pd.DataFrame({
+                "group": [detected[row_of[text]] for text in texts],
+                "row": [row_of[text] for text in texts]
+            })
+        else:
+            pairs = [
+                (group, row_of[texts[index]])
+                for group, indices in groups.items()
+                for index in indices
+                if 0 <= index < len(texts)
+            ]
+            membership = pd.DataFrame(pairs, columns=["group", "row"])
+
+        table = StakeholderTable(table_id, scores, membership)
+        self._remember(table)
+        return table
+
+    async def score_comments(self, texts: List[str]) -> pd.DataFrame:
+        """
+        Single scoring pass: policy sentiment and concern hits per comment.
+        All texts go to the analyzer in one batch call, which runs off the
+        event loop.
+
+        Args:
+            texts: Distinct comment texts
+
+        Returns:
+            pd.DataFrame: One row per text
+        """
+        results = await self.sentiment_analyzer.analyze_policy_sentiment_batch(texts)
+
+        scores = pd.DataFrame({
+            "text": texts,
+            "sentiment": [result.sentiment_label.value if result else "neutral" for result in results],
+            "confidence": [result.confidence_score if result else 0.0 for result in results],
+            "positive_score": [result.positive_score if result else 0.0 for result in results],
+            "negative_score": [result.negative_score if result else 0.0 for result in results],
+            "word_count": [len(text.split()) for text in texts]
+        })
+
+        lowered = scores["text"].str.lower()
+        for keyword in ALL_CONCERNS:
+            scores[keyword] = lowered.str.contains(keyword, regex=False)
+        return scores
+
+    def get(self, table_id: str) -> Optional[StakeholderTable]:
+        """Cached table by ID, or None if unknown or evicted."""
+        table = self._tables.get(table_id)
+        if table is not None:
+            self._tables.move_to_end(table_id)
+        return table
+
+    def _remember(self, table: StakeholderTable):
+        if self.cache_size <= 0:
+            return
+        self._tables[table.table_id] = table
+        while len(self._tables) > self.cache_size:
+            self._tables.popitem(last=False)
+
+    @staticmethod
+    def _table_id(texts: List[str], groups: Optional[Dict[str, List[int]]]) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(texts, ensure_ascii=False).encode("utf-8"))
+        digest.update(json.dumps(groups, sort_keys=False).encode("utf-8"))
+        return digest.hexdigest()[:32]
@@ -9,17 +9,11 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
-from collections import defaultdict, Counter
+from collections import defaultdict
 import numpy as np
 from functools import lru_cache
 
 # NLP libraries
-try:
-    import spacy
-    _SPACY_SUMMARY_AVAILABLE = True
-except Exception:
-    spacy = None  # type: ignore
-    _SPACY_SUMMARY_AVAILABLE = False
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
@@ -45,6 +39,12 @@ except Exception:
     print("⚠️ Transformers not available for abstractive summarization")
 
 from backend.app.core.config import settings
+from backend.app.services.spacy_service import get_spacy_service
+from backend.app.services.campaign_clustering import CampaignClusterer
+from backend.app.services.term_matrix import TermAnalyzer, TermDocumentMatrix, term_matrix_engine
+
+# Fallback key themes: words of four or more characters
+THEME_WORD_ANALYZER = TermAnalyzer(name="summary_themes", pattern=re.compile(r'\b\w{4,}\b'))
 
 
 class SummarizationType(str, Enum):
@@ -221,6 +221,7 @@ class SummarizationService:
     def __init__(self):
         self._initialize_models()
         self.custom_textrank = TextRankSummarizer()
+        self.campaign_clusterer = CampaignClusterer()
         self._initialize_policy_keywords()
     
     def _initialize_policy_keywords(self):
@@ -260,12 +261,11 @@ class SummarizationService:
     def _initialize_models(self):
         """Initialize summarization models and tools."""
         try:
-            # Load spaCy model if available
-            try:
-                self.nlp = spacy.load("en_core_web_sm") if _SPACY_SUMMARY_AVAILABLE else None
-            except Exception:
+            # Shared spaCy model and Doc cache
+            self.spacy_service = get_spacy_service("en_core_web_sm")
+            self.nlp = self.spacy_service.nlp
+            if not self.nlp:
                 print("⚠️ spaCy model not available")
-                self.nlp = None
             
             # Initialize Sumy summarizers
             self.sumy_summarizers = {
@@ -344,6 +344,11 @@ class SummarizationService:
         Returns:
             SummaryResult: Summarization result
         """
+        return self._extractive_summary(text, method, num_sentences)
+
+    def _extractive_summary(self, text: str, method: SummarizationMethod = SummarizationMethod.TEXTRANK,
+                            num_sentences: int = 3) -> SummaryResult:
+        """Blocking extractive summarization; reads shared models only, so pool threads may call it."""
         import time
         start_time = time.time()
         
@@ -656,8 +661,10 @@ class SummarizationService:
         Returns:
             SummaryResult: Summary of all comments
         """
-        # Combine all comments
-        combined_text = ' '.join(comments)
+        # Combine comments, with each campaign template contributing once
+        # (copies are dropped, not weighted by member count)
+        clusters = self.campaign_clusterer.cluster(comments)
+        combined_text = ' '.join(cluster.representative_text for cluster in clusters)
         
         # Choose summarization approach based on type
         if summary_type == SummarizationType.EXTRACTIVE:
@@ -671,7 +678,8 @@ class SummarizationService:
         result.metadata.update({
             "source_type": "multiple_comments",
             "comment_count": len(comments),
-            "average_comment_length": len(combined_text) / len(comments) if comments else 0
+            "unique_comment_count": len(clusters),
+            "average_comment_length": sum(len(comment) for comment in comments) / len(comments) if comments else 0
         })
         
         return result
@@ -690,6 +698,11 @@ class SummarizationService:
         Returns:
             SummaryResult: Policy-enhanced summary
         """
+        return self._policy_summary(text, stakeholder_type, focus_areas)
+
+    def _policy_summary(self, text: str, stakeholder_type: Optional[str] = None,
+                        focus_areas: Optional[List[str]] = None) -> SummaryResult:
+        """Blocking policy summarization; reads shared models only, so pool threads may call it."""
         import time
         start_time = time.time()
         
@@ -769,7 +782,7 @@ class SummarizationService:
         except Exception as e:
             print(f"Error in policy summarization: {e}")
             # Fallback to regular extractive summarization
-            return await self.extractive_summarization(text, SummarizationMethod.CUSTOM_TEXTRANK)
+            return self._extractive_summary(text, SummarizationMethod.CUSTOM_TEXTRANK)
     
     def _detect_stakeholder_type(self, text: str) -> str:
         """Detect stakeholder type from text content."""
@@ -904,30 +917,32 @@ class SummarizationService:
         if not comments:
             return []
         
-        # Combine all comments
-        combined_text = ' '.join(comments).lower()
-        
         # Remove common words and extract meaningful terms
         if self.nlp:
-            doc = self.nlp(combined_text)
-            # Extract noun phrases and named entities
-            themes = []
-            for chunk in doc.noun_chunks:
-                if len(chunk.text.strip()) > 3 and chunk.text.strip() not in ['the', 'and', 'for', 'with']:
-                    themes.append(chunk.text.strip())
-            
-            for ent in doc.ents:
-                if ent.label_ in ['ORG', 'PERSON', 'GPE', 'LAW'] and len(ent.text.strip()) > 2:
-                    themes.append(ent.text.strip())
+            # Parse comments individually in nlp.pipe batches instead of one
+            # concatenated Doc, which can exceed max_length and defeats the cache
+            docs = self.spacy_service.pipe(
+                (comment.lower() for comment in comments), task='phrases'
+            )
+            # Extract noun phrases and named entities, one row of themes per comment
+            comment_themes = []
+            for doc in docs:
+                themes = []
+                for chunk in doc.noun_chunks:
+                    if len(chunk.text.strip()) > 3 and chunk.text.strip() not in ['the', 'and', 'for', 'with']:
+                        themes.append(chunk.text.strip())
+                
+                for ent in doc.ents:
+                    if ent.label_ in ['ORG', 'PERSON', 'GPE', 'LAW'] and len(ent.text.strip()) > 2:
+                        themes.append(ent.text.strip())
+                comment_themes.append(themes)
+            matrix = TermDocumentMatrix.from_tokens(comment_themes)
         else:
-            # Fallback: simple word frequency
-            words = re.findall(r'\b\w{4,}\b', combined_text)
-            theme_counts = Counter(words)
-            themes = [word for word, count in theme_counts.most_common(max_themes * 2)]
+            # Fallback: simple word frequency on the shared term-document matrix
+            matrix = term_matrix_engine.build(comments, THEME_WORD_ANALYZER)
         
         # Return most common themes
-        theme_counts = Counter(themes)
-        return [theme for theme, count in theme_counts.most_common(max_themes)]
+        return [theme for theme, count in matrix.top_terms(max_themes)]
     
     async def batch_summarization(self, texts: List[str], 
                                 method: SummarizationMethod = SummarizationMethod.CUSTOM_TEXTRANK,
@@ -0,0 +1,320 @@
+"""
+Shared term-document matrix engine.
+A comment set is tokenized once into a sparse CSR matrix (documents x terms,
+raw counts) and cached by corpus hash and tokenizer. Keyword, theme and word
+frequency features query that matrix with NumPy/SciPy operations: top-k
+terms, TF-IDF, per-group frequencies and co-occurrence. Tokenization rules
+differ per feature, so each caller passes a TermAnalyzer; matrices of the
+same comments under the same analyzer are shared.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+
+@dataclass(frozen=True)
+class TermAnalyzer:
+    """
+    Tokenization rules of a feature.
+
+    Tokens are the matches of pattern (whitespace-separated words when
+    pattern is None) after the strip_patterns spans are removed in turn,
+    filtered by length, stopwords and the alpha_only / drop_numeric flags.
+    """
+    name: str
+    pattern: Optional[Pattern] = None
+    lowercase: bool = True
+    min_length: int = 1
+    stopwords: FrozenSet[str] = frozenset()
+    alpha_only: bool = False
+    drop_numeric: bool = False
+    strip_patterns: Tuple[Pattern, ...] = ()
+
+    def tokenize(self, text: str) -> List[str]:
+        if not text:
+            return []
+        if self.lowercase:
+            text = text.lower()
+        for strip_pattern in self.strip_patterns:
+            text = strip_pattern.sub(" ", text)
+        words = self.pattern.findall(text) if self.pattern is not None else text.split()
+        return [
+            word for word in words
+            if len(word) >= self.min_length
+            and word not in self.stopwords
+            and (not self.alpha_only or word.isalpha())
+            and (not self.drop_numeric or not word.isdigit())
+        ]
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the rules, part of the matrix cache key."""
+        return json.dumps([
+            self.name,
+            self.pattern.pattern if self.pattern is not None else None,
+            self.lowercase,
+            self.min_length,
+            sorted(self.stopwords),
+            self.alpha_only,
+            self.drop_numeric,
+            [strip_pattern.pattern for strip_pattern in self.strip_patterns]
+        ])
+
+
+# \w+ words, nothing filtered
+WORD_ANALYZER = TermAnalyzer(name="words", pattern=re.compile(r"\b\w+\b"))
+
+
+class TermDocumentMatrix:
+    """
+    Documents x terms count matrix of one corpus.
+
+    Terms are numbered in order of first appearance in the corpus; positions
+    holds, for every non-zero count, the index of the term's first token in
+    its document. Both are used to break count ties in first-seen order, as
+    Counter.most_common does over a token stream.
+    """
+
+    def __init__(self, vocabulary: List[str], counts: sparse.csr_matrix, positions: sparse.csr_matrix):
+        self.vocabulary = vocabulary
+        self.term_index: Dict[str, int] = {term: index for index, term in enumerate(vocabulary)}
+        self.counts = counts
+        self.positions = positions
+
+    @classmethod
+    def from_tokens(cls, documents: Iterable[Sequence[str]]) -> "TermDocumentMatrix":
+        """Build the matrix from already tokenized documents."""
+        term_index: Dict[str, int] = {}
+        rows: List[int] = []
+        columns: List[int] = []
+        offsets: List[int] = []
+        document_count = 0
+        for row, tokens in enumerate(documents):
+            document_count += 1
+            for offset, token in enumerate(tokens):
+                rows.append(row)
+                columns.append(term_index.setdefault(token, len(term_index)))
+                offsets.append(offset)
+
+        shape = (document_count, len(term_index))
+        rows_array = np.asarray(rows, dtype=np.int64)
+        columns_array = np.asarray(columns, dtype=np.int64)
+
+        # Duplicate (row, column) entries are summed by the CSR conversion
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows_array, columns_array)), shape=shape
+        )
+        counts.sum_duplicates()
+
+        # First token offset per (row, column): keep the earliest of each pair
+        positions = sparse.csr_matrix(shape, dtype=np.int64)
+        if rows:
+            order = np.lexsort((np.asarray(offsets, dtype=np.int64), columns_array, rows_array))
+            pairs = rows_array[order] * max(1, shape[1]) + columns_array[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pairs[1:] != pairs[:-1]
+            keep = order[first]
+            positions = sparse.csr_matrix(
+                # Stored +1 so a first-token offset of 0 is not an implicit zero
+                (np.asarray(offsets, dtype=np.int64)[keep] + 1, (rows_array[keep], columns_array[keep])),
+                shape=shape
+            )
+        return cls(list(term_index), counts, positions)
+
+    @property
+    def document_count(self) -> int:
+        return self.counts.shape[0]
+
+    def term_counts(self) -> np.ndarray:
+        """Total count of every term over the corpus."""
+        return np.asarray(self.counts.sum(axis=0)).ravel()
+
+    def document_frequency(self) -> np.ndarray:
+        """Number of documents containing each term."""
+        return np.diff(self.counts.tocsc().indptr)
+
+    def top_terms(self, k: Optional[int] = None, rows: Optional[Sequence[int]] = None) -> List[Tuple[str, int]]:
+        """
+        Most frequent terms, ties in order of first appearance.
+
+        Args:
+            k: Number of terms (None: every term with a non-zero count)
+            rows: Documents to count, in order; repeated rows count again
+                (None: the whole corpus in document order)
+
+        Returns:
+            list: (term, count) pairs, most frequent first
+        """
+        if rows is None:
+            counts = self.term_counts()
+            first_seen = np.arange(len(self.vocabulary))
+        else:
+            counts, first_seen = self._row_counts(np.asarray(rows, dtype=np.int64))
+        return self._select(counts, first_seen, k)
+
+    def _row_counts(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        term_total = len(self.vocabulary)
+        if len(rows) == 0:
+            return np.zeros(term_total, dtype=np.int64), np.zeros(term_total, dtype=np.int64)
+
+        unique_rows, first_index, multiplicity = np.unique(rows, return_index=True, return_counts=True)
+        counts = np.asarray(self.counts[unique_rows].T @ multiplicity).ravel()
+
+        # First appearance: (order of the row's first use, token offset in the row)
+        row_rank = np.empty(len(unique_rows), dtype=np.int64)
+        row_rank[np.argsort(first_index, kind="stable")] = np.arange(len(unique_rows))
+        positions = self.positions[unique_rows].tocoo()
+        longest = int(positions.data.max()) + 1 if positions.nnz else 1
+        first_seen = np.full(term_total, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_seen, positions.col, row_rank[positions.row] * longest + positions.data)
+        return counts, first_seen
+
+    def _select(self, scores: np.ndarray, first_seen: np.ndarray, k: Optional[int]) -> List[Tuple[str, int]]:
+        candidates = np.flatnonzero(scores > 0)
+        if k is not None and k < len(candidates):
+            # Everything scoring at least the k-th best survives, then an exact ordering
+            threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = candidates[np.lexsort((first_seen[candidates], -scores[candidates]))]
+        if k is not None:
+            order = order[:k]
+        return [(self.vocabulary[index], scores[index].item()) for index in order]
+
+    def tfidf(self, smooth: bool = True, sublinear: bool = False) -> sparse.csr_matrix:
+        """
+        TF-IDF weights (l2-normalized rows), as scikit-learn's TfidfTransformer.
+
+        Args:
+            smooth: Add one to document frequencies
+            sublinear: Use 1 + log(tf) instead of raw counts
+
+        Returns:
+            sparse.csr_matrix: documents x terms
+        """
+        document_total = self.document_count + int(smooth)
+        frequency = self.document_frequency() + int(smooth)
+        idf = np.log(document_total / np.maximum(frequency, 1)) + 1.0
+
+        weights = self.counts.astype(np.float64)
+        if sublinear:
+            weights.data = np.log(weights.data) + 1.0
+        weights = weights @ sparse.diags(idf)
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ weights)
+
+    def top_tfidf_terms(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Terms with the highest summed TF-IDF weight over the corpus."""
+        scores = np.asarray(self.tfidf().sum(axis=0)).ravel()
+        return self._select(scores, np.arange(len(self.vocabulary)), k)
+
+    def group_term_counts(self, groups: Sequence[str]) -> Tuple[List[str], sparse.csr_matrix]:
+        """
+        Term counts per group.
+
+        Args:
+            groups: Group label of every document
+
+        Returns:
+            tuple: (group labels in order of first appearance, groups x terms counts)
+        """
+        labels = list(dict.fromkeys(groups))
+        label_index = {label: index for index, label in enumerate(labels)}
+        membership = sparse.csr_matrix(
+            (
+                np.ones(len(groups), dtype=np.int64),
+                ([label_index[label] for label in groups], np.arange(len(groups)))
+            ),
+            shape=(len(labels), self.document_count)
+        )
+        return labels, sparse.csr_matrix(membership @ self.counts)
+
+    def cooccurrence(self) -> sparse.csr_matrix:
+        """Number of documents in which each pair of terms occurs together (terms x terms)."""
+        presence = (self.counts > 0).astype(np.int64)
+        return sparse.csr_matrix(presence.T @ presence)
+
+    def cooccurring_terms(self, term: str, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Terms sharing the most documents with term."""
+        index = self.term_index.get(term)
+        if index is None:
+            return []
+        presence = (self.counts > 0).astype(np.int64)
+        documents = presence[:, index].toarray().ravel()
+        shared = np.asarray(presence.T @ documents).ravel()
+        shared[index] = 0
+        return self._select(shared, np.arange(len(self.vocabulary)), k)
+
+    def terms_containing(self, fragment: str) -> List[str]:
+        """Vocabulary terms that contain fragment (substring match)."""
+        return [term for term in self.vocabulary if fragment in term]
+
+
+class TermMatrixEngine:
+    """Builds term-document matrices and keeps them in an LRU cache keyed by corpus hash."""
+
+    def __init__(self, cache_size: Optional[int] = None):
+        # None: TERM_MATRIX_CACHE_SIZE, read on first use (see cache_size)
+        self._cache_size = cache_size
+        self._matrices: "OrderedDict[str, TermDocumentMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def cache_size(self) -> int:
+        # The engine is imported by standalone scripts too, which must not load
+        # the backend config (and its startup prints); they read the variable itself
+        if self._cache_size is None:
+            config = sys.modules.get("backend.app.core.config")
+            if config is not None:
+                self._cache_size = config.settings.TERM_MATRIX_CACHE_SIZE
+            else:
+                self._cache_size = int(os.getenv("TERM_MATRIX_CACHE_SIZE", "32"))
+        return self._cache_size
+
+    def build(self, texts: Sequence[str], analyzer: TermAnalyzer = WORD_ANALYZER) -> TermDocumentMatrix:
+        """
+        Term-document matrix of texts under analyzer (cached).
+
+        Args:
+            texts: Documents, one row each
+            analyzer: Tokenization rules
+
+        Returns:
+            TermDocumentMatrix: The corpus matrix
+        """
+        key = self.corpus_key(texts, analyzer)
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self._matrices.move_to_end(key)
+                return matrix
+
+        matrix = TermDocumentMatrix.from_tokens(analyzer.tokenize(text or "") for text in texts)
+
+        with self._lock:
+            if self.cache_size > 0:
+                self._matrices[key] = matrix
+                while len(self._matrices) > self.cache_size:
+                    self._matrices.popitem(last=False)
+        return matrix
+
+    @staticmethod
+    def corpus_key(texts: Sequence[str], analyzer: TermAnalyzer) -> str:
+        digest = hashlib.sha256(analyzer.key.encode("utf-8"))
+        digest.update(json.dumps(list(texts), ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+
+# Shared engine for the process
+term_matrix_engine = TermMatrixEngine()
@@ -0,0 +1,576 @@
+"""
+Per-sentiment term statistics for word clouds.
+Counts of every term per (sentiment label, stakeholder type), with sentiment
+and confidence sums and a small reservoir of contextual examples, are
+accumulated once when comments are analyzed. Word cloud requests read the
+top-N terms of a slice from running totals instead of re-tokenizing and
+rescanning the comments. Statistics are stored per consultation in MongoDB,
+so every API worker reads the same counts and they survive restarts; each
+worker applies only the counts recorded since its cached copy.
+"""
+
+import random
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import quote, unquote
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from backend.app.core.config import settings
+
+# Words kept on each side of a term in stored examples
+EXAMPLE_CONTEXT_WORDS = 5
+EXAMPLES_PER_TERM = 3
+# A compaction not finished within this time may be taken over by another process
+COMPACTION_LEASE_SECONDS = 300
+
+# Slice key: (sentiment label, stakeholder type); None matches any
+SliceKey = Tuple[Optional[str], Optional[str]]
+
+
+def label_for_score(score: float) -> str:
+    """Label of a (mean) sentiment score."""
+    if score > 0.1:
+        return 'positive'
+    if score < -0.1:
+        return 'negative'
+    return 'neutral'
+
+
+def sentiment_label_of(result: Dict[str, Any]) -> str:
+    """Sentiment label of one analysis result (its own label, else from its score)."""
+    label = result.get('sentiment_label') or result.get('sentiment')
+    if isinstance(label, str) and label:
+        return label.lower()
+    return label_for_score(result.get('sentiment_score', 0.0))
+
+
+def merge_reservoirs(first: Sequence, first_seen: int, second: Sequence, second_seen: int,
+                     size: int, rng: random.Random) -> List:
+    """
+    Merge two reservoir samples into one of at most size examples.
+
+    Each kept example is drawn from either sample in proportion to the number
+    of contexts that sample was taken from, so the result is again a sample
+    of all contexts seen by both rather than of the earliest ones.
+    """
+    first = list(first)
+    second = [example for example in second if example not in first]
+    merged = []
+    while len(merged) < size and (first or second):
+        if second and (not first or rng.random() * (first_seen + second_seen) >= first_seen):
+            side = second
+        else:
+            side = first
+        merged.append(side.pop(rng.randrange(len(side))))
+    return merged
+
+
+class TermStatistics:
+    """
+    Running term counts of one set of analyzed comments.
+
+    cells[term][(label, stakeholder)] holds [count, sentiment_sum,
+    confidence_sum]. totals holds one Counter per slice, including the
+    label-only, stakeholder-only and overall margins, so top-N of any slice
+    is a heap selection over its counter. Ties keep first-seen term order.
+    """
+
+    def __init__(self, examples_per_term: int = EXAMPLES_PER_TERM, seed: int = 0):
+        self.examples_per_term = examples_per_term
+        self.cells: Dict[str, Dict[Tuple[str, str], List[float]]] = {}
+        self.totals: Dict[SliceKey, Counter] = {}
+        self.examples: Dict[str, List[Tuple[Tuple[str, ...], int]]] = {}
+        self._examples_seen: Counter = Counter()
+        self._random = random.Random(seed)
+        self.comment_count = 0
+
+    def add(self, tokens: Sequence[str], text: str, results: Sequence[Dict[str, Any]]):
+        """
+        Add one comment text, analyzed once, on behalf of every comment it stands for.
+
+        Args:
+            tokens: Tokens of the text (a term counts once per occurrence)
+            text: Comment text, for contextual examples
+            results: Analysis results of each comment with this text (one
+                per campaign cluster member); sentiment_score,
+                confidence_score, sentiment label and stakeholder_type are used
+        """
+        if not results:
+            return
+        self.comment_count += len(results)
+
+        # Members sharing a label and stakeholder type are one weighted update
+        groups: Dict[Tuple[str, str], List[float]] = {}
+        for result in results:
+            key = (sentiment_label_of(result), result.get('stakeholder_type') or 'unknown')
+            group = groups.setdefault(key, [0, 0.0, 0.0])
+            group[0] += 1
+            group[1] += result.get('sentiment_score', 0.0)
+            group[2] += result.get('confidence_score', 0.5)
+
+        words = text.split()
+        for token in tokens:
+            for (label, stakeholder), (count, sentiment_sum, confidence_sum) in groups.items():
+                self.add_cell(token, label, stakeholder, count, sentiment_sum, confidence_sum)
+            self._add_example(token, words)
+
+    def add_cell(self, term: str, label: str, stakeholder: str, count: int,
+                 sentiment_sum: float, confidence_sum: float):
+        """Add counts of a term within one (label, stakeholder) slice and its margins."""
+        cell = self.cells.setdefault(term, {}).setdefault((label, stakeholder), [0, 0.0, 0.0])
+        cell[0] += count
+        cell[1] += sentiment_sum
+        cell[2] += confidence_sum
+        for slice_key in ((None, None), (label, None), (None, stakeholder), (label, stakeholder)):
+            self.totals.setdefault(slice_key, Counter())[term] += count
+
+    def _add_example(self, token: str, words: List[str]):
+        # Context around the first word containing the term
+        position = next((j for j, word in enumerate(words) if token.lower() in word.lower()), -1)
+        if position < 0:
+            return
+        start = max(0, position - EXAMPLE_CONTEXT_WORDS)
+        example = (tuple(words[start:position + EXAMPLE_CONTEXT_WORDS + 1]), position - start)
+
+        examples = self.examples.setdefault(token, [])
+        if example in examples:
+            return
+        # Reservoir sampling: every distinct context has the same chance to be kept
+        self._examples_seen[token] += 1
+        if len(examples) < self.examples_per_term:
+            examples.append(example)
+        else:
+            slot = self._random.randrange(self._examples_seen[token])
+            if slot < self.examples_per_term:
+                examples[slot] = example
+
+    def examples_seen(self, term: str) -> int:
+        """Number of distinct contexts the examples of a term were sampled from."""
+        return self._examples_seen[term]
+
+    def merge_examples(self, term: str, examples: Sequence[Tuple[Tuple[str, ...], int]], seen: int):
+        """Merge another reservoir of a term, sampled from seen distinct contexts, into this one."""
+        merged = merge_reservoirs(self.examples.get(term, []), self._examples_seen[term], examples, seen,
+                                  self.examples_per_term, self._random)
+        self._examples_seen[term] += seen
+        if merged:
+            self.examples[term] = merged
+
+    def top_terms(self, n: Optional[int] = None, sentiment_label: Optional[str] = None,
+                  stakeholder_type: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Most frequent terms of a slice.
+
+        Args:
+            n: Number of terms (None: all, in descending count)
+            sentiment_label: Only comments with this label
+            stakeholder_type: Only comments of this stakeholder type
+
+        Returns:
+            list: (term, count) pairs
+        """
+        totals = self.totals.get((sentiment_label, stakeholder_type))
+        if not totals:
+            return []
+        return totals.most_common(n)
+
+    def term_summary(self, term: str, sentiment_label: Optional[str] = None,
+                     stakeholder_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Count, mean sentiment score, mean confidence and stakeholder types of
+        a term within a slice.
+        """
+        count = 0
+        sentiment_sum = 0.0
+        confidence_sum = 0.0
+        stakeholders: Set[str] = set()
+        for (label, stakeholder), cell in self.cells.get(term, {}).items():
+            if sentiment_label is not None and label != sentiment_label:
+                continue
+            if stakeholder_type is not None and stakeholder != stakeholder_type:
+                continue
+            count += cell[0]
+            sentiment_sum += cell[1]
+            confidence_sum += cell[2]
+            stakeholders.add(stakeholder)
+        return {
+            'frequency': count,
+            'sentiment_score': sentiment_sum / count if count else 0.0,
+            'confidence': confidence_sum / count if count else 0.0,
+            'stakeholder_types': stakeholders
+        }
+
+    def contextual_examples(self, term: str, context_words: int = EXAMPLE_CONTEXT_WORDS) -> List[str]:
+        """Stored examples of a term, trimmed to context_words on each side."""
+        snippets = []
+        for words, position in self.examples.get(term, []):
+            start = max(0, position - context_words)
+            snippets.append(' '.join(words[start:position + context_words + 1]))
+        return snippets
+
+    def stakeholder_types(self) -> List[str]:
+        return [stakeholder for label, stakeholder in self.totals if label is None and stakeholder is not None]
+
+
+def _cell_field(label: str, stakeholder: str) -> str:
+    """Document field name of a cell; '.', '$' and the separator are escaped."""
+    return f"{quote(label, safe='')}|{quote(stakeholder, safe='')}".replace('.', '%2E')
+
+
+def _cell_key(field: str) -> Tuple[str, str]:
+    label, stakeholder = field.split('|')
+    return unquote(label), unquote(stakeholder)
+
+
+def _apply_delta(statistics: TermStatistics, delta: Dict[str, Any], applied: Optional[Dict[str, int]] = None):
+    """
+    Add one stored delta to statistics.
+
+    Terms whose document already includes the delta's version (per applied)
+    are skipped.
+    """
+    version = delta["version"]
+    statistics.comment_count += delta.get("comment_count", 0)
+    for term, label, stakeholder, count, sentiment_sum, confidence_sum in delta.get("cells", []):
+        if applied and applied.get(term, 0) >= version:
+            continue
+        statistics.add_cell(term, label, stakeholder, count, sentiment_sum, confidence_sum)
+    for term, seen, examples in delta.get("examples", []):
+        if applied and applied.get(term, 0) >= version:
+            continue
+        statistics.merge_examples(term, [(tuple(words), position) for words, position in examples], seen)
+
+
+class TermStatisticsStore:
+    """
+    Term statistics per consultation, persisted in MongoDB.
+
+    Every add is stored as numbered delta documents. A version is taken by
+    inserting its delta under a unique (consultation, version) index, so
+    versions have no gaps and concurrent recorders never overwrite each
+    other. A cached copy is brought up to date by applying only the deltas
+    past its version, so a read costs the new counts rather than the whole
+    vocabulary. Every compact_versions versions, the deltas are folded into
+    one document per term under a lease; each term document keeps the last
+    version folded into it, so an interrupted compaction is finished without
+    counting a delta twice. The keys of recorded comments are kept as well,
+    so recording a comment again does not count it twice. Cached statistics
+    are kept for max_consultations consultations (LRU).
+    """
+
+    consultations_collection = "term_statistics"
+    terms_collection = "term_statistics_terms"
+    deltas_collection = "term_statistics_deltas"
+    comments_collection = "term_statistics_comments"
+
+    def __init__(self, max_consultations: Optional[int] = None, delta_terms: Optional[int] = None,
+                 compact_versions: Optional[int] = None):
+        self.max_consultations = (
+            max_consultations if max_consultations is not None else settings.TERM_STATISTICS_MAX_CONSULTATIONS
+        )
+        self.delta_terms = delta_terms if delta_terms is not None else settings.TERM_STATISTICS_DELTA_TERMS
+        self.compact_versions = (
+            compact_versions if compact_versions is not None else settings.TERM_STATISTICS_COMPACT_VERSIONS
+        )
+        # consultation_id -> (version applied, statistics)
+        self._cache: "OrderedDict[str, Tuple[int, TermStatistics]]" = OrderedDict()
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase):
+        """Create the term, delta and recorded-comment lookup indexes."""
+        await db[self.terms_collection].create_index([("consultation_id", 1), ("term", 1)], unique=True)
+        await db[self.deltas_collection].create_index([("consultation_id", 1), ("version", 1)], unique=True)
+        await db[self.comments_collection].create_index([("consultation_id", 1), ("key", 1)], unique=True)
+
+    async def get(self, db: AsyncIOMotorDatabase, consultation_id: str) -> Optional[TermStatistics]:
+        """Statistics of a consultation, or None if nothing was recorded."""
+        header = await db[self.consultations_collection].find_one({"_id": consultation_id})
+        if header is None:
+            self._cache.pop(consultation_id, None)
+            return None
+
+        cached = self._cache.get(consultation_id)
+        if cached is not None and cached[0] >= header.get("pruned_version", 0):
+            deltas = await self._deltas(db, consultation_id, cached[0])
+            # Another read may have brought the cached copy further meanwhile
+            cached = self._cache.get(consultation_id, cached)
+            if deltas and deltas[0]["version"] > cached[0] + 1:
+                # The deltas it still needs were compacted away meanwhile
+                cached = None
+            else:
+                version, statistics = cached
+                for delta in deltas:
+                    if delta["version"] == version + 1:
+                        _apply_delta(statistics, delta)
+                        version = delta["version"]
+                cached = (version, statistics)
+        else:
+            cached = None
+        if cached is None:
+            cached = await self._load(db, consultation_id)
+
+        self._cache[consultation_id] = cached
+        self._cache.move_to_end(consultation_id)
+        while len(self._cache) > self.max_consultations:
+            # Only the cached copy is dropped; the next read loads it again
+            self._cache.popitem(last=False)
+        return cached[1]
+
+    async def _deltas(self, db: AsyncIOMotorDatabase, consultation_id: str, after: int,
+                      until: Optional[int] = None) -> List[Dict[str, Any]]:
+        versions: Dict[str, Any] = {"$gt": after}
+        if until is not None:
+            versions["$lte"] = until
+        cursor = db[self.deltas_collection].find({"consultation_id": consultation_id, "version": versions})
+        return [delta async for delta in cursor.sort("version", 1)]
+
+    async def _load(self, db: AsyncIOMotorDatabase, consultation_id: str) -> Tuple[int, TermStatistics]:
+        while True:
+            header = await db[self.consultations_collection].find_one({"_id": consultation_id}) or {}
+            compacted = header.get("compacted_version", 0)
+            statistics = TermStatistics()
+            statistics.comment_count = header.get("comment_count", 0)
+
+            # Terms load in the order they were first recorded, which keeps count ties stable
+            applied: Dict[str, int] = {}
+            cursor = db[self.terms_collection].find({"consultation_id": consultation_id}).sort("_id", 1)
+            async for document in cursor:
+                term = document["term"]
+                applied[term] = document.get("applied_version") or 0
+                for field, cell in document.get("cells", {}).items():
+                    label, stakeholder = _cell_key(field)
+                    statistics.add_cell(term, label, stakeholder, cell["count"],
+                                        cell["sentiment_sum"], cell["confidence_sum"])
+                examples = [(tuple(words), position) for words, position in document.get("examples", [])]
+                statistics.merge_examples(term, examples, document.get("examples_seen", len(examples)))
+
+            deltas = await self._deltas(db, consultation_id, compacted)
+            if deltas and deltas[0]["version"] != compacted + 1:
+                # Compacted twice while loading; start over
+                continue
+            # Terms folded by a compaction running meanwhile skip the deltas they include
+            version = compacted
+            for delta in deltas:
+                _apply_delta(statistics, delta, applied)
+                version = delta["version"]
+            return version, statistics
+
+    async def claim(self, db: AsyncIOMotorDatabase, consultation_id: str,
+                    comment_keys: Sequence[str]) -> List[int]:
+        """
+        Mark comments as recorded for a consultation.
+
+        Args:
+            db: Database
+            consultation_id: Consultation ID
+            comment_keys: Stable key per comment (e.g. its comment ID)
+
+        Returns:
+            list: Indexes into comment_keys of the comments not recorded before
+        """
+        first_index = {}
+        for index, key in enumerate(comment_keys):
+            first_index.setdefault(key, index)
+        if not first_index:
+            return []
+
+        now = datetime.utcnow()
+        keys = list(first_index)
+        try:
+            await db[self.comments_collection].insert_many(
+                [{"consultation_id": consultation_id, "key": key, "recorded_at": now} for key in keys],
+                ordered=False
+            )
+            duplicates = set()
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            duplicates = {keys[error["index"]] for error in e.details["writeErrors"]}
+        return [first_index[key] for key in keys if key not in duplicates]
+
+    async def release(self, db: AsyncIOMotorDatabase, consultation_id: str, comment_keys: Iterable[str]):
+        """Undo claim for comments whose statistics could not be stored."""
+        await db[self.comments_collection].delete_many(
+            {"consultation_id": consultation_id, "key": {"$in": list(comment_keys)}}
+        )
+
+    async def add(self, db: AsyncIOMotorDatabase, consultation_id: str, statistics: TermStatistics) -> int:
+        """
+        Add the counts of claimed comments to a consultation's stored statistics.
+
+        Returns:
+            int: Number of comments now recorded for the consultation
+        """
+        header = await db[self.consultations_collection].find_one_and_update(
+            {"_id": consultation_id},
+            {"$setOnInsert": {"compacted_version": 0, "pruned_version": 0, "comment_count": 0},
+             "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        version = header["compacted_version"]
+        for delta in self._delta_documents(statistics):
+            version = await self._insert_delta(db, consultation_id, delta, version)
+        if version - header["compacted_version"] >= self.compact_versions:
+            await self.compact(db, consultation_id)
+
+        current = await self.get(db, consultation_id)
+        return current.comment_count if current is not None else 0
+
+    def _delta_documents(self, statistics: TermStatistics) -> List[Dict[str, Any]]:
+        # At most delta_terms terms per document keeps deltas of large batches below the document size limit
+        terms = list(statistics.cells)
+        documents = []
+        for start in range(0, len(terms), self.delta_terms):
+            chunk = terms[start:start + self.delta_terms]
+            documents.append({
+                "comment_count": 0,
+                "cells": [
+                    [term, label, stakeholder, count, sentiment_sum, confidence_sum]
+                    for term in chunk
+                    for (label, stakeholder), (count, sentiment_sum, confidence_sum) in statistics.cells[term].items()
+                ],
+                "examples": [
+                    [term, statistics.examples_seen(term),
+                     [[list(words), position] for words, position in statistics.examples[term]]]
+                    for term in chunk if statistics.examples.get(term)
+                ]
+            })
+        if statistics.comment_count:
+            if not documents:
+                documents.append({"cells": [], "examples": []})
+            documents[0]["comment_count"] = statistics.comment_count
+        return documents
+
+    async def _insert_delta(self, db: AsyncIOMotorDatabase, consultation_id: str,
+                            delta: Dict[str, Any], after: int) -> int:
+        last = await db[self.deltas_collection].find_one(
+            {"consultation_id": consultation_id}, sort=[("version", -1)]
+        )
+        version = max(after, last["version"] if last else 0)
+        while True:
+            version += 1
+            try:
+                await db[self.deltas_collection].insert_one({
+                    **delta, "consultation_id": consultation_id, "version": version,
+                    "created_at": datetime.utcnow()
+                })
+                return version
+            except DuplicateKeyError:
+                # Taken by a concurrent recorder; the next number is tried
+                continue
+
+    async def compact(self, db: AsyncIOMotorDatabase, consultation_id: str) -> bool:
+        """
+        Fold a consultation's deltas into its term documents.
+
+        Returns:
+            bool: False if another process holds the compaction lease
+        """
+        now = datetime.utcnow()
+        header = await db[self.consultations_collection].find_one_and_update(
+            {"_id": consultation_id, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"lease_until": now + timedelta(seconds=COMPACTION_LEASE_SECONDS)}},
+            return_document=ReturnDocument.AFTER
+        )
+        if header is None:
+            return False
+
+        compacted = header["compacted_version"]
+        # An interrupted compaction is finished over the same versions
+        target = header.get("compacting_to")
+        if target is None:
+            last = await db[self.deltas_collection].find_one(
+                {"consultation_id": consultation_id}, sort=[("version", -1)]
+            )
+            target = last["version"] if last else compacted
+            await db[self.consultations_collection].update_one(
+                {"_id": consultation_id}, {"$set": {"compacting_to": target}}
+            )
+
+        merged = TermStatistics()
+        for delta in await self._deltas(db, consultation_id, compacted, target):
+            _apply_delta(merged, delta)
+
+        terms = list(merged.cells)
+        for start in range(0, len(terms), self.delta_terms):
+            chunk = terms[start:start + self.delta_terms]
+            existing = {}
+            cursor = db[self.terms_collection].find({"consultation_id": consultation_id, "term": {"$in": chunk}})
+            async for document in cursor:
+                existing[document["term"]] = document
+
+            updates = []
+            inserts = []
+            for term in chunk:
+                document = existing.get(term)
+                applied = document.get("applied_version") if document is not None else None
+                if applied is not None and applied > compacted:
+                    # Folded before the previous attempt was interrupted
+                    continue
+                examples = merged.examples.get(term, [])
+                seen = merged.examples_seen(term)
+                if document is not None:
+                    stored = [(tuple(words), position) for words, position in document.get("examples", [])]
+                    stored_seen = document.get("examples_seen", len(stored))
+                    examples = merge_reservoirs(stored, stored_seen, examples, seen,
+                                                merged.examples_per_term, merged._random)
+                    seen += stored_seen
+                cells = {}
+                for (label, stakeholder), (count, sentiment_sum, confidence_sum) in merged.cells[term].items():
+                    cells[_cell_field(label, stakeholder)] = {
+                        "count": count, "sentiment_sum": sentiment_sum, "confidence_sum": confidence_sum
+                    }
+                folded = {
+                    "examples": [[list(words), position] for words, position in examples],
+                    "examples_seen": seen,
+                    "applied_version": target
+                }
+                if document is None:
+                    inserts.append({"consultation_id": consultation_id, "term": term, "cells": cells, **folded})
+                    continue
+                increments = {}
+                for field, cell in cells.items():
+                    for name, value in cell.items():
+                        increments[f"cells.{field}.{name}"] = value
+                # Matching the version read keeps a concurrent compactor from folding the term twice
+                updates.append(UpdateOne({"_id": document["_id"], "applied_version": applied},
+                                         {"$inc": increments, "$set": folded}))
+            if updates:
+                await db[self.terms_collection].bulk_write(updates, ordered=False)
+            if inserts:
+                try:
+                    await db[self.terms_collection].insert_many(inserts, ordered=False)
+                except BulkWriteError as e:
+                    if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                        raise
+
+        # Deltas up to the previous compaction are dropped now; readers still
+        # applying the ones just folded find them until the next compaction
+        await db[self.consultations_collection].update_one(
+            {"_id": consultation_id, "compacted_version": compacted},
+            {"$set": {"compacted_version": target, "pruned_version": compacted},
+             "$inc": {"comment_count": merged.comment_count},
+             "$unset": {"compacting_to": "", "lease_until": ""}}
+        )
+        await db[self.deltas_collection].delete_many(
+            {"consultation_id": consultation_id, "version": {"$lte": compacted}}
+        )
+        return True
+
+    async def delete(self, db: AsyncIOMotorDatabase, consultation_id: str) -> bool:
+        """Drop a consultation's statistics and recorded comment keys."""
+        self._cache.pop(consultation_id, None)
+        result = await db[self.consultations_collection].delete_one({"_id": consultation_id})
+        await db[self.terms_collection].delete_many({"consultation_id": consultation_id})
+        await db[self.deltas_collection].delete_many({"consultation_id": consultation_id})
+        await db[self.comments_collection].delete_many({"consultation_id": consultation_id})
+        return result.deleted_count > 0
+
+
+# Shared store for the process (its cache is per process; the statistics are in MongoDB)
+term_statistics_store = TermStatisticsStore()
@@ -13,6 +13,11 @@ import numpy as np
 from wordcloud import WordCloud
 from PIL import Image
 
+from backend.app.services.campaign_clustering import CampaignClusterer
+from backend.app.services.term_statistics import TermStatistics, label_for_score, term_statistics_store
+from backend.app.services.term_matrix import TermAnalyzer, TermDocumentMatrix, term_matrix_engine
+from backend.app.services.wordcloud_cache import wordcloud_cache_key, wordcloud_image_cache
+
 # Lightweight stopwords list (avoid heavy runtime downloads). Extend as needed.
 BASIC_STOPWORDS = set(
     [
@@ -26,6 +31,11 @@ BASIC_STOPWORDS = set(
 )
 
 TOKEN_PATTERN = re.compile(r"[A-Za-z]{2,}")
+# URLs, then emails, are blanked before tokenizing
+STRIP_PATTERNS = (re.compile(r"https?://\S+"), re.compile(r"\S+@\S+"))
+
+# Fixed layout seed: a cached image and a re-render of the same key are identical
+WORDCLOUD_RANDOM_STATE = 42
 
 
 @dataclass
@@ -42,25 +52,29 @@ class SentimentTaggedWord:
 class VisualizationService:
     """Helper service to prepare tokens, frequencies, and word cloud image bytes."""
 
+    def __init__(self):
+        self.campaign_clusterer = CampaignClusterer()
+
+    def token_analyzer(self, min_len: int = 3) -> TermAnalyzer:
+        """Word cloud tokenization rules: lowercase alpha words of min_len+ characters, no stopwords."""
+        return TermAnalyzer(
+            name="wordcloud",
+            pattern=TOKEN_PATTERN,
+            min_length=min_len,
+            stopwords=frozenset(BASIC_STOPWORDS),
+            strip_patterns=STRIP_PATTERNS
+        )
+
+    def term_matrix(self, texts: List[str], min_len: int = 3) -> TermDocumentMatrix:
+        """Term-document matrix of texts under the word cloud rules (shared, cached by corpus)."""
+        return term_matrix_engine.build(texts, self.token_analyzer(min_len))
+
     async def prepare_tokens(self, texts: List[str], min_len: int = 3) -> List[str]:
         """Clean, tokenize, and filter tokens from a list of texts."""
+        analyzer = self.token_analyzer(min_len)
         tokens: List[str] = []
         for t in texts:
-            if not t:
-                continue
-            # Basic normalize
-            s = t.lower()
-            # Remove URLs/emails rudimentarily
-            s = re.sub(r"https?://\S+", " ", s)
-            s = re.sub(r"\S+@\S+", " ", s)
-            # Extract alpha tokens
-            words = TOKEN_PATTERN.findall(s)
-            for w in words:
-                if len(w) < min_len:
-                    continue
-                if w in BASIC_STOPWORDS:
-                    continue
-                tokens.append(w)
+            tokens.extend(analyzer.tokenize(t))
         return tokens
 
     def compute_frequencies(self, tokens: Iterable[str], max_words: int = 100) -> Dict[str, int]:
@@ -69,8 +83,29 @@ class VisualizationService:
         most_common = counter.most_common(max_words)
         return {k: int(v) for k, v in most_common}
 
+    def text_frequencies(self, texts: List[str], max_words: int = 100, min_len: int = 3) -> Dict[str, int]:
+        """
+        Top-N word frequencies of texts, read from the shared term-document matrix.
+
+        Same result as compute_frequencies(prepare_tokens(texts)); repeated
+        requests for one comment set reuse the cached matrix.
+        """
+        return dict(self.term_matrix(texts, min_len).top_terms(max_words))
+
+    def wordcloud_image_key(self, frequencies: Dict[str, int], width: int = 800, height: int = 400) -> str:
+        """Cache key of the image generate_wordcloud_image returns for these arguments."""
+        return wordcloud_cache_key(frequencies, width, height, style="basic")
+
+    def sentiment_wordcloud_key(self, words: Dict[str, SentimentTaggedWord], width: int = 800,
+                                height: int = 400) -> str:
+        """Cache key of a sentiment-tagged word cloud (frequencies plus sentiment colors)."""
+        return wordcloud_cache_key(
+            {word: data.frequency for word, data in words.items()}, width, height,
+            style="sentiment", labels={word: data.sentiment_label for word, data in words.items()}
+        )
+
     def generate_wordcloud_image(self, frequencies: Dict[str, int], width: int = 800, height: int = 400) -> bytes:
-        """Generate a PNG image for a word cloud and return raw bytes."""
+        """Generate a PNG image for a word cloud and return raw bytes (cached per frequencies and size)."""
         if not frequencies:
             # Empty transparent image
             img = Image.new("RGBA", (width, height), (255, 255, 255, 0))
@@ -78,7 +113,13 @@ class VisualizationService:
             img.save(bio, format="PNG")
             return bio.getvalue()
 
-        wc = WordCloud(width=width, height=height, background_color="white")
+        return wordcloud_image_cache.get_or_render(
+            self.wordcloud_image_key(frequencies, width, height),
+            lambda: self._render_wordcloud(frequencies, width, height)
+        )
+
+    def _render_wordcloud(self, frequencies: Dict[str, int], width: int, height: int) -> bytes:
+        wc = WordCloud(width=width, height=height, background_color="white", random_state=WORDCLOUD_RANDOM_STATE)
         wc.generate_from_frequencies(frequencies)
 
         img = wc.to_image()
@@ -91,7 +132,10 @@ class VisualizationService:
                                                 analysis_results: List[Dict],
                                                 width: int = 800,
                                                 height: int = 400,
-                                                max_words: int = 100) -> Tuple[bytes, Dict[str, SentimentTaggedWord]]:
+                                                max_words: int = 100,
+                                                statistics: Optional[TermStatistics] = None,
+                                                sentiment_label: Optional[str] = None,
+                                                stakeholder_type: Optional[str] = None) -> Tuple[bytes, Dict[str, SentimentTaggedWord]]:
         """
         Create a sentiment-tagged word cloud with contextual examples.
 
@@ -101,25 +145,28 @@ class VisualizationService:
             width: Width of the word cloud image
             height: Height of the word cloud image
             max_words: Maximum number of words to include
+            statistics: Precomputed term statistics (e.g. a consultation's
+                from term_statistics_store); texts and analysis_results are
+                ignored when given
+            sentiment_label: Only words of comments with this label
+            stakeholder_type: Only words of comments from this stakeholder type
 
         Returns:
             Tuple of (wordcloud_image_bytes, word_sentiment_data)
         """
-        # Create sentiment-tagged word data
-        sentiment_words = await self._create_sentiment_word_data(texts, analysis_results)
+        if statistics is None:
+            statistics = await self.build_term_statistics(texts, analysis_results)
 
-        # Filter to top words by frequency
-        top_words = dict(sorted(sentiment_words.items(),
-                               key=lambda x: x[1].frequency,
-                               reverse=True)[:max_words])
+        # Top words by frequency, read from the statistics
+        top_words = self.sentiment_word_data(statistics, max_words, sentiment_label, stakeholder_type)
 
         # Create frequency dict for word cloud
         frequencies = {word: data.frequency for word, data in top_words.items()}
 
         # Generate color function based on sentiment
         def sentiment_color_func(word, font_size, position, orientation, random_state=None, **kwargs):
-            if word in sentiment_words:
-                sentiment = sentiment_words[word].sentiment_label
+            if word in top_words:
+                sentiment = top_words[word].sentiment_label
                 if sentiment == 'positive':
                     return "hsl(120, 100%, 30%)"  # Green
                 elif sentiment == 'negative':
@@ -128,87 +175,128 @@ class VisualizationService:
                     return "hsl(60, 100%, 30%)"   # Yellow
             return "hsl(0, 0%, 50%)"  # Gray fallback
 
-        # Generate word cloud with sentiment colors
-        wc = WordCloud(
-            width=width,
-            height=height,
-            background_color="white",
-            color_func=sentiment_color_func
-        )
-        wc.generate_from_frequencies(frequencies)
+        def render() -> bytes:
+            # Generate word cloud with sentiment colors
+            wc = WordCloud(
+                width=width,
+                height=height,
+                background_color="white",
+                color_func=sentiment_color_func,
+                random_state=WORDCLOUD_RANDOM_STATE
+            )
+            wc.generate_from_frequencies(frequencies)
+
+            img = wc.to_image()
+            bio = BytesIO()
+            img.save(bio, format="PNG")
+            return bio.getvalue()
 
-        img = wc.to_image()
-        bio = BytesIO()
-        img.save(bio, format="PNG")
-        image_bytes = bio.getvalue()
+        image_bytes = wordcloud_image_cache.get_or_render(
+            self.sentiment_wordcloud_key(top_words, width, height), render
+        )
 
         return image_bytes, top_words
 
-    async def _create_sentiment_word_data(self,
-                                         texts: List[str],
-                                         analysis_results: List[Dict]) -> Dict[str, SentimentTaggedWord]:
-        """
-        Create sentiment-tagged word data with contextual examples.
+    async def build_term_statistics(self, texts: List[str], analysis_results: List[Dict],
+                                    statistics: Optional[TermStatistics] = None) -> TermStatistics:
         """
-        word_data = {}
+        Accumulate term statistics of analyzed comments.
+
+        Campaign copies (grouped by the cluster ID stored at ingestion) are
+        tokenized once and counted once per member.
 
-        for text, result in zip(texts, analysis_results):
-            # Get sentiment information from result
-            sentiment_label = result.get('sentiment_label', 'neutral')
-            sentiment_score = result.get('sentiment_score', 0.0)
-            confidence = result.get('confidence_score', 0.5)
+        Args:
+            texts: Comment texts
+            analysis_results: Analysis result per text (sentiment_score,
+                confidence_score, sentiment label, stakeholder_type)
+            statistics: Statistics to add to (a new one when omitted)
 
-            # Tokenize text
+        Returns:
+            TermStatistics: The updated statistics
+        """
+        if statistics is None:
+            statistics = TermStatistics()
+        pairs = [(text, analysis_results[i]) for i, text in enumerate(texts)
+                 if text and i < len(analysis_results)]
+
+        clusters = self.campaign_clusterer.group(
+            [text for text, _ in pairs],
+            [result.get('campaign_cluster_id') for _, result in pairs]
+        )
+        for cluster in clusters:
+            text = cluster.representative_text
             tokens = await self.prepare_tokens([text])
+            statistics.add(tokens, text, [pairs[i][1] for i in cluster.member_indexes])
+        return statistics
 
-            # Create contextual examples (short snippets around each word)
-            for i, token in enumerate(tokens):
-                if token not in word_data:
-                    word_data[token] = SentimentTaggedWord(
-                        word=token,
-                        frequency=0,
-                        sentiment_score=0.0,
-                        sentiment_label='neutral',
-                        contextual_examples=[],
-                        confidence=0.0
-                    )
-
-                # Increment frequency
-                word_data[token].frequency += 1
-
-                # Update sentiment (weighted average)
-                current_freq = word_data[token].frequency
-                word_data[token].sentiment_score = (
-                    (word_data[token].sentiment_score * (current_freq - 1)) + sentiment_score
-                ) / current_freq
-
-                # Update sentiment label (based on average score)
-                avg_sentiment = word_data[token].sentiment_score
-                if avg_sentiment > 0.1:
-                    word_data[token].sentiment_label = 'positive'
-                elif avg_sentiment < -0.1:
-                    word_data[token].sentiment_label = 'negative'
-                else:
-                    word_data[token].sentiment_label = 'neutral'
-
-                # Update confidence (weighted average)
-                word_data[token].confidence = (
-                    (word_data[token].confidence * (current_freq - 1)) + confidence
-                ) / current_freq
-
-                # Add contextual example (if not too many already)
-                if len(word_data[token].contextual_examples) < 3:
-                    # Create context snippet
-                    words = text.split()
-                    token_index = next((j for j, w in enumerate(words) if token.lower() in w.lower()), -1)
-                    if token_index >= 0:
-                        start = max(0, token_index - 5)
-                        end = min(len(words), token_index + 6)
-                        context = ' '.join(words[start:end])
-                        if context not in word_data[token].contextual_examples:
-                            word_data[token].contextual_examples.append(context)
+    async def record_analyzed_comments(self, db, consultation_id: str, comment_keys: List[str],
+                                       texts: List[str], analysis_results: List[Dict]) -> Tuple[int, int]:
+        """
+        Add analyzed comments to a consultation's stored term statistics.
 
+        Comments whose key was recorded before are skipped, so recording the
+        same comments again does not count them twice.
+
+        Args:
+            db: Database holding the statistics
+            consultation_id: Consultation ID
+            comment_keys: Stable key per comment (e.g. its comment ID)
+            texts: Comment texts
+            analysis_results: Analysis result per text
+
+        Returns:
+            Tuple of (newly recorded comments, comments recorded for the consultation)
+        """
+        new_indexes = await term_statistics_store.claim(db, consultation_id, comment_keys)
+        if not new_indexes:
+            statistics = await term_statistics_store.get(db, consultation_id)
+            return 0, statistics.comment_count if statistics is not None else 0
+
+        try:
+            statistics = await self.build_term_statistics(
+                [texts[i] for i in new_indexes], [analysis_results[i] for i in new_indexes]
+            )
+            total = await term_statistics_store.add(db, consultation_id, statistics)
+        except BaseException:
+            await term_statistics_store.release(db, consultation_id, [comment_keys[i] for i in new_indexes])
+            raise
+        return len(new_indexes), total
+
+    def sentiment_word_data(self, statistics: TermStatistics, max_words: Optional[int] = None,
+                            sentiment_label: Optional[str] = None,
+                            stakeholder_type: Optional[str] = None) -> Dict[str, SentimentTaggedWord]:
+        """
+        Sentiment-tagged top words of a statistics slice, most frequent first.
+
+        Args:
+            statistics: Term statistics
+            max_words: Number of words (None: all)
+            sentiment_label: Only comments with this label
+            stakeholder_type: Only comments of this stakeholder type
+
+        Returns:
+            dict: word -> SentimentTaggedWord
+        """
+        word_data = {}
+        for word, _ in statistics.top_terms(max_words, sentiment_label, stakeholder_type):
+            summary = statistics.term_summary(word, sentiment_label, stakeholder_type)
+            word_data[word] = SentimentTaggedWord(
+                word=word,
+                frequency=summary['frequency'],
+                sentiment_score=summary['sentiment_score'],
+                sentiment_label=label_for_score(summary['sentiment_score']),
+                contextual_examples=statistics.contextual_examples(word),
+                confidence=summary['confidence']
+            )
         return word_data
+
+    async def _create_sentiment_word_data(self,
+                                         texts: List[str],
+                                         analysis_results: List[Dict]) -> Dict[str, SentimentTaggedWord]:
+        """
+        Create sentiment-tagged word data with contextual examples.
+        """
+        return self.sentiment_word_data(await self.build_term_statistics(texts, analysis_results))
     
     async def generate_density_wordcloud(self, 
                                        texts: List[str],
@@ -216,7 +304,8 @@ class VisualizationService:
                                        width: int = 800,
                                        height: int = 600,
                                        max_words: int = 100,
-                                       density_type: str = "frequency") -> Tuple[bytes, Dict]:
+                                       density_type: str = "frequency",
+                                       statistics: Optional[TermStatistics] = None) -> Tuple[bytes, Dict]:
         """
         Generate word cloud with density visualization.
         
@@ -227,12 +316,17 @@ class VisualizationService:
             height: Word cloud height
             max_words: Maximum words to include
             density_type: "frequency", "sentiment_intensity", or "stakeholder_spread"
+            statistics: Precomputed term statistics; texts and analysis_results
+                are ignored when given
             
         Returns:
             Tuple of (image_bytes, density_data)
         """
+        if statistics is None:
+            statistics = await self.build_term_statistics(texts, analysis_results)
+
         # Create enhanced word data with density metrics
-        word_data = await self._create_density_word_data(texts, analysis_results, density_type)
+        word_data = self.density_word_data(statistics, density_type, max_words)
         
         # Filter to top words
         top_words = dict(sorted(word_data.items(),
@@ -289,7 +383,8 @@ class VisualizationService:
                                            texts_by_stakeholder: Dict[str, List[str]],
                                            analysis_results_by_stakeholder: Dict[str, List[Dict]],
                                            width: int = 1200,
-                                           height: int = 800) -> Tuple[bytes, Dict]:
+                                           height: int = 800,
+                                           statistics: Optional[TermStatistics] = None) -> Tuple[bytes, Dict]:
         """
         Generate comparative word cloud showing different stakeholder perspectives.
         
@@ -298,6 +393,9 @@ class VisualizationService:
             analysis_results_by_stakeholder: Analysis results by stakeholder
             width: Word cloud width
             height: Word cloud height
+            statistics: Precomputed term statistics sliced by stakeholder type;
+                texts are ignored when given (an empty texts_by_stakeholder
+                selects every stakeholder type in the statistics)
             
         Returns:
             Tuple of (image_bytes, stakeholder_comparison_data)
@@ -319,17 +417,20 @@ class VisualizationService:
             'government': 'hsl(180, 70%, 40%)'    # Cyan
         }
         
-        for stakeholder_type, texts in texts_by_stakeholder.items():
-            if not texts:
-                continue
-                
-            analysis_results = analysis_results_by_stakeholder.get(stakeholder_type, [])
-            
-            # Create stakeholder-specific word data
-            word_data = await self._create_sentiment_word_data(texts, analysis_results)
-            top_words = dict(sorted(word_data.items(),
-                                   key=lambda x: x[1].frequency,
-                                   reverse=True)[:30])
+        if statistics is None:
+            # One statistics for all groups, each group's comments tagged with its type
+            statistics = TermStatistics()
+            for stakeholder_type, texts in texts_by_stakeholder.items():
+                analysis_results = [
+                    {**result, 'stakeholder_type': stakeholder_type}
+                    for result in analysis_results_by_stakeholder.get(stakeholder_type, [])
+                ]
+                await self.build_term_statistics(texts, analysis_results, statistics)
+        stakeholder_types = list(texts_by_stakeholder) or statistics.stakeholder_types()
+        
+        for stakeholder_type in stakeholder_types:
+            # Stakeholder-specific top words from the statistics slice
+            top_words = self.sentiment_word_data(statistics, 30, stakeholder_type=stakeholder_type)
             
             frequencies = {word: data.frequency for word, data in top_words.items()}
             
@@ -393,54 +494,31 @@ class VisualizationService:
         
         return image_bytes, stakeholder_data
     
-    async def _create_density_word_data(self, 
-                                      texts: List[str],
-                                      analysis_results: List[Dict],
-                                      density_type: str) -> Dict[str, Dict]:
-        """Create word data with density metrics."""
+    def density_word_data(self, statistics: TermStatistics, density_type: str,
+                          max_words: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Word data with density metrics from term statistics.
+
+        Frequency density reads only the top max_words terms; the other
+        density types rank by derived scores and cover the whole vocabulary.
+        """
+        if density_type in ("sentiment_intensity", "stakeholder_spread"):
+            terms = statistics.top_terms()
+        else:
+            terms = statistics.top_terms(max_words)
+
         word_data = {}
-        stakeholder_words = {}  # Track which stakeholders use which words
-        
-        for i, text in enumerate(texts):
-            if not text or i >= len(analysis_results):
-                continue
-                
-            analysis = analysis_results[i]
-            sentiment_score = analysis.get('sentiment_score', 0)
-            stakeholder_type = analysis.get('stakeholder_type', 'unknown')
-            
-            tokens = await self.prepare_tokens([text])
-            
-            for token in tokens:
-                if token not in word_data:
-                    word_data[token] = {
-                        'frequency': 0,
-                        'sentiment_score': 0,
-                        'stakeholder_types': set(),
-                        'contexts': []
-                    }
-                
-                word_data[token]['frequency'] += 1
-                word_data[token]['sentiment_score'] = (
-                    (word_data[token]['sentiment_score'] * (word_data[token]['frequency'] - 1)) + sentiment_score
-                ) / word_data[token]['frequency']
-                word_data[token]['stakeholder_types'].add(stakeholder_type)
-                
-                # Add context
-                if len(word_data[token]['contexts']) < 3:
-                    words = text.split()
-                    token_index = next((j for j, w in enumerate(words) if token.lower() in w.lower()), -1)
-                    if token_index >= 0:
-                        start = max(0, token_index - 3)
-                        end = min(len(words), token_index + 4)
-                        context = ' '.join(words[start:end])
-                        word_data[token]['contexts'].append(context)
-        
-        # Calculate density scores based on type
-        for word, data in word_data.items():
-            if density_type == "frequency":
-                data['density_score'] = data['frequency']
-            elif density_type == "sentiment_intensity":
+        for word, _ in terms:
+            summary = statistics.term_summary(word)
+            data = {
+                'frequency': summary['frequency'],
+                'sentiment_score': summary['sentiment_score'],
+                'stakeholder_types': summary['stakeholder_types'],
+                'contexts': statistics.contextual_examples(word, context_words=3)
+            }
+
+            # Density score based on type
+            if density_type == "sentiment_intensity":
                 data['density_score'] = data['frequency'] * abs(data['sentiment_score'])
             elif density_type == "stakeholder_spread":
                 stakeholder_diversity = len(data['stakeholder_types'])
@@ -448,5 +526,12 @@ class VisualizationService:
                 data['stakeholder_spread'] = stakeholder_diversity / 6  # Normalize by max stakeholder types
             else:
                 data['density_score'] = data['frequency']
-        
-        return word_data
\ No newline at end of file
+            word_data[word] = data
+        return word_data
+
+    async def _create_density_word_data(self, 
+                                      texts: List[str],
+                                      analysis_results: List[Dict],
+                                      density_type: str) -> Dict[str, Dict]:
+        """Create word data with density metrics."""
+        return self.density_word_data(await self.build_term_statistics(texts, analysis_results), density_type)
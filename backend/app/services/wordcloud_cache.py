@@ -0,0 +1,235 @@
+"""
+Rendered word cloud image cache.
+Word cloud layout and PNG encoding dominate the cost of the word cloud
+endpoints, so rendered images are cached under a deterministic key derived
+from the top-N frequencies and the render options. A byte-bounded in-memory
+LRU sits in front of an on-disk tier that survives restarts and is shared
+by the API, the dashboard and worker processes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from backend.app.core.config import settings
+
+
+def wordcloud_cache_key(frequencies: Dict[str, float], width: int, height: int,
+                        colormap: Optional[str] = None, font: Optional[str] = None,
+                        top_n: Optional[int] = None, **options: Any) -> str:
+    """
+    Deterministic cache key of a word cloud rendering.
+
+    Frequencies are ordered by weight then word, so dicts built in a
+    different order map to the same key. With top_n, words tied with the
+    last drawn word are kept in the key as well.
+
+    Args:
+        frequencies: Word weights the cloud is rendered from
+        width: Image width
+        height: Image height
+        colormap: Colormap name, if any
+        font: Font path, if any
+        top_n: Only the top_n words are drawn (None: all)
+        **options: Other options that change the image (style, colors, ...)
+
+    Returns:
+        str: Hex SHA-256 key
+    """
+    top = sorted(frequencies.items(), key=lambda item: (-item[1], item[0]))
+    if top_n is not None and len(top) > top_n:
+        # Words tied with the last one drawn may be drawn instead of it
+        cutoff = top[top_n - 1][1] if top_n > 0 else None
+        top = [item for item in top if cutoff is not None and item[1] >= cutoff]
+    payload = json.dumps(
+        {
+            "frequencies": top,
+            "width": width,
+            "height": height,
+            "colormap": colormap,
+            "font": font,
+            "options": options
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class WordCloudImageCache:
+    """Two-tier (memory LRU + disk) cache of rendered PNG bytes."""
+
+    def __init__(self, max_memory_bytes: Optional[int] = None, directory: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        self.max_memory_bytes = (
+            max_memory_bytes if max_memory_bytes is not None else settings.WORDCLOUD_CACHE_MAX_BYTES
+        )
+        self.directory = directory if directory is not None else settings.WORDCLOUD_CACHE_DIR
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else settings.WORDCLOUD_CACHE_DISK_MAX_BYTES
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached PNG bytes for a key, from memory or disk."""
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return image
+
+        image = self._read_disk(key)
+        with self._lock:
+            if image is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, image)
+            return image
+
+    def put(self, key: str, image: bytes):
+        """Store rendered PNG bytes in both tiers."""
+        with self._lock:
+            self._remember(key, image)
+        self._write_disk(key, image)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached image for key, rendering and storing it on a miss.
+
+        Args:
+            key: Key from wordcloud_cache_key
+            render: Produces the PNG bytes
+
+        Returns:
+            bytes: PNG image
+        """
+        image = self.get(key)
+        if image is None:
+            image = render()
+            if image:
+                self.put(key, image)
+        return image
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _remember(self, key: str, image: bytes):
+        if len(image) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = image
+        self._memory_bytes += len(image)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory or self.max_disk_bytes <= 0:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, image: bytes):
+        if not self.directory or self.max_disk_bytes <= 0:
+            return
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(image)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"Could not write word cloud cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(image)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".png"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _prune_disk(self):
+        """Delete the oldest files until the disk tier is back under 90% of its limit."""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+
+# Shared cache for the process
+wordcloud_image_cache = WordCloudImageCache()
+
+
+def image_etag(key: str) -> str:
+    """Strong ETag of a cached image (renders are deterministic per key)."""
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
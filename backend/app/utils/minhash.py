@@ -0,0 +1,86 @@
+"""
+MinHash signatures and LSH banding for scalable near-duplicate detection.
+"""
+
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set
+
+import numpy as np
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHashLSH:
+    """
+    Character-shingle MinHash with locality-sensitive hashing over bands.
+
+    Texts whose shingle sets have a high Jaccard similarity share at least
+    one band with high probability, so only those pairs need an exact
+    similarity check instead of every pair in the corpus.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32,
+                 shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Permutations h(x) = (a * x + b) mod p; a, b < 2^32 keeps a * x in uint64
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: Dict[str, Set[Hashable]] = defaultdict(set)
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hash the character k-shingles of a (normalized) text."""
+        k = self.shingle_size
+        if len(text) <= k:
+            return {zlib.crc32(text.encode('utf-8'))}
+        return {zlib.crc32(text[i:i + k].encode('utf-8')) for i in range(len(text) - k + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        hashes = np.fromiter(self.shingles(text), dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=0)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """Compute MinHash signatures for many texts as an (n, num_perm) matrix."""
+        rows = [self.signature(text) for text in texts]
+        if not rows:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        return np.vstack(rows)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """Split a signature into band keys suitable for bucketing or storage."""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(chunk.tobytes(), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        """Add a signature to the in-memory band buckets."""
+        for band_key in self.band_keys(signature):
+            self._buckets[band_key].add(key)
+
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        """Return keys sharing at least one band with the signature."""
+        candidates: Set[Hashable] = set()
+        for band_key in self.band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        return candidates
+
+    def clear(self):
+        """Drop all in-memory buckets."""
+        self._buckets.clear()
@@ -0,0 +1,167 @@
+"""
+Compiled PII scanner.
+A single regular expression with named groups finds emails, URLs, Aadhaar
+and PAN numbers, phone numbers, SSNs and street addresses in one pass; the
+resulting spans drive both detection and anonymization.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class PIIMatch:
+    """A PII span found in a text."""
+    pii_type: str
+    start: int
+    end: int
+    value: str
+
+
+class PIIScanner:
+    """Single-pass PII detection and anonymization."""
+
+    # Group name -> (label reported by detection, anonymization mask)
+    PII_TYPES: Dict[str, Tuple[str, str]] = {
+        'email': ('Email', '[EMAIL]'),
+        'url': ('URL', '[URL]'),
+        'aadhaar': ('Aadhaar', '[AADHAAR]'),
+        'pan': ('PAN', '[PAN]'),
+        'ssn': ('SSN', '[SSN]'),
+        'phone': ('Phone', '[PHONE]'),
+        'phone_intl': ('Phone', '[PHONE]'),
+        'address': ('Address', '[ADDRESS]'),
+    }
+
+    # Patterns that start at a word boundary; the boundary is factored out below
+    PATTERNS: Dict[str, str] = {
+        'email': r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b',
+        'url': r'https?://[^\s<>"\']+|www\.[^\s<>"\']+',
+        # 12 digits, optionally grouped 4-4-4; UIDAI numbers never start with 0 or 1
+        'aadhaar': r'[2-9]\d{3}[ -]?\d{4}[ -]?\d{4}\b',
+        # Five letters, four digits, one letter (upper case as issued)
+        'pan': r'[A-Z]{5}\d{4}[A-Z]\b',
+        'ssn': r'\d{3}-\d{2}-\d{4}\b',
+        'phone': r'\d{10}\b|\d{3}-\d{3}-\d{4}\b',
+        'address': r'(?i:\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b)',
+    }
+
+    # +91 numbers start with a non-word character, so they sit outside the boundary
+    INTL_PHONE_PATTERN = r'\+91[ -]?\d{10}\b'
+
+    # Every pattern needs a digit, '@', a URL prefix or an upper-case run;
+    # texts without any of them are skipped in batch mode
+    CANDIDATE_PATTERN = r'[\d@]|https?://|www\.|[A-Z]{5}'
+
+    def __init__(self):
+        self.pattern = re.compile(self._combined_pattern())
+        self.candidate_pattern = re.compile(self.CANDIDATE_PATTERN)
+
+    def _combined_pattern(self) -> str:
+        """
+        Build the alternation. At a given position earlier alternatives win:
+        email before the digit patterns (addresses may start with digits) and
+        Aadhaar before SSN/phone. One shared word boundary and a digit
+        lookahead keep the engine from retrying every alternative at every
+        position.
+        """
+        def group(name: str) -> str:
+            return f'(?P<{name}>{self.PATTERNS[name]})'
+
+        digit_led = '|'.join(group(name) for name in ('aadhaar', 'ssn', 'phone', 'address'))
+        return (
+            rf'\b(?:{group("email")}|{group("url")}|(?=\d)(?:{digit_led})|{group("pan")})'
+            rf'|(?P<phone_intl>{self.INTL_PHONE_PATTERN})'
+        )
+
+    def scan(self, text: str) -> List[PIIMatch]:
+        """
+        Find all PII spans in a text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            list: Non-overlapping matches in text order
+        """
+        if not text:
+            return []
+        return [
+            PIIMatch(match.lastgroup, match.start(), match.end(), match.group())
+            for match in self.pattern.finditer(text)
+        ]
+
+    def pii_types(self, matches: List[PIIMatch]) -> List[str]:
+        """Distinct PII labels in the order they were first found."""
+        return list(dict.fromkeys(self.PII_TYPES[match.pii_type][0] for match in matches))
+
+    def anonymize(self, text: str, matches: Optional[List[PIIMatch]] = None) -> str:
+        """
+        Replace PII spans with type masks.
+
+        Args:
+            text: Original text
+            matches: Spans from scan(text); scanned here if not given
+
+        Returns:
+            str: Text with each span replaced by its mask
+        """
+        if matches is None:
+            matches = self.scan(text)
+        if not matches:
+            return text
+
+        parts = []
+        position = 0
+        for match in matches:
+            parts.append(text[position:match.start])
+            parts.append(self.PII_TYPES[match.pii_type][1])
+            position = match.end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def screen(self, text: str) -> Tuple[List[str], str]:
+        """Detect and anonymize in one scan; returns (pii_types, anonymized_text)."""
+        matches = self.scan(text)
+        return self.pii_types(matches), self.anonymize(text, matches)
+
+    def scan_series(self, texts: pd.Series, anonymize: bool = False) -> pd.DataFrame:
+        """
+        Batch mode over a pandas Series.
+
+        Args:
+            texts: Series of texts
+            anonymize: Also return anonymized texts
+
+        Returns:
+            pd.DataFrame: has_pii, pii_types and pii_count per text (plus
+                anonymized_text if requested), aligned with texts' index
+        """
+        texts = texts.fillna('').astype(str)
+        result = pd.DataFrame({
+            'has_pii': False,
+            'pii_types': [[] for _ in range(len(texts))],
+            'pii_count': 0
+        }, index=texts.index)
+        if anonymize:
+            result['anonymized_text'] = texts
+
+        candidates = texts[texts.str.contains(self.candidate_pattern, regex=True)]
+        for index, text in candidates.items():
+            matches = self.scan(text)
+            if not matches:
+                continue
+            result.at[index, 'has_pii'] = True
+            result.at[index, 'pii_types'] = self.pii_types(matches)
+            result.at[index, 'pii_count'] = len(matches)
+            if anonymize:
+                result.at[index, 'anonymized_text'] = self.anonymize(text, matches)
+
+        return result
+
+
+# Shared compiled scanner
+pii_scanner = PIIScanner()
@@ -3,11 +3,17 @@ Text processing utilities for validation, cleaning, and deduplication.
 """
 
 import re
+import warnings
 from typing import List, Tuple, Optional, Set
 from difflib import SequenceMatcher
 import hashlib
 from dataclasses import dataclass
 
+import pandas as pd
+
+from backend.app.utils.minhash import MinHashLSH
+from backend.app.utils.pii_scanner import pii_scanner
+
 
 @dataclass
 class ValidationResult:
@@ -34,13 +40,8 @@ class TextValidator:
         self.max_length = 10000
         self.min_words = 2
         
-        # PII patterns (basic detection)
-        self.pii_patterns = [
-            r'\b\d{3}-\d{2}-\d{4}\b',  # SSN
-            r'\b\d{10}\b',  # Phone number
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Email
-            r'\b\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b',  # Address
-        ]
+        # Compiled single-pass PII scanner
+        self.pii_scanner = pii_scanner
     
     def is_valid_comment(self, text: str) -> bool:
         """Quick validation check."""
@@ -91,6 +92,32 @@ class TextValidator:
         
         return ValidationResult(is_valid, issues, quality_score)
     
+    def valid_mask(self, texts: pd.Series) -> pd.Series:
+        """
+        Column-oriented equivalent of is_valid_comment for stripped texts.
+
+        The quality score is not evaluated: its penalties multiply to at least
+        0.7 * 0.8 * 0.8 * 0.9 > 0.3, so it never rejects a text on its own.
+
+        Args:
+            texts: Series of stripped comment texts (non-null)
+
+        Returns:
+            pd.Series: Boolean mask, True where the text is a valid comment
+        """
+        texts = texts.astype(str)
+        lengths = texts.str.len()
+        word_counts = texts.str.count(r'\S+')
+
+        valid = (lengths >= self.min_length) & (lengths <= self.max_length) & (word_counts >= self.min_words)
+        with warnings.catch_warnings():
+            # Spam patterns use groups for backreferences, not for extraction
+            warnings.filterwarnings('ignore', 'This pattern is interpreted as a regular expression')
+            for pattern in self.spam_patterns:
+                valid &= ~texts.str.contains(pattern, case=False, regex=True)
+
+        return valid
+
     def contains_pii(self, text: str) -> Tuple[bool, List[str]]:
         """
         Check if text contains personally identifiable information.
@@ -101,18 +128,7 @@ class TextValidator:
         Returns:
             tuple: (has_pii, list_of_pii_types_found)
         """
-        pii_found = []
-        
-        pii_types = {
-            r'\b\d{3}-\d{2}-\d{4}\b': 'SSN',
-            r'\b\d{10}\b': 'Phone',
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b': 'Email',
-            r'\b\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b': 'Address',
-        }
-        
-        for pattern, pii_type in pii_types.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                pii_found.append(pii_type)
+        pii_found = self.pii_scanner.pii_types(self.pii_scanner.scan(text))
         
         return len(pii_found) > 0, pii_found
     
@@ -124,14 +140,20 @@ class TextValidator:
         if len(text) < 50:
             score *= 0.7
         
+        # Count uppercase and punctuation characters in a single pass
+        uppercase = punctuation = 0
+        for c in text:
+            if c.isupper():
+                uppercase += 1
+            elif not c.isalnum() and not c.isspace():
+                punctuation += 1
+        
         # Penalize excessive uppercase
-        uppercase_ratio = sum(1 for c in text if c.isupper()) / len(text)
-        if uppercase_ratio > 0.7:
+        if uppercase / len(text) > 0.7:
             score *= 0.8
         
         # Penalize excessive punctuation
-        punct_ratio = sum(1 for c in text if not c.isalnum() and not c.isspace()) / len(text)
-        if punct_ratio > 0.3:
+        if punctuation / len(text) > 0.3:
             score *= 0.8
         
         # Reward proper sentence structure
@@ -153,14 +175,22 @@ class TextValidator:
 class DuplicationDetector:
     """Detector for duplicate and near-duplicate comments."""
     
-    def __init__(self, similarity_threshold: float = 0.85):
+    def __init__(self, similarity_threshold: float = 0.85,
+                 num_perm: int = 128, bands: int = 32, shingle_size: int = 5):
         self.similarity_threshold = similarity_threshold
         self.exact_match_cache = {}
+        self.lsh_params = {'num_perm': num_perm, 'bands': bands, 'shingle_size': shingle_size}
+        # Shared instance for signatures; find_duplicates uses fresh buckets per call
+        self.lsh = MinHashLSH(**self.lsh_params)
         
     def find_duplicates(self, comments: List) -> List[Tuple[int, int]]:
         """
         Find duplicate comments in a list.
         
+        Exact duplicates are found by hash. Near-duplicate candidates come from
+        MinHash LSH buckets and are verified against similarity_threshold, so
+        only likely pairs are compared instead of every pair.
+        
         Args:
             comments: List of Comment objects or text strings
             
@@ -168,44 +198,56 @@ class DuplicationDetector:
             list: List of (original_index, duplicate_index) tuples
         """
         duplicates = []
+        normalized = [self.normalize_text(self._comment_text(comment)) for comment in comments]
         
         # First pass: exact matches using hash
         hash_to_index = {}
+        processed = set()
         
-        for i, comment in enumerate(comments):
-            text = comment.original_text if hasattr(comment, 'original_text') else str(comment)
-            text_hash = self._hash_text(text)
+        for i, text in enumerate(normalized):
+            text_hash = hashlib.md5(text.encode()).hexdigest()
             
             if text_hash in hash_to_index:
                 duplicates.append((hash_to_index[text_hash], i))
+                processed.add(i)
             else:
                 hash_to_index[text_hash] = i
         
-        # Second pass: near-duplicates using similarity
-        processed = set()
+        # Second pass: near-duplicates via LSH candidates. Only representatives
+        # (comments not yet marked as duplicates) are indexed, and each comment
+        # is matched to the earliest similar representative.
+        lsh = MinHashLSH(**self.lsh_params)
         
-        for i, comment1 in enumerate(comments):
+        for i, text in enumerate(normalized):
             if i in processed:
                 continue
-                
-            text1 = comment1.original_text if hasattr(comment1, 'original_text') else str(comment1)
             
-            for j, comment2 in enumerate(comments[i+1:], i+1):
-                if j in processed:
-                    continue
-                    
-                text2 = comment2.original_text if hasattr(comment2, 'original_text') else str(comment2)
-                
-                if self._are_similar(text1, text2):
-                    duplicates.append((i, j))
-                    processed.add(j)
+            signature = lsh.signature(text)
+            for j in sorted(lsh.query(signature)):
+                if self.normalized_similar(normalized[j], text):
+                    duplicates.append((j, i))
+                    processed.add(i)
+                    break
+            else:
+                lsh.insert(i, signature)
         
         return duplicates
     
+    def signature(self, text: str):
+        """MinHash signature of a text after normalization."""
+        return self.lsh.signature(self.normalize_text(text))
+    
+    def band_keys(self, text: str) -> List[str]:
+        """LSH band keys of a text, used by persistent signature indexes."""
+        return self.lsh.band_keys(self.signature(text))
+    
+    def _comment_text(self, comment) -> str:
+        return comment.original_text if hasattr(comment, 'original_text') else str(comment)
+    
     def is_duplicate(self, text1: str, text2: str) -> bool:
         """Check if two texts are duplicates."""
         # Exact match
-        if self._normalize_text(text1) == self._normalize_text(text2):
+        if self.normalize_text(text1) == self.normalize_text(text2):
             return True
         
         # Near-duplicate match
@@ -213,10 +255,10 @@ class DuplicationDetector:
     
     def _hash_text(self, text: str) -> str:
         """Create hash of normalized text for exact duplicate detection."""
-        normalized = self._normalize_text(text)
+        normalized = self.normalize_text(text)
         return hashlib.md5(normalized.encode()).hexdigest()
     
-    def _normalize_text(self, text: str) -> str:
+    def normalize_text(self, text: str) -> str:
         """Normalize text for comparison."""
         # Convert to lowercase
         text = text.lower()
@@ -228,18 +270,25 @@ class DuplicationDetector:
     
     def _are_similar(self, text1: str, text2: str) -> bool:
         """Check if two texts are similar using sequence matching."""
-        # Normalize texts
-        norm1 = self._normalize_text(text1)
-        norm2 = self._normalize_text(text2)
+        return self.normalized_similar(self.normalize_text(text1), self.normalize_text(text2))
+    
+    def normalized_similar(self, norm1: str, norm2: str) -> bool:
+        """Similarity check on already normalized texts."""
+        if not norm1 or not norm2:
+            return norm1 == norm2
         
         # Skip if texts are too different in length
         len_ratio = min(len(norm1), len(norm2)) / max(len(norm1), len(norm2))
         if len_ratio < 0.5:
             return False
         
-        # Calculate similarity
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity >= self.similarity_threshold
+        # Cheap upper bounds first, full ratio only when they pass
+        matcher = SequenceMatcher(None, norm1, norm2)
+        if matcher.real_quick_ratio() < self.similarity_threshold:
+            return False
+        if matcher.quick_ratio() < self.similarity_threshold:
+            return False
+        return matcher.ratio() >= self.similarity_threshold
 
 
 class TextCleaner:
@@ -305,27 +354,4 @@ class TextCleaner:
     
     def anonymize_pii(self, text: str) -> str:
         """Anonymize personally identifiable information."""
-        # Replace emails
-        text = re.sub(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            '[EMAIL]',
-            text,
-            flags=re.IGNORECASE
-        )
-        
-        # Replace phone numbers
-        text = re.sub(r'\b\d{3}-\d{3}-\d{4}\b', '[PHONE]', text)
-        text = re.sub(r'\b\d{10}\b', '[PHONE]', text)
-        
-        # Replace potential SSNs
-        text = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', text)
-        
-        # Replace addresses (basic pattern)
-        text = re.sub(
-            r'\b\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b',
-            '[ADDRESS]',
-            text,
-            flags=re.IGNORECASE
-        )
-        
-        return text
\ No newline at end of file
+        return pii_scanner.anonymize(text)
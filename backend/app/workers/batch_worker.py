@@ -0,0 +1,131 @@
+"""
+Batch job worker.
+Claims jobs from the durable batch queue and processes them. Run any number of
+workers, on one or several machines, against the same MongoDB:
+
+    python -m backend.app.workers.batch_worker --processes 4 --concurrency 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import uuid
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from backend.app.core.config import settings
+from backend.app.services.batch_job_queue import BatchJobQueue
+from backend.app.services.term_statistics import term_statistics_store
+
+# How often each worker deletes expired result files
+RESULT_PURGE_INTERVAL_SECONDS = 3600
+
+
+class BatchWorker:
+    """Polls the queue and runs up to `concurrency` jobs at a time."""
+
+    def __init__(self, db: AsyncIOMotorDatabase, concurrency: int = 1,
+                 worker_id: Optional[str] = None,
+                 poll_interval: Optional[float] = None,
+                 chunk_processes: Optional[int] = None):
+        self.queue = BatchJobQueue(db)
+        self.concurrency = max(1, concurrency)
+        # Chunk process pool size (None: BATCH_CHUNK_PROCESSES, 0: in-process)
+        self.chunk_processes = chunk_processes
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval or settings.BATCH_POLL_INTERVAL_SECONDS
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None):
+        """Process jobs until stop_event is set."""
+        # Imported here so the analysis models load only in processes that run jobs
+        from backend.app.services.batch_job_processor import BatchJobProcessor, result_store, shutdown_chunk_pool
+
+        stop_event = stop_event or asyncio.Event()
+        processor = BatchJobProcessor(self.queue, self.worker_id, chunk_processes=self.chunk_processes)
+        print(f"Batch worker {self.worker_id} started with {self.concurrency} slot(s)")
+
+        async def slot():
+            while not stop_event.is_set():
+                try:
+                    job = await self.queue.claim(self.worker_id)
+                except Exception as e:
+                    print(f"Batch worker {self.worker_id} could not claim a job: {e}")
+                    job = None
+
+                if job is None:
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await processor.run(job)
+
+        async def purge_results():
+            retention_seconds = settings.BATCH_RESULT_RETENTION_HOURS * 3600
+            while retention_seconds > 0 and not stop_event.is_set():
+                try:
+                    purged = await asyncio.to_thread(result_store.purge_expired, retention_seconds)
+                    if purged:
+                        print(f"Batch worker {self.worker_id} deleted expired results of {purged} job(s)")
+                except Exception as e:
+                    print(f"Batch worker {self.worker_id} could not purge results: {e}")
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=RESULT_PURGE_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+        try:
+            await asyncio.gather(purge_results(), *(slot() for _ in range(self.concurrency)))
+        finally:
+            shutdown_chunk_pool()
+
+
+async def _run_worker(concurrency: int):
+    from backend.app.core.database import MongoDB
+
+    db = await MongoDB.connect_db()
+    await BatchJobQueue(db).ensure_indexes()
+    await term_statistics_store.ensure_indexes(db)
+    try:
+        await BatchWorker(db, concurrency=concurrency).run()
+    finally:
+        await MongoDB.close_db()
+
+
+def _worker_process(concurrency: int):
+    try:
+        asyncio.run(_run_worker(concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run batch job workers")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs run concurrently per process")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _worker_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(args.concurrency,), daemon=False)
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,9 +17,15 @@ import logging
 import asyncio
 from pathlib import Path
 import math
+import sys
 from dataclasses import dataclass
 from enum import Enum
 
+# Run from backend/ as a script: make the backend package importable
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.term_matrix import TermAnalyzer, term_matrix_engine
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -1047,20 +1053,18 @@ def create_fallback_sentiment_result(text: str) -> Dict[str, Any]:
         'sentiment_scores': {'positive': 0, 'negative': 0, 'neutral': 1}
     }
 
+# Remove common stop words
+WORD_CLOUD_ANALYZER = TermAnalyzer(
+    name="final_api_wordcloud",
+    pattern=re.compile(r'\b\w+\b'),
+    min_length=3,
+    stopwords=frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'a', 'an'})
+)
+
 def create_word_frequencies(texts: List[str]) -> Dict[str, int]:
     """Create word frequency data for word cloud"""
-    all_text = ' '.join(texts).lower()
-    
-    # Remove common stop words
-    stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their', 'a', 'an'}
-    
-    # Extract words
-    words = re.findall(r'\b\w+\b', all_text)
-    words = [word for word in words if len(word) > 2 and word not in stop_words]
-    
-    # Count frequencies
-    word_freq = Counter(words)
-    return dict(word_freq.most_common(50))
+    matrix = term_matrix_engine.build(texts, WORD_CLOUD_ANALYZER)
+    return dict(matrix.top_terms(50))
 
 def generate_summary(texts: List[str]) -> str:
     """Generate summary of multiple texts"""
@@ -1751,12 +1755,13 @@ async def generate_wordcloud_from_upload(request: Dict[str, Any]):
             "error_details": str(e)
         }
 
-def create_advanced_word_frequencies(texts: List[str]) -> Dict[str, int]:
-    """Create advanced word frequency data with better filtering"""
-    all_text = ' '.join(texts).lower()
-    
-    # Enhanced stop words including metadata terms
-    stop_words = {
+# Enhanced stop words including metadata terms
+ADVANCED_WORD_CLOUD_ANALYZER = TermAnalyzer(
+    name="final_api_advanced_wordcloud",
+    pattern=re.compile(r'\b\w+\b'),
+    min_length=3,
+    drop_numeric=True,
+    stopwords=frozenset({
         'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 
         'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
         'will', 'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'can',
@@ -1766,19 +1771,14 @@ def create_advanced_word_frequencies(texts: List[str]) -> Dict[str, int]:
         # Metadata terms to filter out
         'individual', 'business', 'government', 'organization', 'citizen', 'private', 'public',
         'stakeholder', 'type', 'category', 'id', 'number', 'date', 'time', 'row', 'column'
-    }
-    
-    # Extract meaningful words (3+ characters, not stop words)
-    words = re.findall(r'\b\w+\b', all_text)
-    meaningful_words = [
-        word for word in words 
-        if len(word) >= 3 and word not in stop_words and not word.isdigit()
-    ]
-    
-    # Count frequencies and return top words
-    from collections import Counter
-    word_freq = Counter(meaningful_words)
-    return dict(word_freq.most_common(50))
+    })
+)
+
+def create_advanced_word_frequencies(texts: List[str]) -> Dict[str, int]:
+    """Create advanced word frequency data with better filtering"""
+    # Meaningful words (3+ characters, not stop words, not numbers), top 50
+    matrix = term_matrix_engine.build(texts, ADVANCED_WORD_CLOUD_ANALYZER)
+    return dict(matrix.top_terms(50))
 
 @app.post("/api/wordcloud-from-comments")
 async def generate_wordcloud_from_comments(request: Dict[str, Any]):
@@ -666,17 +666,16 @@ def calculate_text_statistics(text: str) -> Dict:
 
 def get_frequent_words(text: str, top_n: int = 20) -> List[tuple]:
     """Get most frequent words from text."""
-    # Simple word frequency (in production, you'd want better text processing)
-    words = text.lower().split()
-    
-    # Filter out common stop words
-    stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'a', 'an'}
-    
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-    
-    word_counts = Counter(filtered_words)
-    
-    return word_counts.most_common(top_n)
+    # Import here to avoid circular imports
+    from backend.app.services.term_matrix import TermAnalyzer, term_matrix_engine
+
+    # Whitespace words without common stop words, counted on the shared term matrix
+    analyzer = TermAnalyzer(
+        name="dashboard_frequent_words",
+        min_length=3,
+        stopwords=frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'a', 'an'})
+    )
+    return term_matrix_engine.build([text], analyzer).top_terms(top_n)
 
 
 def export_analysis_data(results: List[Dict]):
@@ -765,17 +764,20 @@ def create_word_cloud(
         from backend.app.services.visualization_service import VisualizationService
         vis_service = VisualizationService()
 
-        # Prepare tokens
-        tokens = vis_service.prepare_tokens([filtered_text], min_len=min_word_length)
-        frequencies = vis_service.compute_frequencies(tokens, max_words)
+        # Word frequencies
+        frequencies = vis_service.text_frequencies([filtered_text], max_words, min_len=min_word_length)
 
         if not frequencies:
             return None
 
-        # Create word cloud
+        # Rendered image comes from the shared word cloud cache when unchanged
+        from PIL import Image
+        import io
+        image_bytes = vis_service.generate_wordcloud_image(frequencies, 800, 400)
+        image = Image.open(io.BytesIO(image_bytes))
+
         fig, ax = plt.subplots(figsize=(10, 5))
-        wordcloud = WordCloud(width=800, height=400, background_color="white").generate_from_frequencies(frequencies)
-        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.imshow(image, interpolation='bilinear')
         ax.axis('off')
         plt.tight_layout()
 
@@ -62,6 +62,13 @@ try:
 except ImportError:
     API_SERVICES_AVAILABLE = False
 
+# Batch jobs are submitted to the backend queue and followed over server-sent events
+try:
+    from services import api_service as batch_api
+    BATCH_API_AVAILABLE = True
+except ImportError:
+    BATCH_API_AVAILABLE = False
+
 # API Configuration
 API_BASE_URL = "http://127.0.0.1:8002"
 
@@ -922,22 +929,48 @@ def render_batch_processing():
                 ["Sentiment Analysis", "Keyword Extraction", "Summarization", "Stakeholder Detection"]
             )
             
+            batch_data = pd.read_csv(batch_file) if batch_file.name.endswith('.csv') else pd.read_excel(batch_file)
+            batch_text_column = st.selectbox("Select text column", batch_data.columns, key="batch_text_column")
+            
             if st.button("🚀 Start Batch Processing"):
-                # Simulate batch job creation
-                job_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                job = {
-                    'id': job_id,
-                    'status': 'queued',
-                    'created': datetime.now(),
-                    'filename': batch_file.name,
-                    'options': processing_options,
-                    'progress': 0
-                }
-                
                 if 'batch_jobs' not in st.session_state:
                     st.session_state.batch_jobs = []
-                st.session_state.batch_jobs.append(job)
-                st.success(f"✅ Batch job {job_id} created!")
+                
+                if BATCH_API_AVAILABLE:
+                    # Queue the job on the backend and follow it over server-sent events
+                    texts = batch_data[batch_text_column].fillna('').astype(str).tolist()
+                    submitted = batch_api.submit_batch_job_api(texts, processing_options)
+                    if submitted:
+                        job = {
+                            'id': submitted['job_id'],
+                            'status': 'queued',
+                            'created': datetime.now(),
+                            'filename': batch_file.name,
+                            'options': processing_options,
+                            'progress': 0
+                        }
+                        st.session_state.batch_jobs.append(job)
+                        st.success(f"✅ Batch job {job['id']} submitted!")
+                        
+                        final = batch_api.follow_batch_job_api(job['id'], st.progress(0.0), st.empty())
+                        job['status'] = final['event']
+                        job['progress'] = final['data'].get('progress_percentage', 0.0) / 100
+                        if final['event'] == 'completed':
+                            job['progress'] = 1.0
+                else:
+                    # Simulate batch job creation
+                    job_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    job = {
+                        'id': job_id,
+                        'status': 'queued',
+                        'created': datetime.now(),
+                        'filename': batch_file.name,
+                        'options': processing_options,
+                        'progress': 0
+                    }
+                    
+                    st.session_state.batch_jobs.append(job)
+                    st.success(f"✅ Batch job {job_id} created!")
     
     with col2:
         st.markdown("#### Job Queue")
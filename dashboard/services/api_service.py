@@ -10,6 +10,26 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+# Dashboard processing options and the batch job type each one needs
+BATCH_JOB_TYPES = {
+    "Sentiment Analysis": "sentiment_analysis",
+    "Summarization": "summarization",
+    "Stakeholder Detection": "policy_analysis",
+    "Keyword Extraction": "comprehensive_analysis"
+}
+
+def batch_job_type(options: List[str]) -> str:
+    """Pick the batch job type covering the selected processing options."""
+    job_types = {BATCH_JOB_TYPES[option] for option in options if option in BATCH_JOB_TYPES}
+    if len(job_types) == 1:
+        return job_types.pop()
+    return "comprehensive_analysis"
+
+def auth_headers() -> Dict[str, str]:
+    """Bearer token of the logged-in dashboard user, if any."""
+    token = st.session_state.get("access_token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
 class APIService:
     """Service class for API communication."""
     
@@ -111,17 +131,22 @@ class APIService:
         """Submit batch processing job."""
         try:
             payload = {
-                "texts": texts,
-                "analysis_types": options,
-                "priority": "normal"
+                "job_type": batch_job_type(options),
+                "comments": texts,
+                "parameters": {"options": options},
+                "priority": 5
             }
             
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.post(
-                    f"{self.base_url}/api/v1/batch/submit",
-                    json=payload
+                    f"{self.base_url}/api/v1/batch/submit-batch",
+                    json=payload,
+                    headers=auth_headers()
                 )
-                return {"status": "success", "data": response.json()}
+                if response.status_code == 200:
+                    return {"status": "success", "data": response.json()}
+                else:
+                    return {"status": "error", "error": f"API returned status {response.status_code}"}
         except Exception as e:
             return {"status": "error", "error": str(e)}
     
@@ -129,11 +154,31 @@ class APIService:
         """Get batch job status."""
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/api/v1/batch/status/{job_id}")
+                response = await client.get(f"{self.base_url}/api/v1/batch/status/{job_id}", headers=auth_headers())
                 return {"status": "success", "data": response.json()}
         except Exception as e:
             return {"status": "error", "error": str(e)}
-    
+
+    async def stream_batch_status(self, job_id: str):
+        """Follow a batch job over server-sent events instead of polling its status.
+
+        Yields dicts with "event" (progress, completed, failed, cancelled) and "data".
+        """
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(self.timeout, read=None)) as client:
+                async with client.stream("GET", f"{self.base_url}/api/v1/batch/stream/{job_id}",
+                                         headers=auth_headers()) as response:
+                    event_name = "message"
+                    async for line in response.aiter_lines():
+                        if line.startswith("event:"):
+                            event_name = line[len("event:"):].strip()
+                        elif line.startswith("data:"):
+                            yield {"event": event_name, "data": json.loads(line[len("data:"):])}
+                            if event_name != "progress":
+                                return
+        except Exception as e:
+            yield {"event": "error", "data": {"error": str(e)}}
+
     async def generate_summary(self, texts: List[str], summary_type: str = "policy") -> Dict[str, Any]:
         """Generate text summary."""
         try:
@@ -260,6 +305,40 @@ def submit_batch_job_api(texts: List[str], options: List[str]):
         st.error(f"❌ Batch submission failed: {result.get('error', 'Unknown error')}")
         return None
 
+def follow_batch_job_api(job_id: str, progress_bar, status_text) -> Dict[str, Any]:
+    """
+    Follow a submitted batch job over server-sent events, updating Streamlit widgets.
+
+    Args:
+        job_id: Batch job ID
+        progress_bar: st.progress placeholder
+        status_text: st.empty placeholder for the status line
+
+    Returns:
+        dict: The final event ("completed", "failed", "cancelled" or "error")
+    """
+    api = get_api_service()
+
+    async def follow():
+        final = {"event": "error", "data": {"error": "Stream ended before the job finished"}}
+        async for event in api.stream_batch_status(job_id):
+            data = event["data"]
+            if event["event"] == "progress":
+                progress_bar.progress(min(data.get("progress_percentage", 0.0) / 100, 1.0))
+                status_text.text(f"{data.get('status', 'processing')}: "
+                                 f"{data.get('processed_comments', 0)}/{data.get('total_comments', 0)} comments")
+            else:
+                final = event
+        return final
+
+    final = run_async(follow())
+    if final["event"] == "completed":
+        progress_bar.progress(1.0)
+        status_text.text("completed")
+    else:
+        status_text.text(f"{final['event']}: {final['data'].get('error_message') or final['data'].get('error', '')}")
+    return final
+
 def generate_summary_api(texts: List[str], summary_type: str = "policy"):
     """Generate summary via API."""
     api = get_api_service()
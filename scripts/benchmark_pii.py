@@ -0,0 +1,110 @@
+"""
+Benchmark PII screening throughput.
+
+Compares the previous one-regex-per-type approach with the compiled PIIScanner
+(single comments and pandas batch mode) on a comment corpus.
+
+Usage:
+    python scripts/benchmark_pii.py [corpus.csv|corpus.txt] [--column comment] [--limit 100000]
+
+Without a corpus, a synthetic 100k-comment corpus with ~5% PII is generated.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import re
+import time
+
+import pandas as pd
+
+from backend.app.utils.pii_scanner import PIIScanner
+
+
+# Patterns used by TextValidator.contains_pii and TextCleaner.anonymize_pii before PIIScanner
+LEGACY_DETECTION = [
+    r'\b\d{3}-\d{2}-\d{4}\b',
+    r'\b\d{10}\b',
+    r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    r'\b\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b',
+]
+LEGACY_ANONYMIZATION = [
+    (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', re.IGNORECASE),
+    (r'\b\d{3}-\d{3}-\d{4}\b', '[PHONE]', 0),
+    (r'\b\d{10}\b', '[PHONE]', 0),
+    (r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', 0),
+    (r'\b\d{1,5}\s\w+\s(?:Street|St|Avenue|Ave|Road|Rd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b', '[ADDRESS]', re.IGNORECASE),
+]
+
+
+def legacy_screen(text: str):
+    found = [pattern for pattern in LEGACY_DETECTION if re.search(pattern, text, re.IGNORECASE)]
+    for pattern, mask, flags in LEGACY_ANONYMIZATION:
+        text = re.sub(pattern, mask, text, flags=flags)
+    return found, text
+
+
+def synthetic_corpus(size: int, seed: int = 7):
+    """Generate consultation-style comments, about 5% containing PII."""
+    rng = random.Random(seed)
+    words = ("the draft policy section clause proposal citizens rural urban data protection "
+             "compliance costs small business timeline implementation review committee public "
+             "consultation transparency penalty amendment rules framework digital services").split()
+    pii = [
+        lambda: f"contact me at user{rng.randint(1, 9999)}@example.org",
+        lambda: f"call {rng.randint(6000000000, 9999999999)}",
+        lambda: f"my Aadhaar is {rng.randint(2000, 9999)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+        lambda: f"PAN ABCDE{rng.randint(1000, 9999)}F",
+        lambda: f"see https://example.gov.in/docs/{rng.randint(1, 999)}",
+        lambda: f"I live at {rng.randint(1, 999)} Station Road",
+    ]
+    corpus = []
+    for _ in range(size):
+        comment = ' '.join(rng.choice(words) for _ in range(rng.randint(12, 60)))
+        if rng.random() < 0.05:
+            comment += ' ' + rng.choice(pii)()
+        corpus.append(comment.capitalize() + '.')
+    return corpus
+
+
+def load_corpus(path: str, column: str, limit: int):
+    if path.endswith('.csv'):
+        texts = pd.read_csv(path, usecols=[column], nrows=limit)[column].dropna().astype(str).tolist()
+    else:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            texts = [line.strip() for line in f if line.strip()][:limit]
+    return texts
+
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f}s  {count / elapsed:12,.0f} comments/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', help='CSV or text file with one comment per line')
+    parser.add_argument('--column', default='comment', help='Comment column for CSV corpora')
+    parser.add_argument('--limit', type=int, default=100_000, help='Maximum number of comments')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus, args.column, args.limit) if args.corpus else synthetic_corpus(args.limit)
+    series = pd.Series(texts)
+    scanner = PIIScanner()
+
+    print(f"Corpus: {len(texts):,} comments ({args.corpus or 'synthetic'})")
+    legacy = timed("legacy regex per type", lambda: [legacy_screen(text) for text in texts], len(texts))
+    single = timed("PIIScanner.screen", lambda: [scanner.screen(text) for text in texts], len(texts))
+    batch = timed("PIIScanner.scan_series", lambda: scanner.scan_series(series, anonymize=True), len(texts))
+    print(f"Speedup: {legacy / single:.1f}x single, {legacy / batch:.1f}x batch")
+    print(f"Comments with PII: {int(scanner.scan_series(series)['has_pii'].sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import mongomock
+import pytest
+
+
+class _AsyncCursor:
+    """Motor-style cursor over a mongomock cursor."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count):
+        self._cursor = self._cursor.skip(count)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        documents = list(self._cursor)
+        return documents if length is None else documents[:length]
+
+    def __aiter__(self):
+        self._iterator = iter(self._cursor)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _AsyncCollection:
+    """Motor-style collection: awaitable operations, async cursors."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs))
+
+    async def bulk_write(self, requests, ordered=True):
+        # mongomock's bulk_write rejects the operations of current pymongo;
+        # UpdateOne requests are applied one by one instead
+        for request in requests:
+            self._collection.update_one(request._filter, request._doc, upsert=request._upsert)
+
+    def __getattr__(self, name):
+        operation = getattr(self._collection, name)
+
+        async def run(*args, **kwargs):
+            return operation(*args, **kwargs)
+        return run
+
+
+class _AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._database[name])
+
+    def __getattr__(self, name):
+        return _AsyncCollection(self._database[name])
+
+
+@pytest.fixture
+def mongo_db():
+    """In-memory MongoDB database with a Motor-style async interface."""
+    return _AsyncDatabase(mongomock.MongoClient().db)
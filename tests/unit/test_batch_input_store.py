@@ -0,0 +1,46 @@
+"""
+Unit tests for chunked batch job input.
+"""
+
+import gzip
+
+import pytest
+
+from backend.app.services.batch_input_store import BatchInputStore, parse_comment_chunk
+
+
+def test_parse_plain_and_gzip_chunks():
+    """Strings and comment objects are accepted, gzip is detected from the body."""
+    body = b'"First comment"\n\n{"comment": "Second comment"}\n{"text": "Third"}\n'
+
+    assert parse_comment_chunk(body) == ["First comment", "Second comment", "Third"]
+    assert parse_comment_chunk(gzip.compress(body)) == ["First comment", "Second comment", "Third"]
+
+
+def test_parse_rejects_invalid_lines():
+    """Errors name the offending line."""
+    with pytest.raises(ValueError, match="Line 2"):
+        parse_comment_chunk(b'"ok"\n{"rating": 5}\n')
+
+
+def test_parts_round_trip(tmp_path):
+    """Stored parts read back in upload order and are removed with the job."""
+    store = BatchInputStore(str(tmp_path))
+    store.write_part("job", 0, ["a", "b\nwith newline"])
+
+    assert store.read_part("job", 0) == ["a", "b\nwith newline"]
+
+    store.delete("job")
+    assert not (tmp_path / "job").exists()
+
+
+def test_gzip_is_decompressed_up_to_a_limit():
+    """Concatenated members are read; a body inflating past max_size is rejected."""
+    body = gzip.compress(b'"First"\n') + gzip.compress(b'"Second"\n')
+    assert parse_comment_chunk(body) == ["First", "Second"]
+
+    bomb = gzip.compress(b'"' + b"x" * 100000 + b'"\n')
+    with pytest.raises(ValueError, match="exceeds 1,000 bytes"):
+        parse_comment_chunk(bomb, max_size=1000)
+    with pytest.raises(ValueError, match="truncated"):
+        parse_comment_chunk(bomb[:-8])
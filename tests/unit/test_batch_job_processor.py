@@ -0,0 +1,214 @@
+"""
+Unit tests for batch job execution.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import backend.app.services.batch_job_processor as batch_job_processor
+from backend.app.services.batch_input_store import BatchInputStore
+from backend.app.services.batch_job_processor import BatchJobProcessor, BatchJobType
+from backend.app.services.batch_job_queue import BatchJobQueue
+from backend.app.services.batch_result_store import BatchResultStore
+from backend.app.services.term_statistics import term_statistics_store
+
+
+TEMPLATE = "The proposed data protection rules will burden small businesses with heavy compliance costs."
+
+
+@pytest.fixture
+def analyzed(monkeypatch, tmp_path):
+    """Replace the model-backed analysis; records every successfully analyzed comment."""
+    calls = []
+
+    def analyze_comments(comments, batch_start_index, job_type):
+        if any("fail" in comment for comment in comments):
+            raise ValueError("cannot analyze")
+        calls.extend(comments)
+        return [
+            {
+                "comment_index": batch_start_index + offset,
+                "comment": comment,
+                "policy_sentiment": {"sentiment_label": "negative", "confidence_score": 0.9}
+            }
+            for offset, comment in enumerate(comments)
+        ]
+
+    monkeypatch.setattr(batch_job_processor, "analyze_comments", analyze_comments)
+    monkeypatch.setattr(batch_job_processor, "result_store", BatchResultStore(str(tmp_path)))
+    return calls
+
+
+async def _claimed(queue, comments, parameters=None):
+    await queue.enqueue({
+        "job_id": "job", "job_type": "policy_analysis", "priority": 5, "created_at": datetime.utcnow(),
+        "total_comments": len(comments), "comments": comments, "parameters": parameters or {}
+    })
+    return await queue.claim("w1")
+
+
+def test_models_are_not_loaded_on_import():
+    assert batch_job_processor._sentiment_analyzer is None
+    assert batch_job_processor._summarization_service is None
+    assert batch_job_processor._visualization_service is None
+
+
+@pytest.mark.asyncio
+async def test_campaign_copies_analyzed_once_in_process(mongo_db, analyzed):
+    """Chunks run in-process; every member gets its representative's result, failures stay aligned."""
+    comments = [TEMPLATE, "Rural connectivity first.", TEMPLATE, "please fail this one", TEMPLATE]
+    queue = BatchJobQueue(mongo_db)
+    processor = BatchJobProcessor(queue, "w1", chunk_size=2, parallel_chunks=2, chunk_processes=0)
+
+    await processor.run(await _claimed(queue, comments))
+
+    job = await queue.get("job")
+    assert job["status"] == "completed"
+    assert sorted(analyzed) == sorted([TEMPLATE, "Rural connectivity first."])
+    assert job["result_summary"]["summary_statistics"]["sentiment_distribution"] == {"negative": 4}
+
+    results = batch_job_processor.result_store.read_page("job", limit=10)
+    assert [result["comment_index"] for result in results] == [0, 1, 2, 4]
+    assert results[2]["campaign_size"] == 3
+    assert batch_job_processor.result_store.read_page("job", failed=True)[0]["comment_index"] == 3
+
+
+@pytest.mark.asyncio
+async def test_in_process_chunks_keep_the_event_loop_responsive(mongo_db, analyzed, monkeypatch):
+    """Without a chunk pool, blocking inference runs on threads: the loop keeps ticking and chunks overlap."""
+    def slow_analyze_comments(comments, batch_start_index, job_type):
+        time.sleep(0.3)
+        return [{"comment_index": batch_start_index + offset, "comment": comment,
+                 "policy_sentiment": {"sentiment_label": "neutral", "confidence_score": 0.9}}
+                for offset, comment in enumerate(comments)]
+
+    monkeypatch.setattr(batch_job_processor, "analyze_comments", slow_analyze_comments)
+    queue = BatchJobQueue(mongo_db)
+    job = await _claimed(queue, ["first comment", "second comment"])
+    processor = BatchJobProcessor(queue, "w1", chunk_size=1, parallel_chunks=2, chunk_processes=0)
+
+    ticks = 0
+    running = asyncio.ensure_future(processor.run(job))
+    started = time.monotonic()
+    while not running.done():
+        await asyncio.sleep(0.01)
+        ticks += 1
+    await running
+
+    assert (await queue.get("job"))["status"] == "completed"
+    assert ticks >= 10
+    assert time.monotonic() - started < 0.55
+
+
+def test_policy_chunks_use_the_batched_analysis(monkeypatch):
+    """A policy chunk is scored in one batch call; a comment without a result becomes an error result."""
+    class StubAnalyzer:
+        batches = []
+
+        def _policy_sentiment_batch(self, texts):
+            self.batches.append(list(texts))
+            return [SimpleNamespace(sentiment_label="positive") if text else None for text in texts]
+
+        def _detect_stakeholder_type(self, text):
+            return "citizen"
+
+    monkeypatch.setattr(batch_job_processor, "get_sentiment_analyzer", StubAnalyzer)
+    results = batch_job_processor.analyze_comments(["good law", ""], 10, BatchJobType.POLICY_ANALYSIS)
+
+    assert StubAnalyzer.batches == [["good law", ""]]
+    assert results[0]["comment_index"] == 10 and results[0]["stakeholder_type"] == "citizen"
+    assert results[0]["policy_sentiment"] == {"sentiment_label": "positive"}
+    assert results[1]["comment_index"] == 11 and "error" in results[1]
+
+
+@pytest.mark.asyncio
+async def test_results_recorded_in_consultation_term_statistics(mongo_db, analyzed):
+    """Sentiment results feed the consultation's term statistics once per comment."""
+    comments = [TEMPLATE, "Rural connectivity first.", TEMPLATE, "please fail this one"]
+    queue = BatchJobQueue(mongo_db)
+    await term_statistics_store.ensure_indexes(mongo_db)
+    job = await _claimed(queue, comments, {"consultation_id": "batch-consultation"})
+    processor = BatchJobProcessor(queue, "w1", chunk_size=2, chunk_processes=0)
+
+    await processor.run(job)
+
+    statistics = await term_statistics_store.get(mongo_db, "batch-consultation")
+    assert statistics.comment_count == 3
+    assert dict(statistics.top_terms(sentiment_label="negative"))["burden"] == 2
+
+    # A resumed run writing the same results again does not count them twice
+    clusters = batch_job_processor.campaign_clusterer.cluster(comments)
+    results = [
+        {"error": "cannot analyze"} if "fail" in cluster.representative_text
+        else {"policy_sentiment": {"sentiment_label": "negative"}}
+        for cluster in clusters
+    ]
+    await processor._record_term_statistics(job, BatchJobType.POLICY_ANALYSIS, comments, clusters, results, 0)
+    assert (await term_statistics_store.get(mongo_db, "batch-consultation")).comment_count == 3
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_checkpoints(mongo_db, analyzed):
+    """A job taken over after a checkpoint only analyzes the remaining chunks."""
+    comments = ["first comment", "second comment", "third comment"]
+    queue = BatchJobQueue(mongo_db)
+    await _claimed(queue, comments)
+    clusters = batch_job_processor.campaign_clusterer.cluster(comments)
+    await queue.mark_started("job", "w1", batch_job_processor._cluster_layout(clusters), {})
+    done = [{"comment_index": i, "policy_sentiment": {"sentiment_label": "positive", "confidence_score": 0.9}}
+            for i in range(2)]
+    assert await queue.checkpoint("job", "w1", 0, done, 2, 66.7)
+
+    processor = BatchJobProcessor(queue, "w1", chunk_size=2, chunk_processes=0)
+    await processor.run(await queue.get("job", include_comments=True))
+
+    assert analyzed == ["third comment"]
+    assert (await queue.get("job"))["result_summary"]["summary_statistics"]["sentiment_distribution"] == {
+        "positive": 2, "negative": 1
+    }
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_is_not_completed(mongo_db, analyzed):
+    queue = BatchJobQueue(mongo_db)
+    job = await _claimed(queue, ["one comment", "another comment"])
+    await queue.cancel("job")
+
+    await BatchJobProcessor(queue, "w1", chunk_size=1, chunk_processes=0).run(job)
+
+    assert (await queue.get("job"))["status"] == "cancelled"
+    assert not batch_job_processor.result_store.exists("job")
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_processed_part_by_part(mongo_db, analyzed, monkeypatch, tmp_path):
+    """Parts are analyzed in upload order, a released part is skipped and the input is removed."""
+    input_store = BatchInputStore(str(tmp_path / "input"))
+    monkeypatch.setattr(batch_job_processor, "input_store", input_store)
+    queue = BatchJobQueue(mongo_db)
+    await queue.enqueue({
+        "job_id": "upload", "job_type": "policy_analysis", "priority": 5, "created_at": datetime.utcnow(),
+        "total_comments": 0, "parameters": {}, "input_mode": "chunked", "input_parts": 0, "sealed": False,
+        "last_append_at": None
+    })
+    for comments in ([TEMPLATE, "Rural connectivity first."], ["never stored"], [TEMPLATE]):
+        seq, start = await queue.reserve_part("upload", len(comments), max_comments=100)
+        if comments == ["never stored"]:
+            continue
+        input_store.write_part("upload", seq, comments)
+        await queue.add_part("upload", seq, start, len(comments))
+    await queue.release_part("upload", 1, 2, 1)
+    assert await queue.seal("upload")
+
+    await BatchJobProcessor(queue, "w1", chunk_size=2, chunk_processes=0).run(await queue.claim("w1"))
+
+    job = await queue.get("upload")
+    assert job["status"] == "completed" and job["total_comments"] == 3
+    assert sorted(analyzed) == sorted([TEMPLATE, "Rural connectivity first.", TEMPLATE])
+    results = batch_job_processor.result_store.read_page("upload", limit=10)
+    assert [result["comment_index"] for result in results] == [0, 1, 3]
+    assert not (tmp_path / "input" / "upload").exists()
@@ -0,0 +1,94 @@
+"""
+Unit tests for the durable batch job queue.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app.services.batch_job_queue import BatchJobQueue, normalize_priority
+
+
+def _job(job_id, priority, created_at, **fields):
+    return {"job_id": job_id, "priority": priority, "created_at": created_at, **fields}
+
+
+@pytest.fixture
+def queue(mongo_db):
+    return BatchJobQueue(mongo_db, lease_seconds=60, max_attempts=2)
+
+
+def test_normalize_priority():
+    assert [normalize_priority(value) for value in (None, "x", 0, 3, "7", 42)] == [5, 5, 1, 3, 7, 10]
+
+
+@pytest.mark.asyncio
+async def test_claims_by_priority_then_age(queue):
+    """A null priority is stored as the default instead of jumping the queue."""
+    start = datetime.utcnow()
+    await queue.enqueue(_job("late-urgent", 1, start + timedelta(seconds=2)))
+    await queue.enqueue(_job("no-priority", None, start))
+    await queue.enqueue(_job("early-urgent", 1, start + timedelta(seconds=1)))
+
+    claimed = [(await queue.claim("w1"))["_id"] for _ in range(3)]
+    assert claimed == ["early-urgent", "late-urgent", "no-priority"]
+    assert await queue.claim("w1") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_taken_over(queue):
+    await queue.enqueue(_job("job", 5, datetime.utcnow()))
+    await queue.claim("w1")
+    assert await queue.heartbeat("job", "w1")
+
+    await queue.jobs.update_one({"_id": "job"}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    taken = await queue.claim("w2")
+    assert taken["worker_id"] == "w2" and taken["attempts"] == 2
+    assert not await queue.heartbeat("job", "w1")
+
+    # A stale worker's checkpoint does not overwrite the new owner's chunk
+    assert await queue.checkpoint("job", "w2", 0, [{"owner": "w2"}], 10, 50.0)
+    assert not await queue.checkpoint("job", "w1", 0, [{"owner": "w1"}], 10, 50.0)
+    assert await queue.load_checkpoints("job") == {0: [{"owner": "w2"}]}
+
+    # Out of attempts: the next expired lease fails the job instead of re-queueing it
+    await queue.jobs.update_one({"_id": "job"}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert await queue.claim("w3") is None
+    job = await queue.get("job")
+    assert job["status"] == "failed" and "abandoned" in job["error_message"]
+
+
+@pytest.mark.asyncio
+async def test_chunked_parts_reserve_and_seal(queue):
+    """Chunked jobs are claimable after their first part; reservations respect the ceiling."""
+    await queue.enqueue(_job("upload", 5, datetime.utcnow(), input_mode="chunked",
+                             sealed=False, input_parts=0, total_comments=0))
+    assert await queue.claim("w1") is None
+
+    assert await queue.reserve_part("upload", 60, max_comments=100) == (0, 0)
+    assert await queue.reserve_part("upload", 60, max_comments=100) is None
+    assert await queue.reserve_part("upload", 40, max_comments=100) == (1, 60)
+    assert (await queue.claim("w1"))["_id"] == "upload"
+
+    assert await queue.seal("upload")
+    assert not await queue.seal("upload")
+    assert await queue.reserve_part("upload", 1, max_comments=1000) is None
+
+
+@pytest.mark.asyncio
+async def test_released_reservations(queue):
+    """A failed part gives back the latest reservation, or leaves an empty part behind later ones."""
+    await queue.enqueue(_job("upload", 5, datetime.utcnow(), input_mode="chunked",
+                             sealed=False, input_parts=0, total_comments=0))
+
+    assert await queue.reserve_part("upload", 10, max_comments=100) == (0, 0)
+    await queue.release_part("upload", 0, 0, 10)
+    assert await queue.reserve_part("upload", 20, max_comments=100) == (0, 0)
+
+    assert await queue.reserve_part("upload", 5, max_comments=100) == (1, 20)
+    assert await queue.reserve_part("upload", 5, max_comments=100) == (2, 25)
+    await queue.release_part("upload", 1, 20, 5)
+
+    job = await queue.get("upload")
+    assert job["input_parts"] == 3 and job["total_comments"] == 25
+    assert [(part["seq"], part["count"]) for part in await queue.list_parts("upload")] == [(1, 0)]
@@ -0,0 +1,60 @@
+"""
+Unit tests for on-disk batch job results.
+"""
+
+import os
+
+import pytest
+
+from backend.app.services.batch_result_store import BatchResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a result store with a small index interval."""
+    return BatchResultStore(str(tmp_path), index_interval=4)
+
+
+def write_job(store, count=10):
+    writer = store.open_writer("job", "policy_analysis")
+    for index in range(count):
+        label = "negative" if index % 3 else "positive"
+        writer.write({
+            "comment_index": index,
+            "policy_sentiment": {"sentiment_label": label, "confidence_score": 0.9}
+        })
+    writer.write({"comment_index": count, "error": "failed"}, failed=True)
+    return writer.close()
+
+
+def test_summary_is_aggregated_while_writing(store):
+    """Summary statistics and recommendations come with the closed writer."""
+    summary = write_job(store)
+
+    assert summary["result_count"] == 10
+    assert summary["failed_count"] == 1
+    assert summary["summary_statistics"]["sentiment_distribution"] == {"positive": 4, "negative": 6}
+    assert summary["recommendations"][0].startswith("High negative sentiment detected (6/10")
+
+
+def test_pages_are_read_from_index(store):
+    """Pages start at any offset, including inside an index block."""
+    write_job(store)
+
+    page = store.read_page("job", offset=5, limit=4)
+
+    assert [result["comment_index"] for result in page] == [5, 6, 7, 8]
+    assert store.read_page("job", offset=20, limit=4) == []
+    assert store.read_page("job", limit=10, failed=True)[0]["error"] == "failed"
+
+
+def test_expired_results_are_purged(store, tmp_path):
+    """Files older than the retention period are removed; the job then reads as gone."""
+    write_job(store)
+    assert store.purge_expired(3600) == 0
+    assert store.exists("job")
+
+    for path in tmp_path.iterdir():
+        os.utime(path, (0, 0))
+    assert store.purge_expired(3600) == 1
+    assert not store.exists("job") and not list(tmp_path.iterdir())
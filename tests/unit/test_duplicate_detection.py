@@ -0,0 +1,78 @@
+"""
+Unit tests for MinHash LSH based duplicate detection.
+"""
+
+import numpy as np
+import pytest
+
+from backend.app.utils.minhash import MinHashLSH
+from backend.app.utils.text_utils import DuplicationDetector
+
+
+@pytest.fixture
+def detector():
+    """Create a duplicate detector instance."""
+    return DuplicationDetector()
+
+
+def test_exact_and_near_duplicates(detector):
+    """Exact and lightly edited copies are paired with the earliest original."""
+    comments = [
+        "The proposed data protection rules will burden small businesses with compliance costs.",
+        "Rural connectivity must be addressed before digital services become mandatory.",
+        "The proposed data protection rules will burden small businesses with compliance costs.",
+        "The proposed data protection rules will burden small business with compliance costs!",
+    ]
+
+    duplicates = detector.find_duplicates(comments)
+
+    assert (0, 2) in duplicates
+    assert (0, 3) in duplicates
+    assert all(original != 1 and duplicate != 1 for original, duplicate in duplicates)
+
+
+def test_distinct_comments_not_paired(detector):
+    """Unrelated comments produce no duplicate pairs."""
+    comments = [
+        "I support the new timeline for implementation of section 4.",
+        "Penalties in clause 7 are far too harsh for first-time offenders.",
+        "Please provide translations of the draft in regional languages.",
+    ]
+
+    assert detector.find_duplicates(comments) == []
+
+
+def test_signatures_are_deterministic():
+    """Signatures must be stable across instances to be stored persistently."""
+    text = "the draft bill improves transparency in public procurement"
+    first = MinHashLSH().signature(text)
+    second = MinHashLSH().signature(text)
+
+    assert np.array_equal(first, second)
+    assert MinHashLSH().band_keys(first) == MinHashLSH().band_keys(second)
+
+
+def test_lsh_query_finds_similar_text():
+    """A near-identical text shares at least one LSH band."""
+    lsh = MinHashLSH()
+    lsh.insert("original", lsh.signature("the draft bill improves transparency in public procurement"))
+
+    candidates = lsh.query(lsh.signature("the draft bill improves transparency in public procurement rules"))
+
+    assert "original" in candidates
+
+
+def test_campaign_clusters_group_template_copies():
+    """Template copies collapse into one cluster represented by the earliest copy."""
+    from backend.app.services.campaign_clustering import CampaignClusterer
+
+    comments = [
+        "The proposed data protection rules will burden small businesses with compliance costs.",
+        "Rural connectivity must be addressed before digital services become mandatory.",
+        "The proposed data protection rules will burden small business with compliance costs!",
+    ]
+
+    clusters = CampaignClusterer().cluster(comments)
+
+    assert [cluster.member_indexes for cluster in clusters] == [[0, 2], [1]]
+    assert clusters[0].representative_text == comments[0]
@@ -0,0 +1,203 @@
+"""
+Unit tests for provision mapping and legislation sessions.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import spacy
+
+from backend.app.services.legislation_session_service import LegislationSessionStore
+from backend.app.services.legislative_context_service import (
+    KeywordMatcher,
+    LegislativeContextService,
+    LegislativeProvision,
+    ProvisionIndex,
+    ProvisionKeywordTable,
+    ProvisionType
+)
+from backend.app.services.spacy_service import SpacyService
+
+COMMENTS = [
+    "Section 2 should remove the penalty for a first violation",
+    "The rights and freedoms of citizens need stronger protection",
+    "Every right holder deserves a clear process and procedure",
+    "The enforcement mechanism must ensure compliance and accountability",
+    "Looks good to me",
+    "",
+]
+
+
+class StubAnalyzer:
+    """Keyword sentiment standing in for SentimentAnalyzer; records scored texts."""
+
+    def __init__(self):
+        self.scored = []
+
+    def _policy_sentiment_batch(self, texts):
+        self.scored.extend(texts)
+        return [self._score(text) for text in texts]
+
+    @staticmethod
+    def _score(text):
+        label = "negative" if "remove" in text or "must" in text else "positive"
+        return SimpleNamespace(sentiment_label=SimpleNamespace(value=label), confidence_score=0.8)
+
+    def _detect_stakeholder_type(self, text):
+        return "citizen"
+
+
+class StubSummarizer:
+    def _policy_summary(self, text):
+        return SimpleNamespace(summary_text=text[:40])
+
+
+def _provision(number, content):
+    return LegislativeProvision(f"section_{number}", ProvisionType.SECTION, f"Section {number}", content)
+
+
+PROVISIONS = [
+    _provision(1, "Every citizen has the right to privacy and freedom of expression."),
+    _provision(2, "A violation is punishable by a fine or other penalty."),
+    _provision(3, "The authority shall ensure compliance through an enforcement procedure."),
+]
+
+
+@pytest.fixture
+def service():
+    return LegislativeContextService(
+        spacy_service=SpacyService(nlp=spacy.blank("en")),
+        sentiment_analyzer=StubAnalyzer(),
+        summarization_service=StubSummarizer()
+    )
+
+
+def test_top_k_orders_by_similarity_then_position():
+    index = ProvisionIndex(PROVISIONS, np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 0.0]]))
+
+    indices, scores = index.top_k(np.array([[3.0, 0.0], [1.0, 1.0], [0.0, 0.0]]), k=2)
+
+    assert indices.tolist() == [[0, 2], [0, 1], [0, 1]]
+    assert scores[0].tolist() == [1.0, 1.0]
+    assert scores[1] == pytest.approx([0.7071, 0.7071], abs=1e-4)
+    # A comment without a vector matches nothing
+    assert scores[2].tolist() == [0.0, 0.0]
+    # k beyond the number of provisions returns every provision
+    assert index.top_k(np.array([[0.0, 1.0]]), k=5)[0].tolist() == [[1, 0, 2]]
+
+
+def test_keyword_matcher_matches_substring_counts(service):
+    """Counts equal the per-keyword substring test the matcher replaced."""
+    matcher = service.keyword_matcher
+    texts = [comment.lower() for comment in COMMENTS] + [provision.content.lower() for provision in PROVISIONS]
+    texts.append("a rights-based waiver is not applicable; it refers to what the act means")
+
+    for text in texts:
+        expected = [
+            sum(1 for keyword in keywords if keyword in text)
+            for keywords in service.legal_keywords.values()
+        ]
+        assert matcher.concept_counts(text).tolist() == expected, text
+
+
+def test_keyword_matcher_counts_shared_keywords_per_concept():
+    matcher = KeywordMatcher({"a": ["duty", "dutyfree"], "b": ["duty"]})
+
+    assert matcher.concept_counts("dutyfree goods").tolist() == [2, 1]
+    assert matcher.concept_counts("nothing").tolist() == [0, 0]
+
+
+def test_keyword_table_best_match(service):
+    """The table scores provisions like the old nested loop; the first provision wins ties."""
+    table = ProvisionKeywordTable(PROVISIONS + [_provision(1, "Duplicate id, later content")],
+                                  service.keyword_matcher)
+
+    provision, score = table.best_match(service.keyword_matcher.concept_counts(COMMENTS[1].lower()))
+    assert provision.provision_id == "section_1"
+    # rights: "right", "rights", "freedom" in the comment; "right", "freedom" in section 1
+    assert score == 3 * 2
+
+    provision, _ = table.best_match(service.keyword_matcher.concept_counts(COMMENTS[3].lower()))
+    assert provision.provision_id == "section_3"
+
+    assert table.best_match(service.keyword_matcher.concept_counts("nothing relevant")) is None
+    assert table.by_id["section_1"] is PROVISIONS[0]
+
+
+@pytest.mark.asyncio
+async def test_session_maps_incrementally_and_caches_analyses(service):
+    store = LegislationSessionStore(service, max_sessions=2, ttl_seconds=3600)
+    session = await store.create("user", PROVISIONS, title="Test Bill")
+
+    mappings = await session.add_comments(COMMENTS[:4])
+    assert [[mapping.provision_id for mapping in comment] for comment in mappings] == [
+        ["section_2"], ["section_1"], ["section_1"], ["section_3"]
+    ]
+    assert mappings[0][0].mapping_method == "explicit_reference"
+
+    analysis = await session.provision_analysis("section_1")
+    assert analysis.comment_count == 2
+    assert await session.provision_analysis("section_1") is analysis
+    untouched = await session.provision_analysis("section_3")
+
+    # New comments only invalidate the provisions they map to
+    await session.add_comments(["Citizens deserve the right to appeal", "Looks good to me"])
+    result = await session.analyze()
+    analyses = {analysis.provision.provision_id: analysis for analysis in result.provision_analyses}
+    assert analyses["section_1"].comment_count == 3
+    assert analyses["section_3"] is untouched
+    assert result.total_comments == 6 and result.unmapped_comments == 1
+    # Only the comments of re-analyzed provisions are scored again
+    assert service.sentiment_analyzer.scored.count("Citizens deserve the right to appeal") == 1
+    assert service.sentiment_analyzer.scored.count(COMMENTS[3]) == 1
+
+    cross = await session.provision_analyses()
+    assert [analysis.provision.provision_id for analysis in cross] == ["section_2", "section_1", "section_3"]
+    assert cross[1] is analyses["section_1"]
+
+    coverage = session.coverage()
+    assert coverage["comments_per_provision"] == {"section_1": 3, "section_2": 1, "section_3": 1}
+    assert coverage["provisions_without_feedback"] == 0
+
+
+@pytest.mark.asyncio
+async def test_session_store_evicts_least_recently_used(service):
+    store = LegislationSessionStore(service, max_sessions=2, ttl_seconds=3600)
+    first = await store.create("user", PROVISIONS)
+    second = await store.create("user", PROVISIONS)
+    assert store.get(first.session_id) is first
+
+    await store.create("user", PROVISIONS)
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) is first
+    assert store.delete(first.session_id) and not store.delete(first.session_id)
+
+
+@pytest.mark.asyncio
+async def test_session_comment_limit(service):
+    """Additions beyond the session's comment limit are rejected as a whole."""
+    store = LegislationSessionStore(service, max_comments=3)
+    session = await store.create("user", PROVISIONS)
+    await session.add_comments(COMMENTS[:2])
+
+    with pytest.raises(ValueError, match="limit of 3"):
+        await session.add_comments(COMMENTS[2:4])
+    assert len(session.comments) == 2
+
+    await session.add_comments(COMMENTS[2:3])
+    assert len(session.comments) == 3
+
+
+@pytest.mark.asyncio
+async def test_provision_groups_share_one_sentiment_pass(service):
+    """Comments mapped to several provisions are scored once, in a single batch."""
+    analyses = await service.analyze_provision_groups({
+        "section_1": [COMMENTS[1], COMMENTS[2]],
+        "section_3": [COMMENTS[1]],
+        "section_9": []
+    }, PROVISIONS)
+
+    assert [analysis.provision.provision_id for analysis in analyses] == ["section_1", "section_3"]
+    assert service.sentiment_analyzer.scored == [COMMENTS[1], COMMENTS[2]]
+    assert analyses[1].provision is PROVISIONS[2]
@@ -0,0 +1,24 @@
+"""
+Unit tests for multilingual word cloud tokenization.
+"""
+
+import pandas as pd
+
+from backend.app.services.multilingual_wordcloud import MultilingualWordCloudGenerator
+
+
+def test_tokenize_mixed_script_comment():
+    """URLs, mentions, hashtags, dandas and stopwords of every script are dropped."""
+    generator = MultilingualWordCloudGenerator()
+    text = "Great SCHEME यह बहुत अच्छी योजना है। இது சிறந்த https://x.org/a?b=1 @gov #tax COVID19"
+
+    assert generator.clean_and_tokenize(text) == ["great", "scheme", "बहुत", "अच्छी", "योजना", "சிறந்த", "COVID19"]
+    assert "इस" in generator.clean_and_tokenize("इस योजना", languages=["en"])
+
+
+def test_batch_and_frequencies_over_series():
+    generator = MultilingualWordCloudGenerator()
+    texts = pd.Series(["योजना अच्छी", None, "अच्छी policy tax", float("nan"), "tax"])
+
+    assert generator.tokenize_batch(texts) == [["योजना", "अच्छी"], [], ["अच्छी", "tax"], [], ["tax"]]
+    assert generator.generate_word_frequencies(texts) == {"अच्छी": 2, "tax": 2}
@@ -0,0 +1,57 @@
+"""
+Unit tests for the compiled PII scanner.
+"""
+
+import pandas as pd
+import pytest
+
+from backend.app.utils.pii_scanner import PIIScanner
+from backend.app.utils.text_utils import TextCleaner, TextValidator
+
+
+@pytest.fixture
+def scanner():
+    """Create a PII scanner instance."""
+    return PIIScanner()
+
+
+def test_detects_all_pii_types(scanner):
+    """Each supported PII type is found and labelled."""
+    text = (
+        "Write to a.citizen@example.org or call +91 9876543210. "
+        "Aadhaar 2345 6789 0123, PAN ABCDE1234F, details at https://example.gov.in/form."
+    )
+
+    types = scanner.pii_types(scanner.scan(text))
+
+    assert types == ['Email', 'Phone', 'Aadhaar', 'PAN', 'URL']
+
+
+def test_anonymize_reuses_spans(scanner):
+    """Anonymization masks the spans found by scan."""
+    text = "Contact 9876543210 or visit www.example.in for section 4 details."
+    matches = scanner.scan(text)
+
+    assert scanner.anonymize(text, matches) == "Contact [PHONE] or visit [URL] for section 4 details."
+
+
+def test_plain_text_has_no_pii(scanner):
+    """Ordinary comments, including section numbers, are not flagged."""
+    assert scanner.scan("Section 4 of the draft rules should be revised by 2025.") == []
+
+
+def test_series_batch_mode(scanner):
+    """Batch mode returns per-row results aligned with the input index."""
+    texts = pd.Series(["mail me at x@y.com", "no personal data here", None], index=[10, 11, 12])
+
+    result = scanner.scan_series(texts, anonymize=True)
+
+    assert result['has_pii'].tolist() == [True, False, False]
+    assert result.loc[10, 'pii_types'] == ['Email']
+    assert result.loc[10, 'anonymized_text'] == "mail me at [EMAIL]"
+
+
+def test_validator_and_cleaner_use_scanner():
+    """TextValidator and TextCleaner expose scanner results."""
+    assert TextValidator().contains_pii("my PAN is ABCDE1234F") == (True, ['PAN'])
+    assert TextCleaner().anonymize_pii("ssn 123-45-6789") == "ssn [SSN]"
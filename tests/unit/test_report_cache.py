@@ -0,0 +1,75 @@
+"""
+Unit tests for background report rendering with cached artifacts.
+"""
+
+import os
+
+import pytest
+
+from backend.app.services.report_cache import ReportArtifactStore
+
+
+@pytest.mark.asyncio
+async def test_rendered_once_per_data_version(tmp_path):
+    """Repeat requests reuse the artifact on disk; a new data version replaces it."""
+    renders = []
+
+    def render(output):
+        renders.append(1)
+        output.write(b"report")
+        return 3
+
+    store = ReportArtifactStore(directory=str(tmp_path))
+    job = store.ensure("pdf", "c1", "v1", render)
+    await job.task
+    assert job.status == "ready" and job.row_count == 3
+
+    # A new process finds the artifact on disk
+    restarted = ReportArtifactStore(directory=str(tmp_path))
+    assert restarted.ensure("pdf", "c1", "v1", render).status == "ready"
+    assert len(renders) == 1
+
+    newer = restarted.ensure("pdf", "c1", "v2", render)
+    await newer.task
+    # The older artifact stays for downloads still streaming it
+    assert os.path.exists(newer.path) and os.path.exists(job.path)
+
+    # and is removed once the grace period after it was superseded has passed
+    expired = ReportArtifactStore(directory=str(tmp_path), superseded_grace_seconds=0)
+    assert expired.ensure("pdf", "c1", "v2", render).status == "ready"
+    assert os.path.exists(newer.path) and not os.path.exists(job.path)
+    assert len(renders) == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_and_failed_renderings(tmp_path):
+    store = ReportArtifactStore(directory=str(tmp_path))
+    empty = store.ensure("excel", "c1", "v1", lambda output: 0)
+    await empty.task
+    assert empty.status == "empty" and not os.path.exists(empty.path)
+
+    def broken(output):
+        raise ValueError("bad row")
+
+    failed = store.ensure("excel", "c2", "v1", broken)
+    await failed.task
+    assert failed.status == "failed" and failed.error == "bad row"
+    retried = store.ensure("excel", "c2", "v1", lambda output: 1)
+    await retried.task
+    assert retried is not failed and retried.status == "ready"
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_not_kept_in_memory(tmp_path):
+    """Ready jobs are found on disk again; only the latest empty or failed outcomes are remembered."""
+    store = ReportArtifactStore(directory=str(tmp_path), max_finished_jobs=2)
+    ready = store.ensure("pdf", "c1", "v1", lambda output: 1)
+    await ready.task
+    assert not store._jobs
+    assert store.status("pdf", "c1", "v1").status == "ready"
+
+    for consultation_id in ("c2", "c3", "c4"):
+        await store.ensure("pdf", consultation_id, "v1", lambda output: 0).task
+    assert len(store._jobs) == 2
+    assert store.status("pdf", "c2", "v1") is None
+    assert store.status("pdf", "c4", "v1").status == "empty"
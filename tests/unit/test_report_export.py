@@ -0,0 +1,43 @@
+"""
+Unit tests for the streaming Excel report export.
+"""
+
+import io
+
+from openpyxl import load_workbook
+
+from backend.app.services.report_export import write_excel_report
+from backend.app.services.visualization_service import VisualizationService
+
+
+def _rows(summaries):
+    return [
+        (index, f"water tax comment {index}", "s1", None, "positive" if index % 2 else "negative", 0.9, summary)
+        for index, summary in enumerate(summaries)
+    ]
+
+
+def test_workbook_sheets_from_batches():
+    """Rows arrive in batches; keywords come from summaries when any row has one."""
+    rows = _rows([None, "tax relief", "tax burden"])
+    output = io.BytesIO()
+    row_count = write_excel_report([rows[:2], rows[2:]], output, VisualizationService().token_analyzer())
+    workbook = load_workbook(output)
+
+    assert row_count == 3
+    assert workbook.sheetnames == ["Summary", "Comments", "Keywords"]
+    assert list(workbook["Summary"].values) == [("sentiment", "count"), ("positive", 1), ("negative", 2), ("neutral", 0)]
+    assert list(workbook["Keywords"].values) == [("keyword", "count"), ("tax", 2), ("relief", 1), ("burden", 1)]
+    assert len(list(workbook["Comments"].values)) == 4
+
+
+def test_keywords_fall_back_to_texts_and_empty_report():
+    analyzer = VisualizationService().token_analyzer()
+    output = io.BytesIO()
+    write_excel_report([_rows(["", None])], output, analyzer)
+    keywords = list(load_workbook(output)["Keywords"].values)
+    assert keywords[1:3] == [("water", 2), ("tax", 2)]
+
+    output = io.BytesIO()
+    assert write_excel_report([], output, analyzer) == 0
+    assert output.getvalue() == b""
@@ -0,0 +1,78 @@
+"""
+Unit tests for the shared spaCy service.
+"""
+
+import pytest
+import spacy
+from spacy.language import Language
+
+from backend.app.services.spacy_service import SpacyService
+
+CALLS = []
+
+
+@Language.component("record_calls")
+def record_calls(doc):
+    CALLS.append(doc.text)
+    if doc.text == "raise":
+        raise ValueError("component failed")
+    return doc
+
+
+@pytest.fixture
+def service():
+    """Service over a blank pipeline standing in for tok2vec and ner."""
+    CALLS.clear()
+    nlp = spacy.blank("en")
+    nlp.add_pipe("record_calls", name="tok2vec")
+    nlp.add_pipe("record_calls", name="ner")
+    nlp.add_pipe("sentencizer")
+    return SpacyService(cache_size=8, nlp=nlp)
+
+
+def test_cached_doc_reused_for_component_subsets(service):
+    """A Doc built for a task serves every task needing a subset of its components."""
+    full = service.process("Section 4 applies.", task="full")
+    assert service.process("Section 4 applies.", task="vectors") is full
+    assert service.process("Section 4 applies.", task="lemmas") is full
+
+    vectors = service.process("Section 5 applies.", task="vectors")
+    phrases = service.process("Section 5 applies.", task="phrases")
+    assert phrases is not vectors
+    assert service.process("Section 5 applies.", task="vectors") is phrases
+    assert service.cache_stats()["hits"] == 3
+
+
+def test_select_pipes_restored(service):
+    """Disabled components are re-enabled after each run, also when a component fails."""
+    service.pipe(["one", "two", "one"], task="vectors")
+    # Duplicate texts are processed once, ner stays disabled for the vectors task
+    assert CALLS == ["one", "two"]
+    assert service.nlp.disabled == []
+
+    with pytest.raises(ValueError):
+        service.pipe(["raise"], task="vectors")
+    assert service.nlp.disabled == []
+    assert service.nlp.pipe_names == ["tok2vec", "ner", "sentencizer"]
+
+
+def test_truncation_is_counted(service):
+    service.nlp.max_length = 10
+    doc = service.process("x" * 25, task="vectors")
+    assert len(doc.text) == 10
+    assert service.cache_stats()["truncated"] == 1
+
+
+def test_uncached_pipe_leaves_cache_alone(service):
+    """Bulk processing neither reads nor evicts cached Docs."""
+    cached = service.process("Section 4 applies.", task="vectors")
+    CALLS.clear()
+
+    docs = service.pipe([f"comment {i}" for i in range(20)] + ["Section 4 applies."],
+                        task="vectors", batch_size=4, use_cache=False)
+
+    assert [doc.text for doc in docs][-2:] == ["comment 19", "Section 4 applies."]
+    assert len(CALLS) == 21
+    assert service.cache_stats()["size"] == 1
+    assert service.process("Section 4 applies.", task="vectors") is cached
+    assert service.nlp.disabled == []
@@ -0,0 +1,97 @@
+"""
+Unit tests for the stakeholder scoring pipeline.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.stakeholder_service import ProfileVectors, StakeholderAnalysisService
+
+
+class KeywordAnalyzer:
+    """Deterministic stand-in for SentimentAnalyzer that counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.scored = []
+
+    async def analyze_policy_sentiment_batch(self, texts):
+        self.calls += 1
+        self.scored.extend(texts)
+        return [self._score(text) for text in texts]
+
+    @staticmethod
+    def _score(text):
+        label = "negative" if "oppose" in text else "positive"
+        return SimpleNamespace(
+            sentiment_label=SimpleNamespace(value=label), confidence_score=0.8,
+            positive_score=0.8 if label == "positive" else 0.1,
+            negative_score=0.1 if label == "positive" else 0.8
+        )
+
+    def _detect_stakeholder_type(self, text):
+        return "business" if "company" in text else "individual"
+
+
+@pytest.fixture
+def service():
+    return StakeholderAnalysisService(KeywordAnalyzer(), cache_size=4)
+
+
+@pytest.mark.asyncio
+async def test_each_comment_scored_once_and_table_reused(service):
+    """Distinct comments are scored in one batch; repeated requests do not re-run it."""
+    texts = [
+        "Our company will oppose the compliance cost",
+        "Our company will oppose the compliance cost",
+        "I support stronger privacy rights for everyone",
+    ]
+
+    table = await service.analyze(texts)
+    again = await service.analyze(texts)
+
+    assert service.sentiment_analyzer.calls == 1
+    assert len(service.sentiment_analyzer.scored) == 2
+    assert again is table
+    assert service.get(table.table_id) is table
+
+
+@pytest.mark.asyncio
+async def test_group_profiles(service):
+    """Profiles aggregate sentiment, stance and concerns per stakeholder group."""
+    texts = [
+        "Our company will oppose the compliance cost",
+        "The company expects a heavy burden and will oppose it",
+        "I support stronger privacy rights for everyone",
+    ]
+
+    profiles = (await service.analyze(texts)).profiles()
+
+    assert list(profiles) == ["business", "individual"]
+    assert profiles["business"]["sentiment_distribution"] == {"negative": 2}
+    assert profiles["business"]["policy_stance"] == "oppose"
+    assert profiles["business"]["key_concerns"] == ["cost", "compliance", "burden"]
+    assert profiles["individual"]["key_concerns"] == ["rights", "privacy"]
+
+
+def test_profile_vectors_alignment():
+    def profile(sentiment, stance, concerns):
+        return SimpleNamespace(dominant_sentiment=sentiment, policy_stance=stance, key_concerns=concerns)
+
+    vectors = ProfileVectors({
+        "business": profile("negative", "oppose", ["cost", "burden"]),
+        "ngo": profile("negative", "support", ["cost", "welfare"]),
+        "academic": profile("positive", "support", []),
+    })
+    alignment = vectors.alignment().round(2)
+
+    assert alignment.diagonal().tolist() == [1.0, 1.0, 1.0]
+    # same sentiment (0.4) + one of three concerns shared (0.4 / 3)
+    assert alignment[0, 1] == pytest.approx(0.53)
+    # only the stance matches; no shared concerns
+    assert alignment[1, 2] == pytest.approx(0.2)
+    assert alignment[0, 2] == 0.0
+    assert vectors.concern_counts().tolist() == [2.0, 1.0, 1.0]
+    assert vectors.groups_with_unique_concerns().tolist() == [True, True, False]
+
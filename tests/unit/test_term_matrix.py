@@ -0,0 +1,47 @@
+"""
+Unit tests for the shared term-document matrix engine.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from backend.app.services.term_matrix import WORD_ANALYZER, TermAnalyzer, TermDocumentMatrix, TermMatrixEngine
+
+
+def test_top_terms_match_counter_order():
+    """Counts and first-appearance tie order are those of Counter.most_common over the token stream."""
+    texts = ["water tax", "tax relief water", "relief now", "now"]
+    matrix = TermMatrixEngine(cache_size=2).build(texts)
+    tokens = [token for text in texts for token in text.split()]
+
+    assert matrix.top_terms(3) == Counter(tokens).most_common(3)
+
+    rows = [3, 2, 2, 0]
+    row_tokens = [token for row in rows for token in texts[row].split()]
+    assert matrix.top_terms(rows=rows) == Counter(row_tokens).most_common()
+
+
+def test_analyzer_rules_and_cache():
+    analyzer = TermAnalyzer(
+        name="test", pattern=re.compile(r"\w+"), min_length=3, stopwords=frozenset({"the"}),
+        drop_numeric=True, strip_patterns=(re.compile(r"https?://\S+"),)
+    )
+    engine = TermMatrixEngine(cache_size=1)
+
+    assert analyzer.tokenize("The 2024 plan https://gov.in/plan PLAN") == ["plan", "plan"]
+    assert engine.build(["a b"]) is engine.build(["a b"])
+    assert engine.build(["a b"], analyzer) is not engine.build(["a b"])
+
+
+def test_groups_cooccurrence_and_tfidf():
+    matrix = TermDocumentMatrix.from_tokens([["tax", "cost"], ["tax"], ["privacy"]])
+
+    labels, counts = matrix.group_term_counts(["business", "business", "individual"])
+    assert labels == ["business", "individual"]
+    assert counts.toarray().tolist() == [[2, 1, 0], [0, 0, 1]]
+
+    assert matrix.cooccurring_terms("cost") == [("tax", 1)]
+    assert np.allclose(np.asarray(matrix.tfidf().multiply(matrix.tfidf()).sum(axis=1)).ravel(), 1.0)
+    assert WORD_ANALYZER.tokenize("Tax, tax!") == ["tax", "tax"]
@@ -0,0 +1,116 @@
+"""
+Unit tests for per-sentiment term statistics.
+"""
+
+import pytest
+
+from backend.app.services.term_statistics import TermStatistics, TermStatisticsStore
+
+
+def test_slices_and_weighted_members():
+    """A text added for several comments counts once per comment in every slice it belongs to."""
+    statistics = TermStatistics()
+    statistics.add(["tax", "relief"], "tax relief now", [
+        {"sentiment_score": 0.6, "stakeholder_type": "business"},
+        {"sentiment_score": 0.4, "stakeholder_type": "business"}
+    ])
+    statistics.add(["tax", "burden"], "tax burden", [{"sentiment_label": "negative", "sentiment_score": -0.8}])
+
+    assert statistics.comment_count == 3
+    assert statistics.top_terms(1) == [("tax", 3)]
+    assert statistics.top_terms(sentiment_label="negative") == [("tax", 1), ("burden", 1)]
+    assert statistics.top_terms(stakeholder_type="business") == [("tax", 2), ("relief", 2)]
+
+    summary = statistics.term_summary("tax")
+    assert summary["frequency"] == 3
+    assert abs(summary["sentiment_score"] - 0.2 / 3) < 1e-9
+    assert summary["stakeholder_types"] == {"business", "unknown"}
+
+
+def test_example_reservoir_is_bounded():
+    statistics = TermStatistics(examples_per_term=2)
+    for i in range(20):
+        statistics.add(["water"], f"comment {i} about water supply", [{"sentiment_score": 0.0}])
+
+    examples = statistics.contextual_examples("water", context_words=1)
+    assert len(examples) == 2
+    assert all(example.endswith("about water supply") for example in examples)
+
+
+@pytest.mark.asyncio
+async def test_store_persists_counts_and_skips_recorded_comments(mongo_db):
+    writer = TermStatisticsStore()
+    await writer.ensure_indexes(mongo_db)
+    assert await writer.claim(mongo_db, "c1", ["1", "2", "1"]) == [0, 1]
+
+    statistics = TermStatistics()
+    statistics.add(["tax", "relief"], "tax relief now", [{"sentiment_score": 0.6, "stakeholder_type": "small.business"}])
+    statistics.add(["tax"], "tax", [{"sentiment_label": "negative", "sentiment_score": -0.5}])
+    assert await writer.add(mongo_db, "c1", statistics) == 2
+    # A re-posted comment is not claimed again
+    assert await writer.claim(mongo_db, "c1", ["2", "3"]) == [1]
+
+    # Another process (or a restart) reads the same counts
+    reader = TermStatisticsStore(max_consultations=1)
+    loaded = await reader.get(mongo_db, "c1")
+    assert loaded.comment_count == 2
+    assert loaded.top_terms() == statistics.top_terms()
+    assert loaded.top_terms(stakeholder_type="small.business") == [("tax", 1), ("relief", 1)]
+    assert loaded.term_summary("tax", "negative") == statistics.term_summary("tax", "negative")
+    assert loaded.contextual_examples("relief") == ["tax relief now"]
+    assert await reader.get(mongo_db, "c1") is loaded
+
+    # Writes from elsewhere are applied to the cached copy
+    more = TermStatistics()
+    more.add(["tax"], "tax", [{"sentiment_score": 0.0}])
+    await writer.add(mongo_db, "c1", more)
+    assert await reader.get(mongo_db, "c1") is loaded
+    assert loaded.top_terms(1) == [("tax", 3)]
+
+    # Eviction only drops the cached copy
+    await writer.add(mongo_db, "c2", more)
+    assert await reader.get(mongo_db, "c2") is not None
+    assert (await reader.get(mongo_db, "c1")).comment_count == 3
+
+    assert await writer.delete(mongo_db, "c1")
+    assert await reader.get(mongo_db, "c1") is None
+    assert await writer.claim(mongo_db, "c1", ["1"]) == [0]
+
+
+@pytest.mark.asyncio
+async def test_compacted_statistics_match_the_recorded_deltas(mongo_db):
+    """Deltas folded into term documents load to the same counts; examples sample every batch."""
+    writer = TermStatisticsStore(delta_terms=2, compact_versions=4)
+    await writer.ensure_indexes(mongo_db)
+    reader = TermStatisticsStore()
+    expected = TermStatistics()
+    for i in range(30):
+        statistics = TermStatistics()
+        statistics.add(["water", "supply", f"area{i}"], f"comment {i} about water supply in area{i}",
+                       [{"sentiment_score": 0.5}])
+        expected.add(["water", "supply", f"area{i}"], "", [{"sentiment_score": 0.5}])
+        await writer.add(mongo_db, "c1", statistics)
+        assert (await reader.get(mongo_db, "c1")).comment_count == i + 1
+
+    # Each add of three terms is two deltas, so compaction ran several times
+    header = await mongo_db.term_statistics.find_one({"_id": "c1"})
+    assert header["compacted_version"] > 0 and "lease_until" not in header
+    assert await mongo_db.term_statistics_deltas.count_documents({"version": {"$lte": header["pruned_version"]}}) == 0
+
+    cold = await TermStatisticsStore().get(mongo_db, "c1")
+    cached = await reader.get(mongo_db, "c1")
+    for statistics in (cold, cached):
+        assert statistics.comment_count == 30
+        assert statistics.top_terms(3) == expected.top_terms(3)
+        assert statistics.term_summary("water") == expected.term_summary("water")
+        assert statistics.examples_seen("water") == 30
+
+    # The stored reservoir is not just the first comments
+    examples = cold.contextual_examples("water", context_words=1)
+    assert len(examples) == 3
+    assert any(not example.startswith(("0 ", "1 ", "2 ")) for example in examples)
+
+    # Compacting again folds nothing twice
+    assert await writer.compact(mongo_db, "c1")
+    assert await writer.compact(mongo_db, "c1")
+    assert (await TermStatisticsStore().get(mongo_db, "c1")).top_terms(3) == expected.top_terms(3)
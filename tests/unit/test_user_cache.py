@@ -0,0 +1,39 @@
+"""
+Unit tests for the authenticated-user cache.
+"""
+
+import time
+from types import SimpleNamespace
+
+from backend.app.core.user_cache import AuthenticatedUserCache
+
+
+def test_token_and_subject_lookups_with_lru_bound():
+    cache = AuthenticatedUserCache(max_entries=2, ttl_seconds=60)
+    cache.put("a@gov.in", "token-a", SimpleNamespace(id="1"))
+    cache.put("b@gov.in", "token-b", SimpleNamespace(id="2"))
+
+    assert cache.get_by_token("token-a").id == "1"
+    assert cache.get_by_token("token-x") is None
+    assert cache.get("b@gov.in").id == "2"
+
+    # a was used before b's last lookup, so a is the least recent
+    cache.put("c@gov.in", "token-c", SimpleNamespace(id="3"))
+    assert cache.get("a@gov.in") is None
+    assert cache.get_by_token("token-a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidation_expiry_and_hit_ratio():
+    cache = AuthenticatedUserCache(max_entries=10, ttl_seconds=60)
+    cache.put("a@gov.in", "token-a", SimpleNamespace(id="1"))
+    cache.record_miss()
+    cache.get_by_token("token-a")
+
+    assert cache.invalidate(user_id=1) == 1
+    assert cache.get_by_token("token-a") is None
+    assert cache.stats()["hit_ratio"] == 0.5
+
+    # Entries never outlive the token's exp claim
+    cache.put("b@gov.in", "token-b", SimpleNamespace(id="2"), token_expires_at=time.time() - 1)
+    assert cache.get_by_token("token-b") is None
@@ -0,0 +1,42 @@
+"""
+Unit tests for the rendered word cloud image cache.
+"""
+
+from backend.app.services.wordcloud_cache import WordCloudImageCache, etag_matches, image_etag, wordcloud_cache_key
+
+
+def test_key_ignores_frequency_order_and_untruncated_words():
+    """Keys depend on the drawn top-N words and render options only."""
+    key = wordcloud_cache_key({"tax": 5, "policy": 3, "rare": 1}, 800, 400, top_n=2)
+
+    assert key == wordcloud_cache_key({"rare": 2, "policy": 3, "tax": 5}, 800, 400, top_n=2)
+    assert key != wordcloud_cache_key({"tax": 5, "policy": 3}, 800, 400, colormap="viridis", top_n=2)
+    assert key != wordcloud_cache_key({"tax": 5, "policy": 3}, 801, 400, top_n=2)
+
+
+def test_memory_bound_and_disk_tier(tmp_path):
+    """Entries evicted from memory are still served from disk."""
+    cache = WordCloudImageCache(max_memory_bytes=10, directory=str(tmp_path), max_disk_bytes=1024)
+    renders = []
+
+    def render(image):
+        renders.append(image)
+        return image
+
+    assert cache.get_or_render("a" * 64, lambda: render(b"123456")) == b"123456"
+    assert cache.get_or_render("b" * 64, lambda: render(b"abcdef")) == b"abcdef"
+    assert cache.stats()["memory_bytes"] <= 10
+
+    assert cache.get_or_render("a" * 64, lambda: render(b"other")) == b"123456"
+    assert renders == [b"123456", b"abcdef"]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_etag_matching():
+    etag = image_etag("a" * 64)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"x", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"b"', etag)